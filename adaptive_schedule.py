@@ -0,0 +1,127 @@
+"""
+Adaptive Engine Scheduling for Proletto
+
+The engine scheduler used to poll every source on fixed cron slots, no matter
+how often a source actually posts new calls. This module turns the per-job
+metadata the scheduler already keeps (``job.kwargs['metadata']``) into a yield
+history and derives each engine's next polling interval from it:
+1. Every successful run records how many opportunities it found, how many were
+   new, and how long it took, as exponentially weighted averages
+2. The next interval aims for TARGET_NEW_PER_RUN new opportunities per run,
+   given the observed rate of new opportunities per hour
+3. Intervals change by at most a factor of two per run and always stay within
+   the engine's bounds, so a quiet source is still checked often enough to
+   catch new calls well before their deadlines, and a hot source is never
+   polled more often than its minimum interval allows
+"""
+
+import os
+import time
+
+# Weight of the latest run in the moving averages
+YIELD_SMOOTHING = float(os.environ.get('ADAPTIVE_YIELD_SMOOTHING', 0.3))
+
+# New opportunities a well-timed run should find
+TARGET_NEW_PER_RUN = float(os.environ.get('ADAPTIVE_TARGET_NEW_PER_RUN', 2))
+
+# Largest factor an interval may grow or shrink by after one run
+MAX_STEP = 2.0
+
+# Polling interval bounds in hours per scheduler tier (min, max)
+TIER_INTERVAL_BOUNDS = {
+    'premium': (12, 96),
+    'supporter': (24, 120),
+    'free': (48, 168),
+    'special': (1, 12),
+}
+
+# Engine-specific bounds in hours, overriding the tier bounds
+ENGINE_INTERVAL_BOUNDS = {
+    'social': (2, 24),
+}
+
+# Engines that save outside the opportunity store (instagram_ads writes to the
+# database directly), so the store's counters cannot measure their yield; they
+# keep their configured schedule
+UNMEASURED_ENGINES = {'instagram_ads'}
+
+# Bounds for engines without a tier
+DEFAULT_INTERVAL_BOUNDS = (24, 168)
+
+
+def interval_bounds(engine_name, tier=None):
+    """
+    Polling interval bounds for an engine
+
+    Args:
+        engine_name (str): Engine name
+        tier (str): Scheduler tier from the job metadata
+
+    Returns:
+        tuple: (min hours, max hours)
+    """
+    if engine_name in ENGINE_INTERVAL_BOUNDS:
+        return ENGINE_INTERVAL_BOUNDS[engine_name]
+    return TIER_INTERVAL_BOUNDS.get(tier, DEFAULT_INTERVAL_BOUNDS)
+
+
+def _smooth(previous, value):
+    """Exponentially weighted moving average; the first value seeds it"""
+    if previous is None:
+        return value
+    return (1 - YIELD_SMOOTHING) * float(previous) + YIELD_SMOOTHING * value
+
+
+def record_yield(metadata, found, added, duration, now=None):
+    """
+    Add one successful run to an engine's yield history
+
+    Args:
+        metadata (dict): Job metadata, updated in place
+        found (int): Opportunities the run scraped
+        added (int): Opportunities that were new to the store
+        duration (float): Seconds the run took
+        now (float): Time the run finished (defaults to now)
+
+    Returns:
+        dict: The updated metadata
+    """
+    now = time.time() if now is None else now
+    last = metadata.get('last_yield_at')
+    if last:
+        hours = max((now - float(last)) / 3600, 1 / 60)
+    else:
+        hours = float(metadata.get('interval_hours') or 24)
+
+    metadata['new_per_hour'] = _smooth(metadata.get('new_per_hour'), added / hours)
+    metadata['avg_new_per_run'] = _smooth(metadata.get('avg_new_per_run'), added)
+    metadata['change_rate'] = _smooth(metadata.get('change_rate'), 1.0 if added else 0.0)
+    metadata['avg_duration'] = _smooth(metadata.get('avg_duration'), duration)
+    metadata['last_found'] = found
+    metadata['last_added'] = added
+    metadata['last_yield_at'] = now
+    metadata['yield_runs'] = int(metadata.get('yield_runs', 0)) + 1
+    return metadata
+
+
+def next_interval_hours(metadata, min_hours, max_hours):
+    """
+    Next polling interval for an engine from its yield history
+
+    Args:
+        metadata (dict): Job metadata with yield history
+        min_hours (float): Shortest allowed interval
+        max_hours (float): Longest allowed interval
+
+    Returns:
+        float: Hours until the next run
+    """
+    current = float(metadata.get('interval_hours') or min_hours)
+    rate = float(metadata.get('new_per_hour') or 0)
+
+    target = TARGET_NEW_PER_RUN / rate if rate > 0 else current * MAX_STEP
+    target = min(max(target, current / MAX_STEP), current * MAX_STEP)
+
+    # Never start a run before the previous one is likely to have finished
+    min_hours = max(min_hours, 2 * float(metadata.get('avg_duration') or 0) / 3600)
+    return min(max(target, min_hours), max_hours)
@@ -45,7 +45,7 @@ if not logger.handlers:
 
 # Import asynchronous scrapers
 from scrapers.instagram_ads_async import run_instagram_ads_scraper
-from scrapers.art_opportunities_async import run_art_opportunities_scraper, run_all_state_scrapers
+from scrapers.art_opportunities_async import run_state_scraper_with_stats, run_all_state_scrapers
 
 # State file path for persistence
 STATE_FILE = "bot_scheduler_state.json"
@@ -106,6 +106,8 @@ def job_listener(event):
             stats["success_count"] += 1
             stats["last_status"] = "success"
             stats["last_duration"] = event.retval.get("duration") if isinstance(event.retval, dict) else None
+            if isinstance(event.retval, dict) and "inserted" in event.retval:
+                stats["last_write"] = {key: event.retval.get(key, 0) for key in ("inserted", "updated", "unchanged", "failed")}
             if job_id in consecutive_failures:
                 consecutive_failures[job_id] = 0
             logger.info(f"Job {job_id} executed successfully")
@@ -183,15 +185,21 @@ def run_state_scraper_job(state_key: str) -> Dict[str, Any]:
     
     try:
         # Run within Flask app context
-        opportunities_count = run_with_app_context(run_art_opportunities_scraper, state_key)
+        stats = run_with_app_context(run_state_scraper_with_stats, state_key)
+        opportunities_count = stats["opportunities_count"]
         
         duration = time.time() - start_time
-        logger.info(f"{state_key} scraper completed in {duration:.2f}s, found {opportunities_count} opportunities")
+        logger.info(f"{state_key} scraper completed in {duration:.2f}s, found {opportunities_count} opportunities "
+                    f"({stats['inserted']} new, {stats['updated']} updated, {stats['unchanged']} unchanged)")
         
         return {
             "success": True,
             "state": state_key,
             "opportunities_count": opportunities_count,
+            "inserted": stats["inserted"],
+            "updated": stats["updated"],
+            "unchanged": stats["unchanged"],
+            "failed": stats["failed"],
             "duration": duration,
             "timestamp": datetime.now().isoformat()
         }
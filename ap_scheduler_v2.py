@@ -18,6 +18,7 @@ import time
 import json
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Dict, Any, List
 
@@ -25,8 +26,16 @@ from flask import Flask
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy import create_engine
 
+from scheduler_lease import start_scheduler_with_lease
+from job_queue import get_job_queue, SUCCEEDED
+from opportunity_store import get_opportunity_store
+from job_history import get_job_history, fetch_counters
+from adaptive_schedule import record_yield, next_interval_hours, interval_bounds, UNMEASURED_ENGINES
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -48,6 +57,16 @@ try:
     from proletto_engine_oregon import run as scrape_oregon
     from proletto_engine_pennsylvania import run as scrape_pennsylvania
     from proletto_engine_social import run as scrape_social
+    # Factory-built engines, which can also run as async scrapers on a shared loop
+    from proletto_engine_newyork import engine as newyork_engine
+    from proletto_engine_texas import engine as texas_engine
+    from proletto_engine_florida import engine as florida_engine
+    from proletto_engine_illinois import engine as illinois_engine
+    from proletto_engine_massachusetts import engine as massachusetts_engine
+    from proletto_engine_washington import engine as washington_engine
+    from proletto_engine_colorado import engine as colorado_engine
+    from proletto_engine_oregon import engine as oregon_engine
+    from proletto_engine_pennsylvania import engine as pennsylvania_engine
 except ImportError as e:
     logger.warning(f"Failed to import one or more state engines: {e}")
 
@@ -86,6 +105,18 @@ free_tier = ["social"]
 special_tier = ["instagram_ads"]
 all_engines = premium_states + supporter_states + other_states + free_tier + special_tier
 
+# Where scraper jobs run: 'inline' runs them on this process's scheduler
+# threads, 'queue' hands them to the job runner process (job_runner.py).
+# Only switch to 'queue' where a job runner is deployed, or nothing scrapes.
+SCRAPER_JOB_MODE = os.environ.get("SCRAPER_JOB_MODE", "inline")
+
+# Queued job name for a comprehensive run of all engines
+ALL_ENGINES_JOB = "all"
+
+# Reschedule engines from their observed yield; the cron slots below only seed
+# each engine's first run
+ADAPTIVE_SCHEDULING = os.environ.get("ADAPTIVE_SCHEDULING", "true").lower() == "true"
+
 # Global variables
 scheduler = None
 current_state = DEFAULT_STATE.copy()
@@ -116,8 +147,8 @@ def save_state(state: Dict[str, Any]) -> None:
         logger.error(f"Error saving state file: {e}")
 
 def job_listener(event):
-    """Event listener for job events to track successes and failures"""
-    global current_state, scheduler
+    """Event listener for job events to track per-job successes and failures"""
+    global scheduler
     
     now = datetime.now().isoformat()
     job = scheduler.get_job(event.job_id) if scheduler and event.job_id else None
@@ -144,13 +175,6 @@ def job_listener(event):
     if event.code == EVENT_JOB_EXECUTED:
         logger.info(f"Job {event.job_id} executed successfully")
         
-        # Update global state
-        current_state["last_successful_run"] = now
-        current_state["consecutive_failures"] = 0
-        current_state["total_runs"] = current_state.get("total_runs", 0) + 1
-        current_state["total_successes"] = current_state.get("total_successes", 0) + 1
-        current_state["last_run"] = now
-        
         # Update job-specific metadata
         if job:
             # Update the in-memory metadata
@@ -172,12 +196,6 @@ def job_listener(event):
     elif event.code == EVENT_JOB_ERROR:
         logger.error(f"Job {event.job_id} failed with exception: {event.exception}")
         
-        # Update global state
-        current_state["consecutive_failures"] = current_state.get("consecutive_failures", 0) + 1
-        current_state["total_runs"] = current_state.get("total_runs", 0) + 1
-        current_state["total_failures"] = current_state.get("total_failures", 0) + 1
-        current_state["last_run"] = now
-        
         # Update job-specific metadata
         if job:
             # Update the in-memory metadata
@@ -209,8 +227,6 @@ def job_listener(event):
             )
         except ImportError:
             logger.warning("Could not import alert_scheduler_error from alerts module")
-    
-    save_state(current_state)
 
 def get_scrape_function(engine_name: str):
     """Get the appropriate scrape function based on engine name"""
@@ -233,8 +249,115 @@ def get_scrape_function(engine_name: str):
     
     return scraper_map.get(engine_name)
 
-def run_scraper_job(engine_name: str) -> bool:
-    """Run a specific scraper engine"""
+def get_state_engine(engine_name: str):
+    """Get the factory-built engine for state engines that run on the async scraper core"""
+    engine_map = {
+        "newyork": newyork_engine,
+        "texas": texas_engine,
+        "florida": florida_engine,
+        "illinois": illinois_engine,
+        "massachusetts": massachusetts_engine,
+        "washington": washington_engine,
+        "colorado": colorado_engine,
+        "oregon": oregon_engine,
+        "pennsylvania": pennsylvania_engine,
+    }
+    
+    return engine_map.get(engine_name)
+
+def alert_scraper_result(engine_name: str, success: bool, duration: float, error: str = None) -> None:
+    """Send the success or error alert for a finished scraper run"""
+    if error is not None:
+        try:
+            from alerts import alert_scraper_error
+            alert_scraper_error(
+                scraper_name=engine_name,
+                error_message=error,
+                url=None,
+                attempts=1
+            )
+        except ImportError:
+            logger.warning("Could not import alert_scraper_error from alerts module")
+    elif success:
+        try:
+            from alerts import alert_scraper_success
+            alert_scraper_success(
+                scraper_name=engine_name,
+                opportunities_count=-1,  # We don't know how many, the engine doesn't return this currently
+                duration=duration
+            )
+        except ImportError:
+            logger.warning("Could not import alert_scraper_success from alerts module")
+
+def enqueue_scraper_job(engine_name: str) -> bool:
+    """Queue a scraper job for the job runner"""
+    try:
+        job_id, created = get_job_queue().enqueue(engine_name)
+    except Exception as e:
+        logger.error(f"Failed to queue scraper job for {engine_name}: {e}")
+        return False
+    
+    if created:
+        logger.info(f"Queued scraper job {job_id} for {engine_name}")
+    else:
+        logger.info(f"Scraper job {job_id} for {engine_name} is already queued or running")
+    return True
+
+def run_scraper_job(engine_name: str, metadata=None) -> bool:
+    """Run a specific scraper engine, or queue it for the job runner"""
+    if SCRAPER_JOB_MODE == "queue":
+        return enqueue_scraper_job(engine_name)
+    
+    run = measure_scraper_job(engine_name)
+    record_engine_run(engine_name, run)
+    apply_engine_yield(engine_name, run)
+    return run["success"]
+
+def record_engine_run(engine_name: str, run: Dict[str, Any]) -> None:
+    """Append an engine run executed in this process to the run history"""
+    try:
+        get_job_history().record_run(
+            engine_name, run["started_at"], run["finished_at"], run["success"],
+            job_id=f"inline:{engine_name}",
+            urls_fetched=run.get("urls_fetched"),
+            bytes_fetched=run.get("bytes_fetched"),
+            found=run.get("found"),
+            added=run.get("added"),
+            error=None if run["success"] else "Engine reported failure",
+            error_class=None if run["success"] else "EngineFailure",
+        )
+    except Exception as e:
+        logger.error(f"Failed to record {engine_name} run in the run history: {e}")
+
+def measure_scraper_job(engine_name: str) -> Dict[str, Any]:
+    """Run a specific scraper engine in this process and measure its yield"""
+    # Engines merge into the opportunity store on the thread that runs them
+    store = get_opportunity_store()
+    found_before, added_before = store.thread_counters()
+    urls_before, bytes_before = fetch_counters()
+    start_time = time.time()
+    
+    success = execute_scraper_job(engine_name)
+    
+    finished_at = time.time()
+    found, added = store.thread_counters()
+    urls_fetched, bytes_fetched = fetch_counters()
+    if engine_name in UNMEASURED_ENGINES:
+        # Unknown yield, so apply_engine_yield leaves the schedule alone
+        found = added = found_before = added_before = None
+    return {
+        "success": success,
+        "found": None if found is None else found - found_before,
+        "added": None if added is None else added - added_before,
+        "urls_fetched": urls_fetched - urls_before,
+        "bytes_fetched": bytes_fetched - bytes_before,
+        "started_at": start_time,
+        "duration": finished_at - start_time,
+        "finished_at": finished_at,
+    }
+
+def execute_scraper_job(engine_name: str) -> bool:
+    """Run a specific scraper engine in this process"""
     start_time = time.time()
     logger.info(f"Running scraper job for {engine_name}")
     
@@ -253,53 +376,168 @@ def run_scraper_job(engine_name: str) -> bool:
         logger.info(f"Scraper job for {engine_name} completed in {duration:.2f} seconds with {'success' if success else 'failure'}")
         
         # Send alert on success if needed
-        if success:
-            try:
-                from alerts import alert_scraper_success
-                alert_scraper_success(
-                    scraper_name=engine_name,
-                    opportunities_count=-1,  # We don't know how many, the engine doesn't return this currently
-                    duration=duration
-                )
-            except ImportError:
-                logger.warning("Could not import alert_scraper_success from alerts module")
+        alert_scraper_result(engine_name, success, duration)
         
         return success
     except Exception as e:
         logger.error(f"Error running scraper {engine_name}: {e}")
         
         # Send alert on error
-        try:
-            from alerts import alert_scraper_error
-            alert_scraper_error(
-                scraper_name=engine_name,
-                error_message=str(e),
-                url=None,
-                attempts=1
-            )
-        except ImportError:
-            logger.warning("Could not import alert_scraper_error from alerts module")
+        alert_scraper_result(engine_name, False, time.time() - start_time, error=str(e))
         
         return False
 
-def run_all_scrapers() -> bool:
-    """Run all available scraper engines"""
+def run_all_scrapers(metadata=None) -> bool:
+    """Run all available scraper engines, or queue the run for the job runner"""
+    if SCRAPER_JOB_MODE == "queue":
+        return enqueue_scraper_job(ALL_ENGINES_JOB)
+    
+    urls_before, bytes_before = fetch_counters()
+    start_time = time.time()
+    success = execute_all_scrapers()
+    urls_fetched, bytes_fetched = fetch_counters()
+    record_engine_run(ALL_ENGINES_JOB, {
+        "success": success,
+        "started_at": start_time,
+        "finished_at": time.time(),
+        "urls_fetched": urls_fetched - urls_before,
+        "bytes_fetched": bytes_fetched - bytes_before,
+    })
+    return success
+
+def execute_all_scrapers() -> bool:
+    """Run all available scraper engines through the shared scrape orchestrator"""
     logger.info("Running all scraper engines")
     
-    results = []
+    from scrapers.orchestrator import ScrapeOrchestrator
+    
+    # Factory-built state engines share the loop, connector pool and per-host
+    # politeness; the remaining engines run through execute_scraper_job in a thread
+    engines = {}
+    async_engines = set()
     for engine in all_engines:
-        result = run_scraper_job(engine)
-        results.append(result)
+        state_engine = get_state_engine(engine)
+        if state_engine:
+            engines[engine] = state_engine["create_scraper"](on_complete=state_engine["merge_with_existing"])
+            async_engines.add(engine)
+        else:
+            engines[engine] = partial(execute_scraper_job, engine)
+    
+    orchestrator = ScrapeOrchestrator()
+    outcome = orchestrator.run_sync(engines)
+    results = [bool(outcome.get(engine)) for engine in all_engines]
+    
+    for engine in async_engines:
+        duration = orchestrator.durations.get(engine, 0.0)
+        if outcome.get(engine) is None:
+            alert_scraper_result(engine, False, duration, error="Engine raised an exception, see scheduler logs")
+        else:
+            alert_scraper_result(engine, bool(outcome[engine]), duration)
     
     success_rate = sum(results) / len(results) if results else 0
     logger.info(f"All scraper jobs completed with {success_rate:.0%} success rate")
     return success_rate > 0.5  # Consider overall success if more than half succeeded
 
-def aggregate_metrics():
+def execute_job(engine_name: str):
+    """Run a queued job; called by the job runner in a worker process"""
+    if engine_name == ALL_ENGINES_JOB:
+        return execute_all_scrapers()
+    return measure_scraper_job(engine_name)
+
+def find_engine_job(engine_name: str):
+    """Find the recurring scheduler job that runs an engine"""
+    if not scheduler:
+        return None
+    for job in scheduler.get_jobs():
+        if (list(job.args) == [engine_name]
+                and getattr(job.func, '__name__', None) == 'run_scraper_job'
+                and not isinstance(job.trigger, DateTrigger)):
+            return job
+    return None
+
+def apply_engine_yield(engine_name: str, run: Dict[str, Any]):
+    """
+    Record a run's yield in the engine's job metadata and reschedule the job
+    
+    Args:
+        engine_name: Engine that ran
+        run: Run outcome with 'success', 'found', 'added', 'duration' and
+            optionally 'finished_at'
+    
+    Returns:
+        Hours until the engine's next run, or None if the job was not rescheduled
+    """
+    if not ADAPTIVE_SCHEDULING or not run.get("success") or run.get("added") is None:
+        return None
+    
+    job = find_engine_job(engine_name)
+    if not job:
+        return None
+    
+    try:
+        metadata = dict(job.kwargs.get('metadata') or {})
+        record_yield(metadata, run.get("found") or 0, run["added"], run.get("duration") or 0,
+                     now=run.get("finished_at"))
+        min_hours, max_hours = interval_bounds(engine_name, metadata.get('tier'))
+        hours = next_interval_hours(metadata, min_hours, max_hours)
+        metadata['interval_hours'] = hours
+        
+        scheduler.modify_job(job_id=job.id, kwargs=dict(job.kwargs, metadata=metadata))
+        scheduler.reschedule_job(job.id, trigger=IntervalTrigger(seconds=int(hours * 3600)))
+        logger.info(
+            f"Engine {engine_name} added {run['added']} of {run.get('found') or 0} opportunities, "
+            f"next run in {hours:.1f} hours"
+        )
+        return hours
+    except Exception as e:
+        logger.error(f"Failed to reschedule engine {engine_name} from its yield: {e}")
+        return None
+
+def apply_job_results(metadata=None) -> int:
+    """Feed the yield of runs finished by the job runner into the schedule"""
+    global current_state
+    
+    queue = get_job_queue()
+    saved_cursor = current_state.get("job_results_cursor")
+    if isinstance(saved_cursor, list):
+        cursor = tuple(saved_cursor)
+    elif saved_cursor:
+        # Cursor saved as a bare job id; resume from that job's finish time
+        job = queue.get(int(saved_cursor))
+        cursor = (job['finished_at'] or 0.0, job['id']) if job else (0.0, 0)
+    else:
+        cursor = (0.0, 0)
+    
+    applied = 0
+    start = cursor
+    for job in queue.finished_since(*cursor):
+        cursor = (job['finished_at'], job['id'])
+        if job['engine'] == ALL_ENGINES_JOB or job['status'] != SUCCEEDED:
+            continue
+        run = {
+            "success": True,
+            "found": job['found'],
+            "added": job['added'],
+            "duration": job['duration'],
+            "finished_at": job['finished_at'],
+        }
+        if apply_engine_yield(job['engine'], run) is not None:
+            applied += 1
+    
+    if cursor != start or not isinstance(saved_cursor, list):
+        current_state["job_results_cursor"] = list(cursor)
+        save_state(current_state)
+    return applied
+
+def aggregate_metrics(metadata=None):
     """Aggregate metrics from all scrapers for reporting"""
     logger.info("Aggregating scraper metrics")
-    # Implementation would depend on what metrics you want to track
-    # For example, success rates, average run times, opportunity counts, etc.
+    # Downsample old engine runs into daily rows and expire old rollups
+    try:
+        get_job_history().compact()
+    except Exception as e:
+        logger.error(f"Failed to compact the job run history: {e}")
+    
     try:
         from scraper_health import aggregate_all
         aggregate_all()
@@ -364,7 +602,7 @@ def init_scheduler(app) -> BackgroundScheduler:
     is_production = os.environ.get("REPLIT_DEPLOYMENT") == "true" or os.environ.get("ENABLE_SCHEDULER") == "true"
     if not is_production:
         logger.info("Running in development mode - jobs will be scheduled but not executed")
-        scheduler.start()
+        start_scheduler_with_lease(scheduler, 'engines')
         return scheduler
     
     # Schedule premium tier state scrapers (3 times per week - Monday, Wednesday, Friday at 11am)
@@ -376,7 +614,8 @@ def init_scheduler(app) -> BackgroundScheduler:
                 'total_runs': 0,
                 'total_successes': 0,
                 'total_failures': 0,
-                'tier': 'premium'
+                'tier': 'premium',
+                'interval_hours': 56
             }
         }
         scheduler.add_job(
@@ -402,7 +641,8 @@ def init_scheduler(app) -> BackgroundScheduler:
                 'total_runs': 0,
                 'total_successes': 0,
                 'total_failures': 0,
-                'tier': 'supporter'
+                'tier': 'supporter',
+                'interval_hours': 84
             }
         }
         scheduler.add_job(
@@ -428,7 +668,8 @@ def init_scheduler(app) -> BackgroundScheduler:
                 'total_runs': 0,
                 'total_successes': 0,
                 'total_failures': 0,
-                'tier': 'free'
+                'tier': 'free',
+                'interval_hours': 168
             }
         }
         scheduler.add_job(
@@ -453,7 +694,8 @@ def init_scheduler(app) -> BackgroundScheduler:
             'total_runs': 0,
             'total_successes': 0,
             'total_failures': 0,
-            'tier': 'free'
+            'tier': 'free',
+            'interval_hours': 6
         }
     }
     scheduler.add_job(
@@ -476,7 +718,8 @@ def init_scheduler(app) -> BackgroundScheduler:
             'total_runs': 0,
             'total_successes': 0,
             'total_failures': 0,
-            'tier': 'special'
+            'tier': 'special',
+            'interval_hours': 1
         }
     }
     scheduler.add_job(
@@ -527,9 +770,20 @@ def init_scheduler(app) -> BackgroundScheduler:
         coalesce=True,
     )
     
+    # Reschedule engines from the yield of runs finished by the job runner
+    if ADAPTIVE_SCHEDULING and SCRAPER_JOB_MODE == "queue":
+        scheduler.add_job(
+            apply_job_results,
+            'interval',
+            minutes=5,
+            id="apply_job_results",
+            max_instances=1,
+            coalesce=True,
+        )
+    
     # Start the scheduler
     logger.info("Starting APScheduler for Proletto engines in production mode")
-    scheduler.start()
+    start_scheduler_with_lease(scheduler, 'engines')
     
     # Run social engine immediately on startup for quick feedback
     if os.environ.get("RUN_ON_STARTUP", "true").lower() == "true":
@@ -589,18 +843,32 @@ def get_scheduler_info() -> Dict[str, Any]:
             "last_failure": job_metadata.get('last_failure', None),
             "consecutive_failures": job_metadata.get('consecutive_failures', 0),
             "total_runs": job_metadata.get('total_runs', 0),
+            "interval_hours": job_metadata.get('interval_hours'),
+            "new_per_hour": job_metadata.get('new_per_hour'),
+            "change_rate": job_metadata.get('change_rate'),
         })
     
     return {
         "status": "running" if scheduler.running else "stopped",
         "jobs_count": len(scheduler.get_jobs()),
         "jobs": jobs,
-        "state": current_state,
+        "state": dict(current_state, **get_job_history().summary()),
         "is_production": os.environ.get("REPLIT_DEPLOYMENT") == "true" or os.environ.get("ENABLE_SCHEDULER") == "true",
         "started_at": getattr(scheduler, 'start_time', None),
         "timezone": str(getattr(scheduler, 'timezone', 'UTC')),
+        "job_mode": SCRAPER_JOB_MODE,
+        "job_queue": get_job_queue_info(limit=10),
     }
 
+def get_job_queue_info(limit: int = 50) -> Dict[str, Any]:
+    """Get the state of the scraper job queue consumed by the job runner"""
+    try:
+        queue = get_job_queue()
+        return {"counts": queue.counts(), "recent": queue.recent(limit)}
+    except Exception as e:
+        logger.error(f"Error reading scraper job queue: {e}")
+        return {"error": str(e)}
+
 # Flask routes for monitoring and management
 @app.route('/healthz')
 def healthz():
@@ -614,6 +882,11 @@ def scheduler_status():
     """Get detailed scheduler status"""
     return get_scheduler_info()
 
+@app.route('/admin/api/scheduler/queue')
+def job_queue_status():
+    """Get queued, running and recent scraper jobs"""
+    return get_job_queue_info()
+
 @app.route('/admin/api/scheduler/jobs/<job_id>/pause')
 def pause_job(job_id):
     """Pause a job"""
@@ -21,6 +21,8 @@ from flask_limiter.util import get_remote_address
 from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
 from flask_caching import Cache
 import token_blocklist  # We'll initialize this later after db setup
+from opportunity_dataset import get_opportunity_dataset
+from opportunity_ingest import ingest_opportunities, parse_batch, request_drive_sync, INGEST_MAX_BATCH
 from ai_helper import generate_personalized_suggestions, track_user_activity
 from portfolio_optimizer import PortfolioOptimizer
 from portfolio_routes import portfolio_bp
@@ -720,31 +722,12 @@ def test_add_opportunity():
         if 'scraped_date' not in data:
             data['scraped_date'] = datetime.utcnow().isoformat()
         
-        # Load existing opportunities from local file only
-        try:
-            with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                opportunities = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            opportunities = []
-            logger.warning(f"Creating new opportunities file at {OPPORTUNITIES_FILE}")
-        
         # Add a marker to identify test opportunities
         data['source'] = f"Test: {data.get('source', 'API Test')}"
         data['test_flag'] = True
         
-        # Check for duplicates (by URL)
-        for opp in opportunities:
-            if opp.get('url') == data.get('url'):
-                # Update existing opportunity
-                opp.update(data)
-                break
-        else:
-            # Add new opportunity
-            opportunities.append(data)
-        
-        # Save updated opportunities to local file only
-        with open(OPPORTUNITIES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(opportunities, f, indent=2)
+        # Upsert by URL in the local file only
+        ingest_opportunities([data], OPPORTUNITIES_FILE)
         
         logger.info(f"Test opportunity saved successfully: {data['title']} - local storage only")
         return jsonify({
@@ -766,25 +749,16 @@ def get_opportunities():
     Get all opportunities, with optional filtering
     """
     try:
-        # Just load directly from the local file for now
-        app.logger.info(f"Loading opportunities from local file: {OPPORTUNITIES_FILE}")
-        
-        # Check if the file exists and is readable
-        if not os.path.exists(OPPORTUNITIES_FILE):
+        # Served from the in-memory dataset, reloaded when the file changes
+        try:
+            dataset = get_opportunity_dataset(OPPORTUNITIES_FILE).snapshot()
+        except FileNotFoundError:
             app.logger.error(f"Opportunities file does not exist: {OPPORTUNITIES_FILE}")
             return jsonify({
                 'success': False,
                 'error': 'Opportunities file not found',
                 'file_path': OPPORTUNITIES_FILE
             }), 404
-        
-        try:
-            with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                opportunities = json.load(f)
-            
-            # Extra logging to debug the structure
-            app.logger.info(f"Successfully loaded {len(opportunities)} opportunities")
-            
         except json.JSONDecodeError as e:
             app.logger.error(f"JSON decode error when reading {OPPORTUNITIES_FILE}: {str(e)}")
             return jsonify({
@@ -797,14 +771,9 @@ def get_opportunities():
                 'success': False,
                 'error': f'Error reading opportunities file: {str(e)}'
             }), 500
-            
-        # Handle file not found or empty
-        if not opportunities:
-            app.logger.warning(f"Opportunities file found but empty: {OPPORTUNITIES_FILE}")
-            opportunities = []
         
         # Get request parameters for filtering
-        keyword = request.args.get('keyword', '').lower()
+        keyword = request.args.get('keyword', '')
         limit = request.args.get('limit')
         if limit:
             try:
@@ -812,30 +781,8 @@ def get_opportunities():
             except ValueError:
                 limit = None
         
-        # Filter by keyword if provided
-        if keyword:
-            filtered_opportunities = [
-                opp for opp in opportunities 
-                if (keyword in opp.get('title', '').lower() or
-                    keyword in opp.get('description', '').lower() or
-                    keyword in opp.get('location', '').lower() or
-                    keyword in opp.get('source', '').lower())
-            ]
-        else:
-            filtered_opportunities = opportunities
-        
-        # Sort by scraped date (newest first)
-        sorted_opportunities = sorted(
-            filtered_opportunities,
-            key=lambda x: x.get('scraped_date', ''),
-            reverse=True
-        )
-        
-        # Apply limit if provided
-        if limit and limit > 0:
-            result = sorted_opportunities[:limit]
-        else:
-            result = sorted_opportunities
+        # Filter by keyword, newest first (the dataset is kept sorted by scraped date)
+        result = dataset.search(keyword, limit)
         
         # Return the opportunities as JSON
         return jsonify({
@@ -851,6 +798,41 @@ def get_opportunities():
             'error': str(e)
         }), 500
 
+def _check_ingest_permission(user_id, action):
+    """
+    Check that a JWT user may push opportunities (bot and admin users only)
+    
+    Args:
+        user_id: Identity from the JWT
+        action (str): What the user is doing, for the logs
+        
+    Returns:
+        tuple: (response, status) to return on failure, or None when allowed
+    """
+    with main_app.app_context():
+        # Import here to ensure User is properly loaded in the app context
+        from models import User
+        user = User.query.get(user_id)
+        
+        if not user:
+            logger.warning(f"User not found for ID {user_id} when attempting to {action}")
+            return jsonify({
+                'success': False,
+                'error': 'User not found.'
+            }), 404
+            
+        # Authenticated but checking specific role permissions
+        if user.role != 'bot' and user.role != 'admin':
+            logger.warning(f"Unauthorized attempt to {action} by user ID {user_id}, role: {user.role}")
+            return jsonify({
+                'success': False,
+                'error': 'Unauthorized. Only bot or admin users can add opportunities via API.'
+            }), 403
+            
+        # Success - user has proper role
+        logger.info(f"Authorized access to {action} by {user.role} user (ID: {user.id}, email: {user.email})")
+    return None
+
 @api_bp.route('/opportunities/add', methods=['POST'])
 @jwt_required()
 def add_opportunity():
@@ -860,32 +842,10 @@ def add_opportunity():
     Only bot and admin users can add opportunities directly via API
     """
     try:
-        # Get user identity from token
-        user_id = get_jwt_identity()
-        
         # Check if user has permission (bot or admin)
-        with main_app.app_context():
-            # Import here to ensure User is properly loaded in the app context
-            from models import User
-            user = User.query.get(user_id)
-            
-            if not user:
-                logger.warning(f"User not found for ID {user_id} when attempting to add opportunity")
-                return jsonify({
-                    'success': False,
-                    'error': 'User not found.'
-                }), 404
-                
-            # Authenticated but checking specific role permissions
-            if user.role != 'bot' and user.role != 'admin':
-                logger.warning(f"Unauthorized attempt to add opportunity by user ID {user_id}, role: {user.role}")
-                return jsonify({
-                    'success': False,
-                    'error': 'Unauthorized. Only bot or admin users can add opportunities via API.'
-                }), 403
-                
-            # Success - user has proper role
-            logger.info(f"Authorized access for opportunity addition by {user.role} user (ID: {user.id}, email: {user.email})")
+        denied = _check_ingest_permission(get_jwt_identity(), 'add opportunity')
+        if denied:
+            return denied
         
         # Get opportunity data from request
         data = request.json
@@ -905,54 +865,15 @@ def add_opportunity():
                     'error': f'Missing required field: {field}'
                 }), 400
         
-        # Add scraped_date if not provided
-        if 'scraped_date' not in data:
-            data['scraped_date'] = datetime.utcnow().isoformat()
-        
-        # Load existing opportunities from Google Drive or local file
-        opportunities = []
-        if DRIVE_ENABLED:
-            try:
-                drive_service = get_drive_service()
-                opportunities = drive_service.load_opportunities()
-                if not opportunities:
-                    # Fall back to local file if no opportunities found
-                    with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                        opportunities = json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading from Google Drive: {e}, falling back to local file")
-                with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                    opportunities = json.load(f)
-        else:
-            # Load from local file
-            try:
-                with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                    opportunities = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                opportunities = []
-        
-        # Check for duplicates (by URL)
-        for opp in opportunities:
-            if opp.get('url') == data.get('url'):
-                # Update existing opportunity
-                opp.update(data)
-                break
-        else:
-            # Add new opportunity
-            opportunities.append(data)
-        
-        # Save updated opportunities to both local file and Google Drive
-        with open(OPPORTUNITIES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(opportunities, f, indent=2)
-        
-        # Save to Google Drive if enabled
-        if DRIVE_ENABLED:
-            try:
-                drive_service = get_drive_service()
-                file_id = drive_service.save_opportunities(opportunities)
-                logger.info(f"Successfully saved opportunities to Google Drive with ID: {file_id}")
-            except Exception as e:
-                logger.error(f"Failed to save to Google Drive: {e}")
+        # A batch of one: upserted by URL in the local file, Drive synced in the background
+        summary = ingest_opportunities([data], OPPORTUNITIES_FILE)
+        if summary['error']:
+            return jsonify({
+                'success': False,
+                'error': summary['results'][0]['error']
+            }), 400
+        if summary['written'] and DRIVE_ENABLED:
+            request_drive_sync()
         
         return jsonify({
             'success': True,
@@ -966,40 +887,79 @@ def add_opportunity():
             'error': str(e)
         }), 500
 
+@api_bp.route('/opportunities/batch', methods=['POST'])
+@jwt_required()
+def add_opportunities_batch():
+    """
+    Add or update many opportunities in one request
+    Requires JWT authentication
+    Only bot and admin users can add opportunities directly via API
+    
+    Accepts a JSON array, {"opportunities": [...]}, or NDJSON (one opportunity
+    per line, Content-Type application/x-ndjson). Opportunities are upserted by
+    URL with a single write of the opportunities file, and the Google Drive copy
+    is synced at most once per DRIVE_SYNC_INTERVAL.
+    
+    Returns per-item results: {"index", "url", "status", "error"} where status
+    is created, updated, unchanged or error.
+    """
+    try:
+        denied = _check_ingest_permission(get_jwt_identity(), 'add opportunity batch')
+        if denied:
+            return denied
+        
+        try:
+            items = parse_batch(request.get_data(), request.content_type)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid batch: {str(e)}'
+            }), 400
+        
+        if len(items) > INGEST_MAX_BATCH:
+            return jsonify({
+                'success': False,
+                'error': f'Batch too large: {len(items)} opportunities (max {INGEST_MAX_BATCH})'
+            }), 413
+        
+        summary = ingest_opportunities(items, OPPORTUNITIES_FILE)
+        if summary['written'] and DRIVE_ENABLED:
+            request_drive_sync()
+        
+        return jsonify({
+            'success': summary['error'] < len(items),
+            'count': len(items),
+            'created': summary['created'],
+            'updated': summary['updated'],
+            'unchanged': summary['unchanged'],
+            'failed': summary['error'],
+            'results': summary['results']
+        })
+    
+    except Exception as e:
+        logger.error(f"Error in add_opportunities_batch: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @api_bp.route('/stats', methods=['GET'])
 def get_stats():
     """
     Get statistics about the opportunities
     """
     try:
-        # Just load directly from the local file for now
-        opportunities = []
-        app.logger.info(f"Loading opportunities from local file for stats: {OPPORTUNITIES_FILE}")
+        # Served from the in-memory dataset, with dates parsed and counted per day on load
         try:
-            with open(OPPORTUNITIES_FILE, 'r', encoding='utf-8') as f:
-                opportunities = json.load(f)
-            app.logger.info(f"Successfully loaded {len(opportunities)} opportunities for stats")
+            dataset = get_opportunity_dataset(OPPORTUNITIES_FILE).snapshot()
+            total_count = len(dataset)
+            
+            # Count opportunities by scraped date (last 7 days)
+            daily_counts = dataset.daily_counts(days=7)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             app.logger.warning(f"Opportunities file not found or invalid: {OPPORTUNITIES_FILE}, Error: {str(e)}")
-            opportunities = []
-        
-        # Calculate stats
-        total_count = len(opportunities)
-        
-        # Count opportunities by scraped date (last 7 days)
-        today = datetime.utcnow().date()
-        daily_counts = {}
-        
-        for opp in opportunities:
-            try:
-                scraped_date = datetime.fromisoformat(opp.get('scraped_date', '')).date()
-                days_ago = (today - scraped_date).days
-                
-                if days_ago <= 7:
-                    date_str = scraped_date.isoformat()
-                    daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
-            except (ValueError, TypeError):
-                continue
+            total_count = 0
+            daily_counts = {}
         
         # Return the stats as JSON
         return jsonify({
@@ -3318,15 +3278,18 @@ def create_app():
     # Configure rate limiting
     # Rate limits can be adjusted based on API usage patterns and requirements
     
-    # Rate limiting configuration - use memory storage for simplicity and reliability
-    # This avoids Redis authentication issues in development
-    app.logger.info("Using memory storage for rate limiting for reliability")
+    # Rate limiting configuration - counters live in storage shared by all
+    # worker processes, so each limit holds for the whole app rather than per worker
+    from rate_limit_storage import rate_limit_storage_uri, RATE_LIMIT_STRATEGY
+    storage_uri = rate_limit_storage_uri()
+    app.logger.info(f"Using shared storage for rate limiting: {storage_uri.split('://')[0]}")
     limiter = Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=["200 per day", "50 per hour"],
-        storage_uri="memory://",
-        strategy="fixed-window"
+        storage_uri=storage_uri,
+        strategy=RATE_LIMIT_STRATEGY,
+        headers_enabled=True
     )
     
     # Register rate limiting for specific endpoints
@@ -3527,8 +3490,8 @@ def create_app():
     @limiter.limit("5 per minute")
     def rate_limit_test():
         """Test endpoint for rate limiting"""
-        # Check if we're using Redis or memory storage
-        storage_type = "Redis" if "redis" in os.environ.get('REDIS_URL', "memory://").lower() else "Memory"
+        # Report which shared storage backs the counters (shm or e.g. redis)
+        storage_type = storage_uri.split('://')[0]
         
         return jsonify({
             'message': 'Rate limit test endpoint',
@@ -3556,6 +3519,13 @@ def create_app():
 # Create the application for both direct execution and imports
 app = create_app()
 
+# Load the opportunities dataset now, so with preload_app the workers are
+# forked with it already in memory
+try:
+    get_opportunity_dataset(OPPORTUNITIES_FILE).snapshot()
+except Exception as e:
+    logger.warning(f"Opportunities dataset not preloaded: {e}")
+
 # Initialize the app with the same db instance from main app
 with app.app_context():
     db.init_app(app)
@@ -3592,6 +3562,13 @@ with app.app_context():
     token_blocklist.define_token_blocklist()
     logger.info("Token blocklist system initialized")
 
+# Answer revocation checks from memory, synced from the blocklist table
+try:
+    token_blocklist.start_revocation_sync(app)
+    logger.info(f"Loaded {len(token_blocklist.revocations)} revoked tokens")
+except Exception as e:
+    logger.error(f"Failed to load token blocklist, will retry on first check: {e}")
+
 # Configure JWT to check for token revocation
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
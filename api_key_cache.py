@@ -0,0 +1,322 @@
+"""
+Verified API Key Cache and Usage Accounting for Proletto
+
+Every public API request runs through ``verify_key``, which used to hash the
+key with 100,000 PBKDF2 iterations, look it up, and run a synchronous
+``UPDATE api_key SET request_count = request_count + 1`` before the request
+could proceed. This module takes both off the hot path:
+1. ``VerifiedKeyCache`` keeps verified keys with their key info for a short
+   TTL, bounded in size, keyed by an HMAC of the raw key with a per-process
+   secret, so raw keys are never kept in memory and lookups cost microseconds
+2. Entries never outlive the key's own ``expires_at``, and revoking a key
+   clears the caches: directly in the revoking process, and in every other
+   process on the host through a revocation marker file they check at most
+   once per second
+3. ``UsageBuffer`` counts requests and rate limit hits per key in memory and
+   writes them with one batched UPDATE every few seconds
+"""
+
+import os
+import hmac
+import time
+import atexit
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import text
+
+# Configure logging
+logger = logging.getLogger('api_key_cache')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Seconds a verified key is trusted without checking the database again
+API_KEY_CACHE_TTL = float(os.environ.get('API_KEY_CACHE_TTL', 60))
+
+# Verified keys kept per process
+API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE', 10000))
+
+# File touched whenever a key is revoked, so every process drops its cache
+API_KEY_REVOCATION_MARKER = os.environ.get('API_KEY_REVOCATION_MARKER', 'data/api_key_revocations')
+
+# Seconds between checks of the revocation marker
+REVOCATION_CHECK_INTERVAL = 1.0
+
+# Seconds between batched usage counter writes
+API_KEY_USAGE_FLUSH_INTERVAL = float(os.environ.get('API_KEY_USAGE_FLUSH_INTERVAL', 5))
+
+_caches = weakref.WeakSet()
+_buffers = weakref.WeakSet()
+
+
+def _marker_mtime():
+    try:
+        return os.stat(API_KEY_REVOCATION_MARKER).st_mtime_ns
+    except OSError:
+        return 0
+
+
+class VerifiedKeyCache:
+    """Bounded, TTL'd cache of verified API key -> key info"""
+
+    def __init__(self, max_entries=None, ttl=None):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries (int): Keys kept before the least recently used is dropped
+            ttl (float): Seconds an entry stays valid
+        """
+        self.max_entries = API_KEY_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = API_KEY_CACHE_TTL if ttl is None else ttl
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._marker = _marker_mtime()
+        self._marker_checked = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    def _digest(self, api_key):
+        return hmac.new(self._secret, api_key.encode('utf-8'), hashlib.sha256).digest()
+
+    def _check_marker(self, now):
+        """Drop everything when another process revoked a key"""
+        if now - self._marker_checked < REVOCATION_CHECK_INTERVAL:
+            return
+        self._marker_checked = now
+        marker = _marker_mtime()
+        if marker != self._marker:
+            self._marker = marker
+            self._entries.clear()
+
+    def get(self, api_key):
+        """
+        Key info for a verified key
+
+        Args:
+            api_key (str): Raw API key
+
+        Returns:
+            dict: Copy of the cached key info, or None on a miss
+        """
+        digest = self._digest(api_key)
+        now = time.monotonic()
+        with self._lock:
+            self._check_marker(now)
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, api_key, key_info, expires_at=None):
+        """
+        Cache a verified key
+
+        Args:
+            api_key (str): Raw API key
+            key_info (dict): Key info returned by verify_key
+            expires_at (datetime): Key expiry (UTC); the entry never outlives it
+        """
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+        digest = self._digest(api_key)
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + ttl, dict(key_info))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key_id=None, api_key=None):
+        """
+        Drop cached entries for a key
+
+        Args:
+            key_id (int): Database id of the key
+            api_key (str): Raw API key
+
+        Returns:
+            int: Number of entries dropped
+        """
+        with self._lock:
+            if api_key is not None:
+                return 1 if self._entries.pop(self._digest(api_key), None) else 0
+            stale = [digest for digest, (_, info) in self._entries.items() if info.get('id') == key_id]
+            for digest in stale:
+                del self._entries[digest]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Cache size and hit counts"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+
+
+def notify_key_revoked(key_id=None):
+    """
+    Invalidate a revoked or expired key in every cache on this host
+
+    Args:
+        key_id (int): Database id of the key, or None to drop all entries
+    """
+    for cache in list(_caches):
+        if key_id is None:
+            cache.clear()
+        else:
+            cache.invalidate(key_id=key_id)
+    try:
+        directory = os.path.dirname(API_KEY_REVOCATION_MARKER)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(API_KEY_REVOCATION_MARKER, 'a'):
+            pass
+        os.utime(API_KEY_REVOCATION_MARKER)
+    except OSError as e:
+        logger.error(f"Error touching API key revocation marker: {e}")
+
+
+class UsageBuffer:
+    """In-memory request and rate limit counters, flushed in batched UPDATEs"""
+
+    def __init__(self, engine, flush_interval=None):
+        """
+        Initialize the buffer
+
+        Args:
+            engine: SQLAlchemy engine for the api_key table
+            flush_interval (float): Seconds between background flushes
+        """
+        self.engine = engine
+        self.flush_interval = API_KEY_USAGE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._requests = {}
+        self._rate_limit_hits = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        _buffers.add(self)
+
+    def record_request(self, key_id, when=None):
+        """Count one request for a key"""
+        when = when or datetime.utcnow()
+        with self._lock:
+            count, _ = self._requests.get(key_id, (0, None))
+            self._requests[key_id] = (count + 1, when)
+        self._ensure_thread()
+
+    def record_rate_limit_hit(self, key_id):
+        """Count one rate limit hit for a key"""
+        with self._lock:
+            self._rate_limit_hits[key_id] = self._rate_limit_hits.get(key_id, 0) + 1
+        self._ensure_thread()
+
+    def pending(self):
+        """Counts not written yet"""
+        with self._lock:
+            return {
+                'requests': sum(count for count, _ in self._requests.values()),
+                'rate_limit_hits': sum(self._rate_limit_hits.values()),
+            }
+
+    def flush(self):
+        """
+        Write the buffered counts, one batched UPDATE per counter
+
+        Returns:
+            int: Number of keys updated
+        """
+        with self._lock:
+            requests, self._requests = self._requests, {}
+            hits, self._rate_limit_hits = self._rate_limit_hits, {}
+        if not requests and not hits:
+            return 0
+        try:
+            with self.engine.begin() as conn:
+                if requests:
+                    conn.execute(
+                        text('UPDATE "api_key" SET request_count = COALESCE(request_count, 0) + :count, '
+                             'last_used_at = :last_used_at WHERE id = :id'),
+                        [{'id': key_id, 'count': count, 'last_used_at': when}
+                         for key_id, (count, when) in requests.items()]
+                    )
+                if hits:
+                    conn.execute(
+                        text('UPDATE "api_key" SET rate_limit_hits = COALESCE(rate_limit_hits, 0) + :count '
+                             'WHERE id = :id'),
+                        [{'id': key_id, 'count': count} for key_id, count in hits.items()]
+                    )
+            return len(set(requests) | set(hits))
+        except Exception as e:
+            logger.error(f"Error flushing API key usage counters: {e}")
+            # Keep the counts for the next flush
+            with self._lock:
+                for key_id, (count, when) in requests.items():
+                    pending, latest = self._requests.get(key_id, (0, when))
+                    self._requests[key_id] = (pending + count, max(latest, when))
+                for key_id, count in hits.items():
+                    self._rate_limit_hits[key_id] = self._rate_limit_hits.get(key_id, 0) + count
+            return 0
+
+    def _ensure_thread(self):
+        if self._thread is None and self.flush_interval > 0:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='api-key-usage', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Stop the background flusher and write what is left"""
+        self._stop.set()
+        self.flush()
+
+    def _after_fork_in_child(self):
+        """Counts buffered before the fork belong to the parent"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._requests = {}
+        self._rate_limit_hits = {}
+
+
+def _flush_buffers_at_exit():
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+def _reset_after_fork():
+    for cache in list(_caches):
+        cache._after_fork_in_child()
+    for buffer in list(_buffers):
+        buffer._after_fork_in_child()
+
+
+atexit.register(_flush_buffers_at_exit)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -4,6 +4,8 @@ Database-backed API Key Service
 
 This module provides functions for verifying API keys against the database.
 It handles key hashing, verification, and status checks using SQLAlchemy Core.
+Verified keys are cached in process and usage counters are written in batches
+(see api_key_cache).
 """
 
 import os
@@ -13,6 +15,8 @@ from datetime import datetime
 from typing import Dict, Any, Tuple, Optional
 from sqlalchemy import create_engine, Table, Column, Integer, String, DateTime, Boolean, MetaData, select, text, update
 
+from api_key_cache import VerifiedKeyCache, UsageBuffer, notify_key_revoked
+
 # Database connection
 DATABASE_URL = os.getenv('DATABASE_URL')
 engine = create_engine(DATABASE_URL) if DATABASE_URL else None
@@ -36,6 +40,10 @@ api_keys = Table(
     Column('rate_limit_hits', Integer, default=0)
 )
 
+# Verified keys and buffered usage counters for this process
+key_cache = VerifiedKeyCache()
+usage_buffer = UsageBuffer(engine) if engine else None
+
 def hash_key(raw_key: str) -> str:
     """
     Hash an API key for secure storage using PBKDF2
@@ -76,6 +84,12 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
             'is_master': True
         }
     
+    # Recently verified keys skip the hash and the lookup
+    cached = key_cache.get(api_key)
+    if cached is not None:
+        usage_buffer.record_request(cached['id'])
+        return True, cached
+    
     # Hash the key for comparison
     key_hash = hash_key(api_key)
     key_prefix = api_key[:8] if len(api_key) >= 8 else api_key
@@ -127,17 +141,14 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
                 # Update key status to expired
                 update_stmt = update(api_keys).where(api_keys.c.id == key_id).values(status='expired')
                 conn.execute(update_stmt)
+                conn.commit()
+                notify_key_revoked(key_id)
                 return False, None
             
-            # Update usage information
-            update_stmt = update(api_keys).where(api_keys.c.id == key_id).values(
-                request_count=api_keys.c.request_count + 1,
-                last_used_at=now
-            )
-            conn.execute(update_stmt)
+            # Usage information is written in the next batch
+            usage_buffer.record_request(key_id, now)
             
-            # Return key info
-            return True, {
+            key_info = {
                 'id': key_id,
                 'name': name,
                 'plan': plan,
@@ -145,6 +156,8 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
                 'user_id': user_id,
                 'expires_at': expires_at
             }
+            key_cache.put(api_key, key_info, expires_at)
+            return True, key_info
     except Exception as e:
         print(f"Error verifying API key: {e}")
         return False, None
@@ -168,6 +181,12 @@ def record_rate_limit_hit(api_key: str) -> bool:
     if master_key and api_key == master_key:
         return True
     
+    # Verified keys are counted in the next usage batch
+    cached = key_cache.get(api_key)
+    if cached is not None:
+        usage_buffer.record_rate_limit_hit(cached['id'])
+        return True
+    
     try:
         # Get key prefix for lookup
         key_prefix = api_key[:8] if len(api_key) >= 8 else api_key
@@ -182,6 +201,7 @@ def record_rate_limit_hit(api_key: str) -> bool:
                 rate_limit_hits=api_keys.c.rate_limit_hits + 1
             )
             result = conn.execute(update_stmt)
+            conn.commit()
             return result.rowcount > 0
     except Exception as e:
         print(f"Error recording rate limit hit: {e}")
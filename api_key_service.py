@@ -4,6 +4,8 @@ API Key Verification Service
 
 This module provides functions for verifying API keys against the database.
 It handles key hashing, verification, and status checks.
+Verified keys are cached in process and usage counters are written in batches
+(see api_key_cache).
 """
 
 import os
@@ -13,10 +15,16 @@ from datetime import datetime
 from typing import Optional, Dict, Any, Tuple
 from sqlalchemy import create_engine, text
 
+from api_key_cache import VerifiedKeyCache, UsageBuffer
+
 # Database connection
 DATABASE_URL = os.environ.get('DATABASE_URL')
 engine = create_engine(DATABASE_URL) if DATABASE_URL else None
 
+# Verified keys and buffered usage counters for this process
+key_cache = VerifiedKeyCache()
+usage_buffer = UsageBuffer(engine) if engine else None
+
 def hash_key(raw_key: str) -> str:
     """
     Hash an API key for secure storage using PBKDF2
@@ -74,6 +82,12 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
             'is_legacy': True
         }
     
+    # Recently verified keys skip the hash and the lookup
+    cached = key_cache.get(api_key)
+    if cached is not None:
+        usage_buffer.record_request(cached['id'])
+        return True, cached
+    
     # New database verification
     try:
         # First try prefix lookup for performance 
@@ -98,12 +112,10 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
                     if record['expires_at'] and record['expires_at'] < datetime.utcnow():
                         return False, None
                         
-                    # Update request count (for analytics)
-                    update_stmt = text('UPDATE "api_key" SET request_count = request_count + 1 WHERE id = :id')
-                    conn.execute(update_stmt, {"id": record['id']})
+                    # Request count (for analytics) is written in the next batch
+                    usage_buffer.record_request(record['id'])
                     
-                    # Return key info
-                    return True, {
+                    key_info = {
                         'id': record['id'],
                         'name': record['name'],
                         'plan': record['plan'],
@@ -111,6 +123,8 @@ def verify_key(api_key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
                         'user_id': record['user_id'],
                         'is_db': True
                     }
+                    key_cache.put(api_key, key_info, record['expires_at'])
+                    return True, key_info
                     
         # No matching key found
         return False, None
@@ -143,6 +157,12 @@ def record_rate_limit_hit(api_key: str) -> bool:
     if not api_key or not engine:
         return False
         
+    # Verified keys are counted in the next usage batch
+    cached = key_cache.get(api_key)
+    if cached is not None and cached.get('is_db'):
+        usage_buffer.record_rate_limit_hit(cached['id'])
+        return True
+    
     try:
         key_prefix = api_key[:8]
         
@@ -15,6 +15,8 @@ from functools import wraps
 from datetime import datetime
 from flask import Blueprint, jsonify, current_app
 
+from scheduler_lease import start_scheduler_with_lease
+
 # Initialize blueprints
 health_bp = Blueprint('health', __name__)
 rescue_bp = Blueprint('rescue', __name__)
@@ -99,6 +101,7 @@ def monitor_jobs():
     Monitor health of scheduled jobs and restart the scheduler if needed.
     This runs as a separate thread.
     """
+    global scheduler
     if not scheduler:
         print("Scheduler not available - watchdog disabled")
         return
@@ -113,16 +116,15 @@ def monitor_jobs():
         if not scheduler.running:
             print("Scheduler stopped - attempting to restart")
             try:
-                scheduler.start()
+                start_scheduler_with_lease(scheduler, 'autonomous_foundation')
                 print("Scheduler restarted successfully")
             except Exception as e:
                 print(f"Failed to restart scheduler: {e}")
                 # Try to recreate scheduler
                 try:
-                    global scheduler
                     scheduler.shutdown(wait=False)
                     scheduler = BackgroundScheduler()
-                    scheduler.start()
+                    start_scheduler_with_lease(scheduler, 'autonomous_foundation')
                     print("Scheduler recreated and restarted")
                 except Exception as e2:
                     print(f"Failed to recreate scheduler: {e2}")
@@ -142,7 +144,7 @@ def monitor_jobs():
                 print("Restarting scheduler due to problematic jobs")
                 scheduler.shutdown(wait=False)
                 scheduler = BackgroundScheduler()
-                scheduler.start()
+                start_scheduler_with_lease(scheduler, 'autonomous_foundation')
                 print("Scheduler restarted due to problematic jobs")
                 
                 # Alert if available
@@ -224,7 +226,7 @@ def restart_scheduler_endpoint():
     """Manually restart the scheduler"""
     try:
         scheduler.shutdown(wait=False)
-        scheduler.start()
+        start_scheduler_with_lease(scheduler, 'autonomous_foundation')
         return jsonify({
             'success': True,
             'message': 'Scheduler restarted successfully',
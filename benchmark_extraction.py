@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark Opportunity Extraction
+
+This script compares the single-walk extract_opportunities_from_html against
+the previous selector-by-selector extraction on a corpus of saved pages, and
+checks that both produce the same opportunities.
+
+Usage:
+    python benchmark_extraction.py --pages saved_pages/ --keywords grant residency
+    python benchmark_extraction.py  # generated listing pages
+"""
+
+import os
+import time
+import argparse
+import logging
+
+from bs4 import BeautifulSoup
+
+from keyword_matcher import get_keyword_matcher
+from scrapers_improvement import extract_opportunities_from_html
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_extraction")
+
+DEFAULT_KEYWORDS = ["grant", "residency", "fellowship", "open call", "commission", "artist", "job"]
+
+def legacy_extract_opportunities(html, keywords, url, min_text_length=15):
+    """
+    Previous extraction: one soup.select() per selector and a subtree walk per container
+    
+    Args:
+        html (str): HTML content
+        keywords (list): List of keywords to check for, or a compiled KeywordMatcher
+        url (str): Source URL
+        min_text_length (int): Minimum length of text to be considered valid
+        
+    Returns:
+        list: List of opportunity dictionaries
+    """
+    matcher = get_keyword_matcher(keywords)
+    soup = BeautifulSoup(html, 'html.parser')
+    opportunities = []
+    
+    # Look for opportunity cards, listings, or sections
+    opportunity_containers = []
+    
+    # Common selectors for opportunity listings
+    selectors = [
+        'article', '.job-listing', '.opportunity', '.post', '.card',
+        '.listing', '.job', '.open-call', '.residency', '.grant',
+        'div[class*="job"]', 'div[class*="opp"]', 'div[class*="listing"]',
+        '.item', '.event', 'section', '.entry', '.content-item',
+        'li.listing', '.result', '.row'
+    ]
+    
+    # Try to find containers for opportunities
+    for selector in selectors:
+        containers = soup.select(selector)
+        if containers:
+            opportunity_containers.extend(containers)
+    
+    # If no containers found, try to find individual links
+    if not opportunity_containers:
+        opportunity_containers = soup.find_all(['a', 'div', 'section', 'article'])
+    
+    # Process each container
+    for container in opportunity_containers:
+        # Look for a title and link
+        title_tag = container.find(['h1', 'h2', 'h3', 'h4', 'h5', 'strong', 'b', 'a'])
+        link_tag = container.find('a', href=True)
+        
+        if not title_tag or not link_tag:
+            continue
+        
+        title = title_tag.get_text(strip=True)
+        link = link_tag['href']
+        
+        # Make sure the link is absolute
+        if not link.startswith('http'):
+            if link.startswith('/'):
+                # Get the base URL (protocol + domain)
+                base_url = '/'.join(url.split('/')[:3])
+                link = base_url + link
+            else:
+                # Relative to current path
+                url_path = '/'.join(url.split('/')[:-1])
+                link = f"{url_path}/{link}"
+        
+        # Skip if title is too short or doesn't match keywords
+        if len(title) < min_text_length:
+            continue
+        matched_keywords = matcher.matched(title)
+        if not matched_keywords:
+            continue
+        
+        # Extract description
+        description = ""
+        description_tags = container.find_all(['p', 'div.description', 'div.summary', 'div.excerpt', 'span.description'])
+        for tag in description_tags:
+            text = tag.get_text(strip=True)
+            if len(text) > min_text_length:
+                description = text
+                break
+        
+        # Extract location
+        location = ""
+        location_tags = container.find_all(['span.location', 'div.location', 'p.location', 'span.place', 'div.place'])
+        for tag in location_tags:
+            text = tag.get_text(strip=True)
+            if 'location' in text.lower() or 'place' in text.lower() or 'city' in text.lower() or 'state' in text.lower():
+                location = text
+                break
+        
+        # Extract date info
+        deadline = ""
+        date_tags = container.find_all(['span.date', 'div.date', 'p.date', 'span.deadline', 'div.deadline'])
+        for tag in date_tags:
+            text = tag.get_text(strip=True)
+            if 'deadline' in text.lower() or 'due' in text.lower() or 'date' in text.lower():
+                deadline = text
+                break
+        
+        # Get source domain
+        source = url.split('//')[1].split('/')[0].replace('www.', '')
+        
+        opportunity = {
+            'title': title,
+            'url': link,
+            'description': description,
+            'location': location,
+            'deadline': deadline,
+            'source': source,
+            'tags': ', '.join(sorted(matched_keywords)),
+            'scraped_date': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        opportunities.append(opportunity)
+    
+    # Deduplicate opportunities by URL
+    unique_opportunities = []
+    seen_urls = set()
+    
+    for opp in opportunities:
+        if opp['url'] not in seen_urls:
+            seen_urls.add(opp['url'])
+            unique_opportunities.append(opp)
+    
+    return unique_opportunities
+
+
+def generate_listing_page(items=200, depth=3):
+    """Generate a listing page with nested, overlapping containers"""
+    cards = []
+    for i in range(items):
+        card = (
+            f'<div class="card job-card"><h3><a href="/calls/{i}">Artist residency and grant call {i}</a></h3>'
+            f'<p>Applications are open for the {i} program for emerging artists.</p>'
+            f'<span class="date">Deadline: 2025-06-{i % 28 + 1:02d}</span></div>'
+        )
+        for level in range(depth):
+            card = f'<div class="row item-{level}">{card}</div>'
+        cards.append(f'<article class="post">{card}</article>')
+    return f'<html><body><section class="listing">{"".join(cards)}</section></body></html>'
+
+
+def load_pages(directory):
+    """Load saved .html pages from a directory"""
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def comparable(opportunities):
+    """Drop the timestamp so runs can be compared"""
+    return [{k: v for k, v in opp.items() if k != 'scraped_date'} for opp in opportunities]
+
+
+def time_extraction(func, pages, keywords, url, repeat):
+    """Best wall time of extracting every page"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, html in pages:
+            func(html, keywords, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark opportunity extraction")
+    parser.add_argument("--pages", help="Directory of saved .html pages (default: generated pages)")
+    parser.add_argument("--keywords", nargs="+", default=DEFAULT_KEYWORDS, help="Relevance keywords")
+    parser.add_argument("--url", default="https://www.example.org/opportunities", help="Source URL for the pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = load_pages(args.pages)
+    else:
+        pages = [(f"generated_{items}.html", generate_listing_page(items)) for items in (50, 200, 500)]
+
+    mismatches = 0
+    for name, html in pages:
+        if comparable(extract_opportunities_from_html(html, args.keywords, args.url)) != \
+                comparable(legacy_extract_opportunities(html, args.keywords, args.url)):
+            mismatches += 1
+            logger.error(f"Output differs for {name}")
+
+    legacy_time = time_extraction(legacy_extract_opportunities, pages, args.keywords, args.url, args.repeat)
+    current_time = time_extraction(extract_opportunities_from_html, pages, args.keywords, args.url, args.repeat)
+
+    print(f"Pages:            {len(pages)}")
+    print(f"Identical output: {len(pages) - mismatches}/{len(pages)}")
+    print(f"Previous:         {legacy_time:.3f}s")
+    print(f"Single walk:      {current_time:.3f}s")
+    print(f"Speedup:          {legacy_time / current_time:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark Rate Limiter Overhead
+
+This script measures what the shared rate limit storage adds to a request:
+the raw cost of one sliding window hit, and the difference between a Flask
+request with and without a Flask-Limiter limit backed by the storage.
+
+Usage:
+    python benchmark_rate_limiter.py --requests 5000
+    python benchmark_rate_limiter.py --storage-uri memory://  # compare backends
+"""
+
+import os
+import time
+import argparse
+import logging
+import tempfile
+
+from flask import Flask
+from flask_limiter import Limiter
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from rate_limit_storage import RATE_LIMIT_STRATEGY
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("benchmark_rate_limiter")
+
+
+def time_per_call(func, count):
+    """Average microseconds per call of func over count calls"""
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def build_app(storage_uri, limited):
+    """Flask app with one endpoint, rate limited or not"""
+    app = Flask(__name__)
+    limiter = Limiter(key_func=lambda: "benchmark", app=app, storage_uri=storage_uri,
+                      strategy=RATE_LIMIT_STRATEGY, headers_enabled=True, enabled=limited)
+
+    # Flask-Limiter only holds a weak reference to itself in the app
+    app.limiter = limiter
+
+    @app.route('/ping')
+    @limiter.limit("1000000 per minute")
+    def ping():
+        return "pong"
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared rate limit storage")
+    parser.add_argument('--requests', type=int, default=5000, help="Requests per measurement")
+    parser.add_argument('--rounds', type=int, default=5, help="Measurements per app, best one counts")
+    parser.add_argument('--storage-uri', help="Storage to benchmark (defaults to a temporary shm:// file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage_uri = args.storage_uri or f"shm://{os.path.join(tmp, 'limits')}"
+
+        storage = storage_from_string(storage_uri)
+        strategy = SlidingWindowCounterRateLimiter(storage)
+        limit = parse("1000000 per minute")
+        hit_us = time_per_call(lambda i: strategy.hit(limit, f"key-{i % 500}"), args.requests)
+        stats_us = time_per_call(lambda i: strategy.get_window_stats(limit, f"key-{i % 500}"), args.requests)
+
+        # Alternate both apps over several rounds and keep the best round of
+        # each, so warm-up and noise do not end up in the difference
+        clients = {limited: build_app(storage_uri, limited).test_client() for limited in (False, True)}
+        timings = {False: float('inf'), True: float('inf')}
+        for _ in range(args.rounds):
+            for limited, client in clients.items():
+                elapsed = time_per_call(lambda i: client.get('/ping'), args.requests)
+                timings[limited] = min(timings[limited], elapsed)
+
+    logger.info(f"Storage: {storage_uri.split('://')[0]}")
+    logger.info(f"Sliding window hit: {hit_us:.1f} us, window stats: {stats_us:.1f} us")
+    logger.info(f"Storage cost per limited request (hit + header stats): {hit_us + stats_us:.1f} us")
+    logger.info(f"Request without limiter: {timings[False]:.1f} us, with limiter: {timings[True]:.1f} us")
+    logger.info(f"Limiter overhead per request: {timings[True] - timings[False]:.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -26,6 +26,9 @@ API_BASE_URL = os.environ.get('API_URL', 'http://localhost:5001/api')
 BOT_EMAIL = os.environ.get('BOT_EMAIL', 'bot@proletto.com')
 BOT_PASSWORD = os.environ.get('BOT_PASSWORD', 'bot_secure_password')
 
+# Opportunities sent per batch ingestion request
+BATCH_SIZE = int(os.environ.get('API_BATCH_SIZE', 500))
+
 # Bot user credentials have been verified with ID: 2, Role: bot, Membership Level: premium
 # These credentials give the bot access to add opportunities via protected API endpoints
 
@@ -304,6 +307,59 @@ def run():
         logger.error("Error in Proletto Bot execution: %s", str(e))
         return False
 
+def post_opportunities_batch(opportunities):
+    """
+    Push opportunities to the API's batch ingestion endpoint
+    
+    The API upserts each batch with one write, instead of one full rewrite
+    of the opportunities file per opportunity.
+    
+    Args:
+        opportunities (list): Opportunities to push
+        
+    Returns:
+        int: Number of opportunities the API accepted
+    """
+    # Batch endpoint of the API (the local API in development)
+    api_url = os.environ.get('API_BATCH_URL', f"{API_BASE_URL}/opportunities/batch")
+    accepted = 0
+    
+    for start in range(0, len(opportunities), BATCH_SIZE):
+        batch = opportunities[start:start + BATCH_SIZE]
+        try:
+            # Get authentication token for API - this uses our bot credentials with ID: 2, role: bot
+            auth_token = get_api_auth_token()
+            
+            if not auth_token:
+                logger.error("Unable to obtain authentication token - cannot post opportunities")
+                return accepted
+            
+            response = requests.post(
+                api_url,
+                json=batch,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Authorization': f'Bearer {auth_token}'
+                },
+                timeout=60  # Add timeout to prevent hanging requests
+            )
+            
+            # Log the API response for monitoring
+            if response.status_code == 200:
+                result = response.json()
+                accepted += result.get('created', 0) + result.get('updated', 0) + result.get('unchanged', 0)
+                logger.info(f"Posted {len(batch)} opportunities to API: {result.get('created', 0)} created, "
+                            f"{result.get('updated', 0)} updated, {result.get('failed', 0)} failed")
+                for item in result.get('results', []):
+                    if item.get('status') == 'error':
+                        logger.warning(f"API rejected opportunity {item.get('url')}: {item.get('error')}")
+            else:
+                logger.warning(f"Failed to post opportunities to API: Status {response.status_code}, Response: {response.text[:500]}")
+        except Exception as e:
+            logger.error(f"Error posting to API: {e}")
+    
+    return accepted
+
 def notify_new_opportunities():
     """
     Function to notify about new opportunities.
@@ -320,7 +376,7 @@ def notify_new_opportunities():
                 drive_service = get_drive_service()
                 logger.info("Backing up opportunities to Google Drive")
                 file_id = drive_service.save_opportunities(opportunities)
-                logger.info(f"Successfully backed up opportunities to Google Drive with ID: {file_id}")
+                logger.info(f"Queued opportunities for Google Drive sync (file ID: {file_id or 'pending first upload'})")
             except Exception as e:
                 logger.error(f"Failed to back up to Google Drive: {e}")
         
@@ -346,40 +402,9 @@ def notify_new_opportunities():
             # Log the new opportunities
             for i, opp in enumerate(recent_opportunities, 1):
                 logger.info(f"New opportunity {i}: {opp['title']} - {opp['url']}")
-                
-                # Post to API to make real-time updates
-                try:
-                    # Default to local API in development
-                    api_url = os.environ.get('API_URL', 'http://localhost:5001/api/opportunities/add')
-                    
-                    # Get authentication token for API - this uses our bot credentials with ID: 2, role: bot
-                    auth_token = get_api_auth_token()
-                    
-                    if not auth_token:
-                        logger.error("Unable to obtain authentication token - cannot post opportunity")
-                        continue
-                    
-                    # Log authentication details (without exposing actual token)
-                    logger.info(f"Using bot authentication for API access (ID: 2, role: bot)")
-                    
-                    # Send the opportunity to the API with authentication
-                    response = requests.post(
-                        api_url,
-                        json=opp,
-                        headers={
-                            'Content-Type': 'application/json',
-                            'Authorization': f'Bearer {auth_token}'
-                        },
-                        timeout=15  # Add timeout to prevent hanging requests
-                    )
-                    
-                    # Log the API response for monitoring
-                    if response.status_code == 200 and response.json().get('success'):
-                        logger.info(f"Successfully posted opportunity to API: {opp['title']}")
-                    else:
-                        logger.warning(f"Failed to post opportunity to API: Status {response.status_code}, Response: {response.text}")
-                except Exception as e:
-                    logger.error(f"Error posting to API: {e}")
+            
+            # Post to API to make real-time updates, as batches
+            post_opportunities_batch(recent_opportunities)
             
             # In a production environment, send these to subscribers
             # send_email_notifications(recent_opportunities)
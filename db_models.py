@@ -16,7 +16,8 @@ from datetime import datetime, timedelta
 # SQLAlchemy imports
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, backref, Session, object_session
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 
 # Create a new db instance without importing from main
@@ -787,9 +788,11 @@ class APIKey(db.Model):
         return True
     
     def revoke(self):
-        """Revoke this API key"""
+        """Revoke this API key; cached copies are dropped once the session commits"""
         self.status = 'revoked'
         self.revoked_at = datetime.utcnow()
+        session = object_session(self) or db.session
+        session.info.setdefault('revoked_api_key_ids', set()).add(self.id)
         return True
     
     def record_usage(self):
@@ -818,6 +821,20 @@ class APIKey(db.Model):
     def __repr__(self):
         return f"<APIKey {self.key_prefix}... ({self.plan})>"
 
+@event.listens_for(Session, 'after_commit')
+def _notify_revoked_api_keys(session):
+    """Invalidate cached copies of keys revoked in the committed transaction"""
+    key_ids = session.info.pop('revoked_api_key_ids', None)
+    if key_ids:
+        from api_key_cache import notify_key_revoked
+        for key_id in key_ids:
+            notify_key_revoked(key_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_revoked_api_keys(session):
+    """A rolled back revocation leaves the key valid"""
+    session.info.pop('revoked_api_key_ids', None)
+
 class DigestEmail(db.Model):
     """Model to track weekly digest emails sent to users"""
     __tablename__ = 'digest_emails'
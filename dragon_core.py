@@ -4,6 +4,7 @@ import os
 import threading
 from flask import Flask, jsonify, Blueprint
 from cache_utils import init_cache  # using existing cache setup
+from scheduler_lease import start_scheduler_with_lease
 from datetime import datetime
 
 # We'll initialize this later in create_app
@@ -112,7 +113,7 @@ def monitor_jobs():
                 import apscheduler
                 from apscheduler.schedulers.background import BackgroundScheduler
                 scheduler = BackgroundScheduler()
-                scheduler.start()
+                start_scheduler_with_lease(scheduler, 'dragon_core')
                 print("Scheduler restarted successfully")
             except Exception as e:
                 print(f"Failed to restart scheduler: {e}")
@@ -219,7 +220,7 @@ def restart_scheduler():
         import apscheduler
         from apscheduler.schedulers.background import BackgroundScheduler
         scheduler = BackgroundScheduler()
-        scheduler.start()
+        start_scheduler_with_lease(scheduler, 'dragon_core')
         
         return True
     except Exception as e:
@@ -410,8 +411,8 @@ def create_app():
             id='daily_snapshot'
         )
         
-        # Start the scheduler
-        scheduler.start()
+        # Start the scheduler; only the lease holder runs the jobs
+        start_scheduler_with_lease(scheduler, 'dragon_core')
         app.logger.info("Scheduler started successfully")
         
     except Exception as e:
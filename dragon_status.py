@@ -117,6 +117,9 @@ def status():
         
         # Get maintenance metrics
         maintenance = get_maintenance_info()
+        
+        # Get engine run history
+        engine_runs = get_engine_run_info()
             
         return render_template('admin/dragon_status.html',
             jobs=jobs,
@@ -127,7 +130,8 @@ def status():
             mem=mem,
             cpu=cpu,
             scrapers=scrapers,
-            maintenance=maintenance
+            maintenance=maintenance,
+            engine_runs=engine_runs
         )
     except Exception as e:
         return f"Error rendering Dragon status: {str(e)}"
@@ -182,6 +186,7 @@ def health_api():
                 "status": scheduler_status,
                 "job_count": scheduler_job_count
             },
+            "engine_runs": get_engine_run_info(),
             "redis": {
                 "status": redis_status
             }
@@ -277,6 +282,34 @@ def get_scraper_info() -> List[Dict[str, Any]]:
             
     return scrapers_list
 
+def get_engine_run_info(days: int = 14) -> List[Dict[str, Any]]:
+    """
+    Get throughput, success rate and run durations per scraper engine.
+    
+    Args:
+        days: Number of days of run history to include
+    
+    Returns:
+        List of per-engine statistics from the job run history
+    """
+    try:
+        from job_history import get_job_history
+        runs = get_job_history().engine_stats(days=days)
+        for stats in runs:
+            stats['regressed'] = bool(
+                (stats['previous_success_rate'] is not None
+                 and stats['success_rate'] < stats['previous_success_rate'] - 10)
+                or (stats['previous_p95_duration'] and stats['p95_duration'] > 1.5 * stats['previous_p95_duration'])
+            )
+            if stats['last_run']:
+                stats['last_run'] = datetime.fromtimestamp(stats['last_run']).isoformat()
+            if stats['last_success']:
+                stats['last_success'] = datetime.fromtimestamp(stats['last_success']).isoformat()
+        return runs
+    except Exception as e:
+        current_app.logger.error(f"Error getting engine run history: {e}")
+        return []
+
 def get_maintenance_info() -> Dict[str, Any]:
     """
     Get information about maintenance tasks.
@@ -9,11 +9,18 @@ For initial setup, you need to:
 2. Enable the Drive API
 3. Create OAuth 2.0 credentials
 4. Save the credentials JSON file as 'credentials.json'
+
+Files are kept in sync through ``drive_sync.DriveSyncEngine``: uploads happen
+in the background, only when the content changed, and update the Drive file
+in place so its id and revision history are kept.
 """
 
 import os
 import json
 import pickle
+import shutil
+import hashlib
+import tempfile
 from datetime import datetime
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -22,6 +29,8 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 import logging
 
+from drive_sync import DriveSyncEngine
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,6 +55,7 @@ class DriveService:
         """Initialize the Drive service and ensure folder structure exists"""
         self.service = self._authenticate()
         self.folder_ids = self._ensure_folder_structure()
+        self.sync = DriveSyncEngine(self)
     
     def _authenticate(self):
         """Authenticate with Google Drive API"""
@@ -278,6 +288,59 @@ class DriveService:
         
         return results.get('files', [])
     
+    def get_file_info(self, file_id):
+        """
+        Get the checksum and version of a file
+        
+        Args:
+            file_id (str): ID of the file
+            
+        Returns:
+            dict: id, name, md5Checksum and version, or None if the file is gone
+        """
+        try:
+            file = self.service.files().get(
+                fileId=file_id,
+                fields='id, name, md5Checksum, version, trashed'
+            ).execute()
+        except HttpError as error:
+            if error.resp.status == 404:
+                return None
+            raise
+        
+        return None if file.get('trashed') else file
+    
+    def update_file(self, file_id, file_path):
+        """
+        Replace the content of an existing file, keeping its ID
+        
+        Drive keeps the previous content as a revision of the file.
+        
+        Args:
+            file_id (str): ID of the file to update
+            file_path (str): Path to the new content
+            
+        Returns:
+            dict: id, md5Checksum and version of the updated file, or None if
+                the file no longer exists
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        try:
+            file = self.service.files().update(
+                fileId=file_id,
+                media_body=MediaFileUpload(file_path, resumable=True),
+                fields='id, md5Checksum, version'
+            ).execute()
+        except HttpError as error:
+            if error.resp.status == 404:
+                return None
+            raise
+        
+        logger.info(f"Updated file: {file_id} to version {file.get('version')}")
+        return file
+    
     def create_backup(self, file_path, prefix="backup"):
         """
         Create a backup of a file
@@ -308,33 +371,13 @@ class DriveService:
             opportunities_data (dict/list): Opportunities data to save
             file_path (str): Path to save the data to locally before uploading
             
+        The upload runs in the background and is skipped when the content
+        did not change; previous versions are kept as Drive revisions.
+        
         Returns:
-            str: ID of the uploaded file
+            str: ID of the file in Drive, or None until its first upload
         """
-        # Save to local file first
-        with open(file_path, 'w') as f:
-            json.dump(opportunities_data, f, indent=2)
-            
-        # Create a backup if the file already exists in Drive
-        existing_files = self.list_files('opportunities')
-        for file in existing_files:
-            if file['name'] == os.path.basename(file_path):
-                # Download the existing file
-                temp_path = f"temp_{file['name']}"
-                self.download_file(file['id'], temp_path)
-                
-                # Create a backup
-                self.create_backup(temp_path)
-                
-                # Delete the temporary file
-                os.remove(temp_path)
-                
-                # Delete the existing file in Drive
-                self.service.files().delete(fileId=file['id']).execute()
-                break
-                
-        # Upload the new file
-        return self.upload_file(file_path, 'opportunities')
+        return _save_and_sync(self.sync, opportunities_data, file_path)
     
     def load_opportunities(self, file_name="opportunities.json"):
         """
@@ -343,35 +386,35 @@ class DriveService:
         Args:
             file_name (str): Name of the file to load
             
+        The file is downloaded only when Drive has a newer version than the
+        local cached copy.
+        
         Returns:
             dict/list: Loaded opportunities data
         """
-        # Check if the file exists
-        existing_files = self.list_files('opportunities')
-        file_id = None
-        
-        for file in existing_files:
-            if file['name'] == file_name:
-                file_id = file['id']
-                break
-                
-        if not file_id:
+        cached_path = self.sync.load('opportunities', file_name)
+        if not cached_path:
             logger.warning(f"File not found in Drive: {file_name}")
             return []
-            
-        # Download the file
-        temp_path = f"temp_{file_name}"
-        if self.download_file(file_id, temp_path):
-            # Load the data
-            with open(temp_path, 'r') as f:
-                data = json.load(f)
-                
-            # Delete the temporary file
-            os.remove(temp_path)
-            
-            return data
-        else:
-            return []
+        
+        with open(cached_path, 'r') as f:
+            return json.load(f)
+
+
+def _save_and_sync(sync, opportunities_data, file_path):
+    """Write opportunities atomically and queue the file for upload"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.opportunities-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(opportunities_data, f, indent=2)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    
+    sync.request_sync(file_path, 'opportunities')
+    return sync.file_id('opportunities', os.path.basename(file_path))
 
 # Factory function to get a singleton instance of DriveService
 _drive_service_instance = None
@@ -379,8 +422,9 @@ _drive_service_instance = None
 class LocalStorageFallback:
     """Fallback implementation that uses local file storage when Drive is unavailable"""
     
-    def __init__(self):
+    def __init__(self, root='.'):
         logger.info("Using local storage fallback for Drive operations")
+        self.root = root
         self.folder_ids = {
             'root': 'local',
             'opportunities': 'local_opportunities',
@@ -391,7 +435,16 @@ class LocalStorageFallback:
         
         # Ensure local folders exist
         for folder in ['local_opportunities', 'local_portfolios', 'local_applications', 'local_backups']:
-            os.makedirs(folder, exist_ok=True)
+            os.makedirs(os.path.join(root, folder), exist_ok=True)
+        
+        self.sync = DriveSyncEngine(
+            self,
+            manifest_path=os.path.join(root, 'local_drive_manifest.json'),
+            cache_dir=os.path.join(root, 'local_drive_cache')
+        )
+    
+    def _folder_path(self, folder_name):
+        return os.path.join(self.root, f"local_{folder_name.lower()}")
     
     def upload_file(self, file_path, destination_folder='opportunities', file_name=None):
         """Local implementation of upload_file"""
@@ -399,11 +452,10 @@ class LocalStorageFallback:
             file_name = os.path.basename(file_path)
             
         # Determine target directory based on destination_folder parameter
-        target_dir = f"local_{destination_folder}"
+        target_dir = self._folder_path(destination_folder)
         target_path = os.path.join(target_dir, file_name)
         
         # Copy the file
-        import shutil
         shutil.copy2(file_path, target_path)
         
         logger.info(f"Locally stored file at: {target_path}")
@@ -413,14 +465,13 @@ class LocalStorageFallback:
         """Local implementation of download_file"""
         if file_id.startswith("local:"):
             source_path = file_id[6:]  # Remove the "local:" prefix
-            import shutil
             shutil.copy2(source_path, output_path)
             return True
         return False
     
     def list_files(self, folder_name='opportunities'):
         """Local implementation of list_files"""
-        target_dir = f"local_{folder_name}"
+        target_dir = self._folder_path(folder_name)
         result = []
         
         if os.path.exists(target_dir):
@@ -435,6 +486,33 @@ class LocalStorageFallback:
         
         return result
     
+    def get_file_info(self, file_id):
+        """Local implementation of get_file_info; the version is the file's mtime"""
+        if not file_id.startswith("local:") or not os.path.isfile(file_id[6:]):
+            return None
+        
+        path = file_id[6:]
+        with open(path, 'rb') as f:
+            md5 = hashlib.md5(f.read()).hexdigest()
+        return {
+            'id': file_id,
+            'name': os.path.basename(path),
+            'md5Checksum': md5,
+            'version': str(os.stat(path).st_mtime_ns)
+        }
+    
+    def update_file(self, file_id, file_path):
+        """Local implementation of update_file"""
+        info = self.get_file_info(file_id)
+        if info is None:
+            return None
+        
+        target_path = file_id[6:]
+        tmp_path = f"{target_path}.tmp"
+        shutil.copyfile(file_path, tmp_path)
+        os.replace(tmp_path, target_path)
+        return self.get_file_info(file_id)
+    
     def create_backup(self, file_path, prefix="backup"):
         """Local implementation of create_backup"""
         original_filename = os.path.basename(file_path)
@@ -445,19 +523,11 @@ class LocalStorageFallback:
     
     def save_opportunities(self, opportunities_data, file_path="opportunities.json"):
         """Local implementation of save_opportunities"""
-        # Save to local file
-        with open(file_path, 'w') as f:
-            json.dump(opportunities_data, f, indent=2)
-        
-        # Create a backup in the backups folder
-        self.create_backup(file_path)
-        
-        # Store in the opportunities folder
-        return self.upload_file(file_path, 'opportunities')
+        return _save_and_sync(self.sync, opportunities_data, file_path)
     
     def load_opportunities(self, file_name="opportunities.json"):
         """Local implementation of load_opportunities"""
-        target_path = os.path.join("local_opportunities", file_name)
+        target_path = os.path.join(self._folder_path('opportunities'), file_name)
         
         # If the local file doesn't exist, try using the regular file
         if not os.path.exists(target_path) and os.path.exists(file_name):
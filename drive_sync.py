@@ -0,0 +1,323 @@
+"""
+Google Drive Sync Engine for Proletto
+
+``DriveService.save_opportunities`` used to list the Drive folder, download
+the current copy to back it up, delete it and upload the whole file again,
+all in the calling request, and ``load_opportunities`` listed and downloaded
+the whole file on every call. This engine replaces both with a sync that
+only moves data when something changed:
+1. A local manifest records, for every synced file, its Drive file id, the
+   MD5 of the content last uploaded or downloaded, and the Drive version
+2. Uploads are skipped when the local MD5 matches the manifest, and
+   otherwise update the existing Drive file in place (Drive keeps its
+   revision history), so the file id never changes
+3. Uploads run on a background thread; requests for the same file made
+   while one is pending are coalesced, and a file is uploaded at most once
+   per DRIVE_SYNC_INTERVAL
+4. Reads are served from a local cache, after one metadata call confirms
+   the Drive version still matches the manifest
+
+The engine works with any storage exposing the ``LocalStorageFallback``
+interface (upload_file, download_file, list_files, update_file and
+get_file_info), so it can be exercised against a local fake.
+"""
+
+import os
+import json
+import time
+import atexit
+import hashlib
+import logging
+import tempfile
+import threading
+import weakref
+from datetime import datetime
+
+# Configure logging
+logger = logging.getLogger('drive_sync')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Manifest of synced files and directory of cached downloads
+DRIVE_MANIFEST_FILE = os.environ.get('DRIVE_MANIFEST_FILE', 'data/drive_manifest.json')
+DRIVE_CACHE_DIR = os.environ.get('DRIVE_CACHE_DIR', 'data/drive_cache')
+
+# Minimum seconds between two uploads of the same file
+DRIVE_SYNC_INTERVAL = float(os.environ.get('DRIVE_SYNC_INTERVAL', 60))
+
+# Seconds before a failed upload is retried
+DRIVE_RETRY_DELAY = float(os.environ.get('DRIVE_RETRY_DELAY', 300))
+
+# Live engines, flushed at exit and reset in forked children
+_engines = weakref.WeakSet()
+
+
+def file_md5(path):
+    """Hex MD5 of a file's content, the checksum Drive reports as md5Checksum"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DriveSyncEngine:
+    """Manifest-based, coalescing file sync against a Drive-like storage"""
+
+    def __init__(self, storage, manifest_path=None, cache_dir=None, interval=None, retry_delay=None):
+        """
+        Initialize the engine
+
+        Args:
+            storage: Object with the LocalStorageFallback interface
+            manifest_path (str): JSON manifest of synced files
+            cache_dir (str): Directory for cached downloads
+            interval (float): Minimum seconds between uploads of one file
+            retry_delay (float): Seconds before a failed upload is retried
+        """
+        self.storage = storage
+        self.manifest_path = manifest_path or DRIVE_MANIFEST_FILE
+        self.cache_dir = cache_dir or DRIVE_CACHE_DIR
+        self.interval = DRIVE_SYNC_INTERVAL if interval is None else interval
+        self.retry_delay = DRIVE_RETRY_DELAY if retry_delay is None else retry_delay
+        self.manifest = self._load_manifest()
+        self.stats = {'uploads': 0, 'skipped': 0, 'downloads': 0, 'cache_hits': 0, 'errors': 0}
+        self._pending = {}
+        self._last_upload = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._stop = False
+        _engines.add(self)
+
+    @staticmethod
+    def _key(folder, name):
+        return f"{folder.lower()}/{name}"
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.drive-manifest-', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _record(self, key, info, md5):
+        """Store a file's Drive id, content MD5 and version in the manifest"""
+        with self._lock:
+            self.manifest[key] = {
+                'file_id': info['id'],
+                'md5': md5,
+                'version': info.get('version'),
+                'synced_at': datetime.utcnow().isoformat(),
+            }
+            self._save_manifest()
+            return self.manifest[key]
+
+    def _locate(self, folder, name):
+        """Drive id of a file from the manifest, or by listing its folder once"""
+        entry = self.manifest.get(self._key(folder, name))
+        if entry:
+            return entry['file_id']
+        for file in self.storage.list_files(folder):
+            if file['name'] == name:
+                return file['id']
+        return None
+
+    def file_id(self, folder, name):
+        """Drive id of a synced file, if known"""
+        entry = self.manifest.get(self._key(folder, name))
+        return entry['file_id'] if entry else None
+
+    def sync_file(self, local_path, folder='opportunities', name=None):
+        """
+        Upload a file now if its content differs from the last synced copy
+
+        Args:
+            local_path (str): File to upload
+            folder (str): Destination folder
+            name (str): Name in Drive (defaults to the file's base name)
+
+        Returns:
+            str: Drive file id
+        """
+        name = name or os.path.basename(local_path)
+        key = self._key(folder, name)
+        md5 = file_md5(local_path)
+        entry = self.manifest.get(key)
+        if entry and entry.get('md5') == md5:
+            self.stats['skipped'] += 1
+            return entry['file_id']
+
+        file_id = self._locate(folder, name)
+        info = None
+        if file_id:
+            info = self.storage.update_file(file_id, local_path)
+        if info is None:
+            # Not in Drive yet, or deleted there since the last sync
+            file_id = self.storage.upload_file(local_path, folder, name)
+            info = self.storage.get_file_info(file_id) or {'id': file_id}
+        self.stats['uploads'] += 1
+        self._last_upload[key] = time.monotonic()
+        logger.info(f"Synced {name} to Drive folder {folder} (file {info['id']}, version {info.get('version')})")
+        return self._record(key, info, md5)['file_id']
+
+    def request_sync(self, local_path, folder='opportunities', name=None):
+        """
+        Queue a file for upload by the background thread
+
+        A file already queued is not queued twice; the upload reads the file
+        when it runs, so it always sends the latest content.
+
+        Returns:
+            bool: True if the file was not queued yet
+        """
+        name = name or os.path.basename(local_path)
+        key = self._key(folder, name)
+        with self._lock:
+            if key in self._pending:
+                return False
+            not_before = self._last_upload.get(key, float('-inf')) + self.interval
+            self._pending[key] = (local_path, folder, name, not_before)
+            self._ensure_thread()
+            self._wakeup.notify()
+            return True
+
+    def _due(self, now):
+        """Pop the queued uploads whose time has come"""
+        due = [key for key, item in self._pending.items() if item[3] <= now]
+        return [self._pending.pop(key) for key in due]
+
+    def flush(self):
+        """
+        Run every queued upload now
+
+        Returns:
+            int: Number of files processed
+        """
+        with self._lock:
+            items = list(self._pending.values())
+            self._pending.clear()
+        for local_path, folder, name, _ in items:
+            self._sync_queued(local_path, folder, name)
+        return len(items)
+
+    def _sync_queued(self, local_path, folder, name):
+        with self._lock:
+            # A request arriving during this upload waits a full interval
+            self._last_upload[self._key(folder, name)] = time.monotonic()
+        try:
+            self.sync_file(local_path, folder, name)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Failed to sync {name} to Google Drive, retrying in {self.retry_delay}s: {e}")
+            with self._lock:
+                key = self._key(folder, name)
+                if key not in self._pending:
+                    self._pending[key] = (local_path, folder, name, time.monotonic() + self.retry_delay)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name='drive-sync', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stop:
+                    now = time.monotonic()
+                    items = self._due(now)
+                    if items:
+                        break
+                    wait = min((item[3] for item in self._pending.values()), default=now + 60) - now
+                    self._wakeup.wait(max(wait, 0.01))
+                if self._stop:
+                    return
+            for local_path, folder, name, _ in items:
+                self._sync_queued(local_path, folder, name)
+
+    def stop(self, flush=True):
+        """Stop the background thread, uploading what is queued first"""
+        with self._lock:
+            self._stop = True
+            self._wakeup.notify()
+        if flush:
+            self.flush()
+
+    def cached_path(self, folder, name):
+        return os.path.join(self.cache_dir, folder.lower(), name)
+
+    def load(self, folder, name):
+        """
+        Local copy of a Drive file, downloaded only when Drive has a new version
+
+        Args:
+            folder (str): Drive folder
+            name (str): File name
+
+        Returns:
+            str: Path of the cached copy, or None if the file is not in Drive
+        """
+        key = self._key(folder, name)
+        file_id = self._locate(folder, name)
+        if not file_id:
+            return None
+        info = self.storage.get_file_info(file_id)
+        if info is None:
+            with self._lock:
+                self.manifest.pop(key, None)
+                self._save_manifest()
+            return None
+
+        path = self.cached_path(folder, name)
+        entry = self.manifest.get(key)
+        if (entry and entry.get('file_id') == file_id and entry.get('version') == info.get('version')
+                and os.path.exists(path) and file_md5(path) == entry.get('md5')):
+            self.stats['cache_hits'] += 1
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.download"
+        if not self.storage.download_file(file_id, tmp_path):
+            return path if os.path.exists(path) else None
+        os.replace(tmp_path, path)
+        self.stats['downloads'] += 1
+        self._record(key, info, file_md5(path))
+        return path
+
+    def _after_fork_in_child(self):
+        """Queued uploads and the sync thread belong to the parent"""
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = {}
+        self._thread = None
+
+
+def _flush_engines_at_exit():
+    for engine in list(_engines):
+        try:
+            engine.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush Drive sync queue at exit: {e}")
+
+
+def _reset_after_fork():
+    for engine in list(_engines):
+        engine._after_fork_in_child()
+
+
+atexit.register(_flush_engines_at_exit)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
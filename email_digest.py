@@ -35,6 +35,47 @@ except ImportError:
     recommendation_bot = None
 
 
+def get_recommendations_for_users(user_ids: List[int], limit: int = 5) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Get personalized art opportunity recommendations for many users at once.
+    
+    The recommendation bot scores every opportunity once for the whole batch;
+    users it has nothing for get the basic tag-matching recommendations.
+    
+    Args:
+        user_ids: The IDs of the users to get recommendations for
+        limit: Maximum number of recommendations per user
+        
+    Returns:
+        Dictionary mapping user ID to a list of recommendation dictionaries
+    """
+    from models import User
+    
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()}
+    
+    # Try to use the recommendation bot if available
+    bot_recommendations = {}
+    if recommendation_bot and users:
+        try:
+            # Get recommendations for every user from the AI engine in one pass
+            bot_recommendations = recommendation_bot.get_recommendations_batch(list(users), limit)
+        except Exception as e:
+            logger.error(f"Error getting recommendations from bot: {e}")
+    
+    results = {}
+    for user_id in user_ids:
+        user = users.get(user_id)
+        if not user:
+            logger.error(f"User {user_id} not found for digest recommendations")
+            results[user_id] = []
+            continue
+        
+        recs = bot_recommendations.get(user_id)
+        results[user_id] = recs if recs else get_fallback_recommendations(user, limit)
+    
+    return results
+
+
 def get_recommendations_for_user(user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
     """
     Get personalized art opportunity recommendations for a user.
@@ -46,25 +87,25 @@ def get_recommendations_for_user(user_id: int, limit: int = 5) -> List[Dict[str,
     Returns:
         List of recommendation dictionaries with opportunity details
     """
-    from models import db, User, Opportunity
+    return get_recommendations_for_users([user_id], limit).get(user_id, [])
+
+
+def get_fallback_recommendations(user, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Get basic recommendations matching a user's profile tags.
     
-    user = User.query.get(user_id)
-    if not user:
-        logger.error(f"User {user_id} not found for digest recommendations")
-        return []
+    Used when the recommendation bot is unavailable or has nothing for the user.
     
-    # Try to use the recommendation bot if available
-    if recommendation_bot:
-        try:
-            # Get recommendations from the AI engine
-            recs = recommendation_bot.get_recommendations_for_user(user_id, limit)
-            if recs and len(recs) > 0:
-                return recs
-        except Exception as e:
-            logger.error(f"Error getting recommendations from bot: {e}")
+    Args:
+        user: The User to get recommendations for
+        limit: Maximum number of recommendations to return
+        
+    Returns:
+        List of recommendation dictionaries with opportunity details
+    """
+    from models import Opportunity
     
-    # Fallback to basic recommendations if the bot fails or doesn't exist
-    logger.info(f"Using fallback recommendation method for user {user_id}")
+    logger.info(f"Using fallback recommendation method for user {user.id}")
     
     # Get opportunities that match the user's profile tags/interests
     # This is a simple implementation - the real recommendation engine would be more sophisticated
@@ -235,10 +276,13 @@ def run_weekly_digest() -> bool:
     success_count = 0
     error_count = 0
     
+    # Get recommendations for every subscriber in one batch
+    recommendations_by_user = get_recommendations_for_users([user.id for user in pro_users], limit=5)
+    
     for user in pro_users:
         try:
             # Get recommendations for this user
-            recommendations = get_recommendations_for_user(user.id, limit=5)
+            recommendations = recommendations_by_user.get(user.id, [])
             
             # Skip if no recommendations
             if not recommendations:
@@ -16,6 +16,7 @@ from apscheduler.triggers.cron import CronTrigger
 from flask import current_app
 
 from email_digest import run_weekly_digest, test_digest_email
+from scheduler_lease import start_scheduler_with_lease, get_scheduler_lease, read_lease_holder
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -68,8 +69,8 @@ def initialize_digest_scheduler(app):
                 args=[app]
             )
             
-            # Start the scheduler
-            scheduler.start()
+            # Start the scheduler; only the lease holder sends digests
+            start_scheduler_with_lease(scheduler, 'email_digest')
             
             # Load and log the scheduler state
             save_scheduler_state()
@@ -111,16 +112,21 @@ def run_daily_digest_job(app):
             
             logger.info(f"Found {len(eligible_users)} users for today's digest (day {current_day})")
             
+            from email_digest import get_recommendations_for_users, send_weekly_digest
+            
+            # Get recommendations for every eligible user in one batch
+            recommendations_by_user = get_recommendations_for_users(
+                [user.id for user in eligible_users], limit=5
+            )
+            
             # Process each eligible user
             success_count = 0
             error_count = 0
             
             for user in eligible_users:
                 try:
-                    from email_digest import get_recommendations_for_user, send_weekly_digest
-                    
                     # Get recommendations for this user
-                    recommendations = get_recommendations_for_user(user.id, limit=5)
+                    recommendations = recommendations_by_user.get(user.id, [])
                     
                     # Skip if no recommendations
                     if not recommendations:
@@ -193,16 +199,21 @@ def retry_failed_digests_job(app):
             
             logger.info(f"Found {len(retry_users)} users with failed digests to retry")
             
+            from email_digest import get_recommendations_for_users, send_weekly_digest
+            
+            # Get recommendations for every retry user in one batch
+            recommendations_by_user = get_recommendations_for_users(
+                [user.id for user in retry_users], limit=5
+            )
+            
             # Process each user
             success_count = 0
             error_count = 0
             
             for user in retry_users:
                 try:
-                    from email_digest import get_recommendations_for_user, send_weekly_digest
-                    
                     # Get recommendations
-                    recommendations = get_recommendations_for_user(user.id, limit=5)
+                    recommendations = recommendations_by_user.get(user.id, [])
                     
                     # Skip if no recommendations
                     if not recommendations:
@@ -324,6 +335,7 @@ def get_digest_scheduler_info():
     """
     info = {
         'active': scheduler is not None and scheduler.running,
+        'leader': read_lease_holder('email_digest'),
         'state_file': scheduler_state_file,
         'current_time': datetime.utcnow().isoformat(),
     }
@@ -398,6 +410,7 @@ def shutdown_scheduler():
     if scheduler and scheduler.running:
         try:
             scheduler.shutdown()
+            get_scheduler_lease('email_digest').stop()
             logger.info("Email digest scheduler shutdown successfully")
         except Exception as e:
             logger.error(f"Error shutting down email digest scheduler: {e}")
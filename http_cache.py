@@ -0,0 +1,256 @@
+"""
+Proletto HTTP Cache
+
+This module provides a disk-backed HTTP response cache shared by the
+synchronous scrapers (scrapers_improvement) and the asynchronous scrapers
+(AsyncBaseScraper).
+
+Features:
+- Survives restarts and is shared by every process on the host (SQLite, WAL)
+- Stores ETag / Last-Modified validators so refetches can be conditional
+  (``If-None-Match`` / ``If-Modified-Since``) and return 304
+- Bodies are zlib-compressed; the total size is bounded with LRU eviction
+- Records which consumer already parsed which version of a page, so
+  unchanged listing pages skip parsing entirely
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Cache location and size bound
+HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', 'data/http_cache.sqlite3')
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_MB', 256)) * 1024 * 1024
+
+# Eviction trims the cache down to this fraction of the maximum size
+EVICTION_TARGET = 0.9
+
+# Check the total size after this many newly stored bytes
+EVICTION_CHECK_BYTES = 4 * 1024 * 1024
+
+# Seconds to wait on a locked database before giving up
+BUSY_TIMEOUT = 10
+
+CacheEntry = namedtuple('CacheEntry', ['url', 'body', 'etag', 'last_modified', 'digest', 'fetched_at'])
+
+
+def body_digest(body):
+    """Content hash used to tell whether a page changed"""
+    return hashlib.sha1(body.encode('utf-8', 'replace')).hexdigest()
+
+
+class HTTPCache:
+    """SQLite-backed HTTP response cache with validators and LRU eviction"""
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            path (str): SQLite database file
+            max_bytes (int): Maximum total size of the compressed bodies
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._bytes_since_check = 0
+
+    def _connection(self):
+        """Return this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS responses (
+                        url TEXT PRIMARY KEY,
+                        body BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        digest TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        fetched_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS processed (
+                        url TEXT NOT NULL,
+                        consumer TEXT NOT NULL,
+                        digest TEXT NOT NULL,
+                        PRIMARY KEY (url, consumer)
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses (accessed_at)')
+                self._initialized = True
+
+        self._local.conn = conn
+        return conn
+
+    def get(self, url, max_age=None):
+        """
+        Look up a cached response
+
+        Args:
+            url (str): Requested URL
+            max_age (float): Only return entries fetched within this many seconds
+
+        Returns:
+            CacheEntry or None
+        """
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT body, etag, last_modified, digest, fetched_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            if max_age is not None and time.time() - row[4] > max_age:
+                return None
+
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            body = zlib.decompress(row[0]).decode('utf-8')
+            return CacheEntry(url, body, row[1], row[2], row[3], row[4])
+        except Exception as e:
+            logger.error(f"Error reading HTTP cache for {url}: {e}")
+            return None
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached URL"""
+        try:
+            row = self._connection().execute(
+                'SELECT etag, last_modified FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading HTTP cache validators for {url}: {e}")
+            return {}
+
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Store a 200 response
+
+        Args:
+            url (str): Requested URL
+            body (str): Response text
+            etag (str): ETag response header, if any
+            last_modified (str): Last-Modified response header, if any
+        """
+        compressed = zlib.compress(body.encode('utf-8'), 6)
+        now = time.time()
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO responses '
+                '(url, body, size, digest, etag, last_modified, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, compressed, len(compressed), body_digest(body), etag, last_modified, now, now)
+            )
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache for {url}: {e}")
+            return
+
+        self._bytes_since_check += len(compressed)
+        if self._bytes_since_check >= EVICTION_CHECK_BYTES:
+            self._bytes_since_check = 0
+            self.evict()
+
+    def revalidated(self, url):
+        """
+        Record a 304 response and return the cached entry it refers to
+
+        Returns:
+            CacheEntry or None if the entry was evicted meanwhile
+        """
+        try:
+            self._connection().execute('UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url))
+        except Exception as e:
+            logger.error(f"Error updating HTTP cache for {url}: {e}")
+        return self.get(url)
+
+    def is_processed(self, url, consumer):
+        """True if ``consumer`` already parsed the currently cached version of ``url``"""
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM processed p JOIN responses r ON r.url = p.url AND r.digest = p.digest '
+                'WHERE p.url = ? AND p.consumer = ?', (url, consumer)
+            ).fetchone()
+            return row is not None
+        except Exception as e:
+            logger.error(f"Error reading HTTP cache for {url}: {e}")
+            return False
+
+    def mark_processed(self, url, consumer):
+        """Remember that ``consumer`` parsed the currently cached version of ``url``"""
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO processed (url, consumer, digest) '
+                'SELECT url, ?, digest FROM responses WHERE url = ?', (consumer, url)
+            )
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache for {url}: {e}")
+
+    def total_size(self):
+        """Total size in bytes of the stored compressed bodies"""
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its size bound"""
+        try:
+            conn = self._connection()
+            total = self.total_size()
+            if total <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * EVICTION_TARGET)
+            victims = []
+            for url, size in conn.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall():
+                if total <= target:
+                    break
+                victims.append((url,))
+                total -= size
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('DELETE FROM responses WHERE url = ?', victims)
+                conn.executemany('DELETE FROM processed WHERE url = ?', victims)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+            logger.info(f"Evicted {len(victims)} entries from the HTTP cache")
+            return len(victims)
+        except Exception as e:
+            logger.error(f"Error evicting HTTP cache entries: {e}")
+            return 0
+
+
+# Process-wide cache shared by the sync and async scrapers
+http_cache = HTTPCache()
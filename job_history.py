@@ -0,0 +1,394 @@
+"""
+Proletto Job Run History
+
+Append-only record of every scraper engine run, replacing the synthetic
+success rates the metrics module used to generate and the counters the engine
+scheduler kept rewriting in ``scheduler_state.json``.
+
+Each run stores its start and end time, duration, engine, outcome, error
+class, pages fetched, bytes downloaded and opportunities found/new in an
+indexed SQLite table (``data/job_history.sqlite3`` by default):
+1. ``daily_success_rates`` and ``engine_stats`` answer dashboard queries with
+   indexed range scans, including p50/p95 durations per engine and the
+   previous window for spotting regressions
+2. ``compact`` downsamples runs older than RAW_RETENTION_DAYS into one row per
+   day and engine, and drops daily rows older than ROLLUP_RETENTION_DAYS
+
+Fetch counters are process-wide; they are exact when each job runs in its own
+process, as it does under the job runner.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# History database shared by the job runner, the scheduler and the dashboards
+JOB_HISTORY_DB = os.environ.get('SCRAPER_JOB_HISTORY_DB', 'data/job_history.sqlite3')
+
+# Days raw runs are kept before they are downsampled to daily rows
+RAW_RETENTION_DAYS = int(os.environ.get('JOB_HISTORY_RAW_RETENTION_DAYS', 30))
+
+# Days daily rows are kept
+ROLLUP_RETENTION_DAYS = int(os.environ.get('JOB_HISTORY_ROLLUP_RETENTION_DAYS', 400))
+
+# Seconds to wait on a locked database before giving up
+BUSY_TIMEOUT = 30
+
+_fetch_lock = threading.Lock()
+_fetch_totals = [0, 0]
+
+
+def count_fetch(nbytes):
+    """Count one fetched page of nbytes towards this process's fetch totals"""
+    with _fetch_lock:
+        _fetch_totals[0] += 1
+        _fetch_totals[1] += nbytes
+
+
+def fetch_counters():
+    """
+    Pages and bytes fetched by this process so far
+
+    Returns:
+        tuple: (pages, bytes)
+    """
+    with _fetch_lock:
+        return _fetch_totals[0], _fetch_totals[1]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list (None if empty)"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+
+def _day_start(now, days_ago):
+    """Timestamp of UTC midnight days_ago days before now"""
+    day = datetime.fromtimestamp(now, timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (day - timedelta(days=days_ago)).timestamp()
+
+
+class JobHistory:
+    """Append-only scraper run history with daily rollups"""
+
+    def __init__(self, db_path=JOB_HISTORY_DB):
+        """
+        Initialize the history
+
+        Args:
+            db_path (str): SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self):
+        """Return this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS job_runs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        job_id TEXT,
+                        engine TEXT NOT NULL,
+                        started_at REAL NOT NULL,
+                        finished_at REAL NOT NULL,
+                        duration REAL NOT NULL,
+                        success INTEGER NOT NULL,
+                        urls_fetched INTEGER,
+                        bytes_fetched INTEGER,
+                        found INTEGER,
+                        added INTEGER,
+                        error_class TEXT,
+                        error TEXT
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS job_runs_started ON job_runs (started_at)')
+                conn.execute('CREATE INDEX IF NOT EXISTS job_runs_engine ON job_runs (engine, started_at)')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS job_runs_daily (
+                        day TEXT NOT NULL,
+                        engine TEXT NOT NULL,
+                        runs INTEGER NOT NULL,
+                        successes INTEGER NOT NULL,
+                        total_duration REAL NOT NULL,
+                        p50_duration REAL,
+                        p95_duration REAL,
+                        urls_fetched INTEGER NOT NULL,
+                        bytes_fetched INTEGER NOT NULL,
+                        found INTEGER NOT NULL,
+                        added INTEGER NOT NULL,
+                        PRIMARY KEY (day, engine)
+                    )
+                ''')
+                self._initialized = True
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def record_run(self, engine, started_at, finished_at, success, job_id=None, urls_fetched=None,
+                   bytes_fetched=None, found=None, added=None, error=None, error_class=None):
+        """
+        Append one finished run
+
+        Args:
+            engine (str): Engine name, or 'all' for a comprehensive run
+            started_at (float): Start time (epoch seconds)
+            finished_at (float): End time (epoch seconds)
+            success (bool): Whether the run succeeded
+            job_id (str): Scheduler or queue job id
+            urls_fetched (int): Pages fetched
+            bytes_fetched (int): Bytes downloaded
+            found (int): Opportunities scraped
+            added (int): Opportunities new to the store
+            error (str): Error message
+            error_class (str): Error type, e.g. 'TimeoutError'
+
+        Returns:
+            int: Run id
+        """
+        cursor = self._connection().execute(
+            'INSERT INTO job_runs (job_id, engine, started_at, finished_at, duration, success, urls_fetched, '
+            'bytes_fetched, found, added, error_class, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, engine, started_at, finished_at, max(0.0, finished_at - started_at), int(bool(success)),
+             urls_fetched, bytes_fetched, found, added, error_class, error)
+        )
+        return cursor.lastrowid
+
+    def daily_success_rates(self, days=14, engine=None, now=None):
+        """
+        Runs and success rate per UTC day, oldest first
+
+        Args:
+            days (int): Days of history including today
+            engine (str): Restrict to one engine
+            now (float): Current time (defaults to now)
+
+        Returns:
+            list: Dicts with 'date', 'runs', 'successes' and 'success_rate'
+            (None on days without runs)
+        """
+        now = time.time() if now is None else now
+        since = _day_start(now, days - 1)
+        engine_filter = ' AND engine = ?' if engine else ''
+        params = (since, engine) if engine else (since,)
+        conn = self._connection()
+
+        totals = {}
+        rows = conn.execute(
+            "SELECT date(started_at, 'unixepoch') AS day, COUNT(*), SUM(success) FROM job_runs "
+            f"WHERE started_at >= ?{engine_filter} GROUP BY day", params
+        )
+        for day, runs, successes in rows:
+            totals[day] = [runs, successes]
+        rows = conn.execute(
+            f"SELECT day, SUM(runs), SUM(successes) FROM job_runs_daily WHERE day >= ?{engine_filter} GROUP BY day",
+            (_day(since),) + params[1:]
+        )
+        for day, runs, successes in rows:
+            entry = totals.setdefault(day, [0, 0])
+            entry[0] += runs
+            entry[1] += successes
+
+        result = []
+        for offset in range(days - 1, -1, -1):
+            day = _day(_day_start(now, offset))
+            runs, successes = totals.get(day, (0, 0))
+            result.append({
+                'date': day,
+                'runs': runs,
+                'successes': successes,
+                'success_rate': round(100.0 * successes / runs, 1) if runs else None,
+            })
+        return result
+
+    def _window_stats(self, since, until):
+        """Per-engine aggregates over raw runs started in [since, until)"""
+        rows = self._connection().execute(
+            'SELECT engine, duration, success, urls_fetched, bytes_fetched, found, added, started_at, error_class '
+            'FROM job_runs WHERE started_at >= ? AND started_at < ? ORDER BY engine, started_at',
+            (since, until)
+        )
+        stats = {}
+        for row in rows:
+            entry = stats.setdefault(row['engine'], {
+                'engine': row['engine'], 'runs': 0, 'successes': 0, 'durations': [],
+                'urls_fetched': 0, 'bytes_fetched': 0, 'found': 0, 'added': 0,
+                'last_run': None, 'last_success': None, 'last_error_class': None,
+            })
+            entry['runs'] += 1
+            entry['durations'].append(row['duration'])
+            entry['urls_fetched'] += row['urls_fetched'] or 0
+            entry['bytes_fetched'] += row['bytes_fetched'] or 0
+            entry['found'] += row['found'] or 0
+            entry['added'] += row['added'] or 0
+            entry['last_run'] = row['started_at']
+            if row['success']:
+                entry['successes'] += 1
+                entry['last_success'] = row['started_at']
+            else:
+                entry['last_error_class'] = row['error_class']
+
+        for entry in stats.values():
+            durations = sorted(entry.pop('durations'))
+            entry['success_rate'] = round(100.0 * entry['successes'] / entry['runs'], 1)
+            entry['p50_duration'] = percentile(durations, 50)
+            entry['p95_duration'] = percentile(durations, 95)
+        return stats
+
+    def engine_stats(self, days=14, now=None):
+        """
+        Per-engine throughput, success rate and p50/p95 duration
+
+        Each engine also gets the success rate and p95 duration of the
+        preceding window of the same length, so regressions stand out.
+
+        Args:
+            days (int): Window length in days
+            now (float): Current time (defaults to now)
+
+        Returns:
+            list: Dicts per engine, sorted by engine name
+        """
+        now = time.time() if now is None else now
+        window = days * 86400
+        current = self._window_stats(now - window, now + 1)
+        previous = self._window_stats(now - 2 * window, now - window)
+
+        result = []
+        for engine in sorted(current):
+            entry = current[engine]
+            before = previous.get(engine, {})
+            entry['previous_success_rate'] = before.get('success_rate')
+            entry['previous_p95_duration'] = before.get('p95_duration')
+            result.append(entry)
+        return result
+
+    def summary(self):
+        """
+        Overall run counters and the latest outcomes
+
+        Returns:
+            dict: total_runs, total_successes, total_failures,
+            consecutive_failures, last_run and last_successful_run (ISO times)
+        """
+        conn = self._connection()
+        raw_runs, raw_successes = conn.execute('SELECT COUNT(*), COALESCE(SUM(success), 0) FROM job_runs').fetchone()
+        daily_runs, daily_successes = conn.execute(
+            'SELECT COALESCE(SUM(runs), 0), COALESCE(SUM(successes), 0) FROM job_runs_daily'
+        ).fetchone()
+        last_run = conn.execute('SELECT MAX(started_at) FROM job_runs').fetchone()[0]
+        last_success = conn.execute('SELECT MAX(finished_at) FROM job_runs WHERE success = 1').fetchone()[0]
+        consecutive_failures = conn.execute(
+            'SELECT COUNT(*) FROM job_runs WHERE success = 0 AND started_at > '
+            '(SELECT COALESCE(MAX(started_at), 0) FROM job_runs WHERE success = 1)'
+        ).fetchone()[0]
+
+        def iso(timestamp):
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        total_runs = raw_runs + daily_runs
+        total_successes = raw_successes + daily_successes
+        return {
+            'total_runs': total_runs,
+            'total_successes': total_successes,
+            'total_failures': total_runs - total_successes,
+            'consecutive_failures': consecutive_failures,
+            'last_run': iso(last_run),
+            'last_successful_run': iso(last_success),
+        }
+
+    def compact(self, now=None):
+        """
+        Downsample old runs into daily rows and drop expired daily rows
+
+        Args:
+            now (float): Current time (defaults to now)
+
+        Returns:
+            int: Number of raw runs downsampled
+        """
+        now = time.time() if now is None else now
+        cutoff = _day_start(now, RAW_RETENTION_DAYS)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT date(started_at, 'unixepoch') AS day, engine, duration, success, urls_fetched, "
+                "bytes_fetched, found, added FROM job_runs WHERE started_at < ? ORDER BY day, engine",
+                (cutoff,)
+            ).fetchall()
+
+            groups = {}
+            for row in rows:
+                groups.setdefault((row['day'], row['engine']), []).append(row)
+
+            for (day, engine), runs in groups.items():
+                durations = sorted(run['duration'] for run in runs)
+                conn.execute(
+                    'INSERT INTO job_runs_daily (day, engine, runs, successes, total_duration, p50_duration, '
+                    'p95_duration, urls_fetched, bytes_fetched, found, added) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (day, engine) DO UPDATE SET runs = runs + excluded.runs, '
+                    'successes = successes + excluded.successes, '
+                    'total_duration = total_duration + excluded.total_duration, '
+                    'p50_duration = MAX(p50_duration, excluded.p50_duration), '
+                    'p95_duration = MAX(p95_duration, excluded.p95_duration), '
+                    'urls_fetched = urls_fetched + excluded.urls_fetched, '
+                    'bytes_fetched = bytes_fetched + excluded.bytes_fetched, '
+                    'found = found + excluded.found, added = added + excluded.added',
+                    (day, engine, len(runs), sum(run['success'] for run in runs), sum(durations),
+                     percentile(durations, 50), percentile(durations, 95),
+                     sum(run['urls_fetched'] or 0 for run in runs), sum(run['bytes_fetched'] or 0 for run in runs),
+                     sum(run['found'] or 0 for run in runs), sum(run['added'] or 0 for run in runs))
+                )
+
+            conn.execute('DELETE FROM job_runs WHERE started_at < ?', (cutoff,))
+            conn.execute('DELETE FROM job_runs_daily WHERE day < ?', (_day(_day_start(now, ROLLUP_RETENTION_DAYS)),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if rows:
+            logger.info(f"Downsampled {len(rows)} job runs older than {RAW_RETENTION_DAYS} days into daily rows")
+        return len(rows)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_job_history():
+    """Return the process-wide job run history"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = JobHistory()
+        return _history
@@ -0,0 +1,298 @@
+"""
+Proletto Scraper Job Queue
+
+Scheduled scraper jobs used to run the engines on APScheduler's thread pool
+inside the web process, competing with request threads. The web process now
+only adds jobs to this persistent queue; the standalone job runner
+(``job_runner.py``) claims them and executes the engines in worker processes.
+
+The queue is a small SQLite database (``data/scraper_jobs.sqlite3`` by default)
+so it survives restarts and can be shared by the web and runner processes on
+one host:
+1. ``enqueue`` adds a job, or returns the engine's job that is still waiting
+   or running, so bursts of triggers do not stack up duplicate scrapes
+2. ``claim`` atomically hands the oldest queued job to one runner
+3. ``finish`` records the outcome, duration, peak memory and yield of a run
+4. ``recover`` requeues jobs whose runner process died mid-run
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Queue database shared by the web process and the job runner
+JOB_QUEUE_DB = os.environ.get('SCRAPER_JOB_QUEUE_DB', 'data/scraper_jobs.sqlite3')
+
+# Times a job is retried after its runner died before it is marked failed
+MAX_ATTEMPTS = int(os.environ.get('SCRAPER_JOB_MAX_ATTEMPTS', 2))
+
+# Seconds to wait on a locked database before giving up
+BUSY_TIMEOUT = 30
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+TIMED_OUT = 'timed_out'
+PENDING_STATES = (QUEUED, RUNNING)
+
+
+def _pid_alive(pid):
+    """True if a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """Persistent, SQLite-backed queue of scraper engine runs"""
+
+    def __init__(self, db_path=JOB_QUEUE_DB):
+        """
+        Initialize the queue
+
+        Args:
+            db_path (str): SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self):
+        """Return this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        engine TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        runner_pid INTEGER,
+                        worker_pid INTEGER,
+                        enqueued_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL,
+                        duration REAL,
+                        max_rss_kb INTEGER,
+                        found INTEGER,
+                        added INTEGER,
+                        error TEXT
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)')
+                conn.execute('CREATE INDEX IF NOT EXISTS jobs_engine ON jobs (engine, status)')
+                conn.execute('CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at, id)')
+                self._initialized = True
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def enqueue(self, engine):
+        """
+        Queue a run of an engine unless one is already waiting or running
+
+        Args:
+            engine (str): Engine name, e.g. 'california' or 'all'
+
+        Returns:
+            tuple: (job id, True if a new job was created)
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT id FROM jobs WHERE engine = ? AND status IN (?, ?) ORDER BY id LIMIT 1',
+                (engine, *PENDING_STATES)
+            ).fetchone()
+            if row:
+                conn.execute('COMMIT')
+                return row['id'], False
+
+            cursor = conn.execute(
+                'INSERT INTO jobs (engine, status, enqueued_at) VALUES (?, ?, ?)',
+                (engine, QUEUED, time.time())
+            )
+            conn.execute('COMMIT')
+            return cursor.lastrowid, True
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def claim(self, runner_pid=None):
+        """
+        Take the oldest queued job for a runner
+
+        Args:
+            runner_pid (int): Pid of the claiming runner (defaults to this process)
+
+        Returns:
+            dict: The claimed job, or None if the queue is empty
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY id LIMIT 1', (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+
+            started_at = time.time()
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, runner_pid = ?, '
+                'worker_pid = NULL, started_at = ? WHERE id = ?',
+                (RUNNING, runner_pid or os.getpid(), started_at, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        job = dict(row)
+        job.update(status=RUNNING, attempts=job['attempts'] + 1, started_at=started_at)
+        return job
+
+    def set_worker(self, job_id, worker_pid):
+        """Record the worker process executing a claimed job"""
+        self._connection().execute('UPDATE jobs SET worker_pid = ? WHERE id = ?', (worker_pid, job_id))
+
+    def finish(self, job_id, status, error=None, max_rss_kb=None, found=None, added=None):
+        """
+        Record the outcome of a run
+
+        Args:
+            job_id (int): Job id
+            status (str): SUCCEEDED, FAILED or TIMED_OUT
+            error (str): Error message for failed runs
+            max_rss_kb (int): Peak resident memory of the worker
+            found (int): Opportunities the run scraped
+            added (int): Opportunities that were new to the store
+        """
+        conn = self._connection()
+        # Take the finish time under the write lock, so finished_at order is
+        # commit order and a finished_since cursor never skips a job
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            finished_at = time.time()
+            conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, duration = ? - started_at, '
+                'error = ?, max_rss_kb = ?, found = ?, added = ? WHERE id = ?',
+                (status, finished_at, finished_at, error, max_rss_kb, found, added, job_id)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def recover(self, max_attempts=MAX_ATTEMPTS):
+        """
+        Requeue running jobs whose runner process is gone
+
+        Jobs that already used up their attempts are marked failed instead.
+
+        Returns:
+            int: Number of jobs recovered
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT id, attempts, runner_pid FROM jobs WHERE status = ?', (RUNNING,)
+            ).fetchall()
+            recovered = 0
+            for row in rows:
+                if row['runner_pid'] and _pid_alive(row['runner_pid']):
+                    continue
+                if row['attempts'] < max_attempts:
+                    conn.execute('UPDATE jobs SET status = ?, runner_pid = NULL WHERE id = ?',
+                                 (QUEUED, row['id']))
+                else:
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?',
+                        (FAILED, time.time(), 'Job runner exited during the run', row['id'])
+                    )
+                recovered += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if recovered:
+            logger.warning(f"Recovered {recovered} scraper jobs left running by a dead job runner")
+        return recovered
+
+    def get(self, job_id):
+        """Return one job as a dict, or None"""
+        row = self._connection().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def finished_since(self, after_finished_at=0.0, after_id=0, limit=500):
+        """
+        Jobs finished after a (finished_at, id) cursor, in the order they finished
+
+        Jobs run concurrently finish out of id order, so the cursor follows
+        finish time, with the id breaking ties.
+
+        Args:
+            after_finished_at (float): finished_at of the last job already handled
+            after_id (int): Id of the last job already handled
+            limit (int): Maximum number of jobs returned
+
+        Returns:
+            list: Job dicts
+        """
+        rows = self._connection().execute(
+            'SELECT * FROM jobs WHERE finished_at IS NOT NULL '
+            'AND (finished_at > ? OR (finished_at = ? AND id > ?)) '
+            'ORDER BY finished_at, id LIMIT ?',
+            (after_finished_at, after_finished_at, after_id, limit)
+        )
+        return [dict(row) for row in rows]
+
+    def recent(self, limit=50):
+        """Most recently enqueued jobs, newest first"""
+        rows = self._connection().execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,))
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        """Number of jobs per status"""
+        rows = self._connection().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status')
+        return {status: count for status, count in rows}
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide scraper job queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
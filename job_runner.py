@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Proletto Scraper Job Runner
+
+Standalone entry point that executes the scraper jobs the web process queues
+(see ``job_queue.py``). Run it next to the web server:
+
+    python job_runner.py [--workers 2] [--timeout 1800] [--memory-limit-mb 2048]
+
+The scheduler only queues jobs when started with ``SCRAPER_JOB_MODE=queue``;
+by default it runs them inline and this runner is not needed.
+
+Each claimed job runs in its own worker process, at most ``--workers`` at a
+time, so a scrape never shares the GIL or request threads with the web app:
+1. Jobs that exceed their timeout are terminated and marked ``timed_out``
+2. Workers get an address-space limit, so a runaway parse fails the job with
+   a MemoryError instead of exhausting the host
+3. Jobs left running by a runner that died are requeued on startup
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from job_queue import get_job_queue, SUCCEEDED, FAILED, TIMED_OUT
+from job_history import get_job_history, fetch_counters
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("job_runner")
+
+# Engine runs executed at the same time
+JOB_RUNNER_WORKERS = int(os.environ.get('SCRAPER_JOB_WORKERS', 2))
+
+# Seconds a job may run before its worker is terminated
+JOB_TIMEOUT = int(os.environ.get('SCRAPER_JOB_TIMEOUT', 1800))
+
+# Job-specific timeouts (engine -> seconds)
+JOB_TIMEOUTS = {
+    'all': int(os.environ.get('SCRAPER_JOB_TIMEOUT_ALL', 4 * 3600)),
+}
+
+# Address-space limit per worker in MB; 0 disables the limit
+JOB_MEMORY_LIMIT_MB = int(os.environ.get('SCRAPER_JOB_MEMORY_LIMIT_MB', 2048))
+
+# Seconds between queue polls
+JOB_POLL_INTERVAL = float(os.environ.get('SCRAPER_JOB_POLL_INTERVAL', 2))
+
+# Seconds a terminated worker gets to exit before it is killed
+TERMINATE_GRACE = 10
+
+
+def execute_engine_job(engine_name):
+    """Run one queued engine job; executed in the worker process"""
+    from ap_scheduler_v2 import execute_job
+    return execute_job(engine_name)
+
+
+def _worker_main(target, engine_name, memory_limit_mb, conn):
+    """Worker process body: apply the memory cap, run the job, report the outcome"""
+    # Own process group, so a timeout also stops the worker's parse processes
+    os.setpgid(0, 0)
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not apply memory limit to {engine_name} job: {e}")
+
+    run = {}
+    error_class = None
+    try:
+        result = target(engine_name)
+        if isinstance(result, dict):
+            run = result
+            success = bool(result.get('success'))
+        else:
+            success = result if isinstance(result, bool) else True
+        error = None if success else "Engine reported failure"
+        error_class = None if success else "EngineFailure"
+    except MemoryError:
+        success, error, error_class = False, f"Memory limit of {memory_limit_mb} MB exceeded", "MemoryError"
+    except BaseException as e:
+        success, error, error_class = False, f"{type(e).__name__}: {e}", type(e).__name__
+
+    urls_fetched, bytes_fetched = fetch_counters()
+    try:
+        conn.send({
+            'success': success,
+            'error': error,
+            'error_class': error_class,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None,
+            'found': run.get('found'),
+            'added': run.get('added'),
+            'urls_fetched': urls_fetched,
+            'bytes_fetched': bytes_fetched,
+        })
+    finally:
+        conn.close()
+
+
+class JobRunner:
+    """Claims queued scraper jobs and runs each in a capped worker process"""
+
+    def __init__(self, queue=None, workers=JOB_RUNNER_WORKERS, timeout=JOB_TIMEOUT,
+                 memory_limit_mb=JOB_MEMORY_LIMIT_MB, poll_interval=JOB_POLL_INTERVAL,
+                 target=execute_engine_job, timeouts=None, history=None):
+        """
+        Initialize the runner
+
+        Args:
+            queue (JobQueue): Queue to consume (defaults to the shared queue)
+            workers (int): Jobs executed at the same time
+            timeout (int): Seconds a job may run
+            memory_limit_mb (int): Address-space limit per worker; 0 disables it
+            poll_interval (float): Seconds between queue polls
+            target (callable): Module-level ``target(engine_name)`` run per job,
+                returning a bool or a dict with 'success', 'found' and 'added'
+            timeouts (dict): Job-specific timeouts (engine -> seconds)
+            history (JobHistory): Run history to append to (defaults to the shared history)
+        """
+        self.queue = queue or get_job_queue()
+        self.history = history or get_job_history()
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.poll_interval = poll_interval
+        self.target = target
+        self.timeouts = JOB_TIMEOUTS if timeouts is None else timeouts
+        self.running = {}
+        self._stopping = False
+        self._context = multiprocessing.get_context()
+
+    def _start(self, job):
+        """Start a worker process for a claimed job"""
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.target, job['engine'], self.memory_limit_mb, sender),
+            name=f"scraper-job-{job['id']}-{job['engine']}",
+        )
+        process.start()
+        sender.close()
+        self.queue.set_worker(job['id'], process.pid)
+
+        deadline = time.monotonic() + self.timeouts.get(job['engine'], self.timeout)
+        self.running[job['id']] = (job, process, receiver, deadline)
+        logger.info(f"Started job {job['id']} ({job['engine']}) in worker {process.pid}")
+
+    def _stop_worker(self, process):
+        """Terminate a worker and its children, killing them if they ignore SIGTERM"""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                break
+            process.join(TERMINATE_GRACE)
+            if not process.is_alive():
+                break
+
+    def _reap(self):
+        """Record finished and timed-out jobs"""
+        for job_id, (job, process, receiver, deadline) in list(self.running.items()):
+            outcome = None
+            if receiver.poll():
+                try:
+                    outcome = receiver.recv()
+                except EOFError:
+                    outcome = None
+                # A worker that reported but hangs on exit (a leftover
+                # non-daemon thread, a slow atexit handler) must not block
+                # the runner loop
+                process.join(TERMINATE_GRACE)
+                if process.is_alive():
+                    logger.warning(f"Worker {process.pid} for job {job_id} did not exit after reporting, stopping it")
+                    self._stop_worker(process)
+            elif not process.is_alive():
+                process.join()
+            elif time.monotonic() > deadline:
+                self._stop_worker(process)
+                limit = self.timeouts.get(job['engine'], self.timeout)
+                outcome = {'success': False, 'error': f"Timed out after {limit} seconds",
+                           'error_class': 'JobTimeout'}
+            else:
+                continue
+
+            if outcome is None:
+                outcome = {'success': False, 'error': f"Worker exited with code {process.exitcode}",
+                           'error_class': 'WorkerExit'}
+            if outcome.get('error_class') == 'JobTimeout':
+                status = TIMED_OUT
+            else:
+                status = SUCCEEDED if outcome['success'] else FAILED
+
+            error = outcome.get('error')
+            self.queue.finish(job_id, status, error=error, max_rss_kb=outcome.get('max_rss_kb'),
+                              found=outcome.get('found'), added=outcome.get('added'))
+            self._record_history(job, outcome)
+            if status == TIMED_OUT:
+                logger.error(f"Job {job_id} ({job['engine']}) timed out and was terminated")
+            elif status == SUCCEEDED:
+                logger.info(f"Job {job_id} ({job['engine']}) succeeded")
+            else:
+                logger.error(f"Job {job_id} ({job['engine']}) failed: {error}")
+            receiver.close()
+            del self.running[job_id]
+
+    def _record_history(self, job, outcome):
+        """Append a finished job to the run history"""
+        try:
+            self.history.record_run(
+                job['engine'], job['started_at'], time.time(), outcome['success'],
+                job_id=f"queue:{job['id']}",
+                urls_fetched=outcome.get('urls_fetched'),
+                bytes_fetched=outcome.get('bytes_fetched'),
+                found=outcome.get('found'),
+                added=outcome.get('added'),
+                error=outcome.get('error'),
+                error_class=outcome.get('error_class'),
+            )
+        except Exception as e:
+            logger.error(f"Failed to record job {job['id']} in the run history: {e}")
+
+    def run_once(self):
+        """
+        Reap finished workers and start queued jobs up to the worker limit
+
+        Returns:
+            int: Number of jobs still running
+        """
+        self._reap()
+        while not self._stopping and len(self.running) < self.workers:
+            job = self.queue.claim()
+            if job is None:
+                break
+            self._start(job)
+        return len(self.running)
+
+    def stop(self, *_):
+        """Stop claiming new jobs"""
+        self._stopping = True
+
+    def run_forever(self):
+        """Consume the queue until SIGTERM or SIGINT, then wait for running jobs"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.queue.recover()
+        logger.info(
+            f"Job runner {os.getpid()} started with {self.workers} workers, "
+            f"{self.timeout}s timeout, {self.memory_limit_mb or 'no'} MB memory limit"
+        )
+
+        while not self._stopping:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error processing the scraper job queue: {e}")
+            time.sleep(self.poll_interval)
+
+        logger.info(f"Stopping job runner, waiting for {len(self.running)} running jobs")
+        while self.running:
+            self._reap()
+            time.sleep(min(self.poll_interval, 1))
+
+
+def main():
+    """Main entry point for the job runner"""
+    parser = argparse.ArgumentParser(description="Run queued Proletto scraper jobs")
+    parser.add_argument('--workers', type=int, default=JOB_RUNNER_WORKERS, help="Jobs run at the same time")
+    parser.add_argument('--timeout', type=int, default=JOB_TIMEOUT, help="Seconds a job may run")
+    parser.add_argument('--memory-limit-mb', type=int, default=JOB_MEMORY_LIMIT_MB,
+                        help="Address-space limit per worker in MB (0 disables it)")
+    parser.add_argument('--enqueue', metavar='ENGINE', help="Queue a run of ENGINE and exit")
+    args = parser.parse_args()
+
+    if args.enqueue:
+        job_id, created = get_job_queue().enqueue(args.enqueue)
+        print(f"{'Queued' if created else 'Already queued'}: job {job_id} ({args.enqueue})")
+        return 0
+
+    JobRunner(workers=args.workers, timeout=args.timeout, memory_limit_mb=args.memory_limit_mb).run_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
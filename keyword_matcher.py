@@ -0,0 +1,166 @@
+"""
+Proletto Keyword Matcher
+
+This module compiles a keyword list into an Aho-Corasick automaton so text can
+be checked against every keyword in a single pass.
+
+Benefits over ``any(keyword.lower() in text.lower() for keyword in keywords)``:
+1. The text is lower-cased once and scanned once, however many keywords there are
+2. All matches come back together with their positions, so the same pass can
+   drive relevance filtering, tagging and type detection
+3. The automaton is built once per keyword list and shared by every page
+
+Matching is case-insensitive substring matching, the same as the checks it
+replaces.
+"""
+
+import threading
+from collections import deque
+
+
+class KeywordMatcher:
+    """Case-insensitive multi-keyword matcher over a fixed keyword list"""
+
+    def __init__(self, keywords):
+        """
+        Compile the automaton
+
+        Args:
+            keywords (iterable): Keywords to match; duplicates and case
+                variants are matched once and reported with their first spelling
+        """
+        self.keywords = []
+        self._transitions = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+
+        seen = {}
+        for keyword in keywords:
+            pattern = keyword.lower()
+            if not pattern or pattern in seen:
+                continue
+            seen[pattern] = len(self.keywords)
+            self.keywords.append(keyword)
+            self._add(pattern, seen[pattern])
+
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        self._build()
+
+    def _add(self, pattern, keyword_index):
+        """Add one pattern to the trie"""
+        state = 0
+        for char in pattern:
+            next_state = self._transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self._transitions)
+                self._transitions[state][char] = next_state
+                self._transitions.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] = (keyword_index,)
+
+    def _build(self):
+        """Compute failure links and fold them into a full transition table"""
+        trie = [dict(transitions) for transitions in self._transitions]
+        order = []
+        queue = deque(trie[0].values())
+
+        # Breadth-first, so a state's failure target is always finished first
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in trie[state].items():
+                fail = self._fail[state]
+                while fail and char not in trie[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = trie[fail].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+                queue.append(next_state)
+
+        # Deterministic transitions: every state inherits its failure state's
+        # moves, so matching never walks failure links
+        for state in order:
+            merged = dict(self._transitions[self._fail[state]])
+            merged.update(trie[state])
+            self._transitions[state] = merged
+
+    def iter_matches(self, text):
+        """
+        Yield every keyword occurrence in the text
+
+        Args:
+            text (str): Text to scan
+
+        Yields:
+            tuple: (start, end, keyword); positions index the lower-cased text,
+            which is the original text for ASCII input
+        """
+        if not text:
+            return
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for position, char in enumerate(text.lower()):
+            state = transitions[state].get(char, 0)
+            for keyword_index in outputs[state]:
+                yield (position + 1 - self._lengths[keyword_index], position + 1, self.keywords[keyword_index])
+
+    def find_all(self, text):
+        """All keyword occurrences as a list of (start, end, keyword)"""
+        return list(self.iter_matches(text))
+
+    def matched(self, text):
+        """Set of distinct keywords found in the text"""
+        if not text:
+            return set()
+        transitions = self._transitions
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return {self.keywords[keyword_index] for keyword_index in found}
+
+    def search(self, text):
+        """True if any keyword occurs in the text; stops at the first match"""
+        if not text:
+            return False
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                return True
+        return False
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_keyword_matcher(keywords):
+    """
+    Return a shared matcher for a keyword list, compiling it on first use
+
+    Args:
+        keywords: A keyword list, or an already compiled KeywordMatcher
+
+    Returns:
+        KeywordMatcher
+    """
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+
+    key = tuple(keywords)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(key)
+            if matcher is None:
+                matcher = KeywordMatcher(key)
+                _matchers[key] = matcher
+    return matcher
@@ -20,6 +20,7 @@ from sqlalchemy.orm import sessionmaker
 
 # Import from our custom modules
 from api_key_db_service import hash_key
+from api_key_cache import notify_key_revoked
 
 # Database URL from environment
 DATABASE_URL = os.environ.get('DATABASE_URL')
@@ -159,6 +160,8 @@ def revoke_api_key(key_id):
                 )
                 result = conn.execute(stmt)
                 trans.commit()
+                # Running API processes drop their cached copy of the key
+                notify_key_revoked(key_id)
                 return result.rowcount > 0
             except Exception as e:
                 trans.rollback()
@@ -26,93 +26,58 @@ def get_scheduler_metrics(days: int = 14) -> List[Dict[str, Any]]:
         days: Number of days of history to include
         
     Returns:
-        List of daily metrics with date and success rate
+        List of daily metrics with date, success rate (None on days without
+        runs) and job count, oldest first
     """
     try:
-        # Import locally to avoid circular imports
-        from ap_scheduler import get_scheduler_info
+        from job_history import get_job_history
         
-        # Get current scheduler state
-        scheduler_info = get_scheduler_info()
-        
-        # Generate metrics for the past X days
         metrics = []
-        
-        # In a real implementation, we would query a database table
-        # that tracks scheduler job executions. For now, we'll generate
-        # sample data based on the current state.
-        current_date = datetime.now()
-        
-        for i in range(days):
-            date = (current_date - timedelta(days=i)).strftime('%Y-%m-%d')
-            
-            # Simple logic to generate synthetic success rates
-            # A real implementation would query actual success/failure data
-            if scheduler_info.get('consecutive_failures', 0) > 0 and i < 2:
-                # If we have current failures, show them in recent data
-                success_rate = max(50, 100 - (scheduler_info.get('consecutive_failures', 0) * 10))
-            else:
-                # Otherwise high success rate with small variations
-                import random
-                success_rate = min(100, max(80, 95 + random.randint(-5, 5)))
-            
+        for day in get_job_history().daily_success_rates(days=days):
             metrics.append({
-                'date': date,
-                'success_rate': success_rate,
-                'job_count': scheduler_info.get('total_runs', 0) - i if i < scheduler_info.get('total_runs', 0) else 0
+                'date': day['date'],
+                'success_rate': day['success_rate'],
+                'job_count': day['runs'],
+                'success_count': day['successes']
             })
-        
-        # Sort chronologically
-        return sorted(metrics, key=lambda x: x['date'])
+        return metrics
     
     except Exception as e:
         logger.error(f"Error getting scheduler metrics: {e}")
         return []
 
-def get_scraper_metrics() -> List[Dict[str, Any]]:
+def get_scraper_metrics(days: int = 14) -> List[Dict[str, Any]]:
     """
-    Get success metrics for different scrapers
+    Get success metrics for each scraper engine
+    
+    Args:
+        days: Number of days of history to include
     
     Returns:
-        List of scraper metrics with site name and success rate
+        List of engine metrics with site name, success rate, run durations and
+        throughput, plus the previous window's success rate and p95 duration
     """
     try:
-        # Get list of scraper engines
-        scrapers = [
-            "creative-capital", "artjobs", "nyfa", "artsthread", "artsy", 
-            "collegeart", "museumjobs", "callforentry", "submittable", 
-            "artworkarchive", "artplaceamerica", "artiststhrive", "hyperallergic",
-            "artnews", "artforum", "theartnewspaper"
-        ]
-        
-        # In a real implementation, we would track scraper success/failure 
-        # in a database. For now, we'll generate sample data.
-        metrics = []
+        from job_history import get_job_history
         
-        for site in scrapers:
-            # Read bot_scheduler_state.json if it exists
-            state_file = "bot_scheduler_state.json"
-            if os.path.exists(state_file):
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    
-                # Use actual success data if available
-                total_runs = state.get('total_runs', 0)
-                total_successes = state.get('total_successes', 0)
-                
-                # Calculate success rate
-                success_rate = int((total_successes / total_runs * 100) if total_runs > 0 else 90)
-            else:
-                # Generate a reasonable success rate
-                import random
-                success_rate = random.randint(70, 100)
-            
+        metrics = []
+        for stats in get_job_history().engine_stats(days=days):
+            last_run = stats['last_run']
             metrics.append({
-                'site': site,
-                'success_rate': success_rate,
-                'last_run': datetime.now().strftime('%Y-%m-%d')
+                'site': stats['engine'],
+                'success_rate': stats['success_rate'],
+                'last_run': datetime.fromtimestamp(last_run).strftime('%Y-%m-%d') if last_run else None,
+                'runs': stats['runs'],
+                'p50_duration': stats['p50_duration'],
+                'p95_duration': stats['p95_duration'],
+                'urls_fetched': stats['urls_fetched'],
+                'bytes_fetched': stats['bytes_fetched'],
+                'opportunities_found': stats['found'],
+                'opportunities_new': stats['added'],
+                'last_error_class': stats['last_error_class'],
+                'previous_success_rate': stats['previous_success_rate'],
+                'previous_p95_duration': stats['previous_p95_duration']
             })
-        
         return metrics
     
     except Exception as e:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Migration script to add a unique index on opportunities.url
+
+The async scrapers upsert opportunities with INSERT ... ON CONFLICT (url),
+which requires a unique index. Existing duplicate URLs are merged into the
+oldest row first; rows referencing a duplicate are re-pointed to that row.
+"""
+
+import os
+import sys
+from flask import Flask
+from sqlalchemy import text
+from models import db
+
+# Create a simple Flask app for this migration
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+db.init_app(app)
+
+INDEX_NAME = 'uq_opportunities_url'
+
+# Tables holding a foreign key to opportunities.id
+REFERENCING_TABLES = ['saved_opportunities', 'applications', 'feedback']
+
+def migrate_opportunity_url_unique():
+    """Merge duplicate opportunity URLs and create the unique index"""
+    with app.app_context():
+        try:
+            # Get a new connection with autocommit=True to avoid transaction issues
+            conn = db.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            
+            result = conn.execute(text(
+                f"SELECT 1 FROM pg_indexes WHERE indexname = '{INDEX_NAME}'"
+            )).fetchone()
+            if result:
+                print(f"✓ Index {INDEX_NAME} already exists")
+                return True
+            
+            # Map every duplicate row to the oldest row with the same URL
+            conn.execute(text(
+                "CREATE TEMP TABLE opportunity_url_duplicates AS "
+                "SELECT id, MIN(id) OVER (PARTITION BY url) AS keep_id "
+                "FROM opportunities WHERE url IS NOT NULL"
+            ))
+            conn.execute(text("DELETE FROM opportunity_url_duplicates WHERE id = keep_id"))
+            
+            duplicates = conn.execute(text("SELECT COUNT(*) FROM opportunity_url_duplicates")).scalar()
+            print(f"→ Found {duplicates} duplicate opportunity rows")
+            
+            if duplicates:
+                for table in REFERENCING_TABLES:
+                    try:
+                        conn.execute(text(
+                            f"UPDATE {table} t SET opportunity_id = d.keep_id "
+                            f"FROM opportunity_url_duplicates d WHERE t.opportunity_id = d.id"
+                        ))
+                        print(f"✓ Re-pointed {table} rows to the kept opportunities")
+                    except Exception as e:
+                        print(f"! Could not update {table}: {str(e)}")
+                
+                conn.execute(text(
+                    "DELETE FROM opportunities WHERE id IN (SELECT id FROM opportunity_url_duplicates)"
+                ))
+                print(f"✓ Removed {duplicates} duplicate opportunities")
+            
+            print(f"→ Creating index {INDEX_NAME}")
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX_NAME} ON opportunities (url)"
+            ))
+            
+            print("✓ Migration completed successfully")
+        except Exception as e:
+            print(f"! Migration failed: {str(e)}")
+            return False
+        
+        return True
+
+if __name__ == "__main__":
+    success = migrate_opportunity_url_unique()
+    sys.exit(0 if success else 1)
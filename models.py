@@ -174,7 +174,7 @@ class Opportunity(db.Model):
     description = Column(Text)
     organization = Column(String(256), nullable=True)
     location = Column(String(256), nullable=True)
-    url = Column(String(512))
+    url = Column(String(512))  # Unique, see uq_opportunities_url
     deadline = Column(DateTime, nullable=True)
     
     # Opportunity metadata
@@ -198,6 +198,11 @@ class Opportunity(db.Model):
     applications = relationship('Application', backref='opportunity', lazy='dynamic', cascade='all, delete-orphan')
     saved_by = relationship('SavedOpportunity', backref='opportunity', lazy='dynamic', cascade='all, delete-orphan')
     
+    # Scrapers upsert on url (INSERT ... ON CONFLICT (url)), which needs a unique index
+    __table_args__ = (
+        db.Index('uq_opportunities_url', 'url', unique=True),
+    )
+    
     def to_dict(self):
         """Convert opportunity to dictionary for API responses."""
         return {
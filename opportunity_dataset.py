@@ -0,0 +1,222 @@
+"""
+Hot Opportunities Dataset for Proletto
+
+The read endpoints of the API used to ``json.load`` the whole opportunities
+file on every request, lowercase four fields of every item to filter by
+keyword, sort the full list by ``scraped_date``, and re-parse every date for
+the stats. This module keeps one parsed copy of the file in memory instead:
+1. The file is loaded once and reloaded only when its mtime, size or inode
+   changes (checked with one ``stat`` per request)
+2. On load the items are sorted newest first, the searchable fields are
+   joined into one lowercase string per item, and the scraped dates are
+   parsed and counted per day
+3. Keyword queries walk the pre-sorted list and stop as soon as the limit is
+   reached; daily counts are a bisect into the sorted days
+
+With gunicorn's ``preload_app`` the dataset is loaded in the master before
+the workers are forked, so they start with it already in memory.
+"""
+
+import os
+import json
+import bisect
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Configure logging
+logger = logging.getLogger('opportunity_dataset')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Default opportunities file, the same one the API reads and writes
+OPPORTUNITIES_FILE = os.environ.get('OPPORTUNITIES_FILE', 'opportunities.json')
+
+# Fields matched by keyword searches
+SEARCH_FIELDS = ('title', 'description', 'location', 'source')
+
+
+def _search_text(opportunity):
+    """Lowercase searchable text of an opportunity, fields separated so a keyword can't span two"""
+    return '\x00'.join(str(opportunity.get(field) or '').lower() for field in SEARCH_FIELDS)
+
+
+def _scraped_day(opportunity):
+    """Day an opportunity was scraped, or None when missing or unparseable"""
+    try:
+        return datetime.fromisoformat(opportunity.get('scraped_date', '')).date()
+    except (ValueError, TypeError):
+        return None
+
+
+class DatasetSnapshot:
+    """One immutable, indexed version of the opportunities file"""
+
+    def __init__(self, opportunities, signature=None):
+        """
+        Index a list of opportunities
+
+        Args:
+            opportunities (list): Opportunity dictionaries
+            signature (tuple): File identity (mtime, size, inode) the list was read from
+        """
+        self.signature = signature
+        self.opportunities = sorted(
+            opportunities,
+            key=lambda opp: opp.get('scraped_date') or '',
+            reverse=True
+        )
+        self.search_texts = [_search_text(opp) for opp in self.opportunities]
+        daily = Counter(day for day in map(_scraped_day, self.opportunities) if day is not None)
+        self.days = sorted(daily)
+        self.day_counts = [daily[day] for day in self.days]
+        self.loaded_at = datetime.utcnow()
+
+    def __len__(self):
+        return len(self.opportunities)
+
+    def search(self, keyword=None, limit=None):
+        """
+        Opportunities matching a keyword, newest first
+
+        Args:
+            keyword (str): Case-insensitive substring of title, description,
+                location or source; None or empty matches everything
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Matching opportunities
+        """
+        if limit is not None and limit <= 0:
+            limit = None
+        if not keyword:
+            return self.opportunities[:limit] if limit else list(self.opportunities)
+
+        keyword = keyword.lower()
+        result = []
+        for opportunity, text in zip(self.opportunities, self.search_texts):
+            if keyword in text:
+                result.append(opportunity)
+                if limit and len(result) >= limit:
+                    break
+        return result
+
+    def daily_counts(self, days=7, today=None):
+        """
+        Opportunities per scraped day for the last days (and any later dates)
+
+        Args:
+            days (int): How many days back to include
+            today (date): Reference day (defaults to today, UTC)
+
+        Returns:
+            dict: ISO date -> count
+        """
+        today = today or datetime.utcnow().date()
+        start = bisect.bisect_left(self.days, today - timedelta(days=days))
+        return {day.isoformat(): count for day, count in zip(self.days[start:], self.day_counts[start:])}
+
+
+class OpportunityDataset:
+    """The opportunities file kept parsed and indexed in memory"""
+
+    def __init__(self, path=None):
+        """
+        Initialize the dataset; the file is read on first use
+
+        Args:
+            path (str): Opportunities JSON file
+        """
+        self.path = path or OPPORTUNITIES_FILE
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _signature(self, fd=None):
+        """(mtime, size, inode) of the file, or of the open file ``fd`` when given"""
+        stat = os.stat(self.path) if fd is None else os.fstat(fd)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def snapshot(self):
+        """
+        Current snapshot, reloading the file if it changed
+
+        Returns:
+            DatasetSnapshot: The indexed dataset
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file is not valid JSON and nothing was loaded before
+        """
+        signature = self._signature()
+        current = self._snapshot
+        if current is not None and current.signature == signature:
+            return current
+
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current.signature == signature:
+                return current
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    # Signature of the file actually read: a file swapped in
+                    # by os.replace after this open gets a new inode
+                    signature = self._signature(f.fileno())
+                    opportunities = json.load(f) or []
+            except ValueError as e:
+                if current is None:
+                    raise
+                # Most likely caught mid-write; keep serving the last good copy
+                logger.warning(f"Could not reload {self.path}, serving previous data: {e}")
+                return current
+            self._snapshot = DatasetSnapshot(opportunities, signature)
+            logger.info(f"Loaded {len(self._snapshot)} opportunities from {self.path}")
+            return self._snapshot
+
+    def replace(self, opportunities):
+        """
+        Swap in a list that was just written to the file
+
+        Args:
+            opportunities (list): The opportunities as written
+
+        Returns:
+            DatasetSnapshot: The new snapshot
+        """
+        with self._lock:
+            try:
+                signature = self._signature()
+            except OSError:
+                signature = None
+            self._snapshot = DatasetSnapshot(opportunities, signature)
+            return self._snapshot
+
+    def invalidate(self):
+        """Force a reload on next use"""
+        with self._lock:
+            self._snapshot = None
+
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def get_opportunity_dataset(path=None):
+    """
+    Get the shared dataset for an opportunities file
+
+    Args:
+        path (str): Opportunities JSON file (defaults to OPPORTUNITIES_FILE)
+
+    Returns:
+        OpportunityDataset: The dataset
+    """
+    path = path or OPPORTUNITIES_FILE
+    with _datasets_lock:
+        if path not in _datasets:
+            _datasets[path] = OpportunityDataset(path)
+        return _datasets[path]
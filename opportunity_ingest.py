@@ -0,0 +1,172 @@
+"""
+Batch Opportunity Ingestion for Proletto
+
+The bot used to push scraped opportunities one request at a time, and every
+request loaded the full opportunities file, scanned it for the URL, rewrote
+the whole file and re-uploaded it to Google Drive. This module applies a
+whole batch at once:
+1. Items are validated one by one; invalid items get an error result and do
+   not stop the batch
+2. Every valid item is upserted by URL into the opportunity store in one
+   transaction (items repeating a URL within the batch update the earlier one)
+3. The store re-exports the JSON file once, atomically, and only if something
+   changed; the in-memory dataset served by the API is then reloaded from it
+4. The Drive copy is queued with the Drive sync engine, which uploads it at
+   most once per DRIVE_SYNC_INTERVAL no matter how many batches arrive
+
+Going through the store keeps API-ingested items in the SQLite rows the
+engines merge into, so the next engine export does not drop them.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+
+from opportunity_dataset import get_opportunity_dataset, OPPORTUNITIES_FILE
+from opportunity_store import get_opportunity_store
+
+# Configure logging
+logger = logging.getLogger('opportunity_ingest')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Largest number of opportunities accepted in one batch
+INGEST_MAX_BATCH = int(os.environ.get('INGEST_MAX_BATCH', 5000))
+
+REQUIRED_FIELDS = ('title', 'url')
+
+# Per-item result statuses
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+def parse_batch(body, content_type=None):
+    """
+    Parse a batch request body
+
+    Args:
+        body (bytes or str): JSON array, {"opportunities": [...]}, or NDJSON
+        content_type (str): Request content type; NDJSON is also detected
+            when the body is not a single JSON document
+
+    Returns:
+        list: Items; lines that are not valid JSON are returned as
+            ValueError instances so they get an error result
+
+    Raises:
+        ValueError: If the body is empty or not a batch
+    """
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    if not body or not body.strip():
+        raise ValueError('Empty request body')
+
+    if 'ndjson' not in (content_type or ''):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        else:
+            if isinstance(data, dict) and isinstance(data.get('opportunities'), list):
+                return data['opportunities']
+            if isinstance(data, list):
+                return data
+            if isinstance(data, dict):
+                return [data]
+            raise ValueError('Expected a JSON array of opportunities')
+
+    items = []
+    for number, line in enumerate(body.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            items.append(ValueError(f'Invalid JSON on line {number}: {e}'))
+    return items
+
+
+def _validate(item):
+    """Error message for an invalid item, or None"""
+    if isinstance(item, Exception):
+        return str(item)
+    if not isinstance(item, dict):
+        return 'Invalid opportunity data'
+    for field in REQUIRED_FIELDS:
+        if not item.get(field):
+            return f'Missing required field: {field}'
+    return None
+
+
+def ingest_opportunities(items, path=None, mark=None):
+    """
+    Upsert a batch of opportunities by URL with a single write
+
+    Args:
+        items (list): Opportunity dictionaries
+        path (str): Opportunities file (defaults to OPPORTUNITIES_FILE)
+        mark (dict): Fields set on every item (e.g. test flags)
+
+    Returns:
+        dict: Counts per status, whether the file was written, and one
+            result per item ({'index', 'url', 'status', 'error'})
+    """
+    path = path or OPPORTUNITIES_FILE
+    results = []
+    valid = []
+    now = datetime.utcnow().isoformat()
+    for index, item in enumerate(items):
+        error = _validate(item)
+        if error:
+            results.append({'index': index, 'url': item.get('url') if isinstance(item, dict) else None,
+                            'status': ERROR, 'error': error})
+            continue
+        item = dict(item)
+        if mark:
+            item.update(mark)
+        result = {'index': index, 'url': item['url'], 'status': None}
+        results.append(result)
+        valid.append((item, result))
+
+    written = False
+    if valid:
+        # The store serializes writers and owns the JSON export, so ingested
+        # items survive the next engine merge
+        store = get_opportunity_store(path)
+        statuses = store.upsert([item for item, _ in valid], defaults={'scraped_date': now})
+        for (_, result), status in zip(valid, statuses):
+            result['status'] = status
+        if any(status != UNCHANGED for status in statuses):
+            written = store.export_json()
+            dataset = get_opportunity_dataset(path)
+            dataset.invalidate()
+            dataset.snapshot()
+
+    summary = {status: sum(1 for r in results if r['status'] == status)
+               for status in (CREATED, UPDATED, UNCHANGED, ERROR)}
+    summary['written'] = written
+    summary['results'] = results
+    logger.info(f"Ingested batch of {len(items)} opportunities: {summary[CREATED]} created, "
+                f"{summary[UPDATED]} updated, {summary[UNCHANGED]} unchanged, {summary[ERROR]} failed")
+    return summary
+
+
+def request_drive_sync(path=None):
+    """
+    Queue the opportunities file for a background upload to Drive
+
+    The Drive sync engine coalesces requests, uploads at most once per
+    DRIVE_SYNC_INTERVAL and skips the upload if the content is unchanged.
+
+    Returns:
+        bool: True if the file was not already queued
+    """
+    from drive_integration import get_drive_service
+    path = path or OPPORTUNITIES_FILE
+    return get_drive_service().sync.request_sync(path, 'opportunities')
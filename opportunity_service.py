@@ -15,6 +15,8 @@ from flask_caching import Cache
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import desc, func, or_
 from models import Opportunity, db
+from opportunity_snapshot import SnapshotCache, write_snapshot, read_snapshot_header
+from scheduler_lease import start_scheduler_with_lease
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -27,7 +29,7 @@ cache = Cache()
 opportunity_bp = Blueprint('opportunities', __name__, url_prefix='/opportunities')
 
 # Constants
-SNAPSHOT_FILE = os.environ.get('OPPORTUNITY_SNAPSHOT_FILE', 'data/opportunities_snapshot.json')
+SNAPSHOT_FILE = os.environ.get('OPPORTUNITY_SNAPSHOT_FILE', 'data/opportunities_snapshot.bin')
 SNAPSHOT_MAX_AGE = int(os.environ.get('OPPORTUNITY_SNAPSHOT_MAX_AGE', 86400))  # 24 hours in seconds
 DEFAULT_LIMIT = 100
 MAX_LIMIT = 1000
@@ -35,6 +37,9 @@ MAX_LIMIT = 1000
 # Ensure the snapshot directory exists
 os.makedirs(os.path.dirname(SNAPSHOT_FILE), exist_ok=True)
 
+# Memory-mapped snapshot, remapped only when the file changes
+snapshot_cache = SnapshotCache(SNAPSHOT_FILE)
+
 def init_app(app):
     """Initialize the opportunities module with the Flask app"""
     # Import our enhanced cache utilities
@@ -72,7 +77,7 @@ def init_app(app):
             name='Create opportunity snapshot file',
             replace_existing=True
         )
-        scheduler.start()
+        start_scheduler_with_lease(scheduler, 'opportunity_snapshot')
         logger.info("Scheduled periodic opportunity snapshot creation")
     except ImportError:
         logger.warning("APScheduler not available - automatic snapshots disabled")
@@ -163,87 +168,27 @@ def get_snapshot_opportunities(filters=None, limit=DEFAULT_LIMIT, offset=0, sear
     """Get opportunities from the snapshot file with optional filtering"""
     try:
         # Check if snapshot file exists
-        if not os.path.exists(SNAPSHOT_FILE):
+        snapshot = snapshot_cache.get()
+        if snapshot is None:
             logger.warning(f"Snapshot file not found: {SNAPSHOT_FILE}")
             return None
         
         # Check if snapshot file is too old
-        file_age = time.time() - os.path.getmtime(SNAPSHOT_FILE)
+        file_age = time.time() - snapshot.timestamp
         if file_age > SNAPSHOT_MAX_AGE:
             logger.warning(f"Snapshot file is too old ({file_age} seconds)")
         
-        # Load opportunities from snapshot file
-        with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, dict) or 'opportunities' not in data:
-            logger.error("Invalid snapshot file format")
-            return None
-        
-        opportunities = data['opportunities']
-        
-        # Apply filters
-        if filters:
-            filtered_opportunities = []
-            
-            # Handle membership tier filtering separately
-            tier = filters.get('tier')
-            states = filters.get('states', [])
-            
-            # Remove tier and states from filters to handle them specially
-            special_filters = {'tier', 'states'}
-            regular_filters = {k: v for k, v in filters.items() if k not in special_filters}
-            
-            for op in opportunities:
-                include = True
-                
-                # Apply regular filters
-                for key, value in regular_filters.items():
-                    if key in op and op[key] != value:
-                        include = False
-                        break
-                
-                # Apply tier-based filtering
-                if include and tier:
-                    if tier == 'free':
-                        # For free tier, only show free opportunities or social media type
-                        include = op.get('membership_level') == 'free' or op.get('type') == 'social_media'
-                    elif tier == 'supporter':
-                        # For supporter tier, show free opportunities, social media, and specific states
-                        if states:
-                            include = (op.get('membership_level') == 'free' or 
-                                      op.get('type') == 'social_media' or 
-                                      op.get('state') in states)
-                        else:
-                            include = op.get('membership_level') == 'free' or op.get('type') == 'social_media'
-                    # For premium tier, include all opportunities (no additional filtering)
-                
-                if include:
-                    filtered_opportunities.append(op)
-            
-            opportunities = filtered_opportunities
-        
-        # Apply search if provided
-        if search:
-            search_term = search.lower()
-            search_results = []
-            for op in opportunities:
-                if (search_term in op.get('title', '').lower() or
-                    search_term in op.get('description', '').lower() or
-                    search_term in op.get('tags', '')):
-                    search_results.append(op)
-            opportunities = search_results
-        
-        # Apply pagination
-        paginated_opportunities = opportunities[offset:offset+limit]
+        # Filters resolve through the snapshot indexes; only the page is decoded
+        paginated_opportunities, total = snapshot.query(filters, limit, offset, search)
         
         return {
             'success': True,
             'count': len(paginated_opportunities),
-            'total': len(opportunities),
+            'total': total,
             'opportunities': paginated_opportunities,
             'from_snapshot': True,
-            'snapshot_age': int(file_age)
+            'snapshot_age': int(file_age),
+            'snapshot_version': snapshot.version
         }
     except Exception as e:
         logger.error(f"Error reading snapshot file: {str(e)}")
@@ -259,23 +204,8 @@ def create_snapshot_file(app):
             # Convert to dictionaries
             opportunity_dicts = [op.to_dict() for op in opportunities]
             
-            # Create snapshot data
-            snapshot_data = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'count': len(opportunity_dicts),
-                'opportunities': opportunity_dicts
-            }
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(SNAPSHOT_FILE), exist_ok=True)
-            
-            # Write to temporary file first to avoid corruption if interrupted
-            temp_file = f"{SNAPSHOT_FILE}.tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(snapshot_data, f, indent=2)
-            
-            # Rename to final file (atomic operation)
-            os.replace(temp_file, SNAPSHOT_FILE)
+            # Serialize once with row indexes; readers pick up the new file by mtime
+            write_snapshot(SNAPSHOT_FILE, opportunity_dicts)
             
             logger.info(f"Created opportunity snapshot with {len(opportunity_dicts)} opportunities")
             return True
@@ -392,9 +322,8 @@ def status():
         if snapshot_exists:
             snapshot_age = time.time() - os.path.getmtime(SNAPSHOT_FILE)
             try:
-                with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    snapshot_count = data.get('count', len(data.get('opportunities', [])))
+                # The count lives in the fixed-size header
+                snapshot_count = read_snapshot_header(SNAPSHOT_FILE)['count']
             except Exception as e:
                 logger.error(f"Error reading snapshot file: {str(e)}")
         
@@ -0,0 +1,262 @@
+"""
+Proletto Opportunity Snapshot
+
+This module stores the opportunity fallback snapshot in a pre-serialized,
+memory-mappable file so fallback reads cost O(page) instead of re-parsing the
+whole corpus on every request.
+
+File layout:
+- Header: magic, format version, record count, timestamp and section offsets
+- Index: JSON with the row numbers of every tier / state / source / category /
+  engine / location value, so filters never have to decode records
+- Offsets: ``count + 1`` little-endian uint64 record boundaries
+- Records: one UTF-8 JSON object per opportunity, in snapshot order
+
+Readers map the file once and keep it in-process; the mapping is only
+replaced when the file's mtime (or inode) changes.
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PRLSNAP\x00'
+FORMAT_VERSION = 1
+
+# magic, format version, count, timestamp, index offset, index length, offsets offset
+HEADER = struct.Struct('<8sIIdQQQ')
+
+# Record keys with a precomputed value -> rows index
+INDEXED_FIELDS = ('source', 'category', 'engine', 'location', 'state')
+
+
+def _is_free(op):
+    """Free tier sees free opportunities and social media posts"""
+    return op.get('membership_level') == 'free' or op.get('type') == 'social_media'
+
+
+def build_index(opportunities):
+    """
+    Build the row-number indexes stored in the snapshot
+
+    Returns:
+        dict: ``{'free': rows, 'fields': {key: {value: rows}}, 'missing': {key: rows}}``
+    """
+    index = {
+        'free': [],
+        'fields': {key: {} for key in INDEXED_FIELDS},
+        'missing': {key: [] for key in INDEXED_FIELDS},
+    }
+    for row, op in enumerate(opportunities):
+        if _is_free(op):
+            index['free'].append(row)
+        for key in INDEXED_FIELDS:
+            if key not in op:
+                index['missing'][key].append(row)
+            elif isinstance(op[key], str):
+                index['fields'][key].setdefault(op[key], []).append(row)
+    return index
+
+
+def write_snapshot(path, opportunities, timestamp=None):
+    """
+    Write a snapshot file atomically
+
+    Args:
+        path (str): Destination file
+        opportunities (list): Opportunity dictionaries in the order to serve them
+        timestamp (float): Snapshot time (defaults to now)
+
+    Returns:
+        int: Number of records written
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    records = [json.dumps(op, separators=(',', ':'), default=str).encode('utf-8') for op in opportunities]
+    index_bytes = json.dumps(build_index(opportunities), separators=(',', ':')).encode('utf-8')
+
+    index_offset = HEADER.size
+    # Align the offsets table so it can be viewed as uint64 in place
+    offsets_offset = (index_offset + len(index_bytes) + 7) // 8 * 8
+    padding = offsets_offset - index_offset - len(index_bytes)
+
+    boundaries = [0]
+    for record in records:
+        boundaries.append(boundaries[-1] + len(record))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to temporary file first to avoid corruption if interrupted
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), timestamp,
+                            index_offset, len(index_bytes), offsets_offset))
+        f.write(index_bytes)
+        f.write(b'\x00' * padding)
+        f.write(struct.pack(f'<{len(boundaries)}Q', *boundaries))
+        for record in records:
+            f.write(record)
+
+    # Rename to final file (atomic operation)
+    os.replace(temp_file, path)
+    return len(records)
+
+
+def read_snapshot_header(path):
+    """
+    Read only the header of a snapshot file
+
+    Returns:
+        dict: ``count``, ``version`` and ``timestamp``
+    """
+    with open(path, 'rb') as f:
+        magic, version, count, timestamp, _, _, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not an opportunity snapshot: {path}")
+    return {'count': count, 'version': version, 'timestamp': timestamp}
+
+
+class OpportunitySnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, timestamp, index_offset, index_length, offsets_offset = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an opportunity snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        self.count = count
+        self.version = version
+        self.timestamp = timestamp
+        self.index = json.loads(self._map[index_offset:index_offset + index_length])
+        self._offsets = memoryview(self._map)[offsets_offset:offsets_offset + 8 * (count + 1)].cast('Q')
+        self._records_offset = offsets_offset + 8 * (count + 1)
+
+    def record(self, row):
+        """Decode a single record"""
+        start = self._records_offset + self._offsets[row]
+        end = self._records_offset + self._offsets[row + 1]
+        return json.loads(self._map[start:end])
+
+    def matching_rows(self, filters=None):
+        """
+        Row numbers matching the filters, resolved from the index where possible
+
+        Args:
+            filters (dict): Same filters as ``get_snapshot_opportunities``
+
+        Returns:
+            tuple: (sorted row numbers, filters that still need record checks)
+        """
+        rows = None
+        remaining = {}
+
+        for key, value in (filters or {}).items():
+            if key == 'states':
+                continue
+            if key == 'tier':
+                if value == 'free' or (value == 'supporter' and not filters.get('states')):
+                    selected = set(self.index['free'])
+                elif value == 'supporter':
+                    selected = set(self.index['free'])
+                    for state in filters['states']:
+                        selected.update(self.index['fields']['state'].get(state, ()))
+                else:
+                    # Premium and unknown tiers see everything
+                    continue
+            elif key in self.index['fields']:
+                # Rows without the key are not filtered out
+                selected = set(self.index['fields'][key].get(value, ()))
+                selected.update(self.index['missing'][key])
+            else:
+                remaining[key] = value
+                continue
+            rows = selected if rows is None else rows & selected
+
+        if rows is None:
+            return range(self.count), remaining
+        return sorted(rows), remaining
+
+    def query(self, filters=None, limit=100, offset=0, search=None):
+        """
+        Filter, search and paginate the snapshot
+
+        Only the returned page is decoded unless a search term or an unindexed
+        filter forces records to be inspected.
+
+        Returns:
+            tuple: (page of opportunity dictionaries, total matches)
+        """
+        rows, remaining = self.matching_rows(filters)
+
+        if remaining or search:
+            search_term = search.lower() if search else None
+            kept = []
+            for row in rows:
+                op = self.record(row)
+                if any(key in op and op[key] != value for key, value in remaining.items()):
+                    continue
+                if search_term and not (
+                    search_term in (op.get('title') or '').lower() or
+                    search_term in (op.get('description') or '').lower() or
+                    search_term in (op.get('tags') or '')
+                ):
+                    continue
+                kept.append(op)
+            return kept[offset:offset + limit], len(kept)
+
+        return [self.record(row) for row in rows[offset:offset + limit]], len(rows)
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield self.record(row)
+
+
+class SnapshotCache:
+    """Keeps the current snapshot mapped and remaps it when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the mapped snapshot, reloading it if the file was replaced
+
+        Returns:
+            OpportunitySnapshot or None if the file does not exist
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.signature == signature:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.signature != signature:
+                # The previous mapping is left to the garbage collector so
+                # requests still reading it are not cut off
+                self._snapshot = OpportunitySnapshot(self.path)
+                logger.info(f"Loaded opportunity snapshot with {self._snapshot.count} records from {self.path}")
+            return self._snapshot
@@ -0,0 +1,339 @@
+"""
+Proletto Opportunity Store
+
+This module replaces the read-modify-write merge of ``opportunities.json`` that
+every engine used to do. Scraped opportunities are appended to a URL-keyed
+SQLite store, and ``opportunities.json`` is exported from it for the consumers
+that still read the JSON file.
+
+Benefits over rewriting the JSON file in every engine:
+1. Merging costs O(new items) instead of parsing and re-dumping the whole corpus
+2. Inserts are transactional, so engines finishing together cannot lose rows
+3. The JSON export is written to a temporary file and renamed into place, so
+   readers never see a half-written file
+4. Export copies the stored JSON text verbatim instead of re-serializing it,
+   and is skipped when nothing was added
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Default export file read by the admin pages, APIs and bots
+DEFAULT_EXPORT_PATH = 'opportunities.json'
+
+# Seconds to wait on a locked database before giving up
+BUSY_TIMEOUT = 30
+
+
+def store_path_for(export_path):
+    """Store database kept next to the exported JSON file"""
+    root, _ = os.path.splitext(export_path)
+    return root + '.sqlite3'
+
+
+class OpportunityStore:
+    """Append-only, URL-keyed opportunity store with a JSON export"""
+
+    def __init__(self, export_path=DEFAULT_EXPORT_PATH, db_path=None):
+        """
+        Initialize the store
+
+        Args:
+            export_path (str): JSON file kept in sync with the store
+            db_path (str): SQLite database file (defaults to the export path with .sqlite3)
+        """
+        self.export_path = export_path
+        self.db_path = db_path or store_path_for(export_path)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self):
+        """Return this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS opportunities (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        url TEXT NOT NULL UNIQUE,
+                        data TEXT NOT NULL,
+                        added_at REAL NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+                self._import_existing(conn)
+                self._initialized = True
+
+        self._local.conn = conn
+        return conn
+
+    def _import_existing(self, conn):
+        """Seed a new store from an existing JSON file, once"""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone():
+                conn.execute('COMMIT')
+                return
+
+            items = []
+            if os.path.exists(self.export_path):
+                try:
+                    with open(self.export_path, 'r', encoding='utf-8') as f:
+                        items = json.load(f)
+                except (ValueError, OSError) as e:
+                    logger.warning(f"Could not import existing {self.export_path}: {e}")
+                    items = []
+
+            added = self._insert(conn, items if isinstance(items, list) else [])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('imported', ?)", (str(time.time()),))
+            conn.execute('COMMIT')
+            if added:
+                logger.info(f"Imported {added} opportunities from {self.export_path} into {self.db_path}")
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _insert(self, conn, items):
+        """Insert items whose URL is not stored yet; returns the number added"""
+        now = time.time()
+        before = conn.total_changes
+        conn.executemany(
+            'INSERT OR IGNORE INTO opportunities (url, data, added_at) VALUES (?, ?, ?)',
+            (
+                (item['url'], json.dumps(item, ensure_ascii=False), now)
+                for item in items if isinstance(item, dict) and item.get('url')
+            )
+        )
+        added = conn.total_changes - before
+        if added:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('revision', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        return added
+
+    def add_new(self, items):
+        """
+        Append opportunities whose URL is not stored yet
+
+        Args:
+            items (list): Opportunity dictionaries with a ``url`` key
+
+        Returns:
+            int: Number of opportunities added
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            added = self._insert(conn, items)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        # Per-thread counters let a scheduler attribute yield to the engine it ran
+        self._local.seen = getattr(self._local, 'seen', 0) + sum(
+            1 for item in items if isinstance(item, dict) and item.get('url')
+        )
+        self._local.added = getattr(self._local, 'added', 0) + added
+        return added
+
+    def upsert(self, items, defaults=None):
+        """
+        Insert new opportunities and update stored ones by URL
+
+        Unlike ``add_new``, fields of an item whose URL is already stored are
+        merged into the stored row, so callers can correct earlier data.
+
+        Args:
+            items (list): Opportunity dictionaries with a ``url`` key
+            defaults (dict): Fields set on newly inserted items that lack them
+
+        Returns:
+            list: 'created', 'updated' or 'unchanged' per item, in order;
+                an item repeating a URL created earlier in the same call
+                counts as 'created'
+        """
+        conn = self._connection()
+        now = time.time()
+        statuses = []
+        created = set()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for item in items:
+                row = conn.execute('SELECT data FROM opportunities WHERE url = ?', (item['url'],)).fetchone()
+                if row is None:
+                    if defaults:
+                        item = dict(item)
+                        for field, value in defaults.items():
+                            item.setdefault(field, value)
+                    conn.execute(
+                        'INSERT INTO opportunities (url, data, added_at) VALUES (?, ?, ?)',
+                        (item['url'], json.dumps(item, ensure_ascii=False), now)
+                    )
+                    created.add(item['url'])
+                    statuses.append('created')
+                    continue
+                stored = json.loads(row[0])
+                merged = dict(stored)
+                merged.update(item)
+                if merged == stored:
+                    statuses.append('unchanged')
+                    continue
+                conn.execute(
+                    'UPDATE opportunities SET data = ? WHERE url = ?',
+                    (json.dumps(merged, ensure_ascii=False), item['url'])
+                )
+                statuses.append('created' if item['url'] in created else 'updated')
+
+            if any(status != 'unchanged' for status in statuses):
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('revision', '1') "
+                    "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return statuses
+
+    def thread_counters(self):
+        """
+        Opportunities merged by the calling thread so far
+
+        Returns:
+            tuple: (offered, newly added)
+        """
+        return getattr(self._local, 'seen', 0), getattr(self._local, 'added', 0)
+
+    def count(self):
+        """Number of stored opportunities"""
+        return self._connection().execute('SELECT COUNT(*) FROM opportunities').fetchone()[0]
+
+    def known_keys(self):
+        """URLs and fingerprints of all stored opportunities"""
+        keys = set()
+        rows = self._connection().execute("SELECT url, json_extract(data, '$.fingerprint') FROM opportunities")
+        for url, fingerprint in rows:
+            keys.add(url)
+            if fingerprint:
+                keys.add(fingerprint)
+        return keys
+
+    def all(self):
+        """All stored opportunities in insertion order"""
+        rows = self._connection().execute('SELECT data FROM opportunities ORDER BY seq')
+        return [json.loads(row[0]) for row in rows]
+
+    def _meta(self, conn, key):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def export_json(self, force=False):
+        """
+        Write the JSON export atomically if the store changed since the last export
+
+        Args:
+            force (bool): Export even if the file looks up to date
+
+        Returns:
+            bool: True if the file was written
+        """
+        conn = self._connection()
+
+        # Hold the write lock so exports are serialized and match the revision they record
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            revision = self._meta(conn, 'revision') or '0'
+            if not force and os.path.exists(self.export_path) and self._meta(conn, 'exported_revision') == revision:
+                conn.execute('COMMIT')
+                return False
+
+            directory = os.path.dirname(os.path.abspath(self.export_path))
+            fd, tmp_path = tempfile.mkstemp(prefix='.opportunities-', suffix='.json', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write('[')
+                    for i, (data,) in enumerate(conn.execute('SELECT data FROM opportunities ORDER BY seq')):
+                        if i:
+                            f.write(',\n')
+                        f.write(data)
+                    f.write(']\n')
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.export_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('exported_revision', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (revision,)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return True
+
+    def merge(self, items):
+        """
+        Add new opportunities and refresh the JSON export
+
+        Args:
+            items (list): Opportunity dictionaries with a ``url`` key
+
+        Returns:
+            tuple: (added, total)
+        """
+        added = self.add_new(items)
+        self.export_json()
+        return added, self.count()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_opportunity_store(export_path=DEFAULT_EXPORT_PATH):
+    """Return the process-wide store for an export file"""
+    key = os.path.abspath(export_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = OpportunityStore(export_path)
+            _stores[key] = store
+        return store
+
+
+def merge_opportunities(items, filename=DEFAULT_EXPORT_PATH):
+    """
+    Merge scraped opportunities into the store behind ``filename``
+
+    Args:
+        items (list): Opportunity dictionaries with a ``url`` key
+        filename (str): JSON export path
+
+    Returns:
+        tuple: (added, total)
+    """
+    return get_opportunity_store(filename).merge(items)
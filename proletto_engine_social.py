@@ -13,6 +13,9 @@ from datetime import datetime
 
 # Import improved scraper
 from improved_scraper import improved_scrape_site
+from keyword_matcher import KeywordMatcher
+from opportunity_store import merge_opportunities
+from scrapers_improvement import commit_parsed_pages
 
 # Configure logging
 logging.basicConfig(
@@ -93,10 +96,11 @@ KEYWORDS = [
     "applications close", "apply by", "submit by", "ends on"
 ]
 
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
 def is_relevant(text):
     """Check if text contains any relevant keywords."""
-    text_lower = text.lower()
-    return any(keyword.lower() in text_lower for keyword in KEYWORDS)
+    return KEYWORD_MATCHER.search(text)
 
 def extract_date(text):
     """
@@ -248,34 +252,15 @@ def run_scraper():
 def merge_with_existing(new_opportunities, filename="opportunities.json"):
     """Merge new social media opportunities with existing ones, avoiding duplicates."""
     try:
-        # Try to read existing file
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                existing_opportunities = json.load(f)
-            logger.info(f"Loaded {len(existing_opportunities)} existing opportunities from {filename}")
-        except (FileNotFoundError, json.JSONDecodeError):
-            logger.info(f"No existing opportunities file found or file is invalid. Creating new.")
-            existing_opportunities = []
-        
-        # Create a set of existing URLs to check for duplicates
-        existing_urls = {opp["url"] for opp in existing_opportunities}
-        
-        # Add only new opportunities
-        added_count = 0
-        for opp in new_opportunities:
-            if opp["url"] not in existing_urls:
-                existing_opportunities.append(opp)
-                existing_urls.add(opp["url"])
-                added_count += 1
-        
-        # Save the merged list
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_opportunities, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Added {added_count} new social media opportunities. Total: {len(existing_opportunities)}")
+        # URL-keyed store: appends only new URLs and re-exports the JSON file atomically
+        added_count, total = merge_opportunities(new_opportunities, filename)
+        logger.info(f"Added {added_count} new social media opportunities. Total: {total}")
+        # Pages parsed by the synchronous scraper are only now safe to skip
+        commit_parsed_pages(True)
         return True
     except Exception as e:
         logger.error(f"Failed to merge social media opportunities: {e}")
+        commit_parsed_pages(False)
         return False
 
 def run():
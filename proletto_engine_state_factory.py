@@ -13,6 +13,11 @@ from datetime import datetime
 
 # Import improved scraper
 from improved_scraper import improved_scrape_site
+from keyword_matcher import KeywordMatcher
+from opportunity_store import merge_opportunities
+from scrapers_improvement import commit_parsed_pages
+from scrapers.orchestrator import ScrapeOrchestrator
+from scrapers.state_engine_async import StateEngineAsyncScraper
 
 def create_state_engine(state_name, state_sites, state_keywords, state_locations, logger_name=None):
     """
@@ -79,9 +84,12 @@ def create_state_engine(state_name, state_sites, state_keywords, state_locations
     # Combine base keywords with state-specific keywords
     KEYWORDS = BASE_KEYWORDS + state_keywords
     
+    # Compiled once per engine; every check is a single pass over the text
+    KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+    
     def is_relevant(text):
         """Check if text contains any relevant keywords."""
-        return any(keyword in text.lower() for keyword in KEYWORDS)
+        return KEYWORD_MATCHER.search(text)
     
     def scrape_site(url):
         """
@@ -93,18 +101,22 @@ def create_state_engine(state_name, state_sites, state_keywords, state_locations
             logger.error(f"Failed to scrape {url}: {e}")
             return []
     
+    def create_scraper(on_complete=None):
+        """
+        Create an async scraper over all target sites.
+        
+        The scraper can be handed to a ScrapeOrchestrator together with other
+        engines; requests to the same host are spaced by its politeness scheduler.
+        """
+        return StateEngineAsyncScraper(state_name, state_sites, KEYWORD_MATCHER, on_complete=on_complete)
+    
     def run_scraper():
         """Run the state-specific scraper on all target sites."""
         logger.info(f"Starting Proletto Engine {state_name} - specialized scraper")
         
-        all_gigs = []
-        for site in state_sites:
-            gigs = scrape_site(site)
-            all_gigs.extend(gigs)
-            # Add a polite delay between requests
-            delay = random.uniform(1.5, 3.5)
-            logger.info(f"Waiting {delay:.2f} seconds before next request")
-            time.sleep(delay)
+        # Sites are fetched concurrently; only requests to the same host are spaced out
+        results = ScrapeOrchestrator().run_sync({state_name: create_scraper()})
+        all_gigs = results.get(state_name) or []
         
         logger.info(f"{state_name} scraping completed. Found {len(all_gigs)} total opportunities")
         return all_gigs
@@ -112,46 +124,26 @@ def create_state_engine(state_name, state_sites, state_keywords, state_locations
     def merge_with_existing(new_gigs, filename="opportunities.json"):
         """Merge new state-specific gigs with existing ones, avoiding duplicates."""
         try:
-            # Try to read existing file
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    existing_gigs = json.load(f)
-                logger.info(f"Loaded {len(existing_gigs)} existing opportunities from {filename}")
-            except (FileNotFoundError, json.JSONDecodeError):
-                logger.info(f"No existing opportunities file found or file is invalid. Creating new.")
-                existing_gigs = []
-            
-            # Create a set of existing URLs to check for duplicates
-            existing_urls = {gig["url"] for gig in existing_gigs}
-            
-            # Add only new gigs
-            added_count = 0
-            for gig in new_gigs:
-                if gig["url"] not in existing_urls:
-                    existing_gigs.append(gig)
-                    existing_urls.add(gig["url"])
-                    added_count += 1
-            
-            # Save the merged list
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(existing_gigs, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Added {added_count} new {state_name} opportunities. Total: {len(existing_gigs)}")
+            # URL-keyed store: appends only new URLs and re-exports the JSON file atomically
+            added_count, total = merge_opportunities(new_gigs, filename)
+            logger.info(f"Added {added_count} new {state_name} opportunities. Total: {total}")
+            # Pages parsed by the synchronous scraper are only now safe to skip
+            commit_parsed_pages(True)
             return True
         except Exception as e:
             logger.error(f"Failed to merge {state_name} opportunities: {e}")
+            commit_parsed_pages(False)
             return False
     
     def run():
         """Main function to run the state-specific scraper."""
         try:
-            # Run the scraper
-            gigs = run_scraper()
-            
-            # Merge with existing opportunities
-            success = merge_with_existing(gigs)
+            # Run the scraper and merge with existing opportunities; the
+            # scraper marks pages processed only once the merge succeeded
+            logger.info(f"Starting Proletto Engine {state_name} - specialized scraper")
+            results = ScrapeOrchestrator().run_sync({state_name: create_scraper(on_complete=merge_with_existing)})
             
-            return success
+            return bool(results.get(state_name))
         except Exception as e:
             logger.error(f"Error in Proletto Engine {state_name}: {e}")
             return False
@@ -160,9 +152,11 @@ def create_state_engine(state_name, state_sites, state_keywords, state_locations
     return {
         "run": run,
         "run_scraper": run_scraper,
+        "create_scraper": create_scraper,
         "merge_with_existing": merge_with_existing,
         "scrape_site": scrape_site,
         "is_relevant": is_relevant,
+        "keyword_matcher": KEYWORD_MATCHER,
         "state_name": state_name,
         "logger": logger
     }
@@ -12,6 +12,9 @@ from datetime import datetime
 
 # Import improved scraper
 from improved_scraper import improved_scrape_site
+from keyword_matcher import KeywordMatcher
+from opportunity_store import merge_opportunities
+from scrapers_improvement import commit_parsed_pages
 
 # Configure logging
 logging.basicConfig(
@@ -153,9 +156,11 @@ KEYWORDS = [
     "art scholarship", "cultural funding", "creative funding", "art support", "arts grant"
 ]
 
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
 def is_relevant(text):
     """Check if text contains any relevant keywords."""
-    return any(keyword in text.lower() for keyword in KEYWORDS)
+    return KEYWORD_MATCHER.search(text)
 
 def scrape_site(url):
     """
@@ -197,34 +202,15 @@ def save_to_json(gigs, filename="opportunities.json"):
 def merge_with_existing(new_gigs, filename="opportunities.json"):
     """Merge new gigs with existing ones, avoiding duplicates."""
     try:
-        # Try to read existing file
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                existing_gigs = json.load(f)
-            logger.info(f"Loaded {len(existing_gigs)} existing opportunities from {filename}")
-        except (FileNotFoundError, json.JSONDecodeError):
-            logger.info(f"No existing opportunities file found or file is invalid. Creating new.")
-            existing_gigs = []
-        
-        # Create a set of existing URLs to check for duplicates
-        existing_urls = {gig["url"] for gig in existing_gigs}
-        
-        # Add only new gigs
-        added_count = 0
-        for gig in new_gigs:
-            if gig["url"] not in existing_urls:
-                existing_gigs.append(gig)
-                existing_urls.add(gig["url"])
-                added_count += 1
-        
-        # Save the merged list
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_gigs, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Added {added_count} new opportunities. Total: {len(existing_gigs)}")
+        # URL-keyed store: appends only new URLs and re-exports the JSON file atomically
+        added_count, total = merge_opportunities(new_gigs, filename)
+        logger.info(f"Added {added_count} new opportunities. Total: {total}")
+        # Pages parsed by the synchronous scraper are only now safe to skip
+        commit_parsed_pages(True)
         return True
     except Exception as e:
         logger.error(f"Failed to merge opportunities: {e}")
+        commit_parsed_pages(False)
         return False
 
 def run():
@@ -16,6 +16,7 @@ from self_learning_bot import get_recommendations as get_bot_recommendations
 from functools import wraps
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from rate_limit_storage import rate_limit_storage_uri, RATE_LIMIT_STRATEGY
 
 public_api = Blueprint('public_api', __name__, url_prefix='/api/v2')
 
@@ -26,13 +27,13 @@ def get_api_key_or_ip():
         return key
     return get_remote_address()
 
-# Initialize the limiter with memory storage
+# Initialize the limiter with storage shared by all worker processes
 # Create it at module level so rate limits can be declared before blueprint registration
 limiter = Limiter(
     key_func=get_api_key_or_ip,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://",  # Use memory storage for simplicity
-    strategy="fixed-window",  # fixed-window strategy is more efficient with Redis
+    storage_uri=rate_limit_storage_uri(),  # Counters shared across gunicorn workers
+    strategy=RATE_LIMIT_STRATEGY,  # Sliding window counter, atomic in the shared storage
     headers_enabled=True  # Include rate-limit info in response headers
 )
 
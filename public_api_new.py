@@ -16,6 +16,7 @@ from functools import wraps
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_limiter.errors import RateLimitExceeded
+from rate_limit_storage import rate_limit_storage_uri, RATE_LIMIT_STRATEGY
 from alerts import alert_slack
 from sqlalchemy import text
 from flask_caching import Cache
@@ -71,33 +72,28 @@ def get_api_key_or_ip():
         return key
     return get_remote_address()
 
-# Create a limiter with memory storage initially
+# Create a limiter with storage shared by all worker processes
 # It will be properly initialized with the app later in api.py
 limiter = Limiter(
     key_func=get_api_key_or_ip,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://",  # Use memory storage by default
-    strategy="fixed-window",  # Standard fixed-window strategy
+    storage_uri=rate_limit_storage_uri(),  # Counters shared across gunicorn workers
+    strategy=RATE_LIMIT_STRATEGY,  # Sliding window counter, atomic in the shared storage
     headers_enabled=True  # Include rate-limit info in response headers
 )
 
+def get_plan_limit():
+    """Rate limit for the plan of the API key authenticated by require_api_key"""
+    plan = getattr(g, 'api_plan', 'free')
+    return PLAN_LIMITS.get(plan, PLAN_LIMITS['free'])
+
 # Dynamic rate limiting based on API key's plan
+# One limit shared by all plan-limited endpoints, counted per API key; the
+# limit value is resolved per request from the plan set in require_api_key
+plan_limit = limiter.shared_limit(get_plan_limit, scope='api_plan')
+
 def limit_by_plan(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # Get plan from g object, which was set in require_api_key
-        plan = getattr(g, 'api_plan', 'free')
-        
-        # Special case: admin plan has higher limits
-        if plan == 'admin':
-            limit = "240 per minute"  # Admin tier has much higher limits
-        else:
-            limit = PLAN_LIMITS.get(plan, PLAN_LIMITS['free'])
-        
-        # Apply the appropriate limit for this plan
-        key = request.args.get('key') or request.headers.get('X-API-KEY')
-        return limiter.shared_limit(limit, scope=key)(f)(*args, **kwargs)
-    return decorated
+    return plan_limit(f)
 
 # Standardized error response
 def error_response(status_code, message):
@@ -434,11 +430,7 @@ def test_rate_limit():
     }
     """
     plan = getattr(g, 'api_plan', 'free')
-    
-    if plan == 'admin':
-        limit = "240 per minute"
-    else:
-        limit = PLAN_LIMITS.get(plan, PLAN_LIMITS['free'])
+    limit = get_plan_limit()
     
     return jsonify({
         'api_version': 'v2',
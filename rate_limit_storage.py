@@ -0,0 +1,356 @@
+"""
+Shared Rate Limit Storage for Proletto
+
+The public API limiters used ``memory://`` storage, so every gunicorn worker
+kept its own counters and a "30 per minute" plan limit really allowed
+30 requests per minute per worker. This module registers a ``shm://`` storage
+backend for the ``limits`` package used by Flask-Limiter that keeps the
+counters in one memory-mapped file shared by all workers on the host:
+1. The file holds a fixed-size hash table split into buckets; a key always
+   lives in the bucket its hash points to
+2. Every operation runs under a per-process lock plus a POSIX record lock on
+   that bucket, so concurrent workers increment counters atomically
+3. A sliding window counter keeps the current and previous window counts in
+   a single slot, so checking and taking a hit is one atomic step
+4. Expired slots are reused in place; a full bucket evicts the entry that
+   expires first
+
+Deployments running on several hosts can point RATE_LIMIT_STORAGE_URI at a
+shared backend supported by ``limits`` (e.g. ``redis://...``) instead.
+"""
+
+import os
+import math
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import threading
+import weakref
+import urllib.parse
+
+from limits.storage.base import Storage, SlidingWindowCounterSupport
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger('rate_limit_storage')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Storage URI override, e.g. redis://host:6379 for limits shared across hosts
+RATE_LIMIT_STORAGE_URI = os.environ.get('RATE_LIMIT_STORAGE_URI')
+
+# File backing the shared counters; /dev/shm keeps it in memory where available
+RATE_LIMIT_SHM_PATH = os.environ.get(
+    'RATE_LIMIT_SHM_PATH',
+    '/dev/shm/proletto-ratelimit' if os.path.isdir('/dev/shm') else 'data/ratelimit.shm'
+)
+
+# Hash table size: buckets * slots per bucket keys can be tracked at once
+RATE_LIMIT_SHM_BUCKETS = int(os.environ.get('RATE_LIMIT_SHM_BUCKETS', 4096))
+SLOTS_PER_BUCKET = 16
+
+# Strategy the API limiters use with this storage
+RATE_LIMIT_STRATEGY = "sliding-window-counter"
+
+MAGIC = b'PRLS0001'
+HEADER = struct.Struct('<8sII')
+HEADER_SIZE = 64
+
+# key hash, expires at, count, previous window count, window number
+SLOT = struct.Struct('<Qdqqq')
+SLOT_SIZE = SLOT.size
+
+
+def rate_limit_storage_uri():
+    """
+    Storage URI for the API rate limiters
+
+    Returns:
+        str: RATE_LIMIT_STORAGE_URI if set, otherwise the shared memory file
+    """
+    if RATE_LIMIT_STORAGE_URI:
+        return RATE_LIMIT_STORAGE_URI
+    return f"shm://{os.path.abspath(RATE_LIMIT_SHM_PATH)}"
+
+
+def _key_hash(key):
+    """Stable 64-bit hash of a key, identical in every process (never 0)"""
+    value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """
+    Rate limit storage in a memory-mapped file shared by all local processes
+
+    Supports the fixed window and sliding window counter strategies.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, buckets=None, **options):
+        """
+        Open (and create if needed) the shared counter file
+
+        Args:
+            uri (str): ``shm:///path/to/file``
+            wrap_exceptions (bool): Wrap storage errors in limits' StorageError
+            buckets (int): Number of hash buckets (defaults to RATE_LIMIT_SHM_BUCKETS)
+        """
+        parsed = urllib.parse.urlparse(uri or rate_limit_storage_uri())
+        query = urllib.parse.parse_qs(parsed.query)
+        self.path = (parsed.netloc + parsed.path) or os.path.abspath(RATE_LIMIT_SHM_PATH)
+        self.buckets = int(buckets or query.get('buckets', [RATE_LIMIT_SHM_BUCKETS])[0])
+        self.size = HEADER_SIZE + self.buckets * SLOTS_PER_BUCKET * SLOT_SIZE
+        self._lock = threading.Lock()
+        self._fd = None
+        self._map = None
+        self._open()
+        _storages.add(self)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return (OSError, ValueError)
+
+    def _open(self):
+        """Map the counter file, initializing it when new or sized differently"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.lockf(fd, fcntl.LOCK_EX, 0, 0)
+            try:
+                header = os.pread(fd, HEADER.size, 0)
+                expected = HEADER.pack(MAGIC, self.buckets, SLOTS_PER_BUCKET)
+                if header != expected or os.fstat(fd).st_size != self.size:
+                    if os.fstat(fd).st_size:
+                        logger.info(f"Reinitializing rate limit storage at {self.path}")
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, expected, 0)
+            finally:
+                if fcntl:
+                    fcntl.lockf(fd, fcntl.LOCK_UN, 0, 0)
+            self._map = mmap.mmap(fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        except Exception:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def _lock_bucket(self, bucket):
+        """Take this process's lock and the record lock of one bucket"""
+        self._lock.acquire()
+        if fcntl:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, HEADER_SIZE + bucket)
+            except Exception:
+                self._lock.release()
+                raise
+
+    def _unlock_bucket(self, bucket):
+        if fcntl:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, HEADER_SIZE + bucket)
+        self._lock.release()
+
+    def _find(self, key_hash, now, create):
+        """
+        Locate a key's slot in its (locked) bucket
+
+        Args:
+            key_hash (int): Hash of the key
+            now (float): Current time, to recognize expired slots
+            create (bool): Claim a slot when the key has none
+
+        Returns:
+            tuple: (slot offset or None, slot values or None for a fresh slot)
+        """
+        start = HEADER_SIZE + (key_hash % self.buckets) * SLOTS_PER_BUCKET * SLOT_SIZE
+        free = None
+        oldest = None
+        for offset in range(start, start + SLOTS_PER_BUCKET * SLOT_SIZE, SLOT_SIZE):
+            values = SLOT.unpack_from(self._map, offset)
+            if values[0] == key_hash:
+                return offset, (values if values[1] > now else None)
+            if free is None:
+                if values[0] == 0 or values[1] <= now:
+                    free = offset
+                elif oldest is None or values[1] < oldest[1]:
+                    oldest = (offset, values[1])
+        if not create:
+            return None, None
+        return (free if free is not None else oldest[0]), None
+
+    def incr(self, key, expiry, amount=1):
+        """
+        Increment the fixed window counter for a key
+
+        Args:
+            key (str): Rate limit key
+            expiry (int): Seconds until a new counter expires
+            amount (int): Number to increment by
+
+        Returns:
+            int: The new count
+        """
+        key_hash = _key_hash(key)
+        bucket = key_hash % self.buckets
+        self._lock_bucket(bucket)
+        try:
+            now = time.time()
+            offset, values = self._find(key_hash, now, create=True)
+            if values is None:
+                count, expires_at = amount, now + expiry
+            else:
+                count, expires_at = values[2] + amount, values[1]
+            SLOT.pack_into(self._map, offset, key_hash, expires_at, count, 0, 0)
+            return count
+        finally:
+            self._unlock_bucket(bucket)
+
+    def _read(self, key):
+        """Current slot values for a key, or None when absent or expired"""
+        key_hash = _key_hash(key)
+        bucket = key_hash % self.buckets
+        self._lock_bucket(bucket)
+        try:
+            return self._find(key_hash, time.time(), create=False)[1]
+        finally:
+            self._unlock_bucket(bucket)
+
+    def get(self, key):
+        values = self._read(key)
+        return values[2] if values else 0
+
+    def get_expiry(self, key):
+        values = self._read(key)
+        return values[1] if values else time.time()
+
+    def clear(self, key):
+        key_hash = _key_hash(key)
+        bucket = key_hash % self.buckets
+        self._lock_bucket(bucket)
+        try:
+            offset, _ = self._find(key_hash, time.time(), create=False)
+            if offset is not None:
+                # Keep the slot occupied but expired so it can be reused
+                SLOT.pack_into(self._map, offset, key_hash, 0.0, 0, 0, 0)
+        finally:
+            self._unlock_bucket(bucket)
+
+    @staticmethod
+    def _window(values, expiry, now):
+        """
+        Previous and current counts of a sliding window slot at a given time
+
+        Returns:
+            tuple: (window number, previous count, current count)
+        """
+        window = int(now / expiry)
+        if values is None or values[4] < window - 1:
+            return window, 0, 0
+        if values[4] == window - 1:
+            return window, values[2], 0
+        return window, values[3], values[2]
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        """
+        Take a hit if the weighted count of the current and previous windows allows it
+
+        Args:
+            key (str): Rate limit key
+            limit (int): Hits allowed per window
+            expiry (int): Window length in seconds
+            amount (int): Number of hits to take
+
+        Returns:
+            bool: True when the hit was taken
+        """
+        if amount > limit:
+            return False
+        key_hash = _key_hash('sliding:' + key)
+        bucket = key_hash % self.buckets
+        self._lock_bucket(bucket)
+        try:
+            now = time.time()
+            offset, values = self._find(key_hash, now, create=True)
+            window, previous, current = self._window(values, expiry, now)
+            previous_ttl = (1 - ((now - expiry) / expiry) % 1) * expiry if previous else 0.0
+            if math.floor(previous * previous_ttl / expiry + current) + amount > limit:
+                return False
+            SLOT.pack_into(self._map, offset, key_hash, (window + 2) * expiry,
+                           current + amount, previous, window)
+            return True
+        finally:
+            self._unlock_bucket(bucket)
+
+    def get_sliding_window(self, key, expiry):
+        """
+        Previous and current window counts with their remaining time to live
+
+        Returns:
+            tuple: (previous count, previous ttl, current count, current ttl)
+        """
+        now = time.time()
+        values = self._read('sliding:' + key)
+        _, previous, current = self._window(values, expiry, now)
+        previous_ttl = (1 - ((now - expiry) / expiry) % 1) * expiry if previous else 0.0
+        current_ttl = (1 - (now / expiry) % 1) * expiry + expiry
+        return previous, previous_ttl, current, current_ttl
+
+    def clear_sliding_window(self, key, expiry):
+        self.clear('sliding:' + key)
+
+    def check(self):
+        return self._map is not None and not self._map.closed
+
+    def reset(self):
+        """
+        Clear every counter
+
+        Returns:
+            int: Number of live entries that were cleared
+        """
+        with self._lock:
+            if fcntl:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 0, 0)
+            try:
+                now = time.time()
+                cleared = 0
+                for offset in range(HEADER_SIZE, self.size, SLOT_SIZE):
+                    values = SLOT.unpack_from(self._map, offset)
+                    if values[0] and values[1] > now:
+                        cleared += 1
+                self._map[HEADER_SIZE:self.size] = bytes(self.size - HEADER_SIZE)
+                return cleared
+            finally:
+                if fcntl:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, 0, 0)
+
+    def _after_fork_in_child(self):
+        """Record locks are per process; only the thread lock needs replacing"""
+        self._lock = threading.Lock()
+
+
+_storages = weakref.WeakSet()
+
+
+def _reset_storages_after_fork():
+    for storage in list(_storages):
+        storage._after_fork_in_child()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_storages_after_fork)
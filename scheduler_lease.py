@@ -0,0 +1,316 @@
+"""
+Scheduler Leases for Proletto
+
+Several modules start their own in-process APScheduler ``BackgroundScheduler``
+(snapshot creation, email digests, the engine scheduler, the Dragon core
+jobs). When the app runs in more than one process, e.g. several gunicorn
+workers or a web process next to a worker process, each of them would run
+every job.
+
+This module gives each named scheduler a lease backed by an exclusive
+``flock`` on ``data/locks/scheduler-<name>.lock``:
+1. Every process starts its scheduler paused and tries to take the lease
+2. The process holding the lease resumes its scheduler and runs the jobs
+3. The others keep polling; the kernel drops the lock when the leader dies,
+   so a standby takes over within one poll interval
+
+The leader writes its pid and a heartbeat timestamp into the lock file so the
+current holder can be reported by health endpoints.
+"""
+
+import os
+import json
+import socket
+import logging
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger('scheduler_lease')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Directory holding one lock file per scheduler
+LEASE_DIR = os.environ.get('SCHEDULER_LEASE_DIR', 'data/locks')
+
+# Seconds between lease attempts by standbys and heartbeats by the leader
+LEASE_POLL_INTERVAL = float(os.environ.get('SCHEDULER_LEASE_POLL_INTERVAL', 2))
+
+
+def lease_path(name, lease_dir=None):
+    """Path of the lock file for a named scheduler"""
+    return os.path.join(lease_dir or LEASE_DIR, f"scheduler-{name}.lock")
+
+
+class SchedulerLease:
+    """Exclusive, heartbeated lease that lets one process run a scheduler's jobs"""
+
+    def __init__(self, name, lease_dir=None, poll_interval=None):
+        """
+        Initialize the lease
+
+        Args:
+            name (str): Scheduler name, shared by all processes running it
+            lease_dir (str): Directory for the lock file
+            poll_interval (float): Seconds between lease attempts and heartbeats
+        """
+        self.name = name
+        self.path = lease_path(name, lease_dir)
+        self.poll_interval = LEASE_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.scheduler = None
+        self.acquired_at = None
+        self._fd = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        """True while this process holds the lease"""
+        return self._fd is not None
+
+    def try_acquire(self):
+        """
+        Take the lease if no other process holds it
+
+        Returns:
+            bool: True if this process is now the leader
+        """
+        with self._lock:
+            if self._fd is not None:
+                return True
+            if fcntl is None:
+                logger.warning(f"File locks unavailable, {self.name} scheduler runs unconditionally")
+                self._fd = -1
+                self.acquired_at = datetime.utcnow()
+                return True
+
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+
+            self._fd = fd
+            self.acquired_at = datetime.utcnow()
+            self._write_heartbeat()
+            logger.info(f"Process {os.getpid()} acquired the {self.name} scheduler lease")
+            return True
+
+    def release(self):
+        """Give up the lease so a standby can take over"""
+        with self._lock:
+            fd, self._fd = self._fd, None
+            self.acquired_at = None
+        if fd is not None and fd >= 0:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+            logger.info(f"Process {os.getpid()} released the {self.name} scheduler lease")
+
+    def _write_heartbeat(self):
+        """Record the holder and the time of the latest heartbeat in the lock file"""
+        holder = {
+            'name': self.name,
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'acquired_at': self.acquired_at.isoformat(),
+            'heartbeat_at': datetime.utcnow().isoformat(),
+        }
+        data = json.dumps(holder).encode('utf-8')
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, data, 0)
+
+    def _still_held(self):
+        """Check that the lock file was not removed or replaced under the leader"""
+        if self._fd < 0:
+            return True
+        try:
+            return os.stat(self.path).st_ino == os.fstat(self._fd).st_ino
+        except OSError:
+            return False
+
+    def heartbeat(self):
+        """
+        Run one lease round: refresh the lease if held, otherwise try to take it
+
+        Returns:
+            bool: True if this process is the leader after the round
+        """
+        with self._lock:
+            was_leader = self.is_leader
+            if was_leader:
+                if self._still_held():
+                    if self._fd >= 0:
+                        self._write_heartbeat()
+                    return True
+                logger.warning(f"Lock file for the {self.name} scheduler lease was replaced, giving it up")
+                self.release()
+                self._pause_scheduler()
+
+            if self.try_acquire():
+                self._resume_scheduler()
+                return True
+            return False
+
+    def _resume_scheduler(self):
+        scheduler = self.scheduler
+        if scheduler is not None and scheduler.running:
+            scheduler.resume()
+            logger.info(f"Running {self.name} scheduler jobs in process {os.getpid()}")
+
+    def _pause_scheduler(self):
+        scheduler = self.scheduler
+        if scheduler is not None and scheduler.running:
+            scheduler.pause()
+            logger.info(f"Paused {self.name} scheduler jobs in process {os.getpid()}")
+
+    def attach(self, scheduler):
+        """
+        Start a scheduler under this lease
+
+        The scheduler starts paused and only processes jobs while this process
+        holds the lease. Attaching a replacement scheduler (e.g. after a
+        restart) moves the lease over to it.
+
+        Args:
+            scheduler: APScheduler BackgroundScheduler, not yet started
+        """
+        with self._lock:
+            self.scheduler = scheduler
+            if not scheduler.running:
+                scheduler.start(paused=True)
+            if self.is_leader:
+                self._resume_scheduler()
+        self.heartbeat()
+        self.start()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Error renewing the {self.name} scheduler lease: {e}")
+
+    def start(self):
+        """Start the background thread that renews or takes over the lease"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"scheduler-lease-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop renewing the lease and release it"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.poll_interval + 1)
+        self._thread = None
+        self._pause_scheduler()
+        self.release()
+
+    def _after_fork_in_child(self):
+        """A forked child inherits neither the lease thread nor the leadership"""
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.scheduler = None
+        if self._fd is not None and self._fd >= 0:
+            # Closing the inherited descriptor keeps the parent's lock intact
+            os.close(self._fd)
+        self._fd = None
+        self.acquired_at = None
+
+
+_leases = {}
+_leases_lock = threading.Lock()
+
+
+def get_scheduler_lease(name):
+    """Return the process-wide lease for a named scheduler"""
+    with _leases_lock:
+        lease = _leases.get(name)
+        if lease is None:
+            lease = SchedulerLease(name)
+            _leases[name] = lease
+        return lease
+
+
+def start_scheduler_with_lease(scheduler, name):
+    """
+    Start a BackgroundScheduler that runs its jobs in one process only
+
+    Use in place of ``scheduler.start()``. Every process keeps its jobs
+    scheduled, but only the current lease holder executes them.
+
+    Args:
+        scheduler: APScheduler BackgroundScheduler, not yet started
+        name (str): Scheduler name, e.g. 'email_digest'
+
+    Returns:
+        SchedulerLease: The lease the scheduler runs under
+    """
+    lease = get_scheduler_lease(name)
+    lease.attach(scheduler)
+    return lease
+
+
+def read_lease_holder(name, lease_dir=None):
+    """
+    Report which process holds a scheduler lease
+
+    Args:
+        name (str): Scheduler name
+        lease_dir (str): Directory for the lock file
+
+    Returns:
+        dict: Holder details from the last heartbeat plus 'held', or None if
+        the lease was never taken
+    """
+    path = lease_path(name, lease_dir)
+    try:
+        with open(path, 'r') as f:
+            content = f.read()
+            held = False
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                except OSError:
+                    held = True
+    except FileNotFoundError:
+        return None
+
+    try:
+        holder = json.loads(content) if content else {}
+    except ValueError:
+        holder = {}
+    holder['held'] = held
+    return holder
+
+
+def _reset_leases_after_fork():
+    global _leases_lock
+    _leases_lock = threading.Lock()
+    for lease in _leases.values():
+        lease._after_fork_in_child()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_leases_after_fork)
@@ -12,7 +12,8 @@ from datetime import datetime
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from scrapers.async_base_scraper import AsyncBaseScraper
-from models import db, Opportunity
+from scrapers.opportunity_writer import OpportunityBatchWriter
+from scrapers.orchestrator import ScrapeOrchestrator
 
 # Configure logging
 logger = logging.getLogger('art_opportunities_scraper')
@@ -26,6 +27,8 @@ if not logger.handlers:
 class ArtOpportunitiesAsyncScraper(AsyncBaseScraper):
     """Asynchronous Art Opportunities Scraper"""
     
+    RUN_STATE_ATTRIBUTES = AsyncBaseScraper.RUN_STATE_ATTRIBUTES + ('writer',)
+    
     def __init__(self, engine_name="general", urls=None, state=None, max_concurrency=10):
         """
         Initialize the art opportunities scraper
@@ -40,6 +43,13 @@ class ArtOpportunitiesAsyncScraper(AsyncBaseScraper):
         self.urls = urls or []
         self.state = state
         self.opportunity_type = "general"
+        self.follow_pagination = True
+        
+        # Buffered database writer, created per run; parsed pages are marked
+        # processed only after it has flushed without failures
+        self.writer = None
+        self.saves_in_sink = False
+        self.write_stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
         
         # Keywords to identify opportunities
         self.opportunity_keywords = [
@@ -74,6 +84,34 @@ class ArtOpportunitiesAsyncScraper(AsyncBaseScraper):
         
         return await self.run_scraper(self.urls)
     
+    async def run_scraper(self, urls):
+        """
+        Run the scraper with a buffered writer stage
+        
+        Extracted opportunities are queued to an OpportunityBatchWriter, which
+        flushes them to the database in batches while fetching continues.
+        
+        Args:
+            urls: List of URLs to scrape
+            
+        Returns:
+            int: Total number of opportunities found
+        """
+        async with OpportunityBatchWriter.for_current_app() as writer:
+            self.writer = writer
+            try:
+                total = await super().run_scraper(urls)
+            finally:
+                self.writer = None
+        
+        self.write_stats = dict(writer.stats)
+        await self.commit_parsed_pages(self.sink_failures == 0 and writer.stats['failed'] == 0)
+        return total
+    
+    def known_opportunity(self, opportunity_data):
+        """Known if the database already held its URL when the run started"""
+        return self.writer is not None and opportunity_data.get('url') in self.writer.preloaded_urls
+
     async def extract_opportunities(self, soup, source_url):
         """
         Extract opportunity data from HTML
@@ -279,68 +317,27 @@ class ArtOpportunitiesAsyncScraper(AsyncBaseScraper):
     
     async def process_opportunity(self, opportunity_data):
         """
-        Process a single opportunity by saving to database
+        Queue a single opportunity for the batch writer
         
         Args:
             opportunity_data: Dictionary with opportunity information
             
         Returns:
-            bool: True if processed successfully
+            bool: True if queued successfully
         """
-        # Import Flask app here to avoid circular imports
-        from flask import current_app
-        
+        queued = True
         try:
-            # For testing without a Flask app context
-            if not current_app:
-                logger.info(f"No Flask app context - would save opportunity: {opportunity_data['title']}")
-                self.total_opportunities += 1
-                return True
-                
-            # Check if opportunity already exists by URL
-            existing = Opportunity.query.filter_by(url=opportunity_data['url']).first()
-            if existing:
-                # Update existing opportunity if needed
-                logger.debug(f"Opportunity already exists: {opportunity_data['url']}")
-                self.total_opportunities += 1
-                return True
-            
-            # Create new opportunity
-            opp = Opportunity(
-                title=opportunity_data['title'],
-                url=opportunity_data['url'],
-                description=opportunity_data.get('description', ''),
-                deadline=opportunity_data.get('deadline'),
-                location=opportunity_data.get('location'),
-                image_url=opportunity_data.get('image_url'),
-                source=opportunity_data['source'],
-                source_url=opportunity_data['source_url'],
-                state=opportunity_data.get('state'),
-                type=opportunity_data.get('type', 'general'),
-                is_ad=opportunity_data.get('is_ad', False),
-                scraped_at=datetime.utcnow()
-            )
-            
-            # Add to database
-            db.session.add(opp)
-            db.session.commit()
-            
-            logger.debug(f"Added new opportunity: {opportunity_data['title']}")
-            self.total_opportunities += 1
-            return True
-            
+            if self.writer is None:
+                logger.info(f"No writer active - would save opportunity: {opportunity_data['title']}")
+            else:
+                await self.writer.put(opportunity_data)
         except Exception as e:
-            logger.error(f"Error processing opportunity: {e}")
-            # Roll back transaction on error if in app context
-            try:
-                if current_app:
-                    db.session.rollback()
-            except:
-                pass
-            
             # Don't fail the entire process for one item
-            self.total_opportunities += 1
-            return True
+            logger.error(f"Error queueing opportunity: {e}")
+            queued = False
+        
+        self.total_opportunities += 1
+        return queued
 
 # Dictionary of pre-configured state-specific scrapers
 STATE_ENGINES = {
@@ -396,28 +393,45 @@ def create_state_scraper(state_key):
         logger.error(f"No configuration found for state: {state_key}")
         return None
 
-# Synchronous function for APScheduler
-def run_art_opportunities_scraper(state_key):
-    """Run the art opportunities scraper for a specific state"""
+# Synchronous functions for APScheduler
+def run_state_scraper_with_stats(state_key):
+    """
+    Run the art opportunities scraper for a specific state
+    
+    Returns:
+        dict: opportunities_count plus inserted/updated/unchanged/failed write counts
+    """
+    stats = {'opportunities_count': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
     try:
         scraper = create_state_scraper(state_key)
         if scraper:
             loop = asyncio.get_event_loop()
-            result = loop.run_until_complete(scraper.run())
-            return result
-        return 0
+            stats['opportunities_count'] = loop.run_until_complete(scraper.run())
+            stats.update(scraper.write_stats)
     except Exception as e:
         logger.error(f"Error running art opportunities scraper for {state_key}: {e}")
-        return 0
+    return stats
+
+def run_art_opportunities_scraper(state_key):
+    """Run the art opportunities scraper for a specific state"""
+    return run_state_scraper_with_stats(state_key)['opportunities_count']
 
 # Run all state scrapers
 def run_all_state_scrapers():
-    """Run all state-specific scrapers"""
-    total = 0
+    """Run all state-specific scrapers concurrently on one event loop"""
+    scrapers = {}
     for state_key in STATE_ENGINES.keys():
-        count = run_art_opportunities_scraper(state_key)
-        total += count
-    return total
+        scraper = create_state_scraper(state_key)
+        if scraper:
+            scrapers[state_key] = scraper
+    
+    try:
+        results = ScrapeOrchestrator().run_sync(scrapers)
+    except Exception as e:
+        logger.error(f"Error running state scrapers: {e}")
+        return 0
+    
+    return sum(count for count in results.values() if count)
 
 # Direct execution entry point
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ Benefits over traditional synchronous scrapers:
 4. More efficient resource usage - non-blocking I/O operations
 """
 
+import os
 import asyncio
 import aiohttp
 import logging
@@ -23,6 +24,15 @@ from bs4 import BeautifulSoup
 from aiohttp import ClientTimeout, ClientSession, TCPConnector
 from urllib.parse import urljoin
 
+from http_cache import http_cache
+from job_history import count_fetch
+from keyword_matcher import KeywordMatcher
+from scrapers.frontier import CrawlFrontier, find_pagination_links
+from scrapers.parse_pool import PARSE_WORKERS, get_parse_stage
+
+# Items buffered between two pipeline stages
+PIPELINE_QUEUE_SIZE = int(os.environ.get('SCRAPER_PIPELINE_QUEUE_SIZE', 50))
+
 # Apply nest_asyncio to allow running asyncio code in environments that already have an event loop
 # This is important for integration with APScheduler
 nest_asyncio.apply()
@@ -83,52 +93,31 @@ def detect_states_from_location(location):
     
     return None
 
+# Type indicators, checked in order; the first tier with a match decides the type
+OPPORTUNITY_TYPE_KEYWORDS = [
+    ('social_media', ['instagram', 'facebook', 'twitter', 'linkedin', 'social', 'post', 'platform']),
+    ('grant', ['grant', 'funding', 'award', 'prize', 'scholarship', 'fellowship', 'financial']),
+    ('residency', ['residency', 'resident', 'residence', 'studio']),
+    ('exhibition', ['exhibition', 'exhibit', 'gallery', 'show', 'showcase', 'museum']),
+    ('opportunity', ['opportunity', 'call', 'application', 'submit', 'apply']),
+]
+
+TYPE_KEYWORD_MATCHER = KeywordMatcher(
+    keyword for _, keywords in OPPORTUNITY_TYPE_KEYWORDS for keyword in keywords
+)
+
+def opportunity_type_from_keywords(matched_keywords):
+    """Pick the opportunity type from keywords already matched in its text"""
+    for opportunity_type, keywords in OPPORTUNITY_TYPE_KEYWORDS:
+        if any(keyword in matched_keywords for keyword in keywords):
+            return opportunity_type
+    return 'general'
+
 def detect_opportunity_type(title, description, source, tags=None, category=None):
     """Determine the opportunity type based on various fields"""
-    # Normalize inputs
-    title = title.lower() if title else ''
-    description = description.lower() if description else ''
-    source = source.lower() if source else ''
-    tags = tags.lower() if tags else ''
-    category = category.lower() if category else ''
-    
-    # Check for social media indicators
-    social_media_keywords = ['instagram', 'facebook', 'twitter', 'linkedin', 'social', 'post', 'platform']
-    for keyword in social_media_keywords:
-        if (keyword in source or keyword in category or keyword in tags or 
-            keyword in title or keyword in description):
-            return 'social_media'
-    
-    # Check for grant indicators
-    grant_keywords = ['grant', 'funding', 'award', 'prize', 'scholarship', 'fellowship', 'financial']
-    for keyword in grant_keywords:
-        if (keyword in source or keyword in category or keyword in tags or 
-            keyword in title or keyword in description):
-            return 'grant'
-    
-    # Check for residency indicators
-    residency_keywords = ['residency', 'resident', 'residence', 'studio']
-    for keyword in residency_keywords:
-        if (keyword in source or keyword in category or keyword in tags or 
-            keyword in title or keyword in description):
-            return 'residency'
-    
-    # Check for exhibition indicators
-    exhibition_keywords = ['exhibition', 'exhibit', 'gallery', 'show', 'showcase', 'museum']
-    for keyword in exhibition_keywords:
-        if (keyword in source or keyword in category or keyword in tags or 
-            keyword in title or keyword in description):
-            return 'exhibition'
-    
-    # Check for opportunity indicators
-    opportunity_keywords = ['opportunity', 'call', 'application', 'submit', 'apply']
-    for keyword in opportunity_keywords:
-        if (keyword in source or keyword in category or keyword in tags or 
-            keyword in title or keyword in description):
-            return 'opportunity'
-    
-    # Default type
-    return 'general'
+    # One pass over all fields; the separator keeps keywords from matching across fields
+    text = '\n'.join(field for field in (source, category, tags, title, description) if field)
+    return opportunity_type_from_keywords(TYPE_KEYWORD_MATCHER.matched(text))
 
 def determine_membership_level(opportunity_type, state=None):
     """Determine appropriate membership level for an opportunity"""
@@ -158,9 +147,81 @@ def determine_membership_level(opportunity_type, state=None):
     # Default to premium for anything else
     return 'premium'
 
+def parse_document(html_content, base_url=None):
+    """
+    Build a BeautifulSoup document, resolving relative links against base_url
+    
+    Returns:
+        BeautifulSoup object, or None if parsing failed
+    """
+    try:
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # Convert all relative URLs to absolute if base_url is provided
+        if base_url:
+            for a_tag in soup.find_all('a', href=True):
+                a_tag['href'] = urljoin(base_url, a_tag['href'])
+            
+            for img_tag in soup.find_all('img', src=True):
+                img_tag['src'] = urljoin(base_url, img_tag['src'])
+        
+        return soup
+    except Exception as e:
+        logger.error(f"Error parsing HTML: {e}")
+        return None
+
+def parse_and_extract(content, url, scraper):
+    """
+    Default page parser: build the document and run the scraper's extraction
+    
+    Runs in a parse worker on a copy of the scraper that carries its
+    configuration but none of its run state (see ``RUN_STATE_ATTRIBUTES``).
+    
+    Args:
+        content (str): Page HTML
+        url (str): Page URL
+        scraper (AsyncBaseScraper): Scraper whose ``extract_opportunities`` is used
+        
+    Returns:
+        list: Opportunity dictionaries
+    """
+    soup = parse_document(content, url)
+    if not soup:
+        return []
+    return asyncio.run(scraper.extract_opportunities(soup, url)) or []
+
+def parse_with_links(content, url, parser, find_links, *args):
+    """
+    Run a page parser and find the page's pagination links in a parse worker
+    
+    Args:
+        content (str): Page HTML
+        url (str): Page URL
+        parser (callable): Module-level ``parser(content, url, *args)``
+        find_links (bool): Whether to look for pagination links
+        *args: Extra picklable arguments for the parser
+        
+    Returns:
+        tuple: (parser result, list of pagination link URLs)
+    """
+    links = find_pagination_links(content, url) if find_links else []
+    return parser(content, url, *args), links
+
+def create_permissive_ssl_context():
+    """Create an SSL context that skips certificate verification"""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
 class AsyncBaseScraper:
     """Base class for asynchronous web scrapers"""
     
+    # Attributes left behind when the scraper is copied into a parse worker;
+    # subclasses add their own connections, writers and per-run buffers
+    RUN_STATE_ATTRIBUTES = ('semaphore', 'session', 'fetch_limiter', 'http_cache',
+                            'parse_stage', 'url_timings', 'page_links', 'parsed_pages')
+    
     def __init__(self, scraper_name="base_scraper", max_concurrency=5):
         """
         Initialize the async scraper
@@ -172,6 +233,36 @@ class AsyncBaseScraper:
         self.scraper_name = scraper_name
         self.max_concurrency = max_concurrency
         self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Shared session and global/per-domain limiter, set when run by the ScrapeOrchestrator
+        self.session = None
+        self.fetch_limiter = None
+        # Disk-backed response cache for conditional requests (None disables it)
+        self.http_cache = http_cache
+        # Serve cached pages younger than this many seconds without a request
+        self.cache_max_age = None
+        # Module-level function (content, url, *page_parser_args()) -> list of
+        # opportunity dicts run in the shared parse pool; when None, pages go
+        # through parse_and_extract with this scraper's extract_opportunities
+        self.page_parser = None
+        self.parse_stage = None
+        # Per-URL {'fetch': seconds, 'parse': seconds} for the last run
+        self.url_timings = {}
+        # Pipeline stage workers and the bound of each queue between stages
+        self.fetch_workers = max_concurrency
+        self.parse_workers = max(PARSE_WORKERS, 1)
+        self.normalize_workers = 1
+        self.queue_size = PIPELINE_QUEUE_SIZE
+        # Follow "next page" / numbered pagination links on listing pages;
+        # the parse workers find each page's candidate links
+        self.follow_pagination = False
+        self.page_links = {}
+        # Pages parsed this run, marked processed in the HTTP cache only once
+        # their opportunities are saved; subclasses that save after
+        # run_scraper returns set saves_in_sink to False and call
+        # commit_parsed_pages themselves
+        self.parsed_pages = []
+        self.saves_in_sink = True
+        self.sink_failures = 0
         self.total_opportunities = 0
         self.start_time = None
         self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
@@ -184,6 +275,17 @@ class AsyncBaseScraper:
             "Cache-Control": "max-age=0"
         }
 
+    def __getstate__(self):
+        """Copy for a parse worker, without the run state that stays in this process"""
+        state = self.__dict__.copy()
+        for name in self.RUN_STATE_ATTRIBUTES:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(dict.fromkeys(self.RUN_STATE_ATTRIBUTES))
+        self.__dict__.update(state)
+
     async def fetch_url(self, session, url, timeout=30, verify_ssl=True, **kwargs):
         """
         Fetch a URL with error handling and retries
@@ -199,49 +301,86 @@ class AsyncBaseScraper:
             (str, int): Tuple of (content, status_code) or (None, None) on error
         """
         async with self.semaphore:
-            retry_count = 3
-            retry_backoff = 1.0
+            if self.fetch_limiter is None:
+                return await self._fetch(session, url, timeout, verify_ssl, **kwargs)
             
-            for attempt in range(retry_count + 1):
-                try:
-                    logger.debug(f"Fetching URL: {url} (attempt {attempt+1}/{retry_count+1})")
-                    
-                    # Set request timeout
-                    client_timeout = ClientTimeout(total=timeout)
-                    
-                    # Add headers if not provided
-                    if 'headers' not in kwargs:
-                        kwargs['headers'] = self.headers
-                    
-                    async with session.get(url, timeout=client_timeout, ssl=verify_ssl, **kwargs) as response:
-                        if response.status == 200:
-                            text = await response.text()
-                            return text, 200
-                        else:
-                            logger.warning(f"HTTP error for {url}: {response.status}")
-                            # Try without SSL verification on certificate errors
-                            if response.status in (495, 496, 497, 403, 401) and verify_ssl:
-                                logger.info(f"Retrying {url} without SSL verification")
-                                return await self.fetch_url(session, url, timeout, False, **kwargs)
-                            return None, response.status
+            async with self.fetch_limiter.slot(url):
+                return await self._fetch(session, url, timeout, verify_ssl, **kwargs)
+
+    async def _fetch(self, session, url, timeout, verify_ssl, **kwargs):
+        """Perform the request with retries; callers must already hold the concurrency slots"""
+        retry_count = 3
+        retry_backoff = 1.0
+        
+        conditional = {}
+        if self.http_cache is not None:
+            if self.cache_max_age:
+                entry = await self._cache_call(self.http_cache.get, url, self.cache_max_age)
+                if entry is not None:
+                    logger.debug(f"Using cached response for {url}")
+                    return entry.body, 200
+            conditional = await self._cache_call(self.http_cache.conditional_headers, url)
+        
+        # Add headers if not provided
+        if 'headers' not in kwargs:
+            kwargs['headers'] = self.headers
+        
+        for attempt in range(retry_count + 1):
+            try:
+                logger.debug(f"Fetching URL: {url} (attempt {attempt+1}/{retry_count+1})")
                 
-                except (asyncio.TimeoutError, aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError, 
-                        aiohttp.ClientError) as e:
-                    if attempt < retry_count:
-                        # Calculate backoff with jitter
-                        sleep_time = retry_backoff * (2 ** attempt) * (0.5 + random.random())
-                        logger.warning(f"Request error for {url}: {e} - retrying in {sleep_time:.2f}s")
-                        await asyncio.sleep(sleep_time)
+                # Set request timeout
+                client_timeout = ClientTimeout(total=timeout)
+                
+                request_kwargs = dict(kwargs, headers=dict(kwargs['headers'], **conditional)) if conditional else kwargs
+                
+                async with session.get(url, timeout=client_timeout, ssl=verify_ssl, **request_kwargs) as response:
+                    if response.status == 200:
+                        text = await response.text()
+                        count_fetch(len(text.encode('utf-8', 'replace')))
+                        if self.http_cache is not None:
+                            await self._cache_call(
+                                self.http_cache.store, url, text,
+                                response.headers.get('ETag'), response.headers.get('Last-Modified')
+                            )
+                        return text, 200
+                    elif response.status == 304 and conditional:
+                        # Unchanged since the cached copy
+                        count_fetch(0)
+                        entry = await self._cache_call(self.http_cache.revalidated, url)
+                        if entry is not None:
+                            logger.debug(f"Not modified: {url}")
+                            return entry.body, 200
+                        # Cached copy evicted meanwhile, ask for the full page
+                        return await self._fetch(session, url, timeout, verify_ssl, **kwargs)
                     else:
-                        logger.error(f"Failed to fetch {url} after {retry_count+1} attempts: {e}")
-                        return None, None
+                        logger.warning(f"HTTP error for {url}: {response.status}")
+                        # Try without SSL verification on certificate errors
+                        if response.status in (495, 496, 497, 403, 401) and verify_ssl:
+                            logger.info(f"Retrying {url} without SSL verification")
+                            return await self._fetch(session, url, timeout, False, **kwargs)
+                        return None, response.status
             
-            return None, None
+            except (asyncio.TimeoutError, aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError, 
+                    aiohttp.ClientError) as e:
+                if attempt < retry_count:
+                    # Calculate backoff with jitter
+                    sleep_time = retry_backoff * (2 ** attempt) * (0.5 + random.random())
+                    logger.warning(f"Request error for {url}: {e} - retrying in {sleep_time:.2f}s")
+                    await asyncio.sleep(sleep_time)
+                else:
+                    logger.error(f"Failed to fetch {url} after {retry_count+1} attempts: {e}")
+                    return None, None
+        
+        return None, None
 
     async def parse_html(self, html_content, base_url=None):
         """
         Parse HTML content to extract information
         
+        The document is built in a background thread so the event loop keeps
+        serving other requests meanwhile.
+        
         Args:
             html_content: HTML content as string
             base_url: Base URL for resolving relative links
@@ -252,21 +391,54 @@ class AsyncBaseScraper:
         if not html_content:
             return None
         
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Convert all relative URLs to absolute if base_url is provided
-            if base_url:
-                for a_tag in soup.find_all('a', href=True):
-                    a_tag['href'] = urljoin(base_url, a_tag['href'])
-                
-                for img_tag in soup.find_all('img', src=True):
-                    img_tag['src'] = urljoin(base_url, img_tag['src'])
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, parse_document, html_content, base_url)
+
+    def page_parser_args(self):
+        """Extra picklable arguments passed to ``page_parser`` after the content and URL"""
+        return ()
+
+    async def parse_page(self, content, url):
+        """
+        Parse a page in the parse stage's worker pool
+        
+        Uses ``page_parser`` when set, otherwise ``parse_and_extract`` with a
+        copy of this scraper, so the document is built and
+        ``extract_opportunities`` runs off the event loop either way. When
+        following pagination, the worker also finds the page's pagination
+        links, kept in ``page_links`` for ``pagination_links``.
+        
+        Args:
+            content: Raw page text
+            url: Page URL
             
-            return soup
-        except Exception as e:
-            logger.error(f"Error parsing HTML: {e}")
-            return None
+        Returns:
+            list: Opportunity dictionaries returned by the parser
+        """
+        stage = self.parse_stage or get_parse_stage()
+        if self.page_parser is not None:
+            parser, args = self.page_parser, self.page_parser_args()
+        else:
+            parser, args = parse_and_extract, (self,)
+        (opportunities, links), parse_time = await stage.parse(
+            parse_with_links, content, url, parser, self.follow_pagination, *args
+        )
+        self.record_timing(url, 'parse', parse_time)
+        if self.follow_pagination:
+            self.page_links[url] = links
+        return opportunities
+
+    def record_timing(self, url, stage, seconds):
+        """Record time spent on a URL in one stage ('fetch' or 'parse')"""
+        timings = self.url_timings.setdefault(url, {})
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def timing_summary(self):
+        """Total fetch and parse seconds over the URLs of the last run"""
+        return {
+            stage: sum(timings.get(stage, 0.0) for timings in self.url_timings.values())
+            for stage in ('fetch', 'parse')
+        }
 
     async def process_opportunity(self, opportunity_data):
         """
@@ -282,10 +454,68 @@ class AsyncBaseScraper:
         self.total_opportunities += 1
         return True
 
+    async def fetch_page(self, session, url, **kwargs):
+        """
+        Fetch stage: download a page that still needs parsing
+        
+        Args:
+            session: aiohttp ClientSession
+            url: URL to fetch
+            **kwargs: Additional parameters for fetch_url
+            
+        Returns:
+            str: Page content, or None if the fetch failed or this version of
+            the page was already parsed
+        """
+        fetch_start = time.perf_counter()
+        content, status = await self.fetch_url(session, url, **kwargs)
+        self.record_timing(url, 'fetch', time.perf_counter() - fetch_start)
+        
+        if not content or status != 200:
+            return None
+        
+        if await self.is_unchanged(url):
+            logger.info(f"{self.scraper_name}: page unchanged since last parse, skipping {url}")
+            return None
+        
+        return content
+
+    async def parse_fetched(self, content, url):
+        """
+        Parse stage: turn a fetched page into opportunity dictionaries
+        
+        Args:
+            content: Page content
+            url: Page URL
+            
+        Returns:
+            list: Opportunity dictionaries
+        """
+        opportunities = await self.parse_page(content, url)
+        self.parsed_pages.append(url)
+        return opportunities
+
+    async def normalize_opportunity(self, opportunity_data, source_url):
+        """
+        Normalize/classify stage, run on every parsed opportunity
+        
+        Args:
+            opportunity_data: Dictionary containing opportunity information
+            source_url: URL of the page it came from
+            
+        Returns:
+            dict: The opportunity to pass on, or None to drop it
+        """
+        # Hook for derived classes; opportunities pass through unchanged by default
+        return opportunity_data
+
     async def fetch_and_process(self, session, url, **kwargs):
         """
         Fetch a URL and process any opportunities found
         
+        Runs one URL through every stage; ``run_scraper`` streams many URLs
+        through the staged pipeline instead.
+        
         Args:
             session: aiohttp ClientSession
             url: URL to fetch
@@ -295,24 +525,65 @@ class AsyncBaseScraper:
             int: Number of opportunities processed from this URL
         """
         local_count = 0
-        content, status = await self.fetch_url(session, url, **kwargs)
+        content = await self.fetch_page(session, url, **kwargs)
+        if content is None:
+            return 0
         
-        if content and status == 200:
-            soup = await self.parse_html(content, url)
-            if soup:
-                opportunities = await self.extract_opportunities(soup, url)
-                if opportunities:
-                    for opp_data in opportunities:
-                        success = await self.process_opportunity(opp_data)
-                        if success:
-                            local_count += 1
+        saved = True
+        for opp_data in await self.parse_fetched(content, url):
+            opp_data = await self.normalize_opportunity(opp_data, url)
+            if opp_data is None:
+                continue
+            if await self.process_opportunity(opp_data) is False:
+                saved = False
+            else:
+                local_count += 1
         
+        if self.saves_in_sink:
+            await self.commit_parsed_pages(saved)
         return local_count
 
+    async def _cache_call(self, func, *args):
+        """Run a blocking HTTP cache call in the default executor"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def is_unchanged(self, url):
+        """True if this scraper already parsed the cached version of the page"""
+        if self.http_cache is None:
+            return False
+        return await self._cache_call(self.http_cache.is_processed, url, self.scraper_name)
+
+    async def mark_parsed(self, url):
+        """Remember that this scraper parsed the cached version of the page"""
+        if self.http_cache is not None:
+            await self._cache_call(self.http_cache.mark_processed, url, self.scraper_name)
+
+    async def commit_parsed_pages(self, saved=True):
+        """
+        Mark the pages parsed so far as processed, once their opportunities are saved
+        
+        A page marked processed is skipped until its content changes, so when
+        saving failed the pages are left unmarked and parsed again next run.
+        
+        Args:
+            saved (bool): Whether every opportunity from these pages was saved
+        """
+        pages, self.parsed_pages = self.parsed_pages, []
+        if not saved:
+            if pages:
+                logger.warning(f"{self.scraper_name}: saving failed, {len(pages)} pages will be parsed again next run")
+            return
+        for url in pages:
+            await self.mark_parsed(url)
+
     async def extract_opportunities(self, soup, source_url):
         """
         Extract opportunity data from parsed HTML
         
+        Runs in a parse worker on a copy of the scraper (see
+        ``parse_and_extract``), so it must not change the scraper's state.
+        
         Args:
             soup: BeautifulSoup object
             source_url: Source URL
@@ -328,6 +599,9 @@ class AsyncBaseScraper:
         """
         Run the scraper on a list of URLs
         
+        Opportunities are handed to ``process_opportunity`` as they stream out
+        of the pipeline, while later URLs are still being fetched.
+        
         Args:
             urls: List of URLs to scrape
             
@@ -336,33 +610,201 @@ class AsyncBaseScraper:
         """
         self.start_time = time.time()
         self.total_opportunities = 0
+        self.url_timings = {}
+        self.page_links = {}
+        self.parsed_pages = []
+        self.sink_failures = 0
         
-        # Create a custom SSL context that's more permissive
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+        # Sink stage; process_opportunity returning False counts as a failed save
+        async for opp_data in self.iter_opportunities(urls):
+            try:
+                if await self.process_opportunity(opp_data) is False:
+                    self.sink_failures += 1
+            except Exception as e:
+                self.sink_failures += 1
+                logger.error(f"Error processing opportunity {opp_data.get('url')}: {e}")
         
-        # Create a shared session for all requests
-        connector = TCPConnector(ssl=ssl_context)
-        async with ClientSession(connector=connector) as session:
-            tasks = []
-            for url in urls:
-                task = self.fetch_and_process(session, url)
-                tasks.append(task)
-            
-            # Wait for all tasks to complete
-            completed = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle any exceptions
-            for i, result in enumerate(completed):
-                if isinstance(result, Exception):
-                    logger.error(f"Error processing {urls[i]}: {result}")
+        if self.saves_in_sink:
+            await self.commit_parsed_pages(self.sink_failures == 0)
         
         duration = time.time() - self.start_time
-        logger.info(f"{self.scraper_name} completed in {duration:.2f}s, found {self.total_opportunities} opportunities")
+        timing = self.timing_summary()
+        logger.info(f"{self.scraper_name} completed in {duration:.2f}s, found {self.total_opportunities} opportunities "
+                    f"(fetch {timing['fetch']:.2f}s, parse {timing['parse']:.2f}s across {len(self.url_timings)} URLs)")
         
         return self.total_opportunities
 
+    async def iter_opportunities(self, urls, session=None):
+        """
+        Stream opportunities through the staged pipeline
+        
+        URL frontier -> fetch -> parse -> normalize/classify, with a bounded
+        queue between stages and ``fetch_workers`` / ``parse_workers`` /
+        ``normalize_workers`` tasks per stage. With ``follow_pagination`` the
+        frontier also queues the pagination links found on parsed pages. A slow consumer fills the queues
+        and pauses fetching, so memory stays bounded however many URLs there are.
+        
+        Args:
+            urls: Iterable of URLs to scrape
+            session: aiohttp ClientSession (defaults to the orchestrator's
+                shared session, or a new one for this run)
+            
+        Yields:
+            dict: Normalized opportunity dictionaries, as soon as each is ready
+        """
+        session = session or self.session
+        if session is not None:
+            async for opp_data in self._run_pipeline(session, urls):
+                yield opp_data
+            return
+        
+        # Create a shared session for all requests
+        connector = TCPConnector(ssl=create_permissive_ssl_context())
+        async with ClientSession(connector=connector) as session:
+            async for opp_data in self._run_pipeline(session, urls):
+                yield opp_data
+
+    async def _run_pipeline(self, session, urls):
+        """Start the stage workers for one run and yield from the last queue"""
+        fetch_queue = asyncio.Queue(maxsize=self.queue_size)
+        parse_queue = asyncio.Queue(maxsize=self.queue_size)
+        normalize_queue = asyncio.Queue(maxsize=self.queue_size)
+        output_queue = asyncio.Queue(maxsize=self.queue_size)
+        # Pagination links; unbounded so parse workers never wait on fetchers
+        discovered = asyncio.Queue()
+        frontier = CrawlFrontier() if self.follow_pagination else None
+        finished = object()
+        
+        # Pages admitted but not yet fully parsed
+        pages = {'pending': 0, 'seeded': False}
+        all_pages_done = asyncio.Event()
+        
+        def page_done():
+            pages['pending'] -= 1
+            if pages['seeded'] and pages['pending'] == 0:
+                all_pages_done.set()
+        
+        async def frontier_stage():
+            try:
+                for url in urls:
+                    if frontier is not None and not frontier.add_seed(url):
+                        continue
+                    # Pagination links found meanwhile go first
+                    while not discovered.empty():
+                        await fetch_queue.put(discovered.get_nowait())
+                    pages['pending'] += 1
+                    await fetch_queue.put(url)
+                pages['seeded'] = True
+                if pages['pending'] == 0:
+                    all_pages_done.set()
+                while True:
+                    await fetch_queue.put(await discovered.get())
+            except Exception as e:
+                await output_queue.put(e)
+        
+        async def fetch_stage():
+            while True:
+                url = await fetch_queue.get()
+                handed_on = False
+                try:
+                    content = await self.fetch_page(session, url)
+                    if content is not None:
+                        await parse_queue.put((url, content))
+                        handed_on = True
+                except Exception as e:
+                    logger.error(f"Error fetching {url}: {e}")
+                finally:
+                    fetch_queue.task_done()
+                    if not handed_on:
+                        page_done()
+        
+        async def parse_stage():
+            while True:
+                url, content = await parse_queue.get()
+                try:
+                    opportunities = await self.parse_fetched(content, url)
+                    if frontier is not None:
+                        for link in self.pagination_links(frontier, url, opportunities):
+                            pages['pending'] += 1
+                            discovered.put_nowait(link)
+                    for opp_data in opportunities:
+                        await normalize_queue.put((url, opp_data))
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {e}")
+                finally:
+                    parse_queue.task_done()
+                    page_done()
+        
+        async def normalize_stage():
+            while True:
+                url, opp_data = await normalize_queue.get()
+                try:
+                    opp_data = await self.normalize_opportunity(opp_data, url)
+                    if opp_data is not None:
+                        await output_queue.put(opp_data)
+                except Exception as e:
+                    logger.error(f"Error normalizing opportunity from {url}: {e}")
+                finally:
+                    normalize_queue.task_done()
+        
+        tasks = [asyncio.ensure_future(frontier_stage())]
+        tasks += [asyncio.ensure_future(fetch_stage()) for _ in range(self.fetch_workers)]
+        tasks += [asyncio.ensure_future(parse_stage()) for _ in range(self.parse_workers)]
+        tasks += [asyncio.ensure_future(normalize_stage()) for _ in range(self.normalize_workers)]
+        
+        async def drive():
+            # Every page is parsed once nothing is pending after the last seed;
+            # then wait for the normalize stage to drain
+            await all_pages_done.wait()
+            await normalize_queue.join()
+            await output_queue.put(finished)
+        
+        tasks.append(asyncio.ensure_future(drive()))
+        try:
+            while True:
+                item = await output_queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Also reached when the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    def pagination_links(self, frontier, url, opportunities):
+        """
+        Pagination links of a parsed page that the frontier admits
+        
+        The candidate links were found by the parse worker; only the frontier
+        bookkeeping runs on the event loop. A page whose opportunities are all
+        already known ends its chain, so older archive pages are not fetched
+        again.
+        
+        Args:
+            frontier: CrawlFrontier of the current run
+            url: Page URL
+            opportunities: Opportunities parsed from the page
+            
+        Returns:
+            list: URLs to fetch next
+        """
+        links = self.page_links.pop(url, [])
+        if opportunities and all(self.known_opportunity(opp_data) for opp_data in opportunities):
+            logger.info(f"{self.scraper_name}: every opportunity on {url} is already known, not paginating further")
+            return []
+        return [link for link in links if frontier.add_discovered(link, url)]
+
+    def known_opportunity(self, opportunity_data):
+        """
+        True if the opportunity was already known before this run (by URL or fingerprint)
+        
+        Used to stop following pagination; derived classes with a store of
+        known opportunities override it.
+        """
+        return False
+
     def scrape(self, urls):
         """
         Synchronous entry point to run the async scraper
@@ -0,0 +1,189 @@
+"""
+Crawl Frontier for Paginated Listing Sites
+
+Listing sources such as ``callforentry.org/opportunities/<state>/`` spread
+their results over several pages. This module finds "next page" and numbered
+pagination links on a fetched page and tracks which pages a run may still
+fetch, so the async scrapers can follow listings past their first page.
+
+The frontier:
+1. Dedupes pages by normalized URL (case, default ports, fragments, trailing
+   slashes, tracking parameters and query order are ignored)
+2. Caps how many pagination hops are followed per domain, and how many pages
+   per domain one run may fetch
+3. Only follows links on the same host as the page they were found on
+
+Scrapers stop following a chain early when a page yields only opportunities
+they already know, so deep archives are not refetched every run.
+"""
+
+import os
+import re
+from html import unescape
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+from scrapers.politeness import domain_for
+
+# Pagination hops followed from a seed URL
+PAGINATION_MAX_DEPTH = int(os.environ.get('SCRAPER_PAGINATION_MAX_DEPTH', 5))
+
+# Pages per domain one run may fetch, seeds included
+PAGINATION_MAX_PAGES = int(os.environ.get('SCRAPER_PAGINATION_MAX_PAGES', 50))
+
+# Domain-specific depth caps (domain -> hops)
+DOMAIN_MAX_DEPTH = {}
+
+# Query parameters that never change page content
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref'}
+
+_ANCHOR = re.compile(r'<a\b([^>]*)>(.*?)</a\s*>', re.IGNORECASE | re.DOTALL)
+_LINK = re.compile(r'<link\b([^>]*)>', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+_TAG = re.compile(r'<[^>]+>')
+_NEXT_TEXT = re.compile(r'^(next|next page|older|older (posts|entries)|more results)?\s*[>›»]*$')
+_PAGE_NUMBER_URL = re.compile(r'([?&](page|paged|pg|p|start|offset)=\d+)|(/page/\d+)', re.IGNORECASE)
+
+
+def normalize_url(url):
+    """
+    Normalize a URL for deduplication
+
+    Args:
+        url (str): Absolute URL
+
+    Returns:
+        str: URL with lower-case scheme and host, no default port, fragment,
+        trailing slash or tracking parameters, and sorted query parameters
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not (scheme, parts.port) in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMETERS and not key.lower().startswith('utm_')
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def _attributes(markup):
+    """Parse the attributes of a start tag into a dict"""
+    attributes = {}
+    for name, double_quoted, single_quoted, bare in _ATTRIBUTE.findall(markup):
+        attributes[name.lower()] = unescape(double_quoted or single_quoted or bare)
+    return attributes
+
+
+def find_pagination_links(html, page_url):
+    """
+    Find links to further pages of the same listing
+
+    Matches ``rel="next"`` links, anchors labelled like "Next" or "»", anchors
+    with a "next" class, and numbered anchors whose URL carries a page number.
+    Only links on the page's own host are returned.
+
+    Args:
+        html (str): Page HTML
+        page_url (str): URL the page was fetched from
+
+    Returns:
+        list: Absolute URLs in document order, without duplicates
+    """
+    host = urlsplit(page_url).hostname
+    candidates = []
+
+    for markup in _LINK.findall(html):
+        attributes = _attributes(markup)
+        if 'next' in attributes.get('rel', '').lower().split() and attributes.get('href'):
+            candidates.append(attributes['href'])
+
+    for markup, inner in _ANCHOR.findall(html):
+        attributes = _attributes(markup)
+        href = attributes.get('href', '').strip()
+        if not href or href.startswith(('#', 'javascript:', 'mailto:')):
+            continue
+
+        text = ' '.join(unescape(_TAG.sub(' ', inner)).split()).lower()
+        rel = attributes.get('rel', '').lower().split()
+        classes = attributes.get('class', '').lower().split()
+
+        if ('next' in rel or any('next' in name for name in classes)
+                or (text and _NEXT_TEXT.match(text))
+                or (text.isdigit() and _PAGE_NUMBER_URL.search(href))):
+            candidates.append(href)
+
+    links = []
+    seen = set()
+    for href in candidates:
+        link = urljoin(page_url, href)
+        if urlsplit(link).hostname != host:
+            continue
+        key = normalize_url(link)
+        if key not in seen and key != normalize_url(page_url):
+            seen.add(key)
+            links.append(link)
+    return links
+
+
+class CrawlFrontier:
+    """Pages a run may fetch, deduplicated and capped per domain"""
+
+    def __init__(self, max_depth=PAGINATION_MAX_DEPTH, max_pages_per_domain=PAGINATION_MAX_PAGES,
+                 domain_max_depth=None):
+        """
+        Initialize the frontier
+
+        Args:
+            max_depth (int): Pagination hops followed from a seed URL
+            max_pages_per_domain (int): Pages per domain this run may fetch
+            domain_max_depth (dict): Domain-specific depth caps
+        """
+        self.max_depth = max_depth
+        self.max_pages_per_domain = max_pages_per_domain
+        self.domain_max_depth = DOMAIN_MAX_DEPTH if domain_max_depth is None else domain_max_depth
+        self.depths = {}
+        self.pages_per_domain = {}
+
+    def depth_of(self, url):
+        """Pagination hops from the seed to this page (None if not in the frontier)"""
+        return self.depths.get(normalize_url(url))
+
+    def _admit(self, url, depth):
+        key = normalize_url(url)
+        if key in self.depths:
+            return False
+
+        domain = domain_for(url)
+        if depth > self.domain_max_depth.get(domain, self.max_depth):
+            return False
+        if self.pages_per_domain.get(domain, 0) >= self.max_pages_per_domain:
+            return False
+
+        self.depths[key] = depth
+        self.pages_per_domain[domain] = self.pages_per_domain.get(domain, 0) + 1
+        return True
+
+    def add_seed(self, url):
+        """
+        Admit a configured listing URL
+
+        Returns:
+            bool: False if the page is already in the frontier
+        """
+        return self._admit(url, 0)
+
+    def add_discovered(self, url, parent_url):
+        """
+        Admit a pagination link found on parent_url
+
+        Returns:
+            bool: True if the page should be fetched
+        """
+        parent_depth = self.depth_of(parent_url)
+        return self._admit(url, (parent_depth or 0) + 1)
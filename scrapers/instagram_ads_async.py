@@ -250,9 +250,10 @@ class InstagramAdsAsyncScraper(AsyncBaseScraper):
             except:
                 pass
             
-            # Don't fail the entire process for one item
+            # Don't fail the entire process for one item, but keep its page
+            # unprocessed so it is picked up again next run
             self.total_opportunities += 1
-            return True
+            return False
 
 # Synchronous function for APScheduler
 def run_instagram_ads_scraper():
@@ -0,0 +1,285 @@
+"""
+Buffered Opportunity Writer
+
+This module provides the write stage for the asynchronous scrapers. Scrapers put
+opportunity dictionaries on a queue; a single writer task dedupes them against a
+URL set preloaded from the database and flushes them in batches, with one
+``INSERT ... ON CONFLICT (url) DO UPDATE`` statement per set of scraped fields
+in the batch.
+
+Benefits over writing each opportunity individually:
+1. One round-trip per batch instead of a SELECT and a COMMIT per item
+2. Database work runs in a thread executor, so the event loop keeps fetching
+3. Rows whose content did not change are left untouched
+4. Inserted / updated / unchanged counts are reported back to the scheduler
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Configure logging
+logger = logging.getLogger('opportunity_writer')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Columns never overwritten by an upsert
+IMMUTABLE_COLUMNS = {'id', 'url', 'created_at'}
+
+# Bookkeeping columns that do not count as a content change
+TIMESTAMP_COLUMNS = {'scraped_at', 'updated_at'}
+
+# Date formats seen in scraped deadline strings
+DEADLINE_FORMATS = ['%B %d, %Y', '%B %d %Y', '%b %d, %Y', '%b %d %Y', '%Y-%m-%d']
+
+_SENTINEL = object()
+
+
+def parse_deadline(value):
+    """Parse a scraped deadline string into a datetime, or None if unparseable"""
+    if value is None or isinstance(value, datetime):
+        return value
+
+    text = ' '.join(str(value).replace(',', ', ').split()).replace(' ,', ',')
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+class OpportunityBatchWriter:
+    """Asynchronous, batching upsert writer for scraped opportunities"""
+
+    def __init__(self, engine=None, table=None, batch_size=200, flush_interval=2.0, queue_size=1000):
+        """
+        Initialize the writer
+
+        Args:
+            engine: SQLAlchemy engine; None runs in dry-run mode (nothing is written)
+            table: Opportunity table to write to (defaults to models.Opportunity)
+            batch_size (int): Maximum number of rows per upsert statement
+            flush_interval (float): Seconds to wait for a batch to fill before flushing
+            queue_size (int): Maximum number of buffered opportunities (backpressure)
+        """
+        if table is None:
+            from models import Opportunity
+            table = Opportunity.__table__
+
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.known_urls = set()
+        # URLs stored before this writer started; known_urls also grows with every batch written
+        self.preloaded_urls = frozenset()
+        self.seen_urls = set()
+        self.stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        self._task = None
+
+    @classmethod
+    def for_current_app(cls, **kwargs):
+        """Create a writer bound to the Flask-SQLAlchemy engine, or a dry-run writer outside an app context"""
+        from flask import has_app_context
+
+        if not has_app_context():
+            return cls(engine=None, **kwargs)
+
+        from models import db
+        return cls(engine=db.engine, **kwargs)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def start(self):
+        """Preload known URLs and start the writer task"""
+        if self.engine is not None:
+            loop = asyncio.get_event_loop()
+            self.known_urls = await loop.run_in_executor(None, self._load_known_urls)
+            self.preloaded_urls = frozenset(self.known_urls)
+            logger.info(f"Preloaded {len(self.known_urls)} known opportunity URLs")
+
+        self._task = asyncio.ensure_future(self._run())
+
+    async def put(self, opportunity_data):
+        """Queue an opportunity for writing (waits if the buffer is full)"""
+        await self.queue.put(opportunity_data)
+
+    async def close(self):
+        """Flush remaining opportunities and stop the writer task"""
+        if self._task is None:
+            return
+
+        await self.queue.put(_SENTINEL)
+        await self._task
+        self._task = None
+
+        logger.info(
+            f"Opportunity writer finished: {self.stats['inserted']} inserted, "
+            f"{self.stats['updated']} updated, {self.stats['unchanged']} unchanged, "
+            f"{self.stats['failed']} failed"
+        )
+
+    async def _run(self):
+        """Collect queued opportunities into batches and flush them"""
+        loop = asyncio.get_event_loop()
+        done = False
+
+        while not done:
+            batch = []
+            item = await self.queue.get()
+
+            while True:
+                if item is _SENTINEL:
+                    done = True
+                    break
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    break
+
+            rows = self._dedupe(batch)
+            if not rows:
+                continue
+
+            if self.engine is None:
+                for row in rows:
+                    logger.info(f"No database engine - would save opportunity: {row.get('title')}")
+                self.stats['inserted'] += len(rows)
+                continue
+
+            try:
+                inserted, updated, unchanged = await loop.run_in_executor(None, self._write_batch, rows)
+                self.stats['inserted'] += inserted
+                self.stats['updated'] += updated
+                self.stats['unchanged'] += unchanged
+            except Exception as e:
+                logger.error(f"Error writing batch of {len(rows)} opportunities: {e}")
+                self.stats['failed'] += len(rows)
+
+    def _dedupe(self, batch):
+        """Drop items without a URL and URLs already written during this run"""
+        rows = {}
+        for item in batch:
+            url = item.get('url')
+            if not url:
+                self.stats['failed'] += 1
+                continue
+
+            if url in self.seen_urls or url in rows:
+                self.stats['unchanged'] += 1
+                continue
+
+            rows[url] = self._to_row(item)
+
+        self.seen_urls.update(rows)
+        return list(rows.values())
+
+    def _to_row(self, item):
+        """Map a scraped opportunity dictionary onto the table's columns"""
+        now = datetime.utcnow()
+        columns = self.table.c
+        row = {}
+
+        for key, value in item.items():
+            if key in columns and key not in ('id', 'created_at', 'updated_at'):
+                row[key] = value
+
+        if 'deadline' in row:
+            row['deadline'] = parse_deadline(row['deadline'])
+        if 'scraped_at' in columns:
+            row['scraped_at'] = now
+        if 'updated_at' in columns:
+            row['updated_at'] = now
+        if 'type' in columns and not row.get('type'):
+            row['type'] = 'general'
+
+        return row
+
+    def _load_known_urls(self):
+        """Load the set of URLs already stored in the database"""
+        with self.engine.connect() as conn:
+            result = conn.execute(self.table.select().with_only_columns(self.table.c.url).where(self.table.c.url.isnot(None)))
+            return {row[0] for row in result}
+
+    def _upsert_statement(self, rows):
+        """
+        Build an INSERT ... ON CONFLICT (url) DO UPDATE for the engine's dialect
+
+        All rows must have the same keys; only those columns are inserted or
+        updated, so fields an item did not carry keep their stored value (or
+        the column default on insert).
+        """
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            insert = postgresql.insert
+        elif dialect == 'sqlite':
+            insert = sqlite.insert
+        else:
+            raise NotImplementedError(f"Bulk upsert is not supported for {dialect}")
+
+        keys = sorted(rows[0])
+        stmt = insert(self.table).values(rows)
+        excluded = stmt.excluded
+
+        update_columns = [key for key in keys if key not in IMMUTABLE_COLUMNS]
+        content_columns = [key for key in update_columns if key not in TIMESTAMP_COLUMNS]
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.c.url],
+            set_={key: excluded[key] for key in update_columns},
+            # Leave rows alone when nothing but the timestamps would change
+            where=or_(*[self.table.c[key].is_distinct_from(excluded[key]) for key in content_columns])
+            if content_columns else None
+        )
+        return stmt.returning(self.table.c.url)
+
+    def _write_batch(self, rows):
+        """
+        Upsert a batch of rows in one transaction
+
+        A multi-row VALUES clause needs the same keys in every row, so rows are
+        grouped by the fields they carry and each group gets its own statement.
+        Padding rows with None instead would overwrite stored fields with NULL.
+
+        Returns:
+            tuple: (inserted, updated, unchanged) counts
+        """
+        groups = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+
+        written = set()
+        with self.engine.begin() as conn:
+            for group in groups.values():
+                written.update(row[0] for row in conn.execute(self._upsert_statement(group)))
+
+        inserted = len(written - self.known_urls)
+        updated = len(written) - inserted
+        unchanged = len(rows) - len(written)
+
+        self.known_urls.update(written)
+        return inserted, updated, unchanged
@@ -0,0 +1,209 @@
+"""
+Scraper Orchestrator
+
+This module runs many scraper engines at once on a single event loop instead of
+calling ``loop.run_until_complete`` once per engine.
+
+Benefits over running engines one after another:
+1. A full refresh takes roughly as long as the slowest engine, not the sum of all
+2. One shared aiohttp connector pool, so keep-alive connections are reused
+3. A global concurrency cap for the whole run
+4. Per-domain concurrency caps keyed by host rather than by engine, since many
+   engines hit the same sites (artjobs.com, callforentry.org, artworkarchive.com)
+5. Per-host request spacing (see scrapers.politeness) shared by all engines
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from aiohttp import ClientSession, TCPConnector
+
+from scrapers.async_base_scraper import create_permissive_ssl_context
+from scrapers.politeness import HostPolitenessScheduler, HOST_REQUEST_INTERVAL, domain_for
+
+# Configure logging
+logger = logging.getLogger('scraper_orchestrator')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Maximum number of requests in flight across every engine
+GLOBAL_CONCURRENCY = int(os.environ.get('SCRAPER_GLOBAL_CONCURRENCY', 32))
+
+# Default maximum number of requests in flight to a single domain
+DOMAIN_CONCURRENCY = int(os.environ.get('SCRAPER_DOMAIN_CONCURRENCY', 4))
+
+# Tighter caps for hosts shared by several engines
+DOMAIN_LIMITS = {
+    'artjobs.com': 2,
+    'callforentry.org': 2,
+    'artworkarchive.com': 2,
+}
+
+# Threads used for engines that are still synchronous; they merge through the
+# transactional opportunity store, so several can run at once
+SYNC_ENGINE_WORKERS = int(os.environ.get('SCRAPER_SYNC_WORKERS', 4))
+
+
+class FetchLimiter:
+    """Global and per-domain concurrency caps shared by every scraper on a loop"""
+
+    def __init__(self, global_limit=GLOBAL_CONCURRENCY, domain_limit=DOMAIN_CONCURRENCY, domain_limits=None,
+                 politeness=None):
+        """
+        Initialize the limiter
+
+        Args:
+            global_limit (int): Maximum requests in flight overall
+            domain_limit (int): Default maximum requests in flight per domain
+            domain_limits (dict): Per-domain overrides (defaults to DOMAIN_LIMITS)
+            politeness (HostPolitenessScheduler): Optional per-host request spacing
+        """
+        self.politeness = politeness
+        self.global_semaphore = asyncio.Semaphore(global_limit)
+        self.domain_limit = domain_limit
+        self.domain_limits = dict(DOMAIN_LIMITS if domain_limits is None else domain_limits)
+        self._domain_semaphores = {}
+        self.in_flight = defaultdict(int)
+        self.peak_in_flight = defaultdict(int)
+
+    def semaphore_for(self, domain):
+        """Return the semaphore guarding a domain, creating it on first use"""
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.domain_limits.get(domain, self.domain_limit))
+            self._domain_semaphores[domain] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold a domain slot and a global slot for the duration of one request"""
+        domain = domain_for(url)
+        # Take the domain slot first so requests queued behind a busy host
+        # do not tie up global capacity other domains could use
+        async with self.semaphore_for(domain):
+            if self.politeness is not None:
+                await self.politeness.wait(url)
+            async with self.global_semaphore:
+                self.in_flight[domain] += 1
+                self.peak_in_flight[domain] = max(self.peak_in_flight[domain], self.in_flight[domain])
+                try:
+                    yield
+                finally:
+                    self.in_flight[domain] -= 1
+
+
+class ScrapeOrchestrator:
+    """Run scraper engines concurrently on one event loop and one connector pool"""
+
+    def __init__(self, global_limit=GLOBAL_CONCURRENCY, domain_limit=DOMAIN_CONCURRENCY,
+                 domain_limits=None, sync_workers=SYNC_ENGINE_WORKERS, host_interval=HOST_REQUEST_INTERVAL,
+                 host_intervals=None):
+        """
+        Initialize the orchestrator
+
+        Args:
+            global_limit (int): Maximum requests in flight across all engines
+            domain_limit (int): Default maximum requests in flight per domain
+            domain_limits (dict): Per-domain overrides (defaults to DOMAIN_LIMITS)
+            sync_workers (int): Threads used for synchronous engine callables
+            host_interval (float): Default seconds between requests to one host (0 disables spacing)
+            host_intervals (dict): Per-host interval overrides
+        """
+        self.global_limit = global_limit
+        self.domain_limit = domain_limit
+        self.domain_limits = domain_limits
+        self.sync_workers = sync_workers
+        self.host_interval = host_interval
+        self.host_intervals = host_intervals
+        self.limiter = None
+        self.durations = {}
+
+    async def run(self, engines):
+        """
+        Run every engine as a task and wait for all of them
+
+        Args:
+            engines (dict): Engine name -> AsyncBaseScraper instance (run on the
+                shared session via its ``run()`` coroutine) or a plain callable
+                (run in a worker thread)
+
+        Returns:
+            dict: Engine name -> result, or None if the engine raised
+        """
+        start_time = time.time()
+        loop = asyncio.get_event_loop()
+
+        # Semaphores must be created on the loop that uses them
+        politeness = None
+        if self.host_interval > 0 or self.host_intervals:
+            politeness = HostPolitenessScheduler(self.host_interval, host_intervals=self.host_intervals)
+        self.limiter = FetchLimiter(self.global_limit, self.domain_limit, self.domain_limits, politeness)
+
+        executor = None
+        if any(not hasattr(engine, 'fetch_url') for engine in engines.values()):
+            executor = ThreadPoolExecutor(max_workers=self.sync_workers, thread_name_prefix='scraper-engine')
+
+        connector = TCPConnector(ssl=create_permissive_ssl_context(), limit=self.global_limit, limit_per_host=0)
+        try:
+            async with ClientSession(connector=connector) as session:
+                names = list(engines)
+                tasks = [self._run_engine(name, engines[name], session, loop, executor) for name in names]
+                completed = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+        results = {}
+        for name, result in zip(names, completed):
+            if isinstance(result, Exception):
+                logger.error(f"Engine {name} failed: {result}")
+                results[name] = None
+            else:
+                results[name] = result
+
+        duration = time.time() - start_time
+        logger.info(
+            f"Ran {len(engines)} engines in {duration:.2f}s "
+            f"(sum of engine times {sum(self.durations.values()):.2f}s)"
+        )
+        return results
+
+    async def _run_engine(self, name, engine, session, loop, executor):
+        """Run one engine, timing it and wiring async scrapers to the shared session"""
+        start_time = time.time()
+        try:
+            if not hasattr(engine, 'fetch_url'):
+                return await loop.run_in_executor(executor, engine)
+
+            engine.session = session
+            engine.fetch_limiter = self.limiter
+            try:
+                return await engine.run()
+            finally:
+                engine.session = None
+                engine.fetch_limiter = None
+        finally:
+            self.durations[name] = time.time() - start_time
+            logger.info(f"Engine {name} finished in {self.durations[name]:.2f}s")
+
+    def run_sync(self, engines):
+        """
+        Synchronous entry point for APScheduler jobs
+
+        Args:
+            engines (dict): See ``run``
+
+        Returns:
+            dict: Engine name -> result, or None if the engine raised
+        """
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(self.run(engines))
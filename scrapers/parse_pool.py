@@ -0,0 +1,122 @@
+"""
+Scraper Parse Stage
+
+This module moves CPU-bound page parsing off the asyncio event loop. Scrapers
+hand raw page text and a module-level parser function to a shared parse stage,
+which runs it in a process pool and returns the parser's plain result (usually
+a list of opportunity dictionaries) together with the time spent parsing.
+
+Benefits over parsing on the event loop:
+1. Fetches keep flowing while pages are parsed on other cores
+2. One large page no longer stalls every in-flight request
+3. Parse time is measured per page, separately from fetch time
+
+Parser functions must be picklable (defined at module level) and take the page
+text and URL first, followed by any extra picklable arguments.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Configure logging
+logger = logging.getLogger('parse_pool')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+# Worker processes for page parsing; 0 parses in a background thread instead
+PARSE_WORKERS = int(os.environ.get('SCRAPER_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def timed_parse(parser, content, url, *args):
+    """Run a parser and return (result, seconds spent); executed in the worker"""
+    start = time.perf_counter()
+    result = parser(content, url, *args)
+    return result, time.perf_counter() - start
+
+
+class ParseStage:
+    """Runs page parsers in a process pool, falling back to a thread"""
+
+    def __init__(self, workers=PARSE_WORKERS):
+        """
+        Initialize the parse stage
+
+        Args:
+            workers (int): Worker processes; 0 parses in a background thread
+        """
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Create the pool on first use"""
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    try:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                        logger.info(f"Parsing pages in {self.workers} worker processes")
+                    except (OSError, NotImplementedError) as e:
+                        logger.warning(f"Process pool unavailable, parsing in a thread: {e}")
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='parse')
+            return self._executor
+
+    def _reset(self, executor):
+        """Drop a broken pool so the next parse starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    async def parse(self, parser, content, url, *args):
+        """
+        Parse a page off the event loop
+
+        Args:
+            parser (callable): Module-level function ``parser(content, url, *args)``
+            content (str): Raw page text
+            url (str): Page URL
+            *args: Extra picklable arguments for the parser
+
+        Returns:
+            tuple: (parser result, seconds spent parsing in the worker)
+        """
+        loop = asyncio.get_event_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, timed_parse, parser, content, url, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); restart the pool and retry once
+            logger.error(f"Parse worker crashed while parsing {url}, restarting pool")
+            self._reset(executor)
+            return await loop.run_in_executor(self._get_executor(), timed_parse, parser, content, url, *args)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_parse_stage = None
+_parse_stage_lock = threading.Lock()
+
+
+def get_parse_stage():
+    """Return the process-wide parse stage shared by all scrapers"""
+    global _parse_stage
+    with _parse_stage_lock:
+        if _parse_stage is None:
+            _parse_stage = ParseStage()
+        return _parse_stage
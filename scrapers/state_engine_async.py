@@ -0,0 +1,191 @@
+"""
+Asynchronous State Engine Scraper
+
+This module implements the scraper behind the state engines built by
+``proletto_engine_state_factory.create_state_engine``. It extends the
+AsyncBaseScraper so every site of an engine is fetched concurrently, with
+per-host politeness handled by the scrape orchestrator instead of sleeping
+between sites.
+
+Extraction, data checks, fingerprinting and circuit breaking reuse the helpers
+from scrapers_improvement, so results match the synchronous
+improved_scrape_site path. Pages are parsed in the shared parse process pool
+so fetching continues while pages are parsed. Pages come from the shared
+disk-backed HTTP cache when fresh, and unchanged pages are not parsed again.
+Listing pagination is followed until a page holds only opportunities that are
+already in the opportunity store.
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+
+from keyword_matcher import get_keyword_matcher
+from opportunity_store import get_opportunity_store
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers_improvement import (
+    CircuitBreaker, CACHE_DURATION, get_domain,
+    extract_opportunities_from_html, verify_opportunity_data
+)
+
+# Configure logging
+logger = logging.getLogger('state_engine_async')
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+
+def parse_state_page(content, url, keywords):
+    """
+    Extract, verify and fingerprint the opportunities on one page
+    
+    Runs in a parse worker process, so it only takes and returns plain data.
+    
+    Args:
+        content (str): Page HTML
+        url (str): Page URL
+        keywords (tuple): Keywords an opportunity title must contain
+        
+    Returns:
+        list: Opportunity dictionaries
+    """
+    opportunities = verify_opportunity_data(extract_opportunities_from_html(content, keywords, url))
+    for opp in opportunities:
+        # Content fingerprinting - hash key fields for identity checking
+        fingerprint_data = f"{opp.get('title', '')}|{opp.get('url', '')}|{opp.get('deadline', '')}"
+        opp['fingerprint'] = hashlib.md5(fingerprint_data.encode()).hexdigest()
+    return opportunities
+
+
+class StateEngineAsyncScraper(AsyncBaseScraper):
+    """Asynchronous scraper for one state engine's list of sites"""
+
+    def __init__(self, state_name, sites, keywords, on_complete=None, max_concurrency=10, use_cache=True):
+        """
+        Initialize the state engine scraper
+
+        Args:
+            state_name (str): Name of the state (e.g., "New York")
+            sites (list): Websites to scrape
+            keywords (list): Keywords an opportunity title must contain, or a
+                compiled KeywordMatcher
+            on_complete (callable): Optional callback given the collected
+                opportunities; its return value becomes the result of ``run()``
+                and, when truthy, marks the parsed pages processed
+            max_concurrency (int): Maximum number of concurrent requests
+            use_cache (bool): Whether to reuse recently fetched pages
+        """
+        super().__init__(
+            scraper_name=f"state_engine_{state_name.lower().replace(' ', '_')}",
+            max_concurrency=max_concurrency
+        )
+        self.state_name = state_name
+        self.urls = list(sites)
+        self.keyword_matcher = get_keyword_matcher(keywords)
+        self.page_parser = parse_state_page
+        self.follow_pagination = True
+        # URLs and fingerprints already in the opportunity store
+        self.known_keys = set()
+        self.on_complete = on_complete
+        # Opportunities are saved by on_complete, after the pipeline finishes
+        self.saves_in_sink = False
+        self.gigs = []
+        
+        if use_cache:
+            self.cache_max_age = CACHE_DURATION
+        else:
+            self.http_cache = None
+
+    async def run(self):
+        """
+        Scrape every site of the engine
+
+        Returns:
+            The ``on_complete`` result if a callback was given, otherwise the
+            list of opportunity dictionaries
+        """
+        self.gigs = []
+        try:
+            loop = asyncio.get_event_loop()
+            self.known_keys = await loop.run_in_executor(None, get_opportunity_store().known_keys)
+        except Exception as e:
+            logger.warning(f"Could not load known opportunities, pagination will not stop early: {e}")
+            self.known_keys = set()
+
+        await self.run_scraper(self.urls)
+        logger.info(f"{self.state_name} scraping completed. Found {len(self.gigs)} total opportunities")
+
+        if self.on_complete is not None:
+            result = self.on_complete(self.gigs)
+            # Pages count as processed only once on_complete saved their opportunities
+            await self.commit_parsed_pages(bool(result))
+            return result
+        # Nothing saves the gigs here, so the pages stay unprocessed
+        self.parsed_pages = []
+        return self.gigs
+
+    def known_opportunity(self, opportunity_data):
+        """Known if its URL or fingerprint is already in the opportunity store"""
+        return (opportunity_data.get('url') in self.known_keys or
+                opportunity_data.get('fingerprint') in self.known_keys)
+
+    def page_parser_args(self):
+        """Workers compile their own matcher from the keyword list"""
+        return (tuple(self.keyword_matcher.keywords),)
+
+    async def fetch_page(self, session, url, **kwargs):
+        """
+        Fetch one site behind its domain's circuit breaker
+
+        Args:
+            session: aiohttp ClientSession
+            url: URL to fetch
+            **kwargs: Additional parameters for fetch_url
+
+        Returns:
+            str: Page content, or None if the fetch failed or the page is unchanged
+        """
+        fetch_start = time.perf_counter()
+        try:
+            with CircuitBreaker(get_domain(url)):
+                content, status = await self.fetch_url(session, url, **kwargs)
+                self.record_timing(url, 'fetch', time.perf_counter() - fetch_start)
+                if content is None:
+                    raise Exception(f"Fetch failed with status {status}")
+        except Exception as e:
+            if "Circuit open" in str(e):
+                logger.warning(f"Circuit breaker prevented request to {url}: {e}")
+            else:
+                logger.error(f"All fetch attempts failed for {url}: {e}")
+            return None
+
+        # Skip parsing entirely if this exact page version was already parsed
+        if await self.is_unchanged(url):
+            logger.info(f"Page unchanged since last parse, skipping {url}")
+            return None
+
+        return content
+
+    async def parse_fetched(self, content, url):
+        """Parse one site in the parse worker pool"""
+        opportunities = await super().parse_fetched(content, url)
+        logger.info(f"Found {len(opportunities)} opportunities from {url}")
+        return opportunities
+
+    async def process_opportunity(self, opportunity_data):
+        """
+        Collect a single opportunity
+
+        Args:
+            opportunity_data: Dictionary with opportunity information
+
+        Returns:
+            bool: True if collected
+        """
+        self.gigs.append(opportunity_data)
+        self.total_opportunities += 1
+        return True
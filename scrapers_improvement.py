@@ -32,6 +32,7 @@ Key improvements:
 """
 
 import logging
+import re
 import random
 import time
 import json
@@ -43,7 +44,11 @@ import requests
 from urllib3.exceptions import InsecureRequestWarning
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+
+from http_cache import http_cache
+from job_history import count_fetch
+from keyword_matcher import get_keyword_matcher
 
 # Configure logging
 logger = logging.getLogger('scraper_improvements')
@@ -88,9 +93,9 @@ CACHE_DURATION = 60 * 60  # 1 hour
 site_health = {}
 site_health_lock = threading.Lock()
 
-# Cache for responses
-response_cache = {}
-response_cache_lock = threading.Lock()
+# Pages parsed by this thread whose opportunities are not saved yet
+_parsed_pages = threading.local()
+
 
 class CircuitBreaker:
     """
@@ -207,7 +212,7 @@ def get_random_user_agent():
     """
     return random.choice(USER_AGENTS)
 
-def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_retries=3):
+def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_retries=3, use_cache=False):
     """
     Fetch a URL with retries and better error handling
     
@@ -217,6 +222,8 @@ def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_ret
         verify_ssl (bool): Whether to verify SSL certificates
         headers (dict): HTTP headers to send
         max_retries (int): Maximum number of retries
+        use_cache (bool): Send conditional headers from the HTTP cache and store the response;
+            a 304 returns the cached body
         
     Returns:
         tuple: (success, content) where success is a boolean and content is the response text
@@ -231,6 +238,9 @@ def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_ret
             'Cache-Control': 'max-age=0'
         }
     
+    if use_cache:
+        headers = dict(headers, **http_cache.conditional_headers(url))
+    
     session = create_resilient_session()
     
     # Initialize retry count
@@ -247,7 +257,22 @@ def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_ret
             
             # Check if the response is valid
             if response.status_code == 200:
+                count_fetch(len(response.content))
+                if use_cache:
+                    http_cache.store(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
                 return True, response.text
+            
+            # Unchanged since the cached copy
+            if response.status_code == 304 and use_cache and ('If-None-Match' in headers or 'If-Modified-Since' in headers):
+                count_fetch(0)
+                entry = http_cache.revalidated(url)
+                if entry is not None:
+                    logger.info(f"Not modified: {url}")
+                    return True, entry.body
+                # Cached copy evicted meanwhile, ask for the full page
+                headers.pop('If-None-Match', None)
+                headers.pop('If-Modified-Since', None)
+                continue
                 
             # Handle common HTTP errors
             if response.status_code == 403:
@@ -314,54 +339,155 @@ def fetch_url_with_retry(url, timeout=15, verify_ssl=True, headers=None, max_ret
     # If we get here, we've exceeded the maximum retries
     return False, "Max retries exceeded"
 
+# Common selectors for opportunity listings, in priority order
+OPPORTUNITY_SELECTORS = [
+    'article', '.job-listing', '.opportunity', '.post', '.card',
+    '.listing', '.job', '.open-call', '.residency', '.grant',
+    'div[class*="job"]', 'div[class*="opp"]', 'div[class*="listing"]',
+    '.item', '.event', 'section', '.entry', '.content-item',
+    'li.listing', '.result', '.row'
+]
+
+# Containers used when no listing selector matches
+FALLBACK_CONTAINER_TAGS = {'a', 'div', 'section', 'article'}
+
+# Tags that can hold an opportunity title
+TITLE_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'strong', 'b', 'a'}
+
+# tag, .class, tag.class or tag[attribute*="value"]
+_SIMPLE_SELECTOR = re.compile(r'^([a-z0-9]*)(?:\.([\w-]+))?(?:\[([\w-]+)\*="([^"]*)"\])?$')
+
+def compile_simple_selector(selector):
+    """
+    Compile one of the listing selectors into a tag predicate
+
+    Only the simple forms used by OPPORTUNITY_SELECTORS are supported; matching
+    follows soupsieve, so results equal ``soup.select(selector)``.
+    """
+    match = _SIMPLE_SELECTOR.match(selector)
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unsupported listing selector: {selector}")
+    name, class_name, attribute, substring = match.groups()
+
+    def matches(tag):
+        if name and tag.name != name:
+            return False
+        if class_name and class_name not in tag.get_attribute_list('class'):
+            return False
+        if attribute:
+            value = tag.get(attribute)
+            if value is None:
+                return False
+            if isinstance(value, list):
+                value = ' '.join(value)
+            # An empty substring never matches, as in CSS
+            return bool(substring) and substring in value
+        return True
+
+    return matches
+
+_selector_matchers = [compile_simple_selector(selector) for selector in OPPORTUNITY_SELECTORS]
+
+def find_opportunity_containers(tags):
+    """
+    Match every listing selector in one walk over the document
+
+    Args:
+        tags (list): All tags of the document in document order
+
+    Returns:
+        list: Matching tags ordered by their highest-priority selector, then
+        document order, each tag once
+    """
+    ranked = []
+    for position, tag in enumerate(tags):
+        for rank, matches in enumerate(_selector_matchers):
+            if matches(tag):
+                ranked.append((rank, position, tag))
+                break
+    ranked.sort(key=lambda item: item[:2])
+    return [tag for _, _, tag in ranked]
+
+def index_container_fields(tags, min_text_length):
+    """
+    Resolve the title tag, link tag and description of every tag bottom-up
+
+    Each tag reuses the results of its children, so nested containers do not
+    walk their subtrees again.
+
+    Args:
+        tags (list): All tags of the document in document order
+        min_text_length (int): Minimum description length
+
+    Returns:
+        dict: ``id(tag)`` -> (first title tag, first link tag, description)
+    """
+    fields = {}
+    empty = (None, None, '')
+    for tag in reversed(tags):
+        title_tag = link_tag = None
+        description = ''
+        for child in tag.children:
+            if not isinstance(child, Tag):
+                continue
+            child_title, child_link, child_description = fields.get(id(child), empty)
+            if title_tag is None:
+                title_tag = child if child.name in TITLE_TAGS else child_title
+            if link_tag is None:
+                link_tag = child if child.name == 'a' and child.get('href') is not None else child_link
+            if not description:
+                if child.name == 'p':
+                    text = child.get_text(strip=True)
+                    description = text if len(text) > min_text_length else child_description
+                else:
+                    description = child_description
+            if title_tag is not None and link_tag is not None and description:
+                break
+        fields[id(tag)] = (title_tag, link_tag, description)
+    return fields
+
 def extract_opportunities_from_html(html, keywords, url, min_text_length=15):
     """
     Extract opportunities from HTML with improved content extraction
     
+    The document is walked once to find listing containers and once, bottom-up,
+    to resolve each container's title, link and description, so overlapping
+    containers cost no extra subtree scans. The first container yielding a URL
+    wins, as with the previous per-selector extraction.
+    
     Args:
         html (str): HTML content
-        keywords (list): List of keywords to check for
+        keywords (list): List of keywords to check for, or a compiled KeywordMatcher
         url (str): Source URL
         min_text_length (int): Minimum length of text to be considered valid
         
     Returns:
         list: List of opportunity dictionaries
     """
+    matcher = get_keyword_matcher(keywords)
     soup = BeautifulSoup(html, 'html.parser')
+    tags = soup.find_all(True)
     opportunities = []
     
-    # Look for opportunity cards, listings, or sections
-    opportunity_containers = []
-    
-    # Common selectors for opportunity listings
-    selectors = [
-        'article', '.job-listing', '.opportunity', '.post', '.card',
-        '.listing', '.job', '.open-call', '.residency', '.grant',
-        'div[class*="job"]', 'div[class*="opp"]', 'div[class*="listing"]',
-        '.item', '.event', 'section', '.entry', '.content-item',
-        'li.listing', '.result', '.row'
-    ]
-    
     # Try to find containers for opportunities
-    for selector in selectors:
-        containers = soup.select(selector)
-        if containers:
-            opportunity_containers.extend(containers)
+    opportunity_containers = find_opportunity_containers(tags)
     
     # If no containers found, try to find individual links
     if not opportunity_containers:
-        opportunity_containers = soup.find_all(['a', 'div', 'section', 'article'])
+        opportunity_containers = [tag for tag in tags if tag.name in FALLBACK_CONTAINER_TAGS]
+    
+    fields = index_container_fields(tags, min_text_length)
+    seen_urls = set()
+    titles = {}
     
     # Process each container
     for container in opportunity_containers:
         # Look for a title and link
-        title_tag = container.find(['h1', 'h2', 'h3', 'h4', 'h5', 'strong', 'b', 'a'])
-        link_tag = container.find('a', href=True)
+        title_tag, link_tag, description = fields[id(container)]
         
-        if not title_tag or not link_tag:
+        if title_tag is None or link_tag is None:
             continue
         
-        title = title_tag.get_text(strip=True)
         link = link_tag['href']
         
         # Make sure the link is absolute
@@ -375,62 +501,38 @@ def extract_opportunities_from_html(html, keywords, url, min_text_length=15):
                 url_path = '/'.join(url.split('/')[:-1])
                 link = f"{url_path}/{link}"
         
-        # Skip if title is too short or doesn't match keywords
-        if len(title) < min_text_length or not any(keyword.lower() in title.lower() for keyword in keywords):
+        # Deduplicate opportunities by URL; the first container wins
+        if link in seen_urls:
             continue
         
-        # Extract description
-        description = ""
-        description_tags = container.find_all(['p', 'div.description', 'div.summary', 'div.excerpt', 'span.description'])
-        for tag in description_tags:
-            text = tag.get_text(strip=True)
-            if len(text) > min_text_length:
-                description = text
-                break
-        
-        # Extract location
-        location = ""
-        location_tags = container.find_all(['span.location', 'div.location', 'p.location', 'span.place', 'div.place'])
-        for tag in location_tags:
-            text = tag.get_text(strip=True)
-            if 'location' in text.lower() or 'place' in text.lower() or 'city' in text.lower() or 'state' in text.lower():
-                location = text
-                break
+        title = titles.get(id(title_tag))
+        if title is None:
+            title = titles[id(title_tag)] = title_tag.get_text(strip=True)
         
-        # Extract date info
-        deadline = ""
-        date_tags = container.find_all(['span.date', 'div.date', 'p.date', 'span.deadline', 'div.deadline'])
-        for tag in date_tags:
-            text = tag.get_text(strip=True)
-            if 'deadline' in text.lower() or 'due' in text.lower() or 'date' in text.lower():
-                deadline = text
-                break
+        # Skip if title is too short or doesn't match keywords
+        if len(title) < min_text_length:
+            continue
+        matched_keywords = matcher.matched(title)
+        if not matched_keywords:
+            continue
         
         # Get source domain
         source = url.split('//')[1].split('/')[0].replace('www.', '')
         
-        opportunity = {
+        seen_urls.add(link)
+        opportunities.append({
             'title': title,
             'url': link,
             'description': description,
-            'location': location,
-            'deadline': deadline,
+            # Generic pages carry no reliable location or deadline markup
+            'location': "",
+            'deadline': "",
             'source': source,
+            'tags': ', '.join(sorted(matched_keywords)),
             'scraped_date': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        opportunities.append(opportunity)
+        })
     
-    # Deduplicate opportunities by URL
-    unique_opportunities = []
-    seen_urls = set()
-    
-    for opp in opportunities:
-        if opp['url'] not in seen_urls:
-            seen_urls.add(opp['url'])
-            unique_opportunities.append(opp)
-    
-    return unique_opportunities
+    return opportunities
 
 def verify_opportunity_data(opportunities):
     """
@@ -474,29 +576,58 @@ def check_cache(url):
     Returns:
         tuple: (cached, content) where cached is a boolean and content is the cached response
     """
-    url_hash = hashlib.md5(url.encode()).hexdigest()
-    
-    with response_cache_lock:
-        if url_hash in response_cache:
-            cache_time, content = response_cache[url_hash]
-            if (datetime.now() - cache_time).total_seconds() < CACHE_DURATION:
-                logger.info(f"Using cached response for {url}")
-                return True, content
+    entry = http_cache.get(url, max_age=CACHE_DURATION)
+    if entry is not None:
+        logger.info(f"Using cached response for {url}")
+        return True, entry.body
     
     return False, None
 
-def update_cache(url, content):
+def update_cache(url, content, etag=None, last_modified=None):
     """
     Update the cache with a new response
     
     Args:
         url (str): URL that was fetched
         content (str): Response content
+        etag (str): ETag response header, if any
+        last_modified (str): Last-Modified response header, if any
+    """
+    http_cache.store(url, content, etag, last_modified)
+
+def keyword_consumer(keywords):
+    """Cache consumer key for a keyword list, since parse results depend on the keywords"""
+    keywords = getattr(keywords, 'keywords', keywords)
+    return 'keywords:' + hashlib.md5('|'.join(sorted(keywords)).encode()).hexdigest()
+
+def defer_mark_processed(url, consumer):
+    """Remember a parsed page until ``commit_parsed_pages`` confirms its opportunities were saved"""
+    pending = getattr(_parsed_pages, 'pending', None)
+    if pending is None:
+        pending = _parsed_pages.pending = []
+    pending.append((url, consumer))
+
+def commit_parsed_pages(saved=True):
     """
-    url_hash = hashlib.md5(url.encode()).hexdigest()
+    Mark the pages this thread parsed as processed, once their opportunities are saved
     
-    with response_cache_lock:
-        response_cache[url_hash] = (datetime.now(), content)
+    Engines call this after merging the opportunities. A page marked processed
+    is skipped until its content changes, so when saving failed the pages are
+    left unmarked and parsed again next run.
+    
+    Args:
+        saved (bool): Whether the opportunities were saved
+        
+    Returns:
+        int: Number of pages marked processed
+    """
+    pending = getattr(_parsed_pages, 'pending', None) or []
+    _parsed_pages.pending = []
+    if not saved:
+        return 0
+    for url, consumer in pending:
+        http_cache.mark_processed(url, consumer)
+    return len(pending)
 
 def get_site_health_metrics():
     """
@@ -561,15 +692,20 @@ def scrape_opportunities(url, keywords, use_cache=True, try_headless=False):
         list: List of opportunity dictionaries
     """
     domain = get_domain(url)
+    consumer = keyword_consumer(keywords)
     logger.info(f"Scraping opportunities from {url}")
     
     # Check cache first if enabled
     if use_cache:
         cached, content = check_cache(url)
         if cached:
+            if http_cache.is_processed(url, consumer):
+                logger.info(f"Page unchanged since last parse, skipping {url}")
+                return []
             # Extract opportunities from cached HTML
             opportunities = extract_opportunities_from_html(content, keywords, url)
             opportunities = verify_opportunity_data(opportunities)
+            defer_mark_processed(url, consumer)
             logger.info(f"Found {len(opportunities)} opportunities from cache for {url}")
             return opportunities
     
@@ -578,13 +714,13 @@ def scrape_opportunities(url, keywords, use_cache=True, try_headless=False):
         with CircuitBreaker(domain):
             start_time = time.time()
             
-            # First attempt with SSL verification
-            success, content = fetch_url_with_retry(url)
+            # First attempt with SSL verification; conditional if we hold a cached copy
+            success, content = fetch_url_with_retry(url, use_cache=use_cache)
             
             # If that fails, try without SSL verification
             if not success:
                 logger.warning(f"Initial fetch failed for {url}, trying without SSL verification")
-                success, content = fetch_url_with_retry(url, verify_ssl=False)
+                success, content = fetch_url_with_retry(url, verify_ssl=False, use_cache=use_cache)
             
             # If still not successful, try with a proxy if available
             if not success and 'PROXY_URL' in os.environ:
@@ -596,8 +732,11 @@ def scrape_opportunities(url, keywords, use_cache=True, try_headless=False):
                 try:
                     response = requests.get(url, headers=headers, proxies=proxies, timeout=20)
                     if response.status_code == 200:
+                        count_fetch(len(response.content))
                         success = True
                         content = response.text
+                        if use_cache:
+                            update_cache(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
                 except Exception as e:
                     logger.error(f"Proxy fetch failed for {url}: {e}")
             
@@ -622,9 +761,10 @@ def scrape_opportunities(url, keywords, use_cache=True, try_headless=False):
                         else:
                             site_health[domain]['avg_latency'] = latency
                 
-                # Update cache if successful
-                if use_cache:
-                    update_cache(url, content)
+                # Skip parsing entirely if this exact page version was already parsed
+                if use_cache and http_cache.is_processed(url, consumer):
+                    logger.info(f"Page unchanged since last parse, skipping {url}")
+                    return []
                 
                 # Extract opportunities from HTML
                 opportunities = extract_opportunities_from_html(content, keywords, url)
@@ -637,6 +777,9 @@ def scrape_opportunities(url, keywords, use_cache=True, try_headless=False):
                     fingerprint_data = f"{opp.get('title', '')}|{opp.get('url', '')}|{opp.get('deadline', '')}"
                     opp['fingerprint'] = hashlib.md5(fingerprint_data.encode()).hexdigest()
                 
+                if use_cache:
+                    defer_mark_processed(url, consumer)
+                
                 logger.info(f"Found {len(opportunities)} opportunities from {url}")
                 return opportunities
             else:
@@ -0,0 +1,458 @@
+"""
+Proletto Search Index
+
+This module provides an in-process inverted index over opportunities so the
+search endpoints do not have to run ``ilike('%q%')`` table scans on every
+keystroke.
+
+Features:
+- Tokenized postings per field (title, description, organization, location,
+  type, categories) with BM25F ranking and per-field boosts
+- Prefix matching on query terms (``paint`` matches ``painting``)
+- Incremental refresh using the ``updated_at`` watermark, so rows inserted by
+  the scrapers show up without a full rebuild
+- Built once in the gunicorn master (``preload_app = True``) so the postings
+  are shared copy-on-write by every worker; each worker only applies deltas
+- Periodic full rebuilds run on a background thread; requests keep searching
+  the current index until the rebuilt one is swapped in
+"""
+
+import os
+import re
+import math
+import time
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Field boosts used for BM25F scoring
+FIELD_BOOSTS = {
+    'title': 3.0,
+    'organization': 2.0,
+    'categories': 2.0,
+    'type': 1.5,
+    'location': 1.5,
+    'description': 1.0,
+}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weight applied to terms matched through prefix expansion instead of exactly
+PREFIX_WEIGHT = 0.8
+
+# Maximum number of vocabulary terms a single query prefix may expand to
+MAX_PREFIX_EXPANSIONS = 50
+
+# Only index the start of long descriptions to keep the postings compact
+MAX_DESCRIPTION_TOKENS = 300
+
+# Refresh intervals (seconds)
+REFRESH_INTERVAL = int(os.environ.get('SEARCH_INDEX_REFRESH_SECONDS', 30))
+FULL_REBUILD_INTERVAL = int(os.environ.get('SEARCH_INDEX_REBUILD_SECONDS', 6 * 3600))
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lower-case and split text into alphanumeric tokens"""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+class OpportunitySearchIndex:
+    """Inverted index over opportunities with BM25F ranking and prefix support"""
+
+    def __init__(self, field_boosts=None):
+        self.field_boosts = dict(field_boosts or FIELD_BOOSTS)
+        self.fields = list(self.field_boosts.keys())
+
+        # field -> term -> {doc_id: term frequency}
+        self._postings = {field: defaultdict(dict) for field in self.fields}
+        # field -> {doc_id: field length in tokens}
+        self._field_lengths = {field: {} for field in self.fields}
+        self._field_length_totals = {field: 0 for field in self.fields}
+        # doc_id -> stored metadata used for filtering and suggestions
+        self._docs = {}
+        # doc_id -> {field: set(terms)} so documents can be removed cheaply
+        self._doc_terms = {}
+
+        # Sorted vocabulary for prefix lookups, rebuilt lazily
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+        self._lock = threading.RLock()
+        self._refresh_guard = threading.Lock()
+        self._rebuild_thread = None
+        self.watermark = None
+        self.last_refresh = 0.0
+        self.last_full_build = 0.0
+        self.built = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def add(self, doc):
+        """
+        Add or replace a document in the index.
+
+        Args:
+            doc (dict): Opportunity fields; must contain ``id``. ``categories``
+                may be a comma-separated string or a list.
+        """
+        doc_id = doc['id']
+        with self._lock:
+            if doc_id in self._docs:
+                self._remove_locked(doc_id)
+
+            categories = doc.get('categories') or ''
+            if isinstance(categories, (list, tuple)):
+                categories = ','.join(categories)
+
+            values = {
+                'title': doc.get('title') or '',
+                'description': doc.get('description') or '',
+                'organization': doc.get('organization') or '',
+                'location': doc.get('location') or '',
+                'type': doc.get('type') or '',
+                'categories': categories,
+            }
+
+            doc_terms = {}
+            for field in self.fields:
+                tokens = tokenize(values.get(field, ''))
+                if field == 'description':
+                    tokens = tokens[:MAX_DESCRIPTION_TOKENS]
+                if not tokens:
+                    continue
+
+                counts = defaultdict(int)
+                for token in tokens:
+                    counts[token] += 1
+
+                postings = self._postings[field]
+                for term, tf in counts.items():
+                    if term not in postings:
+                        self._vocabulary_dirty = True
+                    postings[term][doc_id] = tf
+
+                self._field_lengths[field][doc_id] = len(tokens)
+                self._field_length_totals[field] += len(tokens)
+                doc_terms[field] = set(counts)
+
+            deadline = doc.get('deadline')
+            if isinstance(deadline, datetime):
+                deadline = deadline.isoformat()
+
+            self._doc_terms[doc_id] = doc_terms
+            self._docs[doc_id] = {
+                'title': values['title'],
+                'organization': values['organization'],
+                'location': values['location'],
+                'deadline': deadline,
+                'location_lower': values['location'].lower(),
+                'categories_lower': categories.lower(),
+            }
+
+    def remove(self, doc_id):
+        """Remove a document from the index if present"""
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id):
+        doc_terms = self._doc_terms.pop(doc_id, None)
+        self._docs.pop(doc_id, None)
+        if not doc_terms:
+            return
+
+        for field, terms in doc_terms.items():
+            postings = self._postings[field]
+            for term in terms:
+                docs = postings.get(term)
+                if docs is None:
+                    continue
+                docs.pop(doc_id, None)
+                if not docs:
+                    del postings[term]
+                    self._vocabulary_dirty = True
+            length = self._field_lengths[field].pop(doc_id, 0)
+            self._field_length_totals[field] -= length
+
+    def _ensure_vocabulary(self):
+        if self._vocabulary_dirty:
+            terms = set()
+            for postings in self._postings.values():
+                terms.update(postings.keys())
+            self._vocabulary = sorted(terms)
+            self._vocabulary_dirty = False
+
+    def _expand(self, term):
+        """Return [(vocabulary term, weight)] for a query term, including prefix matches"""
+        self._ensure_vocabulary()
+        expansions = []
+        start = bisect.bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            expansions.append((candidate, 1.0 if candidate == term else PREFIX_WEIGHT))
+        return expansions
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, query, fields=None, filter_fn=None):
+        """
+        Rank documents matching every term of ``query``.
+
+        Args:
+            query (str): Free-text query; each term is prefix-expanded
+            fields (list): Restrict matching to these fields (default: all)
+            filter_fn (callable): Optional predicate called with the stored
+                document metadata; documents returning False are dropped
+
+        Returns:
+            list: ``[(doc_id, score)]`` sorted by score descending, then deadline
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        fields = [f for f in (fields or self.fields) if f in self._postings]
+
+        with self._lock:
+            total_docs = len(self._docs)
+            if not total_docs:
+                return []
+
+            avg_lengths = {
+                field: (self._field_length_totals[field] / len(self._field_lengths[field]))
+                if self._field_lengths[field] else 1.0
+                for field in fields
+            }
+
+            candidates = None
+            # term position -> doc_id -> weighted tf, plus matched doc frequency
+            per_term_tf = []
+            per_term_df = []
+
+            for term in dict.fromkeys(terms):
+                weighted = defaultdict(float)
+                for expanded, weight in self._expand(term):
+                    for field in fields:
+                        docs = self._postings[field].get(expanded)
+                        if not docs:
+                            continue
+                        boost = self.field_boosts[field] * weight
+                        lengths = self._field_lengths[field]
+                        avg_length = avg_lengths[field]
+                        for doc_id, tf in docs.items():
+                            norm = 1.0 - BM25_B + BM25_B * lengths[doc_id] / avg_length
+                            weighted[doc_id] += boost * tf / norm
+
+                if not weighted:
+                    return []
+
+                matched = set(weighted)
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+
+                per_term_tf.append(weighted)
+                per_term_df.append(len(weighted))
+
+            results = []
+            for doc_id in candidates:
+                doc = self._docs[doc_id]
+                if filter_fn is not None and not filter_fn(doc):
+                    continue
+                score = 0.0
+                for weighted, df in zip(per_term_tf, per_term_df):
+                    idf = _idf(total_docs, df)
+                    tf = weighted[doc_id]
+                    score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1)
+                results.append((doc_id, score, doc['deadline'] or '9999-12-31'))
+
+        results.sort(key=lambda item: (-item[1], item[2]))
+        return [(doc_id, score) for doc_id, score, _ in results]
+
+    def get_document(self, doc_id):
+        """Return the stored metadata for a document, or None"""
+        return self._docs.get(doc_id)
+
+    # ------------------------------------------------------------------
+    # Database synchronisation
+    # ------------------------------------------------------------------
+
+    def build(self):
+        """Rebuild the index from every active opportunity. Requires an app context."""
+        start = time.time()
+        fresh, watermark = self._build_fresh()
+        self._swap(fresh, watermark)
+        logger.info(f"Search index built with {len(self._docs)} opportunities in {time.time() - start:.2f}s")
+
+    def _build_fresh(self):
+        """Index every active opportunity into a new, unshared index"""
+        from models import Opportunity
+
+        fresh = OpportunitySearchIndex(self.field_boosts)
+        watermark = None
+
+        for row in _opportunity_rows(Opportunity.query.filter(Opportunity.active == True)):
+            fresh.add(row)
+            if row['updated_at'] and (watermark is None or row['updated_at'] > watermark):
+                watermark = row['updated_at']
+
+        return fresh, watermark
+
+    def _swap(self, fresh, watermark):
+        """Replace the postings with those of a freshly built index"""
+        with self._lock:
+            self._postings = fresh._postings
+            self._field_lengths = fresh._field_lengths
+            self._field_length_totals = fresh._field_length_totals
+            self._docs = fresh._docs
+            self._doc_terms = fresh._doc_terms
+            self._vocabulary_dirty = True
+            self.watermark = watermark
+            self.last_refresh = self.last_full_build = time.time()
+            self.built = True
+
+    def _rebuild_in_background(self):
+        """
+        Start a full rebuild on a background thread. Requires an app context.
+
+        The new index is built without holding any lock, so searches and
+        incremental refreshes keep running against the current one. The swap
+        takes the refresh guard so that no incremental refresh straddles it;
+        rows changed after the rebuild's snapshot are newer than its
+        watermark and are picked up by the next refresh.
+        """
+        from flask import current_app
+
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return
+        app = current_app._get_current_object()
+
+        def rebuild():
+            with app.app_context():
+                start = time.time()
+                try:
+                    fresh, watermark = self._build_fresh()
+                    with self._refresh_guard:
+                        self._swap(fresh, watermark)
+                    logger.info(f"Search index rebuilt with {len(fresh)} opportunities "
+                                f"in {time.time() - start:.2f}s")
+                except Exception as e:
+                    logger.error(f"Error rebuilding search index: {str(e)}", exc_info=True)
+                    # Keep serving the current index; try again next interval
+                    self.last_full_build = time.time()
+
+        self._rebuild_thread = threading.Thread(target=rebuild, name='search-index-rebuild', daemon=True)
+        self._rebuild_thread.start()
+
+    def refresh(self):
+        """Apply rows changed since the last watermark. Requires an app context."""
+        from models import Opportunity
+
+        if not self.built:
+            return self.build()
+
+        query = Opportunity.query
+        if self.watermark is not None:
+            query = query.filter(Opportunity.updated_at > self.watermark)
+
+        changed = 0
+        watermark = self.watermark
+        for row in _opportunity_rows(query):
+            if row['active']:
+                self.add(row)
+            else:
+                self.remove(row['id'])
+            changed += 1
+            if row['updated_at'] and (watermark is None or row['updated_at'] > watermark):
+                watermark = row['updated_at']
+
+        with self._lock:
+            self.watermark = watermark
+            self.last_refresh = time.time()
+
+        if changed:
+            logger.info(f"Search index applied {changed} changed opportunities")
+
+    def maybe_refresh(self):
+        """
+        Refresh incrementally at most every REFRESH_INTERVAL seconds
+
+        Only an index that was never built is built inline; the periodic full
+        rebuild runs in the background while the incremental refresh keeps
+        the current index up to date.
+        """
+        now = time.time()
+        if now - self.last_refresh < REFRESH_INTERVAL:
+            return
+        if not self._refresh_guard.acquire(blocking=False):
+            return
+        try:
+            if not self.built:
+                self.build()
+            else:
+                if now - self.last_full_build >= FULL_REBUILD_INTERVAL:
+                    self._rebuild_in_background()
+                self.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing search index: {str(e)}", exc_info=True)
+            self.last_refresh = now
+        finally:
+            self._refresh_guard.release()
+
+
+def _idf(total_docs, df):
+    """BM25 inverse document frequency (always positive)"""
+    return math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+
+
+def _opportunity_rows(query):
+    """Yield plain dicts for the indexed columns of an Opportunity query"""
+    from models import Opportunity
+
+    columns = (
+        Opportunity.id, Opportunity.title, Opportunity.description,
+        Opportunity.organization, Opportunity.location, Opportunity.type,
+        Opportunity.categories, Opportunity.deadline, Opportunity.active,
+        Opportunity.updated_at,
+    )
+    for row in query.with_entities(*columns).yield_per(1000):
+        yield {
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'organization': row.organization,
+            'location': row.location,
+            'type': row.type,
+            'categories': row.categories,
+            'deadline': row.deadline,
+            'active': row.active,
+            'updated_at': row.updated_at,
+        }
+
+
+# Process-wide index shared by the search routes
+search_index = OpportunitySearchIndex()
+
+
+def get_search_index():
+    """Return the shared index, refreshing it if it is stale"""
+    search_index.maybe_refresh()
+    return search_index
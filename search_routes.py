@@ -11,6 +11,7 @@ from flask import Blueprint, request, jsonify, render_template, current_app, g
 from flask_login import login_required, current_user
 from sqlalchemy import or_, and_
 from models import Opportunity, db
+from search_index import search_index, get_search_index
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -152,6 +153,14 @@ def search_opportunities(query='', medium=None, location=None, deadline_start=No
         tuple: (list of opportunity dicts, total count)
     """
     try:
+        # Ranked text search is served from the in-process inverted index
+        if query:
+            index = get_search_index()
+            if index.built:
+                return search_opportunities_from_index(index, query, medium, location,
+                                                       deadline_start, deadline_end,
+                                                       page, per_page)
+
         # Start with a base query for active opportunities
         search_query = Opportunity.query.filter(Opportunity.active == True)
         
@@ -209,6 +218,63 @@ def search_opportunities(query='', medium=None, location=None, deadline_start=No
                                              deadline_end, page, per_page)
 
 
+def search_opportunities_from_index(index, query, medium=None, location=None, deadline_start=None,
+                                   deadline_end=None, page=1, per_page=20):
+    """
+    Search opportunities using the inverted index, ranked by BM25.
+    
+    Filters are applied against the metadata held in the index, so only the
+    requested page of rows is loaded from the database.
+    
+    Uses the same parameters as search_opportunities.
+    """
+    medium = medium.lower() if medium else None
+    location = location.lower() if location else None
+    start = _normalize_deadline(deadline_start)
+    end = _normalize_deadline(deadline_end)
+    
+    def matches_filters(doc):
+        if medium and medium not in doc['categories_lower']:
+            return False
+        if location and location not in doc['location_lower']:
+            return False
+        if start or end:
+            deadline = doc['deadline']
+            if not deadline:
+                return False
+            if start and deadline < start:
+                return False
+            if end and deadline > end:
+                return False
+        return True
+    
+    ranked = index.search(query, filter_fn=matches_filters)
+    total = len(ranked)
+    
+    # Load only the rows for the requested page, preserving rank order
+    offset = (page - 1) * per_page
+    page_ids = [doc_id for doc_id, _ in ranked[offset:offset + per_page]]
+    if not page_ids:
+        return [], total
+    
+    rows = Opportunity.query.filter(Opportunity.id.in_(page_ids)).all()
+    by_id = {opp.id: opp for opp in rows}
+    results = [by_id[doc_id].to_dict() for doc_id in page_ids if doc_id in by_id]
+    
+    return results, total
+
+
+def _normalize_deadline(value):
+    """Normalize an ISO deadline parameter so it compares with indexed deadlines"""
+    if not value:
+        return None
+    try:
+        from datetime import datetime
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None).isoformat()
+    except ValueError:
+        return value
+
+
 def search_opportunities_from_cache(query='', medium=None, location=None, deadline_start=None, 
                                   deadline_end=None, page=1, per_page=20):
     """
@@ -323,6 +389,10 @@ def get_search_suggestions(query, limit=5):
         list: List of suggestion objects with title and type properties
     """
     try:
+        index = get_search_index()
+        if index.built:
+            return get_search_suggestions_from_index(index, query, limit)
+        
         # Search for matching opportunities
         suggestions = []
         
@@ -385,6 +455,49 @@ def get_search_suggestions(query, limit=5):
         return []
 
 
+def get_search_suggestions_from_index(index, query, limit=5):
+    """
+    Get search suggestions from the inverted index without touching the database.
+    
+    Title matches come first, then organization and location matches, mirroring
+    get_search_suggestions.
+    """
+    suggestions = []
+    seen_ids = set()
+    
+    for field, suggestion_type in (('title', 'opportunity'),
+                                   ('organization', 'organization'),
+                                   ('location', 'location')):
+        if len(suggestions) >= limit:
+            break
+        
+        for doc_id, _ in index.search(query, fields=[field]):
+            if len(suggestions) >= limit:
+                break
+            if doc_id in seen_ids:
+                continue
+            seen_ids.add(doc_id)
+            
+            doc = index.get_document(doc_id)
+            if suggestion_type == 'opportunity':
+                suggestions.append({
+                    'id': doc_id,
+                    'title': doc['title'],
+                    'type': suggestion_type,
+                    'url': f'/opportunity/{doc_id}'
+                })
+            else:
+                suggestions.append({
+                    'id': doc_id,
+                    'title': doc[field],
+                    'subtitle': doc['title'],
+                    'type': suggestion_type,
+                    'url': f'/opportunity/{doc_id}'
+                })
+    
+    return suggestions
+
+
 def get_filter_options():
     """
     Get available filter options for the search form dropdowns.
@@ -429,4 +542,13 @@ def get_filter_options():
 def init_app(app):
     """Initialize the search blueprint with the app"""
     app.register_blueprint(search_bp)
+    
+    # Build the search index up front so that, with gunicorn's preload_app,
+    # the postings are created once in the master and shared by every worker
+    try:
+        with app.app_context():
+            search_index.build()
+    except Exception as e:
+        logger.warning(f"Search index could not be built at startup: {str(e)}")
+    
     logger.info("Search blueprint registered successfully")
\ No newline at end of file
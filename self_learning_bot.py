@@ -34,6 +34,33 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 MODEL_PATH = os.path.join(MODEL_DIR, 'art_recommender.pkl')
 VECTORIZER_PATH = os.path.join(MODEL_DIR, 'text_vectorizer.pkl')
 STATS_PATH = os.path.join(MODEL_DIR, 'feature_stats.pkl')
+SCHEMA_PATH = os.path.join(MODEL_DIR, 'feature_schema.pkl')
+FEATURE_MATRIX_PATH = os.path.join(MODEL_DIR, 'opportunity_features.npz')
+TRAINING_SET_PATH = os.path.join(MODEL_DIR, 'training_set.npz')
+
+# Columns of the engineered DataFrame that are not model inputs
+NON_FEATURE_COLUMNS = ['id', 'title', 'description', 'url', 'deadline', 
+                       'source', 'location', 'category', 'tags', 'created_at', 
+                       'updated_at', 'text_content', 'source_encoded', 'location_encoded']
+
+# Numeric features normalized with frozen statistics
+NUMERIC_COLUMNS = ['days_to_deadline', 'days_since_creation', 'feedback_count', 
+                   'avg_rating', 'rating_variance']
+
+# Categorical features one-hot encoded against fixed vocabularies
+CATEGORICAL_COLUMNS = {
+    'source': 'source_encoded',
+    'location': 'location_encoded',
+    'category': 'category',
+}
+
+# Bump whenever the feature layout produced by FeatureSchema changes
+FEATURE_SCHEMA_VERSION = 1
+
+# Vocabulary limits for categorical features; rarer values use the unknown bucket
+MAX_VOCABULARY_SIZE = 50
+MIN_VOCABULARY_COUNT = 2
+UNKNOWN_VALUE = '__unknown__'
 
 # Configure logging
 logging.basicConfig(
@@ -51,6 +78,127 @@ from sklearn.ensemble import RandomForestClassifier
 db = None  # Will be set by the initialize_bot function
 
 
+class FeatureSchemaMismatch(ValueError):
+    """Raised when inference features no longer match the frozen feature schema"""
+
+
+class FeatureSchema:
+    """
+    Frozen description of the model's feature layout
+    
+    Holds the categorical vocabularies (with an unknown bucket), the
+    normalization statistics for numeric features and the final column order.
+    It is fitted once at training time, saved with the model artifacts and
+    reused at inference so the columns are deterministic and nothing is
+    re-fitted per request.
+    """
+    
+    def __init__(self, 
+                 vocabularies: Dict[str, List[str]], 
+                 stats: Dict[str, Dict[str, float]], 
+                 text_feature_count: int,
+                 version: int = FEATURE_SCHEMA_VERSION):
+        self.vocabularies = vocabularies
+        self.stats = stats
+        self.text_feature_count = text_feature_count
+        self.version = version
+        self.columns = self._build_columns()
+    
+    def _build_columns(self) -> List[str]:
+        """Build the ordered list of model input columns"""
+        columns = [f'text_{i}' for i in range(self.text_feature_count)]
+        for name, values in self.vocabularies.items():
+            columns.extend(f'{name}_{value}' for value in values + [UNKNOWN_VALUE])
+        columns.extend(NUMERIC_COLUMNS)
+        columns.extend(f'{column}_norm' for column in NUMERIC_COLUMNS)
+        return columns
+    
+    @classmethod
+    def fit(cls, features_df: pd.DataFrame, text_feature_count: int) -> 'FeatureSchema':
+        """
+        Fit vocabularies and normalization statistics from a features DataFrame
+        
+        Args:
+            features_df: DataFrame with raw categorical and numeric features
+            text_feature_count: Number of text features produced by the vectorizer
+            
+        Returns:
+            Fitted FeatureSchema
+        """
+        vocabularies = {}
+        for name, column in CATEGORICAL_COLUMNS.items():
+            counts = features_df[column].value_counts()
+            counts = counts[counts >= MIN_VOCABULARY_COUNT].head(MAX_VOCABULARY_SIZE)
+            vocabularies[name] = sorted(str(value) for value in counts.index if value != UNKNOWN_VALUE)
+        
+        stats = {
+            column: {
+                'mean': float(features_df[column].mean()),
+                'std': float(features_df[column].std() or 1.0),  # Avoid division by zero
+                'min': float(features_df[column].min()),
+                'max': float(features_df[column].max())
+            }
+            for column in NUMERIC_COLUMNS
+        }
+        
+        return cls(vocabularies, stats, text_feature_count)
+    
+    def transform(self, features_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Encode categorical and normalized numeric features using the frozen schema
+        
+        Args:
+            features_df: DataFrame with raw categorical and numeric features
+            
+        Returns:
+            DataFrame with one column per schema column (text columns excluded)
+        """
+        encoded = {}
+        
+        for name, column in CATEGORICAL_COLUMNS.items():
+            vocabulary = self.vocabularies.get(name, [])
+            values = features_df[column].astype(str).to_numpy()
+            known = np.isin(values, vocabulary)
+            for value in vocabulary:
+                encoded[f'{name}_{value}'] = values == value
+            encoded[f'{name}_{UNKNOWN_VALUE}'] = ~known
+        
+        for column in NUMERIC_COLUMNS:
+            stats = self.stats[column]
+            values = features_df[column].to_numpy(dtype=float)
+            encoded[column] = values
+            if stats['max'] > stats['min']:
+                encoded[f'{column}_norm'] = (values - stats['min']) / (stats['max'] - stats['min'])
+            else:
+                encoded[f'{column}_norm'] = np.full(len(values), 0.5)  # Default to middle value if there's no range
+        
+        return pd.DataFrame(encoded, index=features_df.index)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the schema to plain data for persistence"""
+        return {
+            'version': self.version,
+            'vocabularies': self.vocabularies,
+            'stats': self.stats,
+            'text_feature_count': self.text_feature_count,
+            'columns': self.columns
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional['FeatureSchema']:
+        """Restore a schema, or return None if it was written by an incompatible version"""
+        if data.get('version') != FEATURE_SCHEMA_VERSION:
+            logger.warning(f"Ignoring feature schema version {data.get('version')}, expected {FEATURE_SCHEMA_VERSION}")
+            return None
+        
+        schema = cls(data['vocabularies'], data['stats'], data['text_feature_count'], data['version'])
+        if schema.columns != data['columns']:
+            logger.warning("Ignoring feature schema with inconsistent column order")
+            return None
+        
+        return schema
+
+
 class ArtRecommendationBot:
     """Main class for the Art Self-Learning Bot"""
     
@@ -59,8 +207,13 @@ class ArtRecommendationBot:
         self.model = None
         self.vectorizer = None
         self.feature_stats = None
+        self.feature_schema = None
         self.db = None
         
+        # Precomputed opportunity feature matrix and cached model scores
+        self.feature_matrix = None
+        self._scores = None
+        
         # Load existing model if available
         self.load_model_artifacts()
     
@@ -84,6 +237,26 @@ class ArtRecommendationBot:
                     self.feature_stats = pickle.load(f)
                 
                 logger.info("Loaded existing feature statistics")
+            
+            if os.path.exists(SCHEMA_PATH):
+                with open(SCHEMA_PATH, 'rb') as f:
+                    self.feature_schema = FeatureSchema.from_dict(pickle.load(f))
+                
+                if self.feature_schema is not None:
+                    self.feature_stats = self.feature_schema.stats
+                    logger.info("Loaded existing feature schema")
+            
+            if os.path.exists(FEATURE_MATRIX_PATH):
+                with np.load(FEATURE_MATRIX_PATH, allow_pickle=False) as data:
+                    self.feature_matrix = {
+                        'ids': data['ids'],
+                        'X': data['X'],
+                        'columns': data['columns'].tolist(),
+                        'signature': data['signature'].item()
+                    }
+                self._scores = None
+                
+                logger.info(f"Loaded opportunity feature matrix with {len(self.feature_matrix['ids'])} rows")
         
         except Exception as e:
             logger.error(f"Error loading model artifacts: {e}")
@@ -109,6 +282,12 @@ class ArtRecommendationBot:
                     pickle.dump(self.feature_stats, f)
                 
                 logger.info("Saved feature statistics to disk")
+            
+            if self.feature_schema is not None:
+                with open(SCHEMA_PATH, 'wb') as f:
+                    pickle.dump(self.feature_schema.to_dict(), f)
+                
+                logger.info("Saved feature schema to disk")
         
         except Exception as e:
             logger.error(f"Error saving model artifacts: {e}")
@@ -169,17 +348,33 @@ class ArtRecommendationBot:
     
     def engineer_features(self, 
                           opportunities_df: pd.DataFrame, 
-                          feedback_df: pd.DataFrame = None) -> pd.DataFrame:
+                          feedback_df: pd.DataFrame = None,
+                          fit: bool = False) -> pd.DataFrame:
         """
         Engineer features for opportunities
         
+        Categorical encodings and normalization come from the frozen
+        FeatureSchema, so the feature columns are identical at training and
+        inference time. The schema is only fitted when ``fit`` is True; at
+        inference a missing schema, or features that no longer fit it, raise
+        FeatureSchemaMismatch, and retraining refits it.
+        
         Args:
             opportunities_df: DataFrame of opportunities
             feedback_df: Optional DataFrame of user feedback
+            fit: Fit a new feature schema from this data (training only)
             
         Returns:
             DataFrame with engineered features
+            
+        Raises:
+            FeatureSchemaMismatch: If no schema was saved with the model, or the
+                text vectorizer does not match it
         """
+        # A model trained before schemas were saved has no frozen layout to match
+        if not fit and self.feature_schema is None:
+            raise FeatureSchemaMismatch("No feature schema saved with the model")
+        
         # Create a copy of the opportunities DataFrame
         features_df = opportunities_df.copy()
         
@@ -211,6 +406,8 @@ class ArtRecommendationBot:
         
         # Vectorize text content if vectorizer exists, otherwise create new one
         if self.vectorizer is None:
+            if not fit:
+                raise FeatureSchemaMismatch("No text vectorizer for the frozen feature schema")
             self.vectorizer = TfidfVectorizer(
                 max_features=100,
                 stop_words='english',
@@ -226,22 +423,12 @@ class ArtRecommendationBot:
         text_feature_names = [f'text_{i}' for i in range(text_features.shape[1])]
         
         # Add text features to the dataframe
-        text_features_df = pd.DataFrame(text_features, columns=text_feature_names)
+        text_features_df = pd.DataFrame(text_features, columns=text_feature_names, index=features_df.index)
         features_df = pd.concat([features_df, text_features_df], axis=1)
         
-        # Source-based features (one-hot encoding)
+        # Normalized categorical values looked up in the schema vocabularies
         features_df['source_encoded'] = features_df['source'].str.lower()
-        source_dummies = pd.get_dummies(features_df['source_encoded'], prefix='source')
-        features_df = pd.concat([features_df, source_dummies], axis=1)
-        
-        # Location-based features (one-hot encoding)
         features_df['location_encoded'] = features_df['location'].str.lower()
-        location_dummies = pd.get_dummies(features_df['location_encoded'], prefix='location')
-        features_df = pd.concat([features_df, location_dummies], axis=1)
-        
-        # Category-based features (one-hot encoding)
-        category_dummies = pd.get_dummies(features_df['category'], prefix='category')
-        features_df = pd.concat([features_df, category_dummies], axis=1)
         
         # If feedback data is provided, add popularity and engagement features
         if feedback_df is not None and not feedback_df.empty:
@@ -262,33 +449,79 @@ class ArtRecommendationBot:
             features_df['avg_rating'] = 2.5  # Neutral rating
             features_df['rating_variance'] = 0
         
-        # Update feature statistics
-        numeric_columns = ['days_to_deadline', 'days_since_creation', 'feedback_count', 
-                          'avg_rating', 'rating_variance']
+        # Fit the schema only for training; inference reuses the frozen one
+        schema = self.feature_schema
+        if fit:
+            schema = FeatureSchema.fit(features_df, len(text_feature_names))
+            self.feature_schema = schema
+            self.feature_stats = schema.stats
+            logger.info(f"Fitted feature schema with {len(schema.columns)} columns")
+        elif schema.text_feature_count != len(text_feature_names):
+            raise FeatureSchemaMismatch(
+                f"Vectorizer produces {len(text_feature_names)} text features, "
+                f"feature schema expects {schema.text_feature_count}"
+            )
         
-        # Calculate statistics for normalization
-        self.feature_stats = {
-            column: {
-                'mean': features_df[column].mean(),
-                'std': features_df[column].std() or 1.0,  # Avoid division by zero
-                'min': features_df[column].min(),
-                'max': features_df[column].max()
-            }
-            for column in numeric_columns
-        }
-        
-        # Normalize numeric features
-        for column in numeric_columns:
-            stats = self.feature_stats[column]
-            if stats['max'] > stats['min']:
-                features_df[f'{column}_norm'] = (features_df[column] - stats['min']) / (stats['max'] - stats['min'])
-            else:
-                features_df[f'{column}_norm'] = 0.5  # Default to middle value if there's no range
+        # One-hot and normalized numeric features in schema order
+        encoded_df = schema.transform(features_df)
+        features_df = features_df.drop(columns=[c for c in encoded_df.columns if c in features_df.columns])
+        features_df = pd.concat([features_df, encoded_df], axis=1)
         
         logger.info(f"Engineered features for {len(features_df)} opportunities")
         
         return features_df
     
+    def get_feature_columns(self, features_df: pd.DataFrame = None) -> List[str]:
+        """
+        Get the ordered model input columns
+        
+        Args:
+            features_df: Optional DataFrame with engineered features, used only
+                when no feature schema has been fitted
+            
+        Returns:
+            List of feature column names in schema order
+        """
+        if self.feature_schema is not None:
+            return list(self.feature_schema.columns)
+        return [col for col in features_df.columns if col not in NON_FEATURE_COLUMNS]
+    
+    def build_training_rows(self, 
+                            opportunity_ids: np.ndarray, 
+                            feature_values: np.ndarray, 
+                            feedback_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Join feedback rows to opportunity feature rows with an indexed lookup
+        
+        Args:
+            opportunity_ids: Opportunity IDs, one per row of feature_values
+            feature_values: Feature matrix aligned with opportunity_ids
+            feedback_df: DataFrame with user feedback
+            
+        Returns:
+            Tuple of (X, y, feedback_ids) for feedback rows whose opportunity exists
+        """
+        if feedback_df is None or feedback_df.empty:
+            return (np.zeros((0, feature_values.shape[1]), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        
+        # First row wins for duplicated opportunity IDs
+        index = pd.Index(opportunity_ids)
+        if not index.is_unique:
+            keep = ~index.duplicated()
+            index = index[keep]
+            feature_values = feature_values[keep]
+        
+        positions = index.get_indexer(feedback_df['opportunity_id'].to_numpy())
+        found = positions >= 0
+        
+        X = feature_values[positions[found]]
+        # Convert rating (1-5) to binary target (rating >= 3 is positive)
+        y = (feedback_df['rating'].to_numpy()[found] >= 3).astype(np.int64)
+        feedback_ids = feedback_df['id'].to_numpy(dtype=np.int64)[found]
+        
+        return X, y, feedback_ids
+    
     def prepare_training_data(self, 
                               features_df: pd.DataFrame, 
                               feedback_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
@@ -303,34 +536,13 @@ class ArtRecommendationBot:
             Tuple of (X, y) for training
         """
         # Get all feature columns (exclude non-feature columns)
-        exclude_columns = ['id', 'title', 'description', 'url', 'deadline', 
-                          'source', 'location', 'category', 'tags', 'created_at', 
-                          'updated_at', 'text_content', 'source_encoded', 'location_encoded']
-        
-        feature_columns = [col for col in features_df.columns if col not in exclude_columns]
-        
-        # Create training data from feedback
-        X_rows = []
-        y_values = []
-        
-        for _, feedback in feedback_df.iterrows():
-            opportunity_id = feedback['opportunity_id']
-            
-            # Find the opportunity in features_df
-            opportunity = features_df[features_df['id'] == opportunity_id]
-            
-            if not opportunity.empty:
-                # Get features for this opportunity
-                X_row = opportunity[feature_columns].values[0]
-                
-                # Convert rating (1-5) to binary target (rating >= 3 is positive)
-                y_value = 1 if feedback['rating'] >= 3 else 0
-                
-                X_rows.append(X_row)
-                y_values.append(y_value)
+        feature_columns = self.get_feature_columns(features_df)
         
-        X = np.array(X_rows)
-        y = np.array(y_values)
+        X, y, _ = self.build_training_rows(
+            features_df['id'].to_numpy(),
+            features_df[feature_columns].to_numpy(dtype=np.float32),
+            feedback_df
+        )
         
         # Check if we have enough data
         if len(y) < 10:
@@ -341,6 +553,70 @@ class ArtRecommendationBot:
         
         return X, y
     
+    def load_training_set(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the cached training set if it matches the current feature schema
+        
+        Returns:
+            Dictionary with X, y and feedback_ids arrays, or None if unusable
+        """
+        if self.feature_schema is None or not os.path.exists(TRAINING_SET_PATH):
+            return None
+        
+        try:
+            with np.load(TRAINING_SET_PATH, allow_pickle=False) as data:
+                training_set = {
+                    'X': data['X'],
+                    'y': data['y'],
+                    'feedback_ids': data['feedback_ids'],
+                    'columns': data['columns'].tolist()
+                }
+        except Exception as e:
+            logger.error(f"Error loading cached training set: {e}")
+            return None
+        
+        if training_set['columns'] != self.feature_schema.columns:
+            logger.info("Cached training set was built with a different feature schema, ignoring it")
+            return None
+        
+        return training_set
+    
+    def save_training_set(self, X: np.ndarray, y: np.ndarray, feedback_ids: np.ndarray) -> None:
+        """Persist the training set so later retrains only add new feedback"""
+        try:
+            np.savez_compressed(
+                TRAINING_SET_PATH,
+                X=X.astype(np.float32),
+                y=y.astype(np.int64),
+                feedback_ids=feedback_ids.astype(np.int64),
+                columns=np.array(self.feature_schema.columns, dtype=str)
+            )
+            logger.info(f"Saved training set with {len(y)} samples")
+        except Exception as e:
+            logger.error(f"Error saving training set: {e}")
+    
+    def load_feedback_ratings(self) -> pd.DataFrame:
+        """
+        Load the ID, opportunity and rating of every feedback row
+        
+        Only integer columns are read, so this is cheap enough to compare the
+        cached training set against the current feedback on every retrain.
+        
+        Returns:
+            DataFrame of feedback ratings
+        """
+        from models import Feedback
+        
+        rows = Feedback.query.with_entities(
+            Feedback.id, Feedback.user_id, Feedback.opportunity_id, Feedback.rating
+        ).all()
+        
+        return pd.DataFrame(
+            [{'id': r.id, 'user_id': r.user_id, 'opportunity_id': r.opportunity_id, 'rating': r.rating}
+             for r in rows],
+            columns=['id', 'user_id', 'opportunity_id', 'rating']
+        )
+    
     def train_model(self, X: np.ndarray, y: np.ndarray) -> Optional[RandomForestClassifier]:
         """
         Train recommendation model
@@ -380,6 +656,7 @@ class ArtRecommendationBot:
             
             # Save the model
             self.model = model
+            self._scores = None
             self.save_model_artifacts()
             
             return model
@@ -447,182 +724,302 @@ class ArtRecommendationBot:
         
         return anomalies
     
-    def get_recommendations(self, 
-                           user_id: int, 
-                           limit: int = 10) -> List[Dict[str, Any]]:
+    def get_opportunity_signature(self) -> str:
         """
-        Get personalized recommendations for a user
+        Get a cheap signature of the opportunity table
+        
+        The signature changes whenever opportunities are added, updated or
+        removed, and is used to decide whether the precomputed feature matrix
+        is stale. Feedback is deliberately left out so that new ratings do
+        not rebuild the matrix on the request path; the feedback-derived
+        columns are refreshed when the recommender is retrained.
+        
+        Returns:
+            Signature string
+        """
+        from models import db, Opportunity
+        
+        opp_count, opp_updated = db.session.query(
+            db.func.count(Opportunity.id), db.func.max(Opportunity.updated_at)
+        ).one()
+        
+        return f"{opp_count}:{opp_updated}"
+    
+    def refresh_feature_matrix(self, force: bool = False) -> bool:
+        """
+        Rebuild the persisted opportunity feature matrix if opportunities changed
+        
+        The matrix holds one float32 row per opportunity in the feature schema's
+        column order, keyed by the ``ids`` array. Its feedback-derived columns
+        are only brought up to date by a forced rebuild, which retraining does.
         
         Args:
-            user_id: User ID to get recommendations for
-            limit: Maximum number of recommendations to return
+            force: Rebuild even if the signature is unchanged
             
         Returns:
-            List of recommended opportunities
+            bool: True if the matrix was rebuilt
+            
+        Raises:
+            FeatureSchemaMismatch: If the features no longer fit the frozen schema
+        """
+        signature = self.get_opportunity_signature()
+        if (not force and self.feature_matrix is not None
+                and self.feature_matrix['signature'] == signature
+                and self.feature_schema is not None
+                and self.feature_matrix['columns'] == self.feature_schema.columns):
+            return False
+        
+        opportunities_df, feedback_df = self.load_data()
+        if opportunities_df.empty:
+            self.feature_matrix = None
+            self._scores = None
+            return False
+        
+        features_df = self.engineer_features(opportunities_df, feedback_df)
+        
+        # Columns come straight from the frozen schema used for training
+        columns = self.get_feature_columns(features_df)
+        X = features_df[columns].to_numpy(dtype=np.float32)
+        ids = features_df['id'].to_numpy(dtype=np.int64)
+        
+        self.feature_matrix = {
+            'ids': ids,
+            'X': X,
+            'columns': list(columns),
+            'signature': signature
+        }
+        self._scores = None
+        
+        try:
+            np.savez_compressed(
+                FEATURE_MATRIX_PATH,
+                ids=ids,
+                X=X,
+                columns=np.array(columns, dtype=str),
+                signature=np.array(signature)
+            )
+        except Exception as e:
+            logger.error(f"Error saving opportunity feature matrix: {e}")
+        
+        logger.info(f"Refreshed opportunity feature matrix: {X.shape[0]} opportunities x {X.shape[1]} features")
+        return True
+    
+    def score_opportunities(self) -> Optional[np.ndarray]:
+        """
+        Score every opportunity in the feature matrix with a single model call
+        
+        The model inputs do not depend on the user, so the scores are cached
+        until the feature matrix or the model changes.
+        
+        Returns:
+            Array of positive-class probabilities aligned with the matrix ids
+            
+        Raises:
+            FeatureSchemaMismatch: If the model was trained on a different number of features
+        """
+        if self.model is None or self.feature_matrix is None:
+            return None
+        
+        columns = self.feature_matrix['columns']
+        expected = getattr(self.model, 'n_features_in_', len(columns))
+        if expected != len(columns):
+            raise FeatureSchemaMismatch(
+                f"Model expects {expected} features, feature matrix has {len(columns)}"
+            )
+        
+        if self._scores is None:
+            X = self.feature_matrix['X']
+            if len(X) == 0:
+                self._scores = np.zeros(0, dtype=np.float32)
+            elif hasattr(self.model, 'predict_proba'):
+                # Get probability of positive class (index 1)
+                self._scores = self.model.predict_proba(X)[:, 1]
+            else:
+                # Fallback to binary predictions
+                self._scores = self.model.predict(X).astype(np.float32)
+        
+        return self._scores
+    
+    def get_recommendations_batch(self, 
+                                  user_ids: List[int], 
+                                  limit: int = 10) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Get personalized recommendations for many users in one pass
+        
+        Opportunities are scored once against the precomputed feature matrix;
+        each user then only needs a mask over already-rated opportunities and
+        a top-k selection. All feedback and recommended opportunities are
+        loaded with one query each.
+        
+        Args:
+            user_ids: User IDs to get recommendations for
+            limit: Maximum number of recommendations per user
+            
+        Returns:
+            Dictionary mapping user ID to a list of recommended opportunities
         """
         # Import models in context to avoid circular imports
         from models import User, Feedback, Opportunity
         
+        results = {}
+        
         try:
             # Check if model is loaded
             if self.model is None or self.vectorizer is None:
                 logger.warning("Model or vectorizer not loaded, trying to load...")
                 self.load_model_artifacts()
-                
-                if self.model is None:
-                    logger.warning("No trained model available, using recent opportunities")
-                    # Return recent opportunities (fallback)
-                    recent_opportunities = Opportunity.query.order_by(
-                        Opportunity.created_at.desc()
-                    ).limit(limit).all()
-                    
-                    return [opp.to_dict() for opp in recent_opportunities]
             
-            # Get user instance
-            user = User.query.get(user_id)
-            if not user:
-                logger.error(f"User {user_id} not found")
-                return []
+            if self.model is None:
+                logger.warning("No trained model available, using recent opportunities")
+                return self._recent_opportunities(user_ids, limit)
             
-            # Get user's previous feedback
-            user_feedback = Feedback.query.filter_by(user_id=user_id).all()
+            # Only keep users that exist
+            existing_ids = {
+                row[0] for row in User.query.filter(User.id.in_(user_ids)).with_entities(User.id).all()
+            }
+            for user_id in user_ids:
+                if user_id not in existing_ids:
+                    logger.error(f"User {user_id} not found")
+                    results[user_id] = []
+            
+            user_ids = [user_id for user_id in user_ids if user_id in existing_ids]
+            if not user_ids:
+                return results
             
-            # Get user's previously viewed opportunities
-            viewed_opportunity_ids = [fb.opportunity_id for fb in user_feedback]
+            # Get the users' previous feedback in one query
+            viewed_by_user = {user_id: [] for user_id in user_ids}
+            feedback_rows = Feedback.query.filter(
+                Feedback.user_id.in_(user_ids)
+            ).with_entities(Feedback.user_id, Feedback.opportunity_id).all()
+            for fb_user_id, opportunity_id in feedback_rows:
+                viewed_by_user[fb_user_id].append(opportunity_id)
             
-            # Get all opportunities
-            opportunities = Opportunity.query.all()
+            # Make sure the feature matrix reflects the current opportunities
+            try:
+                self.refresh_feature_matrix()
+                scores = self.score_opportunities()
+            except FeatureSchemaMismatch as e:
+                logger.error(f"Feature schema mismatch, using recent opportunities until the recommender is retrained: {e}")
+                return {**results, **self._recent_opportunities(user_ids, limit)}
             
             # No opportunities available
-            if not opportunities:
+            if scores is None or len(scores) == 0:
                 logger.warning("No opportunities available in the database")
-                return []
-            
-            # Convert opportunities to DataFrame for feature engineering
-            opportunities_data = []
-            for opp in opportunities:
-                opp_dict = {
-                    'id': opp.id,
-                    'title': opp.title,
-                    'description': opp.description or '',
-                    'url': opp.url or '',
-                    'deadline': opp.deadline,
-                    'source': opp.source or '',
-                    'location': opp.location or '',
-                    'category': opp.category or 'art',
-                    'tags': opp.tags or '',
-                    'created_at': opp.created_at,
-                    'updated_at': opp.updated_at
-                }
-                opportunities_data.append(opp_dict)
-            
-            opportunities_df = pd.DataFrame(opportunities_data)
-            
-            # Convert user feedback to DataFrame
-            feedback_data = []
-            for fb in user_feedback:
-                fb_dict = {
-                    'id': fb.id,
-                    'user_id': fb.user_id,
-                    'opportunity_id': fb.opportunity_id,
-                    'rating': fb.rating,
-                    'comment': fb.comment or '',
-                    'created_at': fb.created_at
-                }
-                feedback_data.append(fb_dict)
+                return {**results, **{user_id: [] for user_id in user_ids}}
             
-            all_feedback_df = pd.DataFrame(feedback_data)
+            ids = self.feature_matrix['ids']
+            top_ids_by_user = {}
             
-            # Engineer features for opportunities
-            features_df = self.engineer_features(opportunities_df, all_feedback_df)
-            
-            # Get all feature columns (exclude non-feature columns)
-            exclude_columns = ['id', 'title', 'description', 'url', 'deadline', 
-                              'source', 'location', 'category', 'tags', 'created_at', 
-                              'updated_at', 'text_content', 'source_encoded', 'location_encoded']
-            
-            feature_columns = [col for col in features_df.columns if col not in exclude_columns]
-            
-            # If we have a trained model, use it for predictions
-            if self.model is not None:
+            for user_id in user_ids:
+                viewed_opportunity_ids = viewed_by_user[user_id]
+                
                 # Filter out opportunities that the user has already rated/viewed
-                unrated_df = features_df[~features_df['id'].isin(viewed_opportunity_ids)]
+                candidates = np.flatnonzero(~np.isin(ids, viewed_opportunity_ids))
                 
-                if unrated_df.empty:
+                if len(candidates) == 0:
                     logger.warning(f"User {user_id} has viewed all available opportunities")
                     # Return random unviewed opportunities
                     random_opportunities = Opportunity.query.filter(
                         ~Opportunity.id.in_(viewed_opportunity_ids)
                     ).order_by(Opportunity.created_at.desc()).limit(limit).all()
                     
-                    return [opp.to_dict() for opp in random_opportunities]
-                
-                # Get features for prediction
-                X_pred = unrated_df[feature_columns].values
-                
-                # Predict probability of positive rating
-                if hasattr(self.model, 'predict_proba'):
-                    pred_proba = self.model.predict_proba(X_pred)
-                    # Get probability of positive class (index 1)
-                    positive_proba = pred_proba[:, 1]
-                else:
-                    # Fallback to binary predictions
-                    positive_proba = self.model.predict(X_pred)
-                
-                # Add predictions to DataFrame
-                unrated_df['prediction_score'] = positive_proba
+                    results[user_id] = [opp.to_dict() for opp in random_opportunities]
+                    continue
                 
-                # Sort by prediction score and get top opportunities
-                top_opportunities = unrated_df.sort_values('prediction_score', ascending=False).head(limit)
+                # Select the top scores without sorting the whole slice
+                candidate_scores = scores[candidates]
+                k = min(limit, len(candidates))
+                top = np.argpartition(-candidate_scores, k - 1)[:k]
+                top = top[np.argsort(-candidate_scores[top], kind='stable')]
                 
-                # Convert top opportunities to list of dictionaries
+                top_ids_by_user[user_id] = [
+                    (int(ids[candidates[i]]), float(candidate_scores[i])) for i in top
+                ]
+            
+            # Load every recommended opportunity in a single query
+            needed_ids = {opp_id for top in top_ids_by_user.values() for opp_id, _ in top}
+            opportunities = {}
+            if needed_ids:
+                opportunities = {
+                    opp.id: opp for opp in Opportunity.query.filter(Opportunity.id.in_(needed_ids)).all()
+                }
+            
+            for user_id, top in top_ids_by_user.items():
                 recommendations = []
-                for _, row in top_opportunities.iterrows():
-                    opp = Opportunity.query.get(row['id'])
+                for opp_id, score in top:
+                    opp = opportunities.get(opp_id)
                     if opp:
                         opp_dict = opp.to_dict()
                         # Add prediction score (confidence)
-                        opp_dict['confidence'] = float(row['prediction_score'])
+                        opp_dict['confidence'] = score
                         recommendations.append(opp_dict)
                 
-                logger.info(f"Generated {len(recommendations)} personalized recommendations for user {user_id}")
-                
-                return recommendations
-            else:
-                logger.warning("No model available, using recent opportunities")
-                # Fallback to recent opportunities
-                recent_opportunities = Opportunity.query.order_by(
-                    Opportunity.created_at.desc()
-                ).limit(limit).all()
-                
-                return [opp.to_dict() for opp in recent_opportunities]
+                results[user_id] = recommendations
+            
+            logger.info(f"Generated personalized recommendations for {len(top_ids_by_user)} users")
+            
+            return results
                 
         except Exception as e:
             logger.error(f"Error getting recommendations: {e}")
             logger.error(traceback.format_exc())
-            return []
+            return {user_id: results.get(user_id, []) for user_id in user_ids}
+    
+    def _recent_opportunities(self, user_ids: List[int], limit: int) -> Dict[int, List[Dict[str, Any]]]:
+        """Recommend the most recent opportunities to every user (fallback)"""
+        from models import Opportunity
+        
+        recent_opportunities = Opportunity.query.order_by(
+            Opportunity.created_at.desc()
+        ).limit(limit).all()
+        recent = [opp.to_dict() for opp in recent_opportunities]
+        
+        return {user_id: list(recent) for user_id in user_ids}
+    
+    def get_recommendations(self, 
+                           user_id: int, 
+                           limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get personalized recommendations for a user
+        
+        Args:
+            user_id: User ID to get recommendations for
+            limit: Maximum number of recommendations to return
+            
+        Returns:
+            List of recommended opportunities
+        """
+        return self.get_recommendations_batch([user_id], limit).get(user_id, [])
     
-    def retrain_recommender(self) -> bool:
+    def retrain_recommender(self, full: bool = False) -> bool:
         """
         Retrain the recommendation model with latest data
         
+        When a training set cached under the current feature schema exists,
+        only feedback added or relabelled since the last run is joined to it
+        and rows of deleted feedback are dropped. Otherwise (or with ``full=True``) the schema is refitted and the
+        training set is rebuilt from all feedback.
+        
+        Args:
+            full: Force a full rebuild of the schema and training set
+        
         Returns:
             bool: True if training was successful
         """
         try:
-            # Load data
-            opportunities_df, feedback_df = self.load_data()
-            
-            # Check if we have enough data
-            if opportunities_df.empty or feedback_df.empty or len(feedback_df) < 10:
-                logger.warning(f"Not enough data for training: {len(opportunities_df)} opportunities, {len(feedback_df)} feedback records")
-                return False
+            training_set = None if full else self.load_training_set()
             
-            # Engineer features
-            features_df = self.engineer_features(opportunities_df, feedback_df)
+            if training_set is not None:
+                try:
+                    X, y, feedback_ids = self._extend_training_set(training_set)
+                except FeatureSchemaMismatch as e:
+                    logger.warning(f"Cached training set no longer matches the features, rebuilding: {e}")
+                    training_set = None
             
-            # Prepare training data
-            X, y = self.prepare_training_data(features_df, feedback_df)
+            if training_set is None:
+                X, y, feedback_ids = self._build_full_training_set()
+                if X is None:
+                    return False
             
             # Check if we have enough data after preprocessing
             if X is None or y is None or len(y) < 10:
@@ -639,6 +1036,12 @@ class ArtRecommendationBot:
             
             # Save artifacts
             self.save_model_artifacts()
+            self.save_training_set(X, y, feedback_ids)
+            
+            # Rebuild the feature matrix with the current schema and rescore;
+            # extending the cached set already rebuilt it
+            if training_set is None:
+                self.refresh_feature_matrix(force=True)
             
             logger.info("Recommender model retraining completed successfully")
             return True
@@ -647,6 +1050,74 @@ class ArtRecommendationBot:
             logger.error(f"Error retraining recommender: {e}")
             logger.error(traceback.format_exc())
             return False
+    
+    def _build_full_training_set(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
+        """Refit the feature schema and build the training set from all feedback"""
+        # Load data
+        opportunities_df, feedback_df = self.load_data()
+        
+        # Check if we have enough data
+        if opportunities_df.empty or feedback_df.empty or len(feedback_df) < 10:
+            logger.warning(f"Not enough data for training: {len(opportunities_df)} opportunities, {len(feedback_df)} feedback records")
+            return None, None, None
+        
+        # Engineer features, fitting a fresh feature schema for this model
+        features_df = self.engineer_features(opportunities_df, feedback_df, fit=True)
+        feature_columns = self.get_feature_columns(features_df)
+        
+        X, y, feedback_ids = self.build_training_rows(
+            features_df['id'].to_numpy(),
+            features_df[feature_columns].to_numpy(dtype=np.float32),
+            feedback_df
+        )
+        logger.info(f"Built full training set with {len(y)} samples")
+        
+        return X, y, feedback_ids
+    
+    def _extend_training_set(self, training_set: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bring the cached training set up to date with the feedback table
+        
+        Cached rows are kept while their feedback still exists with the same
+        label. Feedback added since the last run, and feedback whose rating
+        moved across the positive threshold, is joined to the feature matrix.
+        """
+        cached_ids = training_set['feedback_ids']
+        last_feedback_id = int(cached_ids.max()) if len(cached_ids) else 0
+        feedback_df = self.load_feedback_ratings()
+        
+        # Keep cached rows whose feedback is unchanged
+        feedback_ids = feedback_df['id'].to_numpy(dtype=np.int64)
+        labels = (feedback_df['rating'].to_numpy() >= 3).astype(np.int64)
+        positions = pd.Index(feedback_ids).get_indexer(cached_ids)
+        exists = positions >= 0
+        keep = exists.copy()
+        keep[exists] = labels[positions[exists]] == training_set['y'][exists]
+        
+        # Join new feedback and cached feedback that was relabelled
+        relabelled = cached_ids[exists & ~keep]
+        rejoin = (feedback_ids > last_feedback_id) | np.isin(feedback_ids, relabelled)
+        changed_feedback_df = feedback_df[rejoin]
+        
+        if keep.all() and changed_feedback_df.empty:
+            logger.info("No feedback changes since the last training run")
+            return training_set['X'], training_set['y'], cached_ids
+        
+        # Features come from the matrix under the frozen schema, rebuilt so its
+        # feedback-derived columns include the ratings given since the last run
+        self.refresh_feature_matrix(force=True)
+        if self.feature_matrix is None:
+            return training_set['X'], training_set['y'], cached_ids
+        
+        X_new, y_new, ids_new = self.build_training_rows(
+            self.feature_matrix['ids'], self.feature_matrix['X'], changed_feedback_df
+        )
+        logger.info(f"Dropped {int((~keep).sum())} deleted or relabelled samples and joined "
+                    f"{len(y_new)} new or relabelled samples to the cached training set")
+        
+        return (np.vstack([training_set['X'][keep], X_new]),
+                np.concatenate([training_set['y'][keep], y_new]),
+                np.concatenate([cached_ids[keep], ids_new]))
 
 
 # Global instance of the recommendation bot
@@ -675,10 +1146,13 @@ def initialize_bot(app=None):
         logger.error(traceback.format_exc())
         return None
 
-def retrain_recommender() -> bool:
+def retrain_recommender(full: bool = False) -> bool:
     """
     Function to be called by scheduler for model retraining
     
+    Args:
+        full: Force a full rebuild instead of appending new feedback
+    
     Returns:
         bool: True if retraining was successful
     """
@@ -692,7 +1166,7 @@ def retrain_recommender() -> bool:
             logger.error("Could not initialize recommendation bot")
             return False
         
-        return _recommendation_bot.retrain_recommender()
+        return _recommendation_bot.retrain_recommender(full=full)
     
     except Exception as e:
         logger.error(f"Error retraining recommender: {e}")
@@ -727,5 +1201,33 @@ def get_recommendations(user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         logger.error(traceback.format_exc())
         return []
 
+def get_recommendations_batch(user_ids: List[int], limit: int = 10) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Get personalized recommendations for many users in one pass
+    
+    Args:
+        user_ids: User IDs to get recommendations for
+        limit: Maximum number of recommendations per user
+        
+    Returns:
+        Dictionary mapping user ID to a list of recommended opportunities
+    """
+    global _recommendation_bot
+    
+    try:
+        if _recommendation_bot is None:
+            _recommendation_bot = initialize_bot()
+        
+        if _recommendation_bot is None:
+            logger.error("Could not initialize recommendation bot")
+            return {user_id: [] for user_id in user_ids}
+        
+        return _recommendation_bot.get_recommendations_batch(user_ids, limit)
+    
+    except Exception as e:
+        logger.error(f"Error getting batch recommendations: {e}")
+        logger.error(traceback.format_exc())
+        return {user_id: [] for user_id in user_ids}
+
 # Initialize bot when module is imported
 bot = initialize_bot()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Script for adaptive engine scheduling
+
+Checks that quiet sources are polled less often and hot sources more often,
+within their bounds, and that runs finished by the job runner reschedule the
+engine's job in the engine scheduler, even when they finish out of order.
+"""
+
+import os
+import tempfile
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from adaptive_schedule import record_yield, next_interval_hours, interval_bounds
+from job_queue import JobQueue, SUCCEEDED
+import ap_scheduler_v2
+
+
+def simulate(added_per_run, runs=12, start_hours=24, bounds=(12, 96)):
+    """Feed a fixed yield into the history and return the final interval"""
+    metadata = {'interval_hours': start_hours}
+    now = 0
+    for _ in range(runs):
+        now += metadata['interval_hours'] * 3600
+        record_yield(metadata, found=20, added=added_per_run, duration=60, now=now)
+        metadata['interval_hours'] = next_interval_hours(metadata, *bounds)
+    return metadata
+
+
+def test_intervals_follow_yield_within_bounds():
+    """Quiet sources drift to the maximum, hot ones to the minimum"""
+    quiet = simulate(0)
+    assert quiet['interval_hours'] == 96
+    assert quiet['change_rate'] == 0
+
+    hot = simulate(30)
+    assert hot['interval_hours'] == 12
+
+    # Two new items per day settles on a one-day interval
+    steady = simulate(2, runs=30)
+    assert abs(steady['interval_hours'] - 24) < 1
+
+    # An interval moves by at most a factor of two per run
+    metadata = {'interval_hours': 48}
+    record_yield(metadata, found=5, added=0, duration=1, now=1)
+    assert next_interval_hours(metadata, 1, 1000) == 96
+
+    assert interval_bounds('social', 'free') == (2, 24)
+    assert interval_bounds('texas', 'premium') == (12, 96)
+
+
+def test_finished_runs_reschedule_the_engine_job():
+    """Yield recorded by the job runner reschedules the engine's cron job"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        scheduler = BackgroundScheduler()
+        scheduler.add_job(
+            ap_scheduler_v2.run_scraper_job, 'cron', day_of_week='mon,wed,fri', hour=11,
+            id='premium_texas', args=['texas'],
+            kwargs={'metadata': {'tier': 'premium', 'interval_hours': 56}},
+        )
+        scheduler.add_job(
+            ap_scheduler_v2.run_scraper_job, 'cron', day_of_week='tue', hour=11,
+            id='other_oregon', args=['oregon'],
+            kwargs={'metadata': {'tier': 'other', 'interval_hours': 48}},
+        )
+
+        saved = (ap_scheduler_v2.scheduler, ap_scheduler_v2.get_job_queue,
+                 ap_scheduler_v2.STATE_FILE, ap_scheduler_v2.current_state)
+        ap_scheduler_v2.scheduler = scheduler
+        ap_scheduler_v2.get_job_queue = lambda: queue
+        ap_scheduler_v2.STATE_FILE = os.path.join(tmp, 'state.json')
+        ap_scheduler_v2.current_state = {}
+        try:
+            job_id, _ = queue.enqueue('texas')
+            queue.claim()
+            queue.finish(job_id, SUCCEEDED, found=40, added=0)
+
+            assert ap_scheduler_v2.apply_job_results() == 1
+            job = scheduler.get_job('premium_texas')
+            metadata = job.kwargs['metadata']
+            assert isinstance(job.trigger, IntervalTrigger)
+            assert metadata['interval_hours'] == 96
+            assert job.trigger.interval.total_seconds() == 96 * 3600
+            assert metadata['last_found'] == 40 and metadata['yield_runs'] == 1
+
+            # Already applied runs are not counted twice
+            assert ap_scheduler_v2.apply_job_results() == 0
+
+            # Jobs run side by side finish out of id order; both are applied
+            first, _ = queue.enqueue('texas')
+            second, _ = queue.enqueue('oregon')
+            queue.claim()
+            queue.claim()
+            queue.finish(second, SUCCEEDED, found=10, added=0)
+            assert ap_scheduler_v2.apply_job_results() == 1
+            queue.finish(first, SUCCEEDED, found=12, added=0)
+            assert ap_scheduler_v2.apply_job_results() == 1
+            assert scheduler.get_job('premium_texas').kwargs['metadata']['yield_runs'] == 2
+        finally:
+            (ap_scheduler_v2.scheduler, ap_scheduler_v2.get_job_queue,
+             ap_scheduler_v2.STATE_FILE, ap_scheduler_v2.current_state) = saved
+
+
+def test_engines_saving_outside_the_store_keep_their_schedule():
+    """instagram_ads saves to the database, so its store counters say nothing"""
+    saved = ap_scheduler_v2.execute_scraper_job
+    ap_scheduler_v2.execute_scraper_job = lambda engine_name: True
+    try:
+        run = ap_scheduler_v2.measure_scraper_job('instagram_ads')
+    finally:
+        ap_scheduler_v2.execute_scraper_job = saved
+    assert run['success'] and run['found'] is None and run['added'] is None
+    assert ap_scheduler_v2.apply_engine_yield('instagram_ads', run) is None
+
+
+if __name__ == "__main__":
+    test_intervals_follow_yield_within_bounds()
+    test_finished_runs_reschedule_the_engine_job()
+    test_engines_saving_outside_the_store_keep_their_schedule()
+    print("All adaptive schedule tests passed")
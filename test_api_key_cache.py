@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test Script for the verified API key cache
+
+Checks that a verified key skips hashing and the database until it is
+revoked or expires, and that request counts reach the api_key table in
+batched writes.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select, update
+
+import api_key_cache
+import api_key_db_service
+from api_key_cache import VerifiedKeyCache, UsageBuffer, notify_key_revoked
+
+
+def test_cache_bounds_ttl_and_expiry():
+    """Entries are evicted by size, TTL, key expiry and revocation"""
+    cache = VerifiedKeyCache(max_entries=2, ttl=60)
+    cache.put('key-a', {'id': 1})
+    cache.put('key-b', {'id': 2})
+    assert cache.get('key-a') == {'id': 1}
+    cache.put('key-c', {'id': 3})
+    assert cache.get('key-b') is None and cache.get('key-a') is not None
+
+    # Never cached past the key's own expiry
+    cache.put('key-d', {'id': 4}, expires_at=datetime.utcnow() - timedelta(seconds=1))
+    assert cache.get('key-d') is None
+
+    # Returned info is a copy
+    cache.get('key-a')['plan'] = 'admin'
+    assert 'plan' not in cache.get('key-a')
+
+    assert cache.invalidate(key_id=1) == 1
+    assert cache.get('key-a') is None
+    assert cache.stats()['entries'] == 1
+
+
+def test_verify_key_uses_cache_and_batches_usage():
+    """Only the first verification hashes; counters arrive in one flush"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'keys.sqlite3')}")
+        api_key_db_service.metadata.create_all(engine)
+        raw_key = 'pk_test_0123456789abcdef'
+        with engine.begin() as conn:
+            conn.execute(insert(api_key_db_service.api_keys).values(
+                id=7, key_hash=api_key_db_service.hash_key(raw_key), key_prefix=raw_key[:8],
+                name='Test', plan='pro', status='active', request_count=0, rate_limit_hits=0))
+
+        saved = (api_key_db_service.engine, api_key_db_service.key_cache,
+                 api_key_db_service.usage_buffer, api_key_db_service.hash_key,
+                 api_key_cache.API_KEY_REVOCATION_MARKER)
+        hashes = []
+        api_key_db_service.engine = engine
+        api_key_db_service.key_cache = VerifiedKeyCache()
+        api_key_db_service.usage_buffer = UsageBuffer(engine, flush_interval=0)
+        api_key_db_service.hash_key = lambda key: hashes.append(key) or saved[3](key)
+        api_key_cache.API_KEY_REVOCATION_MARKER = os.path.join(tmp, 'revocations')
+        try:
+            for _ in range(5):
+                valid, info = api_key_db_service.verify_key(raw_key)
+                assert valid and info['plan'] == 'pro'
+            assert api_key_db_service.record_rate_limit_hit(raw_key)
+            assert len(hashes) == 1
+
+            assert api_key_db_service.usage_buffer.flush() == 1
+            with engine.connect() as conn:
+                row = conn.execute(select(api_key_db_service.api_keys)).first()
+            assert row.request_count == 5 and row.rate_limit_hits == 1
+            assert row.last_used_at is not None
+
+            # Revoking drops the cached key
+            with engine.begin() as conn:
+                conn.execute(update(api_key_db_service.api_keys).values(
+                    status='revoked', revoked_at=datetime.utcnow()))
+            notify_key_revoked(7)
+            assert api_key_db_service.verify_key(raw_key) == (False, None)
+        finally:
+            (api_key_db_service.engine, api_key_db_service.key_cache,
+             api_key_db_service.usage_buffer, api_key_db_service.hash_key,
+             api_key_cache.API_KEY_REVOCATION_MARKER) = saved
+
+
+def test_model_revoke_notifies_after_commit():
+    """APIKey.revoke drops cached copies only once the revocation is committed"""
+    from flask import Flask
+    from unittest import mock
+    from db_models import db, APIKey
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'models.sqlite3')}"
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(app)
+        with app.app_context(), mock.patch('api_key_cache.notify_key_revoked') as notify:
+            db.create_all()
+            api_key, _ = APIKey.create_for_user(user_id=1, name='test')
+            db.session.add(api_key)
+            db.session.commit()
+
+            api_key.revoke()
+            assert notify.call_count == 0
+            db.session.rollback()
+            db.session.commit()
+            assert notify.call_count == 0
+
+            api_key.revoke()
+            db.session.commit()
+            notify.assert_called_once_with(api_key.id)
+
+
+if __name__ == "__main__":
+    test_cache_bounds_ttl_and_expiry()
+    test_verify_key_uses_cache_and_batches_usage()
+    test_model_revoke_notifies_after_commit()
+    print("All API key cache tests passed")
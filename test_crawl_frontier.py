@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test Script for the pagination-aware crawl frontier
+
+Checks URL normalization, pagination link discovery, per-domain depth caps
+and that a chain stops at the first page holding only known opportunities.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers.frontier import CrawlFrontier, find_pagination_links, normalize_url
+
+
+def test_normalize_url():
+    """Equivalent spellings of a page collapse to one key"""
+    assert normalize_url('HTTPS://WWW.Example.org:443/calls/?b=2&a=1&utm_source=x#top') == \
+        'https://www.example.org/calls?a=1&b=2'
+    assert normalize_url('http://example.org') == 'http://example.org/'
+
+
+def test_find_pagination_links():
+    """Next links, rel=next and numbered page links on the same host are found"""
+    html = '''
+        <link rel="next" href="/calls/page/2/">
+        <a href="/calls/5">Artist grant deadline</a>
+        <a class="next page-numbers" href="/calls/page/2/">Next &raquo;</a>
+        <a href="?page=3">3</a>
+        <a href="https://other.org/calls?page=2">2</a>
+        <a href="#">Next</a>
+        <a href="/calls?page=4"><span>Older posts</span></a>
+    '''
+    assert find_pagination_links(html, 'https://example.org/calls/') == [
+        'https://example.org/calls/page/2/',
+        'https://example.org/calls/?page=3',
+        'https://example.org/calls?page=4',
+    ]
+
+
+def test_frontier_dedupes_and_caps_depth():
+    """Pages are admitted once and only up to the domain's depth cap"""
+    frontier = CrawlFrontier(max_depth=2, domain_max_depth={'deep.org': 3})
+    assert frontier.add_seed('https://example.org/list')
+    assert not frontier.add_seed('https://example.org/list/')
+    assert frontier.add_discovered('https://example.org/list?page=2', 'https://example.org/list')
+    assert frontier.add_discovered('https://example.org/list?page=3', 'https://example.org/list?page=2')
+    assert not frontier.add_discovered('https://example.org/list?page=4', 'https://example.org/list?page=3')
+
+    frontier.add_seed('https://deep.org/a')
+    parent = 'https://deep.org/a'
+    for page in range(2, 5):
+        assert frontier.add_discovered(f'https://deep.org/a?page={page}', parent)
+        parent = f'https://deep.org/a?page={page}'
+
+
+class ListingScraper(AsyncBaseScraper):
+    """Scraper that follows pagination and treats some URLs as known"""
+
+    def __init__(self, known=()):
+        super().__init__(scraper_name='listing_scraper', max_concurrency=2)
+        self.http_cache = None
+        self.follow_pagination = True
+        self.known = set(known)
+        self.found = []
+
+    async def extract_opportunities(self, soup, source_url):
+        return [{'url': a['href']} for a in soup.select('a.opp')]
+
+    def known_opportunity(self, opportunity_data):
+        return opportunity_data['url'] in self.known
+
+    async def process_opportunity(self, opportunity_data):
+        self.found.append(opportunity_data['url'])
+        self.total_opportunities += 1
+        return True
+
+
+def crawl(scraper, pages=8):
+    """Serve a paginated listing with two opportunities per page and crawl it"""
+    served = []
+
+    async def listing(request):
+        page = int(request.query.get('page', 1))
+        served.append(page)
+        body = ''.join(f'<a class="opp" href="/opp/{page}-{i}">Call {page}-{i}</a>' for i in range(2))
+        if page < pages:
+            body += f'<a rel="next" href="/list?page={page + 1}">Next</a>'
+        return web.Response(text=f'<html><body>{body}</body></html>', content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/list', listing)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f'http://127.0.0.1:{runner.addresses[0][1]}'
+        scraper.known = {base + url for url in scraper.known}
+        try:
+            await scraper.run_scraper([f'{base}/list', f'{base}/list/'])
+        finally:
+            await runner.cleanup()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    return served
+
+
+def test_pipeline_follows_pagination_up_to_the_cap():
+    """Later listing pages are fetched once each, up to the depth cap"""
+    scraper = ListingScraper()
+    served = crawl(scraper)
+    # The seed plus five pagination hops, duplicates of the seed skipped
+    assert sorted(served) == [1, 2, 3, 4, 5, 6]
+    assert len(scraper.found) == 12
+
+
+def test_pagination_stops_at_a_fully_known_page():
+    """A page with only known opportunities ends the chain"""
+    scraper = ListingScraper(known={'/opp/3-0', '/opp/3-1', '/opp/2-0'})
+    served = crawl(scraper)
+    assert sorted(served) == [1, 2, 3]
+
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_find_pagination_links()
+    test_frontier_dedupes_and_caps_depth()
+    test_pipeline_follows_pagination_up_to_the_cap()
+    test_pagination_stops_at_a_fully_known_page()
+    print("All crawl frontier tests passed")
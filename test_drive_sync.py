@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Drive sync engine
+
+Runs the engine against a local fake with the LocalStorageFallback interface
+and checks that unchanged files are not uploaded, changed files are updated
+in place, queued uploads are coalesced, and reads are served from the cache
+until Drive has a new version.
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+
+from drive_sync import DriveSyncEngine
+
+
+class FakeDrive:
+    """Drive-like storage in a local directory that counts every call"""
+
+    def __init__(self, root):
+        self.root = root
+        self.versions = {}
+        self.calls = []
+
+    def _path(self, file_id):
+        return os.path.join(self.root, file_id)
+
+    def upload_file(self, file_path, destination_folder='opportunities', file_name=None):
+        self.calls.append('upload')
+        file_id = f"{destination_folder}-{file_name or os.path.basename(file_path)}"
+        shutil.copyfile(file_path, self._path(file_id))
+        self.versions[file_id] = 1
+        return file_id
+
+    def update_file(self, file_id, file_path):
+        self.calls.append('update')
+        if file_id not in self.versions:
+            return None
+        shutil.copyfile(file_path, self._path(file_id))
+        self.versions[file_id] += 1
+        return self.get_file_info(file_id, count=False)
+
+    def download_file(self, file_id, output_path):
+        self.calls.append('download')
+        shutil.copyfile(self._path(file_id), output_path)
+        return True
+
+    def list_files(self, folder_name='opportunities'):
+        self.calls.append('list')
+        prefix = f"{folder_name}-"
+        return [{'id': file_id, 'name': file_id[len(prefix):]}
+                for file_id in self.versions if file_id.startswith(prefix)]
+
+    def get_file_info(self, file_id, count=True):
+        if count:
+            self.calls.append('info')
+        if file_id not in self.versions:
+            return None
+        with open(self._path(file_id), 'rb') as f:
+            md5 = hashlib.md5(f.read()).hexdigest()
+        return {'id': file_id, 'md5Checksum': md5, 'version': str(self.versions[file_id])}
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_uploads_only_changed_content_in_place():
+    """One create, then in-place updates only when the content changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drive = FakeDrive(tmp)
+        manifest = os.path.join(tmp, 'manifest.json')
+        engine = DriveSyncEngine(drive, manifest, os.path.join(tmp, 'cache'), interval=0)
+        path = os.path.join(tmp, 'opportunities.json')
+
+        write(path, '[1]')
+        file_id = engine.sync_file(path)
+        write(path, '[1]')
+        assert engine.sync_file(path) == file_id
+        write(path, '[1, 2]')
+        assert engine.sync_file(path) == file_id
+        assert drive.calls == ['list', 'upload', 'info', 'update']
+        assert drive.versions[file_id] == 2
+
+        # A new process picks the file id and checksum up from the manifest
+        drive.calls.clear()
+        restarted = DriveSyncEngine(drive, manifest, os.path.join(tmp, 'cache'), interval=0)
+        assert restarted.sync_file(path) == file_id
+        assert drive.calls == []
+
+
+def test_requests_are_coalesced():
+    """Requests while an upload is queued or recent fold into one upload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drive = FakeDrive(tmp)
+        engine = DriveSyncEngine(drive, os.path.join(tmp, 'manifest.json'), os.path.join(tmp, 'cache'),
+                                 interval=0.3)
+        path = os.path.join(tmp, 'opportunities.json')
+
+        write(path, '[1]')
+        assert engine.request_sync(path)
+        time.sleep(0.1)
+        assert engine.stats['uploads'] == 1
+
+        for i in range(2, 6):
+            write(path, f'[{i}]')
+            engine.request_sync(path)
+        assert not engine.request_sync(path)
+        time.sleep(0.1)
+        assert engine.stats['uploads'] == 1
+        time.sleep(0.3)
+        assert engine.stats['uploads'] == 2
+        with open(drive._path(engine.file_id('opportunities', 'opportunities.json'))) as f:
+            assert f.read() == '[5]'
+
+        # Pending work is uploaded on flush, e.g. at shutdown
+        write(path, '[6]')
+        engine.request_sync(path)
+        assert engine.flush() == 1 and engine.stats['uploads'] == 3
+        engine.stop(flush=False)
+
+
+def test_reads_are_served_from_cache():
+    """Downloads happen only when the Drive version changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        drive = FakeDrive(tmp)
+        engine = DriveSyncEngine(drive, os.path.join(tmp, 'manifest.json'), os.path.join(tmp, 'cache'),
+                                 interval=0)
+        path = os.path.join(tmp, 'opportunities.json')
+        write(path, '[1]')
+        engine.sync_file(path)
+
+        drive.calls.clear()
+        cached = engine.load('opportunities', 'opportunities.json')
+        assert engine.load('opportunities', 'opportunities.json') == cached
+        assert drive.calls == ['info', 'download', 'info']
+
+        # Another writer updates the file in Drive
+        other = os.path.join(tmp, 'other.json')
+        write(other, '[1, 2]')
+        drive.update_file(engine.file_id('opportunities', 'opportunities.json'), other)
+        with open(engine.load('opportunities', 'opportunities.json')) as f:
+            assert f.read() == '[1, 2]'
+        assert engine.stats['downloads'] == 2 and engine.stats['cache_hits'] == 1
+
+        assert engine.load('opportunities', 'missing.json') is None
+
+
+if __name__ == "__main__":
+    test_uploads_only_changed_content_in_place()
+    test_requests_are_coalesced()
+    test_reads_are_served_from_cache()
+    print("All Drive sync tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test Script for single-walk opportunity extraction
+
+Checks that extract_opportunities_from_html returns exactly what the previous
+selector-by-selector extraction returned, on generated listing pages and on
+randomly nested, overlapping markup.
+"""
+
+import random
+
+from benchmark_extraction import comparable, generate_listing_page, legacy_extract_opportunities
+from scrapers_improvement import extract_opportunities_from_html
+
+KEYWORDS = ['grant', 'residency', 'call']
+URL = 'https://www.example.org/listings/index'
+
+TAGS = ['div', 'section', 'article', 'li', 'span', 'p', 'h3', 'b', 'a']
+CLASSES = ['row', 'card', 'job-card', 'opportunity', 'listing', 'item', 'post', 'result', 'other']
+TEXTS = ['Studio residency call 2025', 'Short', 'Emerging artist grant program',
+         'This description is long enough to be kept']
+
+
+def random_markup(rng, depth=0):
+    """Random nested markup with overlapping containers and repeated links"""
+    parts = []
+    for _ in range(rng.randint(1, 3)):
+        tag = rng.choice(TAGS)
+        attributes = ''
+        if rng.random() < 0.6:
+            attributes += f' class="{rng.choice(CLASSES)} {rng.choice(CLASSES)}"'
+        if tag == 'a' and rng.random() < 0.9:
+            attributes += f' href="{rng.choice(["/a", "b", "https://other.org/c", ""])}"'
+        inner = rng.choice(TEXTS) if depth > 3 or rng.random() < 0.3 else random_markup(rng, depth + 1)
+        parts.append(f'<{tag}{attributes}>{inner}</{tag}>')
+    return ''.join(parts)
+
+
+def assert_same_output(html):
+    assert comparable(extract_opportunities_from_html(html, KEYWORDS, URL)) == \
+        comparable(legacy_extract_opportunities(html, KEYWORDS, URL))
+
+
+def test_generated_listing_pages_match_previous_output():
+    """Nested listing cards give the same opportunities in the same order"""
+    html = generate_listing_page(items=20)
+    assert len(extract_opportunities_from_html(html, KEYWORDS, URL)) == 20
+    assert_same_output(html)
+    assert_same_output('<div><a href="/x">Open call for a public grant</a></div>')
+
+
+def test_random_markup_matches_previous_output():
+    """Overlapping and nested containers resolve exactly as before"""
+    rng = random.Random(12)
+    for _ in range(300):
+        assert_same_output(f'<html><body>{random_markup(rng)}</body></html>')
+
+
+if __name__ == "__main__":
+    test_generated_listing_pages_match_previous_output()
+    test_random_markup_matches_previous_output()
+    print("All extraction tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test Script for the recommender's opportunity feature matrix
+
+Checks that the feature matrix is persisted, reloaded by a new process and
+only rebuilt when the opportunity signature changes, and that new feedback
+does not change the signature.
+"""
+
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from models import db, User, Opportunity, Feedback
+from self_learning_bot import ArtRecommendationBot
+from test_self_learning_bot import make_opportunities, model_dir
+
+
+def test_feature_matrix_is_persisted():
+    """The matrix is rebuilt only when the opportunity signature changes"""
+    with tempfile.TemporaryDirectory() as tmp, model_dir(tmp):
+        opportunities_df = make_opportunities(20)
+        bot = ArtRecommendationBot()
+        bot.engineer_features(opportunities_df, fit=True)
+
+        with mock.patch.object(bot, 'get_opportunity_signature', return_value='20:a'), \
+                mock.patch.object(bot, 'load_data', return_value=(opportunities_df, pd.DataFrame())) as load:
+            assert bot.refresh_feature_matrix()
+            assert not bot.refresh_feature_matrix()
+            assert load.call_count == 1
+        matrix = bot.feature_matrix
+        assert matrix['X'].dtype == np.float32
+        assert matrix['X'].shape == (20, len(bot.feature_schema.columns))
+        assert matrix['ids'].tolist() == opportunities_df['id'].tolist()
+
+        # A new process loads the matrix from disk instead of rebuilding it
+        bot.save_model_artifacts()
+        restored = ArtRecommendationBot()
+        assert np.array_equal(restored.feature_matrix['X'], matrix['X'], equal_nan=True)
+        assert restored.feature_matrix['columns'] == matrix['columns']
+        with mock.patch.object(restored, 'get_opportunity_signature', return_value='20:a'), \
+                mock.patch.object(restored, 'load_data') as load:
+            assert not restored.refresh_feature_matrix()
+            assert load.call_count == 0
+
+        with mock.patch.object(restored, 'get_opportunity_signature', return_value='21:b'), \
+                mock.patch.object(restored, 'load_data', return_value=(make_opportunities(21), pd.DataFrame())):
+            assert restored.refresh_feature_matrix()
+        assert len(restored.feature_matrix['ids']) == 21
+
+
+def test_signature_ignores_feedback(tmp_path):
+    """Ratings do not invalidate the matrix; opportunity changes do"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'recommender.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context(), model_dir(str(tmp_path)):
+        db.create_all()
+        user = User(username='artist', email='artist@example.org')
+        opportunity = Opportunity(title='Call', url='https://example.org/1')
+        db.session.add_all([user, opportunity])
+        db.session.commit()
+
+        bot = ArtRecommendationBot()
+        signature = bot.get_opportunity_signature()
+        db.session.add(Feedback(user_id=user.id, opportunity_id=opportunity.id, rating=5))
+        db.session.commit()
+        assert bot.get_opportunity_signature() == signature
+
+        opportunity.title = 'Call (updated)'
+        opportunity.updated_at = datetime(2100, 1, 1)
+        db.session.commit()
+        assert bot.get_opportunity_signature() != signature
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    test_feature_matrix_is_persisted()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_signature_ignores_feedback(Path(tmp))
+    print("All feature matrix tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test Script for the recommender's frozen feature schema
+
+Checks that the feature schema survives a save/load round trip and keeps the
+column layout frozen at inference, and that features which no longer match
+the trained model (a changed vectorizer, or a model saved before schemas
+existed) raise FeatureSchemaMismatch so recommendations fall back to recent
+opportunities instead of being scored against the wrong columns.
+"""
+
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from models import db, User, Opportunity
+from self_learning_bot import ArtRecommendationBot, FeatureSchema, FeatureSchemaMismatch
+from test_self_learning_bot import make_feedback, make_opportunities, model_dir
+
+
+def legacy_model(feature_count):
+    """A model trained before feature schemas were saved alongside it"""
+    rng = np.random.default_rng(0)
+    return RandomForestClassifier(n_estimators=5, random_state=0).fit(
+        rng.random((20, feature_count)), np.arange(20) % 2
+    )
+
+
+def test_feature_schema_round_trip_and_frozen_columns():
+    """The schema persists and inference always yields the trained columns"""
+    with tempfile.TemporaryDirectory() as tmp, model_dir(tmp):
+        bot = ArtRecommendationBot()
+        opportunities_df = make_opportunities(30)
+        features_df = bot.engineer_features(opportunities_df, make_feedback(opportunities_df['id'], 40), fit=True)
+        columns = bot.get_feature_columns(features_df)
+        assert columns == bot.feature_schema.columns
+
+        bot.save_model_artifacts()
+        restored = ArtRecommendationBot()
+        assert restored.feature_schema.columns == columns
+        assert restored.feature_schema.to_dict() == bot.feature_schema.to_dict()
+        assert FeatureSchema.from_dict({**bot.feature_schema.to_dict(), 'version': 0}) is None
+
+        # Unseen categories and a different batch size map onto the same columns
+        new_df = make_opportunities(5, sources=('brand-new-source',), start_id=100)
+        new_features = restored.engineer_features(new_df)
+        assert restored.feature_schema.columns == columns
+        assert new_features[columns].shape == (5, len(columns))
+        assert new_features['source___unknown__'].all()
+
+        # A vectorizer that no longer matches the schema is an error, not a silent refit
+        restored.vectorizer = TfidfVectorizer(max_features=3).fit(new_df['title'])
+        try:
+            restored.engineer_features(new_df)
+            assert False, "expected FeatureSchemaMismatch"
+        except FeatureSchemaMismatch:
+            pass
+        assert restored.feature_schema.columns == columns
+
+
+def test_model_without_schema_is_a_mismatch():
+    """Inference never fits a schema of its own for a model saved without one"""
+    with tempfile.TemporaryDirectory() as tmp, model_dir(tmp):
+        bot = ArtRecommendationBot()
+        bot.model = legacy_model(7)
+        bot.vectorizer = TfidfVectorizer().fit(['painting grant', 'mural residency'])
+        try:
+            bot.engineer_features(make_opportunities(5))
+            assert False, "expected FeatureSchemaMismatch"
+        except FeatureSchemaMismatch:
+            pass
+        assert bot.feature_schema is None
+
+        # A matrix whose width differs from what the model was trained on
+        bot.feature_matrix = {'ids': np.arange(3), 'X': np.zeros((3, 9), dtype=np.float32),
+                              'columns': [f'c{i}' for i in range(9)], 'signature': 'x'}
+        try:
+            bot.score_opportunities()
+            assert False, "expected FeatureSchemaMismatch"
+        except FeatureSchemaMismatch:
+            pass
+
+
+def test_mismatch_falls_back_to_recent_opportunities(tmp_path):
+    """Users get the most recent opportunities until the recommender is retrained"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'recommender.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context(), model_dir(str(tmp_path)):
+        db.create_all()
+        user = User(username='artist', email='artist@example.org')
+        db.session.add(user)
+        now = datetime.utcnow()
+        for i in range(3):
+            db.session.add(Opportunity(title=f'Call {i}', url=f'https://example.org/{i}',
+                                       created_at=now - timedelta(days=i)))
+        db.session.commit()
+
+        bot = ArtRecommendationBot()
+        bot.model = legacy_model(7)
+        bot.vectorizer = TfidfVectorizer().fit(['painting grant', 'mural residency'])
+        with mock.patch.object(bot, 'load_data', return_value=(make_opportunities(3), pd.DataFrame())):
+            recommendations = bot.get_recommendations_batch([user.id], limit=2)
+
+        assert [opp['title'] for opp in recommendations[user.id]] == ['Call 0', 'Call 1']
+        assert bot.feature_schema is None
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    test_feature_schema_round_trip_and_frozen_columns()
+    test_model_without_schema_is_a_mismatch()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_mismatch_falls_back_to_recent_opportunities(Path(tmp))
+    print("All feature schema tests passed")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Script for the disk-backed HTTP cache
+
+Checks validators, processed-version tracking, LRU eviction and that the
+async scrapers send conditional requests and skip unchanged pages.
+"""
+
+import asyncio
+import os
+import tempfile
+
+from aiohttp import web
+
+from http_cache import HTTPCache
+from scrapers.async_base_scraper import AsyncBaseScraper
+
+
+def make_cache(max_bytes=10 * 1024 * 1024):
+    """Create a cache in a fresh temporary directory"""
+    directory = tempfile.mkdtemp()
+    return HTTPCache(path=os.path.join(directory, 'cache.sqlite3'), max_bytes=max_bytes)
+
+
+def test_validators_and_processed_versions():
+    """Validators become conditional headers; a new body resets processed state"""
+    cache = make_cache()
+    url = 'https://example.org/calls'
+    assert cache.get(url) is None
+    assert cache.conditional_headers(url) == {}
+
+    cache.store(url, '<html>v1</html>', etag='"abc"', last_modified='Wed, 01 Jan 2025 00:00:00 GMT')
+    assert cache.get(url).body == '<html>v1</html>'
+    assert cache.conditional_headers(url) == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': 'Wed, 01 Jan 2025 00:00:00 GMT',
+    }
+
+    assert not cache.is_processed(url, 'texas')
+    cache.mark_processed(url, 'texas')
+    assert cache.is_processed(url, 'texas')
+    assert not cache.is_processed(url, 'oregon')
+
+    cache.store(url, '<html>v2</html>', etag='"def"')
+    assert not cache.is_processed(url, 'texas')
+
+
+def test_lru_eviction():
+    """The least recently used entries are dropped once the size bound is exceeded"""
+    cache = make_cache(max_bytes=1500)
+    for i in range(4):
+        cache.store(f'https://example.org/{i}', os.urandom(500).hex())
+    cache.get('https://example.org/0')
+
+    assert cache.evict() > 0
+    assert cache.total_size() <= 1500
+    assert cache.get('https://example.org/0') is not None
+    assert cache.get('https://example.org/1') is None
+
+
+class PageScraper(AsyncBaseScraper):
+    """Scraper that counts how often it parsed a page"""
+
+    def __init__(self, cache):
+        super().__init__(scraper_name='page_scraper')
+        self.http_cache = cache
+        self.parsed = 0
+        self.fail_saves = False
+
+    async def parse_page(self, content, url):
+        self.parsed += 1
+        return await super().parse_page(content, url)
+
+    async def extract_opportunities(self, soup, source_url):
+        return [{'url': source_url}]
+
+    async def process_opportunity(self, opportunity_data):
+        if self.fail_saves:
+            raise RuntimeError('database unavailable')
+        return await super().process_opportunity(opportunity_data)
+
+
+def test_async_conditional_fetch_skips_unchanged_pages():
+    """A 304 is served from the cache and the page is not parsed again"""
+    requests_seen = []
+
+    async def page(request):
+        requests_seen.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text='<html><body>listing</body></html>', content_type='text/html',
+                            headers={'ETag': '"v1"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/listing', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        url = f'http://127.0.0.1:{runner.addresses[0][1]}/listing'
+
+        scraper = PageScraper(make_cache())
+        try:
+            # A failed save leaves the page unprocessed, so it is parsed again
+            scraper.fail_saves = True
+            await scraper.run_scraper([url])
+            scraper.fail_saves = False
+            first = await scraper.run_scraper([url])
+            second = await scraper.run_scraper([url])
+        finally:
+            await runner.cleanup()
+        return scraper, first, second
+
+    loop = asyncio.new_event_loop()
+    try:
+        scraper, first, second = loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    assert requests_seen == [None, '"v1"', '"v1"']
+    assert (first, second) == (1, 0)
+    assert scraper.parsed == 2
+
+
+if __name__ == "__main__":
+    test_validators_and_processed_versions()
+    test_lru_eviction()
+    test_async_conditional_fetch_skips_unchanged_pages()
+    print("All HTTP cache tests passed")
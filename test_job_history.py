@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test Script for the job run history
+
+Checks daily success rates, per-engine duration percentiles with the previous
+window for regressions, and that downsampling old runs keeps the totals.
+"""
+
+import os
+import tempfile
+
+from job_history import JobHistory, percentile, RAW_RETENTION_DAYS
+
+DAY = 86400
+NOW = 1760000000.0  # A fixed time keeps the UTC day boundaries stable
+
+
+def test_percentile_uses_nearest_rank():
+    """p50/p95 pick an observed duration"""
+    values = list(range(1, 21))
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile([], 50) is None
+
+
+def test_rollups_and_regressions():
+    """Success rates per day and engine stats come from recorded runs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = JobHistory(os.path.join(tmp, 'history.sqlite3'))
+
+        # Previous week: texas always succeeds in about 10s
+        for i in range(5):
+            start = NOW - 10 * DAY + i * 3600
+            history.record_run('texas', start, start + 10, True, urls_fetched=4, bytes_fetched=1000, found=8, added=1)
+        # This week: texas got slower and fails half of the time
+        for i in range(4):
+            start = NOW - 2 * DAY + i * 3600
+            history.record_run('texas', start, start + 30 + i, i % 2 == 0, found=5, added=0,
+                               error_class=None if i % 2 == 0 else 'TimeoutError')
+        history.record_run('social', NOW - 3600, NOW - 3500, True, found=3, added=3)
+
+        days = history.daily_success_rates(days=3, now=NOW)
+        assert [day['runs'] for day in days] == [4, 0, 1]
+        assert days[0]['success_rate'] == 50.0
+        assert days[1]['success_rate'] is None
+
+        texas = {stats['engine']: stats for stats in history.engine_stats(days=7, now=NOW)}['texas']
+        assert texas['runs'] == 4 and texas['success_rate'] == 50.0
+        assert texas['p50_duration'] == 31 and texas['p95_duration'] == 33
+        assert texas['previous_success_rate'] == 100.0
+        assert texas['previous_p95_duration'] == 10
+        assert texas['last_error_class'] == 'TimeoutError'
+
+        summary = history.summary()
+        assert summary['total_runs'] == 10 and summary['total_failures'] == 2
+        assert summary['consecutive_failures'] == 0
+
+
+def test_compact_downsamples_old_runs():
+    """Runs past the raw retention become daily rows without changing totals"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = JobHistory(os.path.join(tmp, 'history.sqlite3'))
+        old = NOW - (RAW_RETENTION_DAYS + 5) * DAY
+        for i in range(3):
+            history.record_run('oregon', old + i, old + i + 20, i != 2, found=2, added=1)
+        history.record_run('oregon', NOW - 60, NOW, True)
+
+        before = history.daily_success_rates(days=RAW_RETENTION_DAYS + 10, now=NOW)
+        assert history.compact(now=NOW) == 3
+        assert history.compact(now=NOW) == 0
+        after = history.daily_success_rates(days=RAW_RETENTION_DAYS + 10, now=NOW)
+        assert before == after
+        assert history.summary()['total_runs'] == 4
+
+        conn = history._connection()
+        assert conn.execute('SELECT COUNT(*) FROM job_runs').fetchone()[0] == 1
+        row = conn.execute('SELECT runs, successes, found, added, p50_duration FROM job_runs_daily').fetchone()
+        assert tuple(row) == (3, 2, 6, 3, 20)
+
+
+if __name__ == "__main__":
+    test_percentile_uses_nearest_rank()
+    test_rollups_and_regressions()
+    test_compact_downsamples_old_runs()
+    print("All job history tests passed")
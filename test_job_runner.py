@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test Script for the scraper job queue and runner
+
+Checks that queued jobs are deduplicated per engine, that the runner records
+successes, failures, timeouts and memory-cap violations in the queue and the
+run history, and that jobs left running by a dead runner are requeued.
+"""
+
+import os
+import time
+import tempfile
+import threading
+from unittest import mock
+
+from job_history import JobHistory
+from job_queue import JobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED, TIMED_OUT
+import job_runner
+from job_runner import JobRunner
+
+
+def fake_engine(engine_name):
+    """Job target standing in for the scraper engines"""
+    if engine_name == 'fail':
+        return False
+    if engine_name == 'boom':
+        raise RuntimeError('engine crashed')
+    if engine_name == 'hang':
+        time.sleep(60)
+    if engine_name == 'hog':
+        return len(bytearray(1024 * 1024 * 1024))
+    if engine_name == 'linger':
+        # Reports success, then keeps the worker from exiting
+        threading.Thread(target=time.sleep, args=(60,)).start()
+    return True
+
+
+def test_enqueue_dedupes_pending_jobs_and_recovers_orphans():
+    """An engine has at most one pending job; orphaned runs are requeued"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        first, created = queue.enqueue('texas')
+        assert created
+        assert queue.enqueue('texas') == (first, False)
+
+        # A runner pid that no longer exists
+        job = queue.claim(runner_pid=2 ** 22 + 1)
+        assert job['id'] == first and job['status'] == RUNNING
+        assert queue.enqueue('texas') == (first, False)
+        assert queue.recover() == 1
+        assert queue.get(first)['status'] == QUEUED
+
+        queue.claim(runner_pid=2 ** 22 + 1)
+        queue.recover(max_attempts=2)
+        assert queue.get(first)['status'] == FAILED
+        assert queue.enqueue('texas')[1]
+
+
+def test_runner_records_job_outcomes():
+    """Each job runs in its own worker and its outcome is stored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        ids = {engine: queue.enqueue(engine)[0] for engine in ('ok', 'fail', 'boom', 'hang', 'hog')}
+
+        history = JobHistory(os.path.join(tmp, 'history.sqlite3'))
+        runner = JobRunner(queue=queue, workers=5, timeout=30, memory_limit_mb=512,
+                           poll_interval=0.05, target=fake_engine, timeouts={'hang': 1}, history=history)
+        deadline = time.time() + 20
+        while (runner.run_once() or queue.counts().get(QUEUED)) and time.time() < deadline:
+            time.sleep(0.05)
+
+        jobs = {engine: queue.get(job_id) for engine, job_id in ids.items()}
+        assert jobs['ok']['status'] == SUCCEEDED
+        assert jobs['ok']['worker_pid'] not in (None, os.getpid())
+        assert jobs['ok']['max_rss_kb'] > 0
+        assert jobs['fail']['status'] == FAILED
+        assert 'engine crashed' in jobs['boom']['error']
+        assert jobs['hang']['status'] == TIMED_OUT
+        assert jobs['hog']['status'] == FAILED and 'Memory limit' in jobs['hog']['error']
+        assert all(job['duration'] is not None for job in jobs.values())
+
+        # Every run lands in the history with its error class
+        runs = {stats['engine']: stats for stats in history.engine_stats(days=1)}
+        assert set(runs) == set(ids)
+        assert runs['ok']['success_rate'] == 100.0
+        assert runs['boom']['last_error_class'] == 'RuntimeError'
+        assert runs['hang']['last_error_class'] == 'JobTimeout'
+        assert runs['hog']['last_error_class'] == 'MemoryError'
+
+
+def test_worker_hanging_after_reporting_is_stopped():
+    """A worker that reported its outcome but does not exit is stopped, not waited on"""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        job_id = queue.enqueue('linger')[0]
+        runner = JobRunner(queue=queue, workers=1, timeout=30, memory_limit_mb=0, poll_interval=0.05,
+                           target=fake_engine, history=JobHistory(os.path.join(tmp, 'history.sqlite3')))
+
+        start = time.time()
+        with mock.patch.object(job_runner, 'TERMINATE_GRACE', 0.5):
+            while (runner.run_once() or queue.counts().get(QUEUED)) and time.time() - start < 20:
+                time.sleep(0.05)
+        assert time.time() - start < 10
+        assert queue.get(job_id)['status'] == SUCCEEDED
+
+
+if __name__ == "__main__":
+    test_enqueue_dedupes_pending_jobs_and_recovers_orphans()
+    test_runner_records_job_outcomes()
+    test_worker_hanging_after_reporting_is_stopped()
+    print("All job runner tests passed")
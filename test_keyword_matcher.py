@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Aho-Corasick keyword matcher
+
+Checks that the matcher agrees with the per-keyword substring checks it
+replaces, including overlapping keywords, and that type detection keeps its
+tier order.
+"""
+
+import random
+
+from keyword_matcher import KeywordMatcher, get_keyword_matcher
+from scrapers.async_base_scraper import detect_opportunity_type
+
+
+def test_matches_agree_with_substring_checks():
+    """Every occurrence is reported, overlapping and case-insensitive"""
+    matcher = KeywordMatcher(['artist residency', 'residency', 'Art', 'UI designer', 'art'])
+    text = 'Artist Residency for a UI Designer'
+
+    assert matcher.find_all(text) == [
+        (0, 3, 'Art'),
+        (0, 16, 'artist residency'),
+        (7, 16, 'residency'),
+        (23, 34, 'UI designer'),
+    ]
+    assert matcher.matched(text) == {'Art', 'artist residency', 'residency', 'UI designer'}
+    assert matcher.search('nothing here') is False
+    assert get_keyword_matcher(['grant']) is get_keyword_matcher(['grant'])
+
+    rng = random.Random(7)
+    for _ in range(200):
+        keywords = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(6)]
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 40)))
+        matcher = KeywordMatcher(keywords)
+        expected = sorted(
+            (i, i + len(keyword), keyword)
+            for keyword in dict.fromkeys(keywords)
+            for i in range(len(text)) if text.startswith(keyword, i)
+        )
+        assert sorted(matcher.find_all(text)) == expected
+        assert matcher.search(text) == any(keyword in text for keyword in keywords)
+
+
+def test_detect_opportunity_type_tier_order():
+    """The first tier with a match wins, whichever field it is in"""
+    assert detect_opportunity_type('Studio Grant', '', 'example.org') == 'grant'
+    assert detect_opportunity_type('Open studio', 'Gallery show', 'example.org') == 'residency'
+    assert detect_opportunity_type('Apply now', '', 'instagram.com') == 'social_media'
+    assert detect_opportunity_type('Photography', None, None, category='Museum') == 'exhibition'
+    assert detect_opportunity_type('Photography', None, None) == 'general'
+
+
+if __name__ == "__main__":
+    test_matches_agree_with_substring_checks()
+    test_detect_opportunity_type_tier_order()
+    print("All keyword matcher tests passed")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Script for the in-memory opportunities dataset
+
+Checks that keyword searches and daily counts match the previous per-request
+scans, and that the file is only re-read after it changes.
+"""
+
+import os
+import json
+import tempfile
+from datetime import date
+from unittest import mock
+
+import opportunity_dataset
+from opportunity_dataset import OpportunityDataset
+
+OPPORTUNITIES = [
+    {'title': 'Painting Residency', 'url': 'a', 'location': 'Paris', 'scraped_date': '2026-10-10T08:00:00'},
+    {'title': 'Sculpture Grant', 'url': 'b', 'description': 'For painters too', 'scraped_date': '2026-10-14T09:00:00'},
+    {'title': 'Open Call', 'url': 'c', 'source': 'PaintersGuild', 'scraped_date': '2026-09-01T09:00:00'},
+    {'title': 'Undated Fellowship', 'url': 'd', 'location': None},
+    {'title': 'Photo Prize', 'url': 'e', 'scraped_date': '2026-10-14T18:30:00'},
+]
+
+
+def previous_search(opportunities, keyword, limit):
+    """The per-request filtering get_opportunities used to do"""
+    matches = [opp for opp in opportunities
+               if any(keyword in str(opp.get(field) or '').lower()
+                      for field in ('title', 'description', 'location', 'source'))]
+    matches = sorted(matches, key=lambda x: x.get('scraped_date', ''), reverse=True)
+    return matches[:limit] if limit else matches
+
+
+def write(path, opportunities):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(opportunities, f)
+
+
+def test_search_and_daily_counts():
+    """Indexed results are the same as a full scan"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'opportunities.json')
+        write(path, OPPORTUNITIES)
+        snapshot = OpportunityDataset(path).snapshot()
+
+        for keyword in ('', 'paint', 'PAINT', 'grant', 'nothing'):
+            for limit in (None, 1, 2):
+                assert snapshot.search(keyword, limit) == previous_search(OPPORTUNITIES, keyword.lower(), limit)
+        assert [opp['url'] for opp in snapshot.search()] == ['e', 'b', 'a', 'c', 'd']
+
+        counts = snapshot.daily_counts(days=7, today=date(2026, 10, 16))
+        assert counts == {'2026-10-10': 1, '2026-10-14': 2}
+
+
+def test_reloads_only_on_change():
+    """The file is parsed once per change"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'opportunities.json')
+        write(path, OPPORTUNITIES)
+        dataset = OpportunityDataset(path)
+        first = dataset.snapshot()
+        assert dataset.snapshot() is first
+
+        write(path, OPPORTUNITIES + [{'title': 'New Call', 'url': 'f', 'scraped_date': '2026-10-15T00:00:00'}])
+        second = dataset.snapshot()
+        assert second is not first and len(second) == 6
+        assert second.search(limit=1)[0]['url'] == 'f'
+
+        # A half-written file keeps the previous data
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[{"title": ')
+        assert dataset.snapshot() is second
+
+        assert opportunity_dataset.get_opportunity_dataset(path) is opportunity_dataset.get_opportunity_dataset(path)
+
+
+def test_file_replaced_while_reading_is_reloaded():
+    """A file swapped in during a read is not mistaken for the one that was read"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'opportunities.json')
+        write(path, OPPORTUNITIES)
+        dataset = OpportunityDataset(path)
+        real_load = json.load
+
+        def load_then_replace(f):
+            data = real_load(f)
+            # Another process exports a new version with an atomic rename
+            write(path + '.tmp', OPPORTUNITIES[:2])
+            os.replace(path + '.tmp', path)
+            return data
+
+        with mock.patch.object(opportunity_dataset.json, 'load', side_effect=load_then_replace):
+            assert len(dataset.snapshot()) == 5
+        assert len(dataset.snapshot()) == 2
+
+
+if __name__ == "__main__":
+    test_search_and_daily_counts()
+    test_reloads_only_on_change()
+    test_file_replaced_while_reading_is_reloaded()
+    print("All opportunity dataset tests passed")
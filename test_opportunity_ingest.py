@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test Script for batch opportunity ingestion
+
+Checks that a batch is upserted by URL into the opportunity store with a
+single export of the opportunities file, with one result per item, and that
+later engine merges keep the ingested items.
+"""
+
+import os
+import json
+import tempfile
+from unittest import mock
+
+from opportunity_dataset import get_opportunity_dataset
+from opportunity_ingest import ingest_opportunities, parse_batch
+from opportunity_store import OpportunityStore, get_opportunity_store
+
+
+def test_batch_upserts_with_one_write():
+    """500 items cost one export; results are reported per item"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'opportunities.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{'title': 'Old', 'url': 'u0', 'scraped_date': '2026-01-01T00:00:00'}], f)
+
+        items = [{'title': f'Call {i}', 'url': f'u{i}'} for i in range(500)]
+        items += [{'title': 'No URL'}, 'not an object', {'title': 'Call 7 again', 'url': 'u7'}]
+        with mock.patch.object(OpportunityStore, 'export_json', autospec=True,
+                               side_effect=OpportunityStore.export_json) as export:
+            summary = ingest_opportunities(items, path)
+        assert export.call_count == 1
+        assert summary['created'] == 500 and summary['updated'] == 1 and summary['error'] == 2
+        assert summary['results'][500]['error'] == 'Missing required field: url'
+        assert summary['results'][502]['status'] == 'created'
+
+        with open(path, encoding='utf-8') as f:
+            stored = {opp['url']: opp for opp in json.load(f)}
+        assert len(stored) == 500
+        assert stored['u0']['title'] == 'Call 0' and stored['u0']['scraped_date'] == '2026-01-01T00:00:00'
+        assert stored['u7']['title'] == 'Call 7 again' and stored['u7']['scraped_date']
+
+        # Sending the same batch again changes nothing and writes nothing
+        again = ingest_opportunities([{'title': 'Call 1', 'url': 'u1'}], path)
+        assert again['unchanged'] == 1 and not again['written']
+
+        # An engine merge re-exports from the store and keeps ingested items
+        get_opportunity_store(path).merge([{'title': 'Scraped', 'url': 'u500'}])
+        with open(path, encoding='utf-8') as f:
+            stored = {opp['url']: opp for opp in json.load(f)}
+        assert len(stored) == 501 and stored['u7']['title'] == 'Call 7 again'
+        assert len(get_opportunity_dataset(path).snapshot()) == 501
+
+
+def test_parse_batch_formats():
+    """JSON arrays, wrapped arrays and NDJSON are accepted"""
+    assert parse_batch(b'[{"url": "a"}]') == [{'url': 'a'}]
+    assert parse_batch('{"opportunities": [{"url": "a"}]}') == [{'url': 'a'}]
+    items = parse_batch('{"url": "a"}\n\n{"url": \n{"url": "b"}\n', 'application/x-ndjson')
+    assert items[0] == {'url': 'a'} and isinstance(items[1], ValueError) and items[2] == {'url': 'b'}
+
+
+if __name__ == "__main__":
+    test_batch_upserts_with_one_write()
+    test_parse_batch_formats()
+    print("All opportunity ingestion tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Script for the memory-mapped opportunity snapshot
+
+Checks header-only reads, index-backed tier and field filters, search and
+pagination, and that readers remap the file only after it changes.
+"""
+
+import os
+import tempfile
+
+from opportunity_snapshot import SnapshotCache, write_snapshot, read_snapshot_header
+
+OPPORTUNITIES = [
+    {'title': 'Free Grant', 'description': 'Open call', 'membership_level': 'free', 'source': 'a', 'state': 'Texas'},
+    {'title': 'Mural Commission', 'description': 'Paint a wall', 'membership_level': 'premium', 'source': 'a', 'state': 'Ohio'},
+    {'title': 'Instagram call', 'description': 'Social post', 'type': 'social_media', 'source': 'b'},
+    {'title': 'Residency', 'description': 'Studio residency', 'membership_level': 'premium', 'state': 'Texas'},
+]
+
+
+def make_snapshot(opportunities=OPPORTUNITIES):
+    """Write a snapshot into a fresh temporary directory"""
+    path = os.path.join(tempfile.mkdtemp(), 'snapshot.bin')
+    write_snapshot(path, opportunities, timestamp=1700000000.0)
+    return path
+
+
+def test_header_filters_and_pagination():
+    """Filters match the previous list-scan semantics and only the page is returned"""
+    path = make_snapshot()
+    assert read_snapshot_header(path) == {'count': 4, 'version': 1, 'timestamp': 1700000000.0}
+
+    snapshot = SnapshotCache(path).get()
+    assert snapshot.record(1)['title'] == 'Mural Commission'
+
+    page, total = snapshot.query({'tier': 'free'})
+    assert total == 2 and [op['title'] for op in page] == ['Free Grant', 'Instagram call']
+
+    page, total = snapshot.query({'tier': 'supporter', 'states': ['Texas']})
+    assert [op['title'] for op in page] == ['Free Grant', 'Instagram call', 'Residency']
+
+    # Rows without the filtered key are kept, as before
+    page, total = snapshot.query({'source': 'a'})
+    assert [op['title'] for op in page] == ['Free Grant', 'Mural Commission', 'Residency']
+
+    page, total = snapshot.query({'tier': 'premium'}, limit=2, offset=1)
+    assert total == 4 and [op['title'] for op in page] == ['Mural Commission', 'Instagram call']
+
+    page, total = snapshot.query({'membership_level': 'premium'}, search='studio')
+    assert total == 1 and page[0]['title'] == 'Residency'
+
+
+def test_cache_reloads_only_when_file_changes():
+    """The mapping is reused until the snapshot file is replaced"""
+    path = make_snapshot()
+    cache = SnapshotCache(path)
+    first = cache.get()
+    assert cache.get() is first
+
+    write_snapshot(path, OPPORTUNITIES[:1])
+    second = cache.get()
+    assert second is not first and second.count == 1
+    # The old mapping stays readable for in-flight requests
+    assert first.record(3)['title'] == 'Residency'
+
+
+if __name__ == "__main__":
+    test_header_filters_and_pagination()
+    test_cache_reloads_only_when_file_changes()
+    print("All opportunity snapshot tests passed")
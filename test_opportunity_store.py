@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test Script for the URL-keyed opportunity store
+
+Checks seeding from an existing opportunities.json, first-writer-wins merges,
+the atomic JSON export and concurrent merges from several engines.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from opportunity_store import OpportunityStore
+
+
+def make_export_path(existing=None):
+    """Create a temporary export path, optionally pre-populated"""
+    path = os.path.join(tempfile.mkdtemp(), 'opportunities.json')
+    if existing is not None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(existing, f, indent=2)
+    return path
+
+
+def test_seed_merge_and_export():
+    """Existing rows are imported once; merges only add unseen URLs, in order"""
+    path = make_export_path([{'url': 'https://a', 'title': 'A'}])
+    store = OpportunityStore(path)
+
+    added, total = store.merge([
+        {'url': 'https://a', 'title': 'A changed'},
+        {'url': 'https://b', 'title': 'B'},
+        {'title': 'no url'},
+    ])
+    assert (added, total) == (1, 2)
+
+    with open(path, encoding='utf-8') as f:
+        exported = json.load(f)
+    assert exported == [{'url': 'https://a', 'title': 'A'}, {'url': 'https://b', 'title': 'B'}]
+
+    # Nothing new, so the export is skipped
+    assert store.merge([{'url': 'https://b', 'title': 'B'}]) == (0, 2)
+    assert store.export_json() is False
+
+    # A second handle on the same files does not import again
+    assert OpportunityStore(path).count() == 2
+
+    store.merge([{'url': 'https://c', 'fingerprint': 'abc123'}])
+    assert store.known_keys() == {'https://a', 'https://b', 'https://c', 'abc123'}
+
+
+def test_concurrent_merges_do_not_lose_rows():
+    """Engines merging at the same time all land in the store and the export"""
+    path = make_export_path()
+    stores = [OpportunityStore(path) for _ in range(4)]
+
+    def merge(i):
+        stores[i].merge([{'url': f'https://site/{i}/{j}'} for j in range(50)])
+
+    threads = [threading.Thread(target=merge, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path, encoding='utf-8') as f:
+        assert len(json.load(f)) == 200
+
+
+if __name__ == "__main__":
+    test_seed_merge_and_export()
+    test_concurrent_merges_do_not_lose_rows()
+    print("All opportunity store tests passed")
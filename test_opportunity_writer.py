@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test Script for the buffered opportunity writer
+
+Runs the batch upsert writer against a temporary SQLite database and checks
+the inserted / updated / unchanged counts it reports.
+"""
+
+import asyncio
+from flask import Flask
+
+from models import db, Opportunity
+from scrapers.opportunity_writer import OpportunityBatchWriter, parse_deadline
+
+
+def create_app(db_path):
+    """Create a Flask app bound to a temporary SQLite database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def write(items, **kwargs):
+    """Push items through a writer bound to the current app and return its stats"""
+    async def run():
+        async with OpportunityBatchWriter.for_current_app(**kwargs) as writer:
+            for item in items:
+                await writer.put(item)
+        return writer.stats
+
+    return asyncio.run(run())
+
+
+def test_parse_deadline():
+    """Scraped deadline strings are parsed when possible"""
+    assert parse_deadline('March 5, 2025').day == 5
+    assert parse_deadline('Jan 15 2025').month == 1
+    assert parse_deadline('whenever') is None
+
+
+def test_batch_upsert_counts(tmp_path):
+    """New URLs are inserted, changed rows updated and identical rows left alone"""
+    app = create_app(tmp_path / 'writer.db')
+    items = [
+        {'title': f'Opportunity {i}', 'url': f'https://example.org/{i}', 'description': 'Open call',
+         'deadline': 'March 5, 2025', 'source': 'example.org', 'type': 'general'}
+        for i in range(5)
+    ]
+
+    with app.app_context():
+        db.create_all()
+
+        stats = write(items, batch_size=2, flush_interval=0.05)
+        assert stats == {'inserted': 5, 'updated': 0, 'unchanged': 0, 'failed': 0}
+
+        items[0]['title'] = 'Opportunity 0 (extended)'
+        items.append(dict(items[1]))  # duplicate within the same run
+        stats = write(items, batch_size=2, flush_interval=0.05)
+        assert stats == {'inserted': 0, 'updated': 1, 'unchanged': 5, 'failed': 0}
+
+        assert Opportunity.query.count() == 5
+        assert Opportunity.query.filter_by(url='https://example.org/0').first().title == 'Opportunity 0 (extended)'
+
+
+def test_missing_fields_keep_stored_values(tmp_path):
+    """A field an item does not carry is not overwritten by another item's batch"""
+    app = create_app(tmp_path / 'writer.db')
+
+    with app.app_context():
+        db.create_all()
+        write([{'title': 'B', 'url': 'https://example.org/b', 'description': 'Stored description'}])
+
+        stats = write([
+            {'title': 'A', 'url': 'https://example.org/a', 'description': 'Fresh description'},
+            {'title': 'B (renamed)', 'url': 'https://example.org/b'},
+        ], flush_interval=0.05)
+        assert stats == {'inserted': 1, 'updated': 1, 'unchanged': 0, 'failed': 0}
+
+        b = Opportunity.query.filter_by(url='https://example.org/b').first()
+        assert b.title == 'B (renamed)' and b.description == 'Stored description'
+        a = Opportunity.query.filter_by(url='https://example.org/a').first()
+        assert a.description == 'Fresh description' and a.active is not None
+
+
+def test_preloaded_urls_ignore_this_runs_writes(tmp_path):
+    """URLs written during a run are known, but not counted as preloaded"""
+    app = create_app(tmp_path / 'writer.db')
+
+    async def run():
+        async with OpportunityBatchWriter.for_current_app(batch_size=1, flush_interval=0.05) as writer:
+            await writer.put({'title': 'New', 'url': 'https://example.org/new'})
+            while writer.stats['inserted'] == 0:
+                await asyncio.sleep(0.01)
+            return set(writer.known_urls), writer.preloaded_urls
+
+    with app.app_context():
+        db.create_all()
+        write([{'title': 'Old', 'url': 'https://example.org/old'}])
+
+        known, preloaded = asyncio.run(run())
+        assert known == {'https://example.org/old', 'https://example.org/new'}
+        assert preloaded == {'https://example.org/old'}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_parse_deadline()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_batch_upsert_counts(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_missing_fields_keep_stored_values(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_preloaded_urls_ignore_this_runs_writes(Path(tmp))
+    print("All opportunity writer tests passed")
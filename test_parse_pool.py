@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test Script for the scraper parse stage
+
+Checks that pages are parsed in worker processes while the event loop keeps
+running, and that fetch and parse times are recorded per URL.
+"""
+
+import asyncio
+import os
+import time
+
+from aiohttp import web
+
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers.parse_pool import ParseStage
+
+
+def busy_parser(content, url, spin_seconds):
+    """CPU-bound parser: spins, then returns one opportunity with the worker pid"""
+    deadline = time.perf_counter() + spin_seconds
+    while time.perf_counter() < deadline:
+        pass
+    return [{'url': url, 'title': content, 'pid': os.getpid()}]
+
+
+class PooledScraper(AsyncBaseScraper):
+    """Scraper whose pages are parsed by busy_parser in a process pool"""
+
+    def __init__(self, stage):
+        super().__init__(scraper_name='pooled_scraper', max_concurrency=4)
+        self.http_cache = None
+        self.page_parser = busy_parser
+        self.parse_stage = stage
+        self.found = []
+
+    def page_parser_args(self):
+        return (0.3,)
+
+    async def process_opportunity(self, opportunity_data):
+        self.found.append(opportunity_data)
+        self.total_opportunities += 1
+        return True
+
+
+def test_pages_parse_in_workers_without_blocking_the_loop():
+    """The loop keeps ticking while pages are parsed, and timings are per URL"""
+
+    async def page(request):
+        return web.Response(text=request.path, content_type='text/html')
+
+    async def run(stage):
+        app = web.Application()
+        app.router.add_get('/{name}', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f'http://127.0.0.1:{runner.addresses[0][1]}'
+        urls = [f'{base}/page{i}' for i in range(4)]
+
+        gaps = []
+
+        async def heartbeat():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        scraper = PooledScraper(stage)
+        ticker = asyncio.ensure_future(heartbeat())
+        try:
+            total = await scraper.run_scraper(urls)
+        finally:
+            ticker.cancel()
+            await runner.cleanup()
+        return scraper, urls, total, gaps
+
+    stage = ParseStage(workers=2)
+    loop = asyncio.new_event_loop()
+    try:
+        scraper, urls, total, gaps = loop.run_until_complete(run(stage))
+    finally:
+        loop.close()
+        stage.shutdown()
+
+    assert total == 4
+    assert sorted(opp['title'] for opp in scraper.found) == [f'/page{i}' for i in range(4)]
+    assert os.getpid() not in {opp['pid'] for opp in scraper.found}
+    # Parsing took 0.3s per page but the loop was never blocked for that long
+    assert max(gaps) < 0.2
+
+    assert set(scraper.url_timings) == set(urls)
+    for timings in scraper.url_timings.values():
+        assert timings['fetch'] > 0
+        assert timings['parse'] >= 0.3
+    assert scraper.timing_summary()['parse'] >= 1.2
+
+
+if __name__ == "__main__":
+    test_pages_parse_in_workers_without_blocking_the_loop()
+    print("All parse pool tests passed")
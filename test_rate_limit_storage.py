@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Script for the shared rate limit storage
+
+Checks fixed and sliding window counters, that hits taken concurrently by
+several processes never exceed the limit, and that Flask-Limiter reports the
+shared counts in its X-RateLimit headers.
+"""
+
+import os
+import time
+import tempfile
+import multiprocessing
+
+from flask import Flask
+from flask_limiter import Limiter
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from rate_limit_storage import SharedMemoryStorage, RATE_LIMIT_STRATEGY
+
+
+def _hammer(uri, results):
+    """Take as many hits as possible from a fresh process"""
+    storage = storage_from_string(uri)
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    limit = parse("50 per hour")
+    results.put(sum(1 for _ in range(40) if limiter.hit(limit, "shared-key")))
+
+
+def test_counters_and_windows():
+    """Fixed window counters expire; sliding windows weigh the previous window"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SharedMemoryStorage(f"shm://{tmp}/limits", buckets=4)
+        assert storage.incr("a", 1) == 1
+        assert storage.incr("a", 1, amount=2) == 3
+        assert storage.get("a") == 3 and storage.get_expiry("a") > time.time()
+        time.sleep(1.05)
+        assert storage.get("a") == 0
+        assert storage.incr("a", 1) == 1
+
+        # A second handle on the same file sees the same counters
+        other = SharedMemoryStorage(f"shm://{tmp}/limits", buckets=4)
+        assert other.get("a") == 1
+        other.clear("a")
+        assert storage.get("a") == 0
+
+        assert storage.acquire_sliding_window_entry("s", 3, 60)
+        assert storage.acquire_sliding_window_entry("s", 3, 60, amount=2)
+        assert not storage.acquire_sliding_window_entry("s", 3, 60)
+        previous, _, current, current_ttl = other.get_sliding_window("s", 60)
+        assert (previous, current) == (0, 3) and 60 < current_ttl <= 120
+
+        # More keys than one bucket holds: the entry expiring first is evicted
+        for i in range(200):
+            storage.incr(f"k{i}", 60 + i)
+        assert storage.get("k199") == 1
+        assert storage.reset() > 0
+        assert storage.get("k199") == 0
+
+
+def test_limits_hold_across_processes():
+    """Concurrent workers share one limit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"shm://{tmp}/limits"
+        SharedMemoryStorage(uri)
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_hammer, args=(uri, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        assert sum(results.get(timeout=5) for _ in workers) == 50
+
+
+def test_flask_limiter_headers():
+    """X-RateLimit headers reflect the shared count"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        limiter = Limiter(key_func=lambda: "client", app=app, storage_uri=f"shm://{tmp}/limits",
+                          strategy=RATE_LIMIT_STRATEGY, headers_enabled=True)
+
+        @app.route('/ping')
+        @limiter.limit("3 per minute")
+        def ping():
+            return "pong"
+
+        client = app.test_client()
+        responses = [client.get('/ping') for _ in range(4)]
+        assert [r.status_code for r in responses] == [200, 200, 200, 429]
+        assert responses[0].headers['X-RateLimit-Limit'] == '3'
+        assert [r.headers['X-RateLimit-Remaining'] for r in responses[:3]] == ['2', '1', '0']
+        assert int(responses[0].headers['X-RateLimit-Reset']) > time.time()
+
+
+if __name__ == "__main__":
+    test_counters_and_windows()
+    test_limits_hold_across_processes()
+    test_flask_limiter_headers()
+    print("All rate limit storage tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test Script for scheduler leases
+
+Checks that only one holder of a named lease runs a scheduler's jobs, and that
+a standby takes over once the leader releases the lease or its process dies.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from scheduler_lease import SchedulerLease, read_lease_holder
+
+
+def wait_for(condition, timeout=5):
+    """Poll until condition() is true or the timeout passes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def test_only_one_holder_and_release_hands_over():
+    """A second lease on the same name waits until the first is released"""
+    with tempfile.TemporaryDirectory() as lease_dir:
+        first = SchedulerLease('digest', lease_dir=lease_dir)
+        second = SchedulerLease('digest', lease_dir=lease_dir)
+
+        assert first.try_acquire()
+        assert not second.heartbeat()
+        holder = read_lease_holder('digest', lease_dir)
+        assert holder['held'] and holder['pid'] == os.getpid()
+
+        first.release()
+        assert not read_lease_holder('digest', lease_dir)['held']
+        assert second.heartbeat()
+        assert second.is_leader
+        second.release()
+        assert read_lease_holder('missing', lease_dir) is None
+
+
+def test_jobs_run_in_the_leader_only():
+    """Two schedulers share a job, only the leader runs it until it stops"""
+    with tempfile.TemporaryDirectory() as lease_dir:
+        runs = {'a': 0, 'b': 0}
+        leases = []
+        for name in ('a', 'b'):
+            scheduler = BackgroundScheduler()
+            scheduler.add_job(lambda name=name: runs.__setitem__(name, runs[name] + 1),
+                              'interval', seconds=0.05, id='tick')
+            lease = SchedulerLease('ticks', lease_dir=lease_dir, poll_interval=0.1)
+            lease.attach(scheduler)
+            leases.append((lease, scheduler))
+
+        try:
+            assert wait_for(lambda: runs['a'] >= 3)
+            assert runs['b'] == 0
+
+            leader, leader_scheduler = leases[0]
+            leader.stop()
+            leader_scheduler.shutdown(wait=False)
+            assert wait_for(lambda: runs['b'] >= 3)
+            assert leases[1][0].is_leader
+        finally:
+            for lease, scheduler in leases:
+                lease.stop()
+                if scheduler.running:
+                    scheduler.shutdown(wait=False)
+
+
+def test_standby_takes_over_when_the_leader_dies():
+    """The lock is dropped with the leader's process, so a standby takes over"""
+    with tempfile.TemporaryDirectory() as lease_dir:
+        script = (
+            "import sys, time\n"
+            "from scheduler_lease import SchedulerLease\n"
+            f"lease = SchedulerLease('snapshot', lease_dir={lease_dir!r})\n"
+            "assert lease.try_acquire()\n"
+            "print('leader', flush=True)\n"
+            "time.sleep(60)\n"
+        )
+        leader = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+        try:
+            assert leader.stdout.readline().strip() == b'leader'
+            standby = SchedulerLease('snapshot', lease_dir=lease_dir)
+            assert not standby.heartbeat()
+            assert read_lease_holder('snapshot', lease_dir)['pid'] == leader.pid
+
+            leader.kill()
+            leader.wait()
+            assert standby.heartbeat()
+            assert read_lease_holder('snapshot', lease_dir)['pid'] == os.getpid()
+            standby.release()
+        finally:
+            if leader.poll() is None:
+                leader.kill()
+            leader.stdout.close()
+
+
+if __name__ == "__main__":
+    test_only_one_holder_and_release_hands_over()
+    test_jobs_run_in_the_leader_only()
+    test_standby_takes_over_when_the_leader_dies()
+    print("All scheduler lease tests passed")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test Script for the scrape orchestrator
+
+Runs several async scrapers against a local aiohttp server on one event loop
+and checks the per-domain caps and that synchronous engines still run.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers.orchestrator import ScrapeOrchestrator, domain_for
+from scrapers.politeness import TokenBucket
+
+
+class CountingScraper(AsyncBaseScraper):
+    """Scraper that counts the pages it fetched"""
+
+    def __init__(self, name, urls):
+        super().__init__(scraper_name=name, max_concurrency=10)
+        self.urls = urls
+        self.http_cache = None
+
+    async def extract_opportunities(self, soup, source_url):
+        return [{'url': source_url}]
+
+    async def run(self):
+        return await self.run_scraper(self.urls)
+
+
+async def _run_against_local_server(engines_for_port, **orchestrator_kwargs):
+    """Start a slow local server, run the orchestrator, then shut the server down"""
+    async def page(request):
+        await asyncio.sleep(0.05)
+        return web.Response(text='<html><body>ok</body></html>', content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/{name}', page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    try:
+        orchestrator = ScrapeOrchestrator(**orchestrator_kwargs)
+        results = await orchestrator.run(engines_for_port(port))
+    finally:
+        await runner.cleanup()
+    return orchestrator, results
+
+
+def test_domain_for_strips_www():
+    """Caps are keyed by host, ignoring a leading www."""
+    assert domain_for('https://www.artjobs.com/texas/') == 'artjobs.com'
+    assert domain_for('https://callforentry.org/x') == 'callforentry.org'
+
+
+def test_engines_share_per_domain_caps():
+    """Engines hitting the same host never exceed that host's cap together"""
+    def engines(port):
+        return {
+            f'engine_{i}': CountingScraper(
+                f'engine_{i}',
+                [f'http://127.0.0.1:{port}/p{i}_{j}' for j in range(4)] +
+                [f'http://localhost:{port}/p{i}_{j}' for j in range(4)]
+            )
+            for i in range(3)
+        }
+
+    def sync_engine():
+        return 7
+
+    def engines_with_sync(port):
+        mapping = engines(port)
+        mapping['legacy'] = sync_engine
+        return mapping
+
+    loop = asyncio.new_event_loop()
+    try:
+        orchestrator, results = loop.run_until_complete(_run_against_local_server(
+            engines_with_sync, global_limit=5, domain_limit=2, domain_limits={'localhost': 1}, host_interval=0
+        ))
+    finally:
+        loop.close()
+
+    assert results == {'engine_0': 8, 'engine_1': 8, 'engine_2': 8, 'legacy': 7}
+    assert orchestrator.limiter.peak_in_flight['127.0.0.1'] == 2
+    assert orchestrator.limiter.peak_in_flight['localhost'] == 1
+
+
+def test_token_bucket_spaces_reservations():
+    """After the burst, each reservation waits one more interval"""
+    now = [100.0]
+    bucket = TokenBucket(rate=0.5, capacity=1, clock=lambda: now[0])
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 2.0
+    assert bucket.reserve() == 4.0
+
+    now[0] += 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_politeness_only_delays_the_same_host():
+    """Requests to one host are spaced out while other hosts proceed in parallel"""
+    def engines(port):
+        return {
+            'a': CountingScraper('a', [f'http://127.0.0.1:{port}/a{j}' for j in range(3)]),
+            'b': CountingScraper('b', [f'http://localhost:{port}/b{j}' for j in range(3)]),
+        }
+
+    loop = asyncio.new_event_loop()
+    try:
+        orchestrator, results = loop.run_until_complete(_run_against_local_server(engines, host_interval=0.2))
+    finally:
+        loop.close()
+
+    assert results == {'a': 3, 'b': 3}
+    # Two hosts, each waiting 0.2s + 0.4s for its 2nd and 3rd request
+    assert abs(orchestrator.limiter.politeness.total_wait - 1.2) < 0.1
+    assert max(orchestrator.durations.values()) < 1.0
+
+
+if __name__ == "__main__":
+    test_domain_for_strips_www()
+    test_engines_share_per_domain_caps()
+    test_token_bucket_spaces_reservations()
+    test_politeness_only_delays_the_same_host()
+    print("All scrape orchestrator tests passed")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test Script for the staged scraper pipeline
+
+Checks that opportunities stream out before slow URLs finish, that bounded
+queues hold fetching back when the consumer is slow, and that the normalize
+stage can rewrite or drop opportunities.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from scrapers.async_base_scraper import AsyncBaseScraper
+
+
+class PipelineScraper(AsyncBaseScraper):
+    """Scraper returning one opportunity per page, dropping 'skip' pages"""
+
+    def __init__(self, queue_size=50):
+        super().__init__(scraper_name='pipeline_scraper', max_concurrency=2)
+        self.http_cache = None
+        self.queue_size = queue_size
+
+    async def extract_opportunities(self, soup, source_url):
+        return [{'url': source_url, 'title': soup.get_text()}]
+
+    async def normalize_opportunity(self, opportunity_data, source_url):
+        if opportunity_data['title'] == 'skip':
+            return None
+        return dict(opportunity_data, title=opportunity_data['title'].upper())
+
+
+def run_with_server(consume):
+    """Serve /slow after 0.5s, /skip as 'skip' and anything else immediately"""
+    served = []
+
+    async def page(request):
+        served.append(request.path)
+        if request.path == '/slow':
+            await asyncio.sleep(0.5)
+        return web.Response(text='skip' if request.path == '/skip' else 'ok', content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/{name}', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        try:
+            return await consume(f'http://127.0.0.1:{runner.addresses[0][1]}', served)
+        finally:
+            await runner.cleanup()
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+def test_results_stream_before_slow_urls_finish():
+    """Fast pages reach the consumer while the slow page is still loading"""
+
+    async def consume(base, served):
+        scraper = PipelineScraper()
+        urls = [f'{base}/slow', f'{base}/skip'] + [f'{base}/page{i}' for i in range(5)]
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        arrivals = []
+        async for opp in scraper.iter_opportunities(urls):
+            arrivals.append((loop.time() - start, opp))
+        return arrivals
+
+    arrivals = run_with_server(consume)
+    assert len(arrivals) == 6
+    assert all(opp['title'] == 'OK' for _, opp in arrivals)
+    assert arrivals[0][0] < 0.4
+    assert arrivals[-1][1]['url'].endswith('/slow')
+
+
+def test_bounded_queues_hold_back_fetching():
+    """With a slow consumer, only a bounded number of pages is fetched ahead"""
+
+    async def consume(base, served):
+        scraper = PipelineScraper(queue_size=1)
+        urls = [f'{base}/page{i}' for i in range(40)]
+        consumed = 0
+        fetched_ahead = 0
+        async for _ in scraper.iter_opportunities(urls):
+            consumed += 1
+            await asyncio.sleep(0.01)
+            fetched_ahead = max(fetched_ahead, len(served) - consumed)
+        return consumed, fetched_ahead
+
+    consumed, fetched_ahead = run_with_server(consume)
+    assert consumed == 40
+    # Two fetch workers, one parse and one normalize worker, four one-item queues
+    assert fetched_ahead <= 8
+
+
+if __name__ == "__main__":
+    test_results_stream_before_slow_urls_finish()
+    test_bounded_queues_hold_back_fetching()
+    print("All scraper pipeline tests passed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Script for the opportunity search index
+
+Exercises tokenization, BM25F ranking, prefix matching and incremental
+updates without needing a database.
+"""
+
+import threading
+from unittest import mock
+
+from flask import Flask
+
+from search_index import OpportunitySearchIndex, tokenize
+
+
+def build_index():
+    """Create a small index with a few representative opportunities"""
+    index = OpportunitySearchIndex()
+    index.add({
+        'id': 1,
+        'title': 'Painting Residency in Vermont',
+        'description': 'A summer residency for painters and sculptors.',
+        'organization': 'Vermont Studio Center',
+        'location': 'Johnson, VT',
+        'type': 'residency',
+        'categories': 'Painting,Sculpture',
+        'deadline': '2025-03-01T00:00:00',
+    })
+    index.add({
+        'id': 2,
+        'title': 'Photography Grant',
+        'description': 'Funding for emerging photographers working in painting-adjacent media.',
+        'organization': 'Lens Foundation',
+        'location': 'New York, NY',
+        'type': 'grant',
+        'categories': ['Photography'],
+        'deadline': '2025-02-01T00:00:00',
+    })
+    index.add({
+        'id': 3,
+        'title': 'Open Call: Public Mural',
+        'description': 'Seeking muralists for a downtown wall.',
+        'organization': 'City Arts Council',
+        'location': 'Chicago, IL',
+        'type': 'commission',
+        'categories': 'Painting,Public Art',
+        'deadline': None,
+    })
+    return index
+
+
+def test_tokenize():
+    """Tokens are lower-cased alphanumerics"""
+    assert tokenize("Open Call: Public-Mural 2025!") == ['open', 'call', 'public', 'mural', '2025']
+    assert tokenize(None) == []
+
+
+def test_title_matches_rank_above_description_matches():
+    """A title hit outranks a description-only hit thanks to field boosts"""
+    index = build_index()
+    ranked = [doc_id for doc_id, _ in index.search('painting')]
+    assert ranked[0] == 1
+    assert set(ranked) == {1, 2, 3}
+
+
+def test_prefix_and_all_terms_required():
+    """Query terms are prefix-expanded and every term must match"""
+    index = build_index()
+    assert [doc_id for doc_id, _ in index.search('photo')] == [2]
+    assert [doc_id for doc_id, _ in index.search('paint vermont')] == [1]
+    assert index.search('paint nowhere') == []
+
+
+def test_field_restriction_and_filters():
+    """Searches can be limited to fields and filtered on stored metadata"""
+    index = build_index()
+    assert [doc_id for doc_id, _ in index.search('new', fields=['location'])] == [2]
+
+    ranked = index.search('painting', filter_fn=lambda doc: 'public' in doc['categories_lower'])
+    assert [doc_id for doc_id, _ in ranked] == [3]
+
+
+def test_incremental_update_and_remove():
+    """Re-adding a document replaces its postings; removing drops it"""
+    index = build_index()
+    index.add({'id': 2, 'title': 'Ceramics Grant', 'description': '', 'categories': 'Ceramics'})
+    assert index.search('photography') == []
+    assert [doc_id for doc_id, _ in index.search('ceramic')] == [2]
+
+    index.remove(1)
+    assert 1 not in [doc_id for doc_id, _ in index.search('painting')]
+    assert len(index) == 2
+
+
+def test_full_rebuild_runs_in_background():
+    """Searches keep using the current index until the rebuilt one is swapped in"""
+    index = build_index()
+    index.built = True
+    index.last_refresh = index.last_full_build = 0.0
+
+    fresh = OpportunitySearchIndex()
+    fresh.add({'id': 4, 'title': 'Ceramics Fellowship', 'description': '', 'categories': 'Ceramics'})
+    release = threading.Event()
+
+    def build_fresh():
+        release.wait(5)
+        return fresh, None
+
+    with Flask(__name__).app_context(), \
+            mock.patch.object(index, '_build_fresh', side_effect=build_fresh), \
+            mock.patch.object(index, 'refresh') as refresh:
+        index.maybe_refresh()
+        assert refresh.call_count == 1
+        assert [doc_id for doc_id, _ in index.search('vermont')] == [1]
+        assert index.search('ceramics') == []
+
+        # A second refresh while the rebuild runs does not start another one
+        index.last_refresh = 0.0
+        thread = index._rebuild_thread
+        index.maybe_refresh()
+        assert index._rebuild_thread is thread
+
+        release.set()
+        thread.join(5)
+        assert [doc_id for doc_id, _ in index.search('ceramics')] == [4]
+        assert index.search('vermont') == [] and index.last_full_build > 0
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_title_matches_rank_above_description_matches()
+    test_prefix_and_all_terms_required()
+    test_field_restriction_and_filters()
+    test_incremental_update_and_remove()
+    test_full_rebuild_runs_in_background()
+    print("All search index tests passed")
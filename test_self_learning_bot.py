@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test Script for the recommender's feature pipeline
+
+Runs the recommendation bot against in-memory DataFrames (no database) and
+checks that training rows match the old row-by-row join and follow new,
+edited and deleted feedback.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import self_learning_bot
+from self_learning_bot import ArtRecommendationBot
+
+WORDS = ['painting', 'sculpture', 'residency', 'grant', 'mural', 'photography',
+         'ceramics', 'printmaking', 'fellowship', 'exhibition', 'textile', 'video']
+
+
+def model_dir(tmp):
+    """Point every model artifact path at a temporary directory"""
+    return mock.patch.multiple(
+        self_learning_bot,
+        MODEL_PATH=os.path.join(tmp, 'art_recommender.pkl'),
+        VECTORIZER_PATH=os.path.join(tmp, 'text_vectorizer.pkl'),
+        STATS_PATH=os.path.join(tmp, 'feature_stats.pkl'),
+        SCHEMA_PATH=os.path.join(tmp, 'feature_schema.pkl'),
+        FEATURE_MATRIX_PATH=os.path.join(tmp, 'opportunity_features.npz'),
+        TRAINING_SET_PATH=os.path.join(tmp, 'training_set.npz'),
+    )
+
+
+def make_opportunities(count, sources=('artcall', 'nea', 'cafe'), start_id=1):
+    now = datetime.utcnow()
+    return pd.DataFrame([{
+        'id': start_id + i,
+        'title': f"{WORDS[i % len(WORDS)].title()} call {i}",
+        'description': f"{WORDS[(i * 5) % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]} open call",
+        'url': f"https://example.org/{start_id + i}",
+        'deadline': now + timedelta(days=i + 1) if i % 4 else None,
+        'source': sources[i % len(sources)],
+        'location': ['new york', 'remote', 'berlin'][i % 3],
+        'category': ['art', 'grant'][i % 2],
+        'tags': WORDS[(i * 3) % len(WORDS)],
+        'created_at': now - timedelta(days=i),
+        'updated_at': now - timedelta(days=i),
+    } for i in range(count)])
+
+
+def make_feedback(opportunity_ids, count):
+    return pd.DataFrame([{
+        'id': i + 1,
+        'user_id': i % 4 + 1,
+        'opportunity_id': int(opportunity_ids[(i * 7) % len(opportunity_ids)]),
+        'rating': i % 5 + 1,
+    } for i in range(count)])
+
+
+def iterrows_join(features_df, feature_columns, feedback_df):
+    """The row-by-row join prepare_training_data used before the indexed lookup"""
+    X_rows, y_values = [], []
+    for _, feedback in feedback_df.iterrows():
+        opportunity = features_df[features_df['id'] == feedback['opportunity_id']]
+        if not opportunity.empty:
+            X_rows.append(opportunity[feature_columns].values[0])
+            y_values.append(1 if feedback['rating'] >= 3 else 0)
+    return np.array(X_rows), np.array(y_values)
+
+
+def test_build_training_rows_matches_iterrows_join():
+    """The indexed join gives the same rows as the old per-feedback lookup"""
+    with tempfile.TemporaryDirectory() as tmp, model_dir(tmp):
+        bot = ArtRecommendationBot()
+        opportunities_df = make_opportunities(25)
+        # A duplicated opportunity id (first row wins) and feedback for a missing one
+        opportunities_df = pd.concat([opportunities_df, opportunities_df.iloc[[3]].assign(title='Duplicate')],
+                                     ignore_index=True)
+        feedback_df = make_feedback(opportunities_df['id'], 60)
+        feedback_df.loc[5, 'opportunity_id'] = 999
+
+        features_df = bot.engineer_features(opportunities_df, feedback_df, fit=True)
+        columns = bot.get_feature_columns(features_df)
+        X, y, feedback_ids = bot.build_training_rows(
+            features_df['id'].to_numpy(), features_df[columns].to_numpy(dtype=np.float32), feedback_df
+        )
+        X_ref, y_ref = iterrows_join(features_df, columns, feedback_df)
+
+        # Opportunities without a deadline have a NaN days_to_deadline in both
+        assert len(y) == 59 and 6 not in feedback_ids
+        assert np.array_equal(y, y_ref)
+        assert np.allclose(X, X_ref.astype(np.float32), equal_nan=True)
+
+
+def test_extend_training_set_follows_feedback_changes():
+    """New and relabelled feedback is joined, deleted feedback is dropped"""
+    with tempfile.TemporaryDirectory() as tmp, model_dir(tmp):
+        bot = ArtRecommendationBot()
+        opportunities_df = make_opportunities(25)
+        features_df = bot.engineer_features(opportunities_df, fit=True)
+        columns = bot.get_feature_columns(features_df)
+        bot.feature_matrix = {
+            'ids': features_df['id'].to_numpy(dtype=np.int64),
+            'X': features_df[columns].to_numpy(dtype=np.float32),
+            'columns': columns,
+            'signature': 'fixed'
+        }
+
+        feedback_df = make_feedback(opportunities_df['id'], 30)
+        X, y, feedback_ids = bot.build_training_rows(bot.feature_matrix['ids'], bot.feature_matrix['X'], feedback_df)
+        bot.save_training_set(X, y, feedback_ids)
+        training_set = bot.load_training_set()
+
+        with mock.patch.object(bot, 'refresh_feature_matrix') as refresh:
+            with mock.patch.object(bot, 'load_feedback_ratings', return_value=feedback_df):
+                unchanged = bot._extend_training_set(training_set)
+            assert refresh.call_count == 0
+            assert np.array_equal(unchanged[2], feedback_ids)
+
+            # Delete one rating, flip one across the threshold, nudge one within
+            # its label and add new ones
+            current_df = feedback_df[feedback_df['id'] != 4].copy()
+            current_df.loc[current_df['id'] == 5, 'rating'] = 1
+            current_df.loc[current_df['id'] == 9, 'rating'] = 3
+            current_df = pd.concat([current_df, make_feedback(opportunities_df['id'], 33).iloc[30:]],
+                                   ignore_index=True)
+            with mock.patch.object(bot, 'load_feedback_ratings', return_value=current_df):
+                X_ext, y_ext, ids_ext = bot._extend_training_set(training_set)
+            assert refresh.call_count == 1
+
+        X_ref, y_ref, ids_ref = bot.build_training_rows(bot.feature_matrix['ids'], bot.feature_matrix['X'], current_df)
+        order, order_ref = np.argsort(ids_ext), np.argsort(ids_ref)
+        assert np.array_equal(ids_ext[order], ids_ref[order_ref])
+        assert np.array_equal(y_ext[order], y_ref[order_ref])
+        assert np.array_equal(X_ext[order], X_ref[order_ref], equal_nan=True)
+        assert 4 not in ids_ext and y_ext[ids_ext == 5][0] == 0
+
+
+if __name__ == "__main__":
+    test_build_training_rows_matches_iterrows_join()
+    test_extend_training_set_follows_feedback_changes()
+    print("All recommender feature pipeline tests passed")
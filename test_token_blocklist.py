@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Script for the in-memory token revocation set
+
+Checks that revocation checks are answered without querying the blocklist
+table, that tokens revoked by another process show up after a sync, and that
+pruning removes expired rows in one statement.
+"""
+
+import os
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+import token_blocklist
+
+
+def payload(jti, minutes=15, token_type='access'):
+    return {'jti': jti, 'type': token_type, 'sub': '1',
+            'exp': int(time.time()) + minutes * 60}
+
+
+def test_revocations_are_served_from_memory():
+    """Local and remote revocations are seen; checks don't hit the database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'tokens.sqlite3')}"
+        db = SQLAlchemy(app)
+        saved = (token_blocklist.db, token_blocklist.TokenBlocklist, token_blocklist.revocations)
+        token_blocklist.init_db(db)
+        Model = token_blocklist.define_token_blocklist()
+        token_blocklist.revocations = token_blocklist.RevocationSet(sync_interval=3600)
+        try:
+            with app.app_context():
+                db.create_all()
+                db.session.add(Model(jti='old', type='access', user_id=1,
+                                     expires_at=datetime.utcnow() + timedelta(minutes=5)))
+                db.session.commit()
+
+                token_blocklist.revocations.sync()
+                queries = []
+                event.listen(db.engine, 'before_cursor_execute', lambda *args: queries.append(args[2]))
+
+                token_blocklist.add_token_to_blocklist(payload('mine'), user_id=1)
+                queries.clear()
+                assert token_blocklist.is_token_revoked(payload('old'))
+                assert token_blocklist.is_token_revoked(payload('mine'))
+                assert not token_blocklist.is_token_revoked(payload('mine', token_type='refresh'))
+                assert not token_blocklist.is_token_revoked(payload('fresh'))
+                assert token_blocklist.is_token_revoked({'type': 'access'})
+                assert queries == []
+
+                # Another process revokes a token
+                with db.engine.begin() as conn:
+                    conn.execute(Model.__table__.insert().values(
+                        jti='remote', type='access', user_id=2, created_at=datetime.utcnow(),
+                        revoked_at=datetime.utcnow(), expires_at=datetime.utcnow() + timedelta(minutes=5)))
+                assert not token_blocklist.is_token_revoked(payload('remote'))
+                assert token_blocklist.revocations.sync() >= 1
+                assert token_blocklist.is_token_revoked(payload('remote'))
+
+                # Expired rows go in one DELETE
+                for i in range(3):
+                    db.session.add(Model(jti=f'expired-{i}', type='access', user_id=1,
+                                         expires_at=datetime.utcnow() - timedelta(minutes=1)))
+                db.session.commit()
+                queries.clear()
+                assert token_blocklist.prune_blocklist() == 3
+                assert sum(q.lstrip().upper().startswith('DELETE') for q in queries) == 1
+                assert Model.query.count() == 3
+        finally:
+            token_blocklist.db, token_blocklist.TokenBlocklist, token_blocklist.revocations = saved
+
+
+if __name__ == "__main__":
+    test_revocations_are_served_from_memory()
+    print("All token blocklist tests passed")
@@ -4,8 +4,28 @@ Token Blocklist Module
 This module manages JWT token revocation and blocklisting.
 It helps invalidate tokens when users log out or when tokens need
 to be revoked for security reasons.
+
+Revocation checks run on every JWT-protected request, so they are answered
+from a process-local set of revoked (jti, type) pairs instead of the
+database. The set is loaded at startup and kept current by a background
+thread that polls for rows revoked since the last sync; tokens revoked in
+this process are added to it immediately.
 """
-from datetime import datetime
+import os
+import time
+import calendar
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls for tokens revoked by other processes
+REVOCATION_SYNC_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 2))
+
+# How far each poll looks back before the newest revocation it has seen, so
+# rows committed late by slower transactions are not missed
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
 
 # Import db as a global variable, but initialize it later
 db = None
@@ -49,6 +69,135 @@ def define_token_blocklist():
     return TokenBlocklist
 
 
+def _epoch(value):
+    """Seconds since the epoch for a naive UTC datetime"""
+    return calendar.timegm(value.utctimetuple())
+
+
+class RevocationSet:
+    """Process-local copy of the non-expired entries of the token blocklist"""
+
+    def __init__(self, sync_interval=None):
+        """
+        Initialize an empty set
+
+        Args:
+            sync_interval (float): Seconds between polls of the blocklist table
+        """
+        self.sync_interval = REVOCATION_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self._revoked = {}
+        self._high_water = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        self._app = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __contains__(self, key):
+        return key in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def add(self, jti, token_type, expires_at):
+        """Record a revocation made by this process"""
+        self._revoked[(jti, token_type)] = _epoch(expires_at)
+
+    def sync(self):
+        """
+        Load blocklist rows revoked since the last sync (all rows on the first call)
+
+        Returns:
+            int: Number of rows read
+        """
+        with self._lock:
+            query = TokenBlocklist.query.with_entities(
+                TokenBlocklist.jti, TokenBlocklist.type,
+                TokenBlocklist.expires_at, TokenBlocklist.revoked_at
+            )
+            if self._high_water is None:
+                query = query.filter(TokenBlocklist.expires_at >= datetime.utcnow())
+            else:
+                query = query.filter(TokenBlocklist.revoked_at >= self._high_water - REVOCATION_SYNC_OVERLAP)
+            rows = query.all()
+
+            for jti, token_type, expires_at, revoked_at in rows:
+                self._revoked[(jti, token_type)] = _epoch(expires_at)
+                if self._high_water is None or revoked_at > self._high_water:
+                    self._high_water = revoked_at
+            if self._high_water is None:
+                self._high_water = datetime.utcnow()
+
+            # Expired tokens are rejected by their exp claim anyway
+            now = time.time()
+            for key in [key for key, expires in list(self._revoked.items()) if expires < now]:
+                del self._revoked[key]
+
+            self._synced_at = time.monotonic()
+            return len(rows)
+
+    def start(self, app):
+        """
+        Load the blocklist and keep it current from a background thread
+
+        Args:
+            app: Flask app whose context the thread queries in
+        """
+        self._app = app
+        with app.app_context():
+            self.sync()
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._app is not None and self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='token-revocation-sync', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.sync_interval):
+            try:
+                with self._app.app_context():
+                    self.sync()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Error syncing token revocations: {e}")
+
+    def ensure_fresh(self):
+        """Sync inline when no background sync has run for a while"""
+        self._ensure_thread()
+        if time.monotonic() - self._synced_at > 3 * self.sync_interval:
+            try:
+                self.sync()
+            except Exception as e:
+                if self._high_water is None:
+                    raise
+                # Keep answering from the last synced set; retry after an interval
+                self._synced_at = time.monotonic()
+                logger.error(f"Error syncing token revocations: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def _after_fork_in_child(self):
+        """The sync thread does not survive a fork; the next check restarts it"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+
+revocations = RevocationSet()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=revocations._after_fork_in_child)
+
+
+def start_revocation_sync(app):
+    """Load revoked tokens and keep them in sync for this process"""
+    revocations.start(app)
+
+
 def is_token_revoked(jwt_payload):
     """
     Check if a token has been revoked.
@@ -64,8 +213,8 @@ def is_token_revoked(jwt_payload):
         return True  # Tokens without JTI are considered revoked
         
     token_type = 'refresh' if jwt_payload.get('type') == 'refresh' else 'access'
-    token = TokenBlocklist.query.filter_by(jti=jti, type=token_type).first()
-    return token is not None
+    revocations.ensure_fresh()
+    return (jti, token_type) in revocations
 
 
 def add_token_to_blocklist(jwt_payload, user_id=None, token_type=None):
@@ -87,8 +236,8 @@ def add_token_to_blocklist(jwt_payload, user_id=None, token_type=None):
     if not token_type:
         token_type = 'refresh' if jwt_payload.get('type') == 'refresh' else 'access'
     
-    # Calculate token expiry
-    expires_at = datetime.fromtimestamp(jwt_payload.get('exp', 0))
+    # Calculate token expiry (UTC, like the other timestamps in the table)
+    expires_at = datetime.utcfromtimestamp(jwt_payload.get('exp', 0))
     
     # Create blocklist entry
     token = TokenBlocklist(
@@ -100,6 +249,7 @@ def add_token_to_blocklist(jwt_payload, user_id=None, token_type=None):
     
     db.session.add(token)
     db.session.commit()
+    revocations.add(jti, token_type, expires_at)
     
     return token
 
@@ -112,12 +262,8 @@ def prune_blocklist():
     Returns:
         int: Number of tokens removed
     """
-    now = datetime.utcnow()
-    expired_tokens = TokenBlocklist.query.filter(TokenBlocklist.expires_at < now).all()
-    count = len(expired_tokens)
-    
-    for token in expired_tokens:
-        db.session.delete(token)
-    
+    count = TokenBlocklist.query.filter(
+        TokenBlocklist.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
     db.session.commit()
-    return count
\ No newline at end of file
+    return count